@@ -6,11 +6,31 @@
 
 from fastapi import APIRouter
 
-from app.api.endpoints import notes, categories
+from app.api.endpoints import (
+    notes,
+    categories,
+    category_rules,
+    transactions,
+    reports,
+    budgets,
+    recurring,
+    imports,
+)
 
 # Создаем основной роутер API
 api_router = APIRouter()
 
 # Включаем роутеры для разных ресурсов
 api_router.include_router(notes.router, prefix="/notes", tags=["notes"])
+# Правила - до категорий, чтобы "rules" не принимался за ID категории
+api_router.include_router(
+    category_rules.router, prefix="/categories/rules", tags=["categories"]
+)
 api_router.include_router(categories.router, prefix="/categories", tags=["categories"])
+api_router.include_router(
+    transactions.router, prefix="/transactions", tags=["transactions"]
+)
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(budgets.router, prefix="/budgets", tags=["budgets"])
+api_router.include_router(recurring.router, prefix="/recurring", tags=["recurring"])
+api_router.include_router(imports.router, prefix="/imports", tags=["imports"])
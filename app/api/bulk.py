@@ -0,0 +1,84 @@
+# app/api/bulk.py
+"""
+Общие помощники для массовых (/bulk) эндпоинтов.
+
+Элементы валидируются по одному, чтобы невалидный элемент попадал в
+список ошибок, а не ронял весь запрос с 422.
+"""
+
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+from app.schemas.bulk import BulkItemError
+
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+
+
+def check_bulk_size(items: List[Any]) -> None:
+    """
+    Проверить размер пачки.
+
+    Raises:
+        HTTPException: 400 если элементов больше BULK_MAX_ITEMS
+    """
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Максимум {settings.BULK_MAX_ITEMS} элементов за запрос",
+        )
+
+
+def validate_bulk_items(
+    items: List[Dict[str, Any]], schema: Type[SchemaType]
+) -> Tuple[List[Tuple[int, SchemaType]], List[BulkItemError]]:
+    """
+    Провалидировать элементы на создание.
+
+    Returns:
+        Кортеж (список (индекс, схема) валидных, список ошибок)
+    """
+    valid: List[Tuple[int, SchemaType]] = []
+    errors: List[BulkItemError] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            errors.append(BulkItemError(index=index, detail=_errors(e)))
+    return valid, errors
+
+
+def validate_bulk_updates(
+    items: List[Dict[str, Any]], schema: Type[BaseModel]
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[BulkItemError]]:
+    """
+    Провалидировать элементы на обновление (каждый с обязательным "id").
+
+    Returns:
+        Кортеж (список (индекс, dict с id и полями), список ошибок)
+    """
+    valid: List[Tuple[int, Dict[str, Any]]] = []
+    errors: List[BulkItemError] = []
+    for index, item in enumerate(items):
+        item_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(item_id, str):
+            errors.append(BulkItemError(index=index, detail="Не указан id"))
+            continue
+
+        fields = {k: v for k, v in item.items() if k != "id"}
+        try:
+            obj_in = schema.model_validate(fields)
+        except ValidationError as e:
+            errors.append(BulkItemError(index=index, id=item_id, detail=_errors(e)))
+            continue
+
+        valid.append((index, {"id": item_id, **obj_in.model_dump(exclude_unset=True)}))
+    return valid, errors
+
+
+def _errors(e: ValidationError) -> Any:
+    """Ошибки pydantic в JSON-совместимом виде."""
+    return jsonable_encoder(e.errors(include_url=False, include_context=False))
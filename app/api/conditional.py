@@ -0,0 +1,176 @@
+# app/api/conditional.py
+"""
+Условные GET запросы (ETag / Last-Modified -> 304 Not Modified).
+
+Клиент присылает валидаторы из прошлого ответа (If-None-Match,
+If-Modified-Since); если представление не изменилось, отвечаем 304 без
+тела. Валидаторы строятся из updated_at: у одной строки - ее updated_at,
+у страницы списка - версии ее строк (хеш значений колонок) и курсор
+следующей страницы.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi import Request, Response, status
+from sqlalchemy import inspect
+
+
+def row_etag(id: str, updated_at: datetime) -> str:
+    """Сильный ETag строки: любое изменение строки меняет updated_at."""
+    return _etag(f"{id}:{updated_at.isoformat()}")
+
+
+def page_etag(request: Request, rows: Sequence[Any], next_cursor: Optional[str]) -> str:
+    """
+    ETag страницы списка по ее строкам и курсору следующей страницы.
+
+    Страница меняется, если меняется набор ее строк, одна из них или
+    курсор (на последней странице появился X-Next-Cursor: за ней
+    добавлены строки). Строка запроса добавлена, чтобы у разных страниц
+    были разные ETag. Last-Modified у страницы нет: удаление строки не
+    сдвигает max(updated_at).
+
+    Args:
+        request: Запрос (строка запроса)
+        rows: ORM объекты страницы
+        next_cursor: Курсор следующей страницы (None - страница последняя)
+    """
+    versions = ",".join(row_version(row) for row in rows)
+    return _etag(f"{request.url.query}:{next_cursor or ''}:{versions}")
+
+
+def row_version(row: Any) -> str:
+    """
+    Версия ORM объекта: хеш значений его колонок.
+
+    updated_at не различает две записи в пределах точности хранения
+    (строки, записанные в обход ORM, получают время с точностью до
+    секунды), а значения колонок меняет любая запись. Читаются только
+    загруженные значения, без запросов в БД.
+    """
+    state = inspect(row)
+    values = [state.dict.get(attr.key) for attr in state.mapper.column_attrs]
+    return hashlib.blake2b(repr(values).encode(), digest_size=8).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Совпадает ли ETag с заголовком If-None-Match.
+
+    По RFC 9110 для If-None-Match используется слабое сравнение:
+    префикс W/ не учитывается. Заголовок может содержать список или "*".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    """
+    Изменилось ли представление после даты из If-Modified-Since.
+
+    HTTP-дата точна до секунды, поэтому доли секунды отбрасываются.
+    Некорректный заголовок игнорируется (считаем, что изменилось).
+    """
+    if not if_modified_since:
+        return True
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) > since
+
+
+def not_modified(
+    request: Request, *, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Ответ 304, если у клиента актуальная версия, иначе None.
+
+    If-None-Match важнее If-Modified-Since: если клиент прислал ETag,
+    дата не проверяется (RFC 9110, 13.2.2).
+
+    Args:
+        request: Запрос (заголовки If-None-Match / If-Modified-Since)
+        etag: Текущий ETag представления
+        last_modified: Время последнего изменения (если известно)
+
+    Returns:
+        Response 304 или None
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        unchanged = etag_matches(if_none_match, etag)
+    elif last_modified is not None:
+        unchanged = not modified_since(
+            request.headers.get("if-modified-since"), last_modified
+        )
+    else:
+        unchanged = False
+
+    if unchanged:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=validator_headers(etag, last_modified),
+        )
+    return None
+
+
+def conditional_json(
+    request: Request,
+    content: bytes,
+    *,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Ответ с готовым JSON: 304 по валидаторам или 200 с телом.
+
+    Args:
+        request: Запрос
+        content: JSON байты
+        etag: ETag представления
+        last_modified: Время последнего изменения
+        headers: Дополнительные заголовки ответа 200
+
+    Returns:
+        Response
+    """
+    unchanged = not_modified(request, etag=etag, last_modified=last_modified)
+    if unchanged is not None:
+        return unchanged
+
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={**validator_headers(etag, last_modified), **(headers or {})},
+    )
+
+
+def validator_headers(
+    etag: str, last_modified: Optional[datetime] = None
+) -> Dict[str, str]:
+    """Заголовки валидаторов для ответа 200/304."""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def _etag(key: str) -> str:
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
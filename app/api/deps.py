@@ -3,16 +3,40 @@
 Зависимости (dependencies) для API endpoints.
 """
 
-from typing import AsyncGenerator
+import secrets
+from typing import AsyncGenerator, Optional
+from fastapi import Depends, Header, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import AsyncSessionLocal
+from app.crud import budget as crud_budget
+from app.crud import category as crud_category
+from app.crud import category_rule as crud_category_rule
+from app.crud import note as crud_note
+from app.crud import recurring_rule as crud_recurring_rule
+from app.crud import transaction as crud_transaction
+from app.crud.crud_budget import CRUDBudget
+from app.crud.crud_category_rule import CRUDCategoryRule
+from app.crud.crud_note import CRUDNote
+from app.crud.crud_recurring_rule import CRUDRecurringRule
+from app.crud.crud_transaction import CRUDTransaction
+from app.core.config import settings
+from app.core.pool import current_handler
+from app.core.replicas import use_replica
+from app.crud.loader import ModelLoader
+from app.database import AsyncSessionLocal, replicas
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Зависимость для получения асинхронной сессии БД.
 
+    Запоминает обработчик запроса, чтобы монитор пула мог назвать того,
+    кто долго держит соединение (см. app/core/pool.py).
+
+    Если настроены реплики, SELECT безопасных запросов (GET/HEAD) идут на
+    реплику - кроме клиентов, которые только что писали (read-your-writes,
+    см. app/core/replicas.py). Запись всегда идет в основную БД.
+
     Использование:
     @router.get("/")
     async def read_items(db: AsyncSession = Depends(get_db)):
@@ -21,8 +45,114 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     Yields:
         AsyncSession: Сессия базы данных
     """
+    route = request.scope.get("route")
+    handler = f"{request.method} {getattr(route, 'path', request.url.path)}"
+    token = current_handler.set(handler)
+
     async with AsyncSessionLocal() as session:
+        if replicas and use_replica(request):
+            session.info["replica"] = replicas.pick()
         try:
             yield session
         finally:
             await session.close()
+            current_handler.reset(token)
+
+
+async def get_current_user_id(
+    x_user_id: Optional[str] = Header(
+        None, max_length=36, description="ID пользователя - владельца данных"
+    ),
+) -> Optional[str]:
+    """
+    ID текущего пользователя из заголовка X-User-Id.
+
+    Аутентификации в приложении пока нет, поэтому пользователя называет
+    клиент (или шлюз перед API). Без заголовка - None: запросы работают
+    с данными без владельца.
+
+    Raises:
+        HTTPException: 401 если заголовка нет, а REQUIRE_USER_ID включен
+    """
+    if x_user_id is None and settings.REQUIRE_USER_ID:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Не указан пользователь (заголовок X-User-Id)",
+        )
+    return x_user_id
+
+
+async def require_internal_token(
+    x_internal_token: Optional[str] = Header(
+        None, description="Токен служебных эндпоинтов (INTERNAL_TOKEN)"
+    ),
+) -> None:
+    """
+    Доступ к служебным эндпоинтам, меняющим данные.
+
+    /internal подключен вне API_PREFIX и скрыт только из схемы, поэтому
+    запись через него требует токена из настроек; без INTERNAL_TOKEN такие
+    эндпоинты выключены.
+
+    Raises:
+        HTTPException: 403 если токен не задан в настройках или не совпадает
+    """
+    expected = settings.INTERNAL_TOKEN
+    if not expected or not secrets.compare_digest(
+        (x_internal_token or "").encode(), expected.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Нужен служебный токен (заголовок X-Internal-Token)",
+        )
+
+
+async def get_note_crud(
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> CRUDNote:
+    """CRUD заметок, ограниченный заметками текущего пользователя."""
+    return crud_note.for_owner(user_id)
+
+
+async def get_transaction_crud(
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> CRUDTransaction:
+    """CRUD операций, ограниченный операциями текущего пользователя."""
+    return crud_transaction.for_owner(user_id)
+
+
+async def get_budget_crud(
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> CRUDBudget:
+    """CRUD бюджетов, ограниченный бюджетами текущего пользователя."""
+    return crud_budget.for_owner(user_id)
+
+
+async def get_recurring_rule_crud(
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> CRUDRecurringRule:
+    """CRUD правил повторения, ограниченный правилами текущего пользователя."""
+    return crud_recurring_rule.for_owner(user_id)
+
+
+async def get_category_rule_crud(
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> CRUDCategoryRule:
+    """CRUD правил категоризации, ограниченный правилами текущего пользователя."""
+    return crud_category_rule.for_owner(user_id)
+
+
+async def get_note_loader(
+    db: AsyncSession = Depends(get_db),
+    notes: CRUDNote = Depends(get_note_crud),
+) -> ModelLoader:
+    """
+    Загрузчик заметок пользователя на время запроса: конкурентные load(id)
+    объединяются в один SELECT ... WHERE id IN.
+    """
+    return ModelLoader(notes, db)
+
+
+async def get_category_loader(db: AsyncSession = Depends(get_db)) -> ModelLoader:
+    """Загрузчик категорий на время запроса (см. get_note_loader)."""
+    return ModelLoader(crud_category, db)
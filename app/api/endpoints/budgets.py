@@ -0,0 +1,189 @@
+# app/api/endpoints/budgets.py
+"""
+API endpoints для работы с бюджетами.
+"""
+
+from datetime import date, datetime, timezone
+from typing import List, NoReturn, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_budget_crud, get_db
+from app.crud import category_catalog
+from app.crud.crud_budget import CRUDBudget
+from app.schemas.budget import Budget, BudgetCreate, BudgetStatus, BudgetUpdate
+
+router = APIRouter()
+
+# Ответ зависит от пользователя: общие HTTP кеши не должны отдавать его другим
+VARY_USER = {"Vary": "X-User-Id"}
+
+
+@router.get("/", response_model=List[Budget])
+async def read_budgets(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDBudget = Depends(get_budget_crud),
+    skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
+    limit: int = Query(100, ge=1, le=1000, description="Лимит записей"),
+) -> List[Budget]:
+    """
+    Получить бюджеты текущего пользователя.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        db: Сессия БД
+        crud: CRUD бюджетов текущего пользователя
+        skip: Сколько записей пропустить
+        limit: Максимальное количество записей
+
+    Returns:
+        Список бюджетов
+    """
+    budgets = await crud.get_multi(db, skip=skip, limit=limit)
+    response.headers.update(VARY_USER)
+    return [Budget.model_validate(item) for item in budgets]
+
+
+@router.get("/status", response_model=List[BudgetStatus])
+async def read_budget_status(
+    response: Response,
+    month: Optional[date] = Query(
+        None, description="Месяц (любой день), по умолчанию текущий (UTC)"
+    ),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDBudget = Depends(get_budget_crud),
+) -> List[BudgetStatus]:
+    """
+    Исполнение бюджетов текущего пользователя за месяц.
+
+    Потраченное берется из помесячных итогов операций, которые
+    обновляются при каждой записи операций, поэтому статус сразу
+    отражает последнюю запись и не зависит от числа операций.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        month: Месяц
+        db: Сессия БД
+        crud: CRUD бюджетов текущего пользователя
+
+    Returns:
+        Статус каждого бюджета: потрачено, остаток, процент, перерасход
+    """
+    month = (month or datetime.now(timezone.utc).date()).replace(day=1)
+    rows = await crud.status(db, month=month)
+    response.headers.update(VARY_USER)
+    return [
+        BudgetStatus(
+            budget_id=budget.id,
+            category_id=budget.category_id,
+            month=month,
+            amount=budget.amount,
+            spent=spent,
+            remaining=budget.amount - spent,
+            percent_used=round(spent * 100 / budget.amount, 2),
+            over_budget=spent > budget.amount,
+        )
+        for budget, spent in rows
+    ]
+
+
+@router.post("/", response_model=Budget, status_code=status.HTTP_201_CREATED)
+async def create_budget(
+    budget_in: BudgetCreate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDBudget = Depends(get_budget_crud),
+) -> Budget:
+    """
+    Создать бюджет (один на категорию у пользователя).
+
+    Args:
+        budget_in: Данные бюджета
+        db: Сессия БД
+        crud: CRUD бюджетов текущего пользователя
+
+    Returns:
+        Созданный бюджет
+
+    Raises:
+        HTTPException: 400 если категории нет или бюджет для нее уже есть
+    """
+    if budget_in.category_id is not None:
+        snapshot = await category_catalog.get(db)
+        if budget_in.category_id not in snapshot.by_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Категория не найдена"
+            )
+    try:
+        budget = await crud.create(db, obj_in=budget_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_conflict()
+    return Budget.model_validate(budget)
+
+
+@router.put("/{budget_id}", response_model=Budget)
+async def update_budget(
+    budget_id: str,
+    budget_in: BudgetUpdate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDBudget = Depends(get_budget_crud),
+) -> Budget:
+    """
+    Изменить лимит бюджета (потраченное при этом не пересчитывается).
+
+    Args:
+        budget_id: UUID бюджета
+        budget_in: Данные для обновления
+        db: Сессия БД
+        crud: CRUD бюджетов текущего пользователя
+
+    Returns:
+        Обновленный бюджет
+
+    Raises:
+        HTTPException: 404 если бюджет не найден
+    """
+    updated = await crud.update_by_id(db, id=budget_id, obj_in=budget_in)
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Бюджет не найден"
+        )
+    return Budget.model_validate(updated)
+
+
+@router.delete("/{budget_id}", response_model=Budget)
+async def delete_budget(
+    budget_id: str,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDBudget = Depends(get_budget_crud),
+) -> Budget:
+    """
+    Удалить бюджет.
+
+    Args:
+        budget_id: UUID бюджета
+        db: Сессия БД
+        crud: CRUD бюджетов текущего пользователя
+
+    Returns:
+        Удаленный бюджет
+
+    Raises:
+        HTTPException: 404 если бюджет не найден
+    """
+    deleted = await crud.remove(db, id=budget_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Бюджет не найден"
+        )
+    return Budget.model_validate(deleted)
+
+
+def _raise_conflict() -> NoReturn:
+    """Ошибка вставки: бюджет категории (или общий) уже есть или нет пользователя."""
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Бюджет для этой категории уже есть или пользователь не найден",
+    )
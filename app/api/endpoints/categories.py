@@ -3,44 +3,318 @@
 API endpoints для работы с категориями.
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, Dict, List, Optional, Union
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
-from app.crud import category as crud_category
+from app.api.conditional import (
+    conditional_json,
+    not_modified,
+    page_etag,
+    row_etag,
+    validator_headers,
+)
+from app.api.bulk import check_bulk_size, validate_bulk_items, validate_bulk_updates
+from app.api.deps import get_category_loader, get_category_rule_crud, get_db
+from app.api.export import ExportFormat, export_response
+from app.core.replicas import primary_engine
+from app.crud import category as crud_category, category_catalog, category_suggest
+from app.crud.base import CountMode
+from app.crud.crud_category_rule import CRUDCategoryRule
+from app.crud.loader import ModelLoader
+from app.crud.pagination import InvalidCursorError
+from app.models.category import Category as CategoryModel
+from app.schemas.bulk import BulkDelete, BulkItemError, BulkResult
 from app.schemas.category import Category, CategoryCreate, CategoryUpdate
+from app.schemas.category_rule import Classification, ClassifyRequest
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Category])
 async def read_categories(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(100, ge=1, le=1000, description="Лимит записей"),
-) -> List[Category]:
+    after: Optional[str] = Query(
+        None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"
+    ),
+    count: CountMode = Query(
+        "none",
+        description="Общее количество в X-Total-Count: exact, estimated или none",
+    ),
+) -> Union[List[Category], Response]:
     """
     Получить список категорий.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor,
+    общее количество (по запросу count=...) - в X-Total-Count.
+
+    Если все категории помещаются в первую страницу, ответ отдается из
+    каталога в памяти: готовый JSON с ETag или 304 по If-None-Match,
+    без обращения к БД. Остальные страницы тоже поддерживают условные
+    запросы (ETag по строкам страницы).
     """
-    categories = await crud_category.get_multi(db, skip=skip, limit=limit)
+    if after is None and skip == 0:
+        snapshot = await category_catalog.get(db)
+        if len(snapshot) <= limit:
+            headers = {}
+            if count != "none":
+                headers["X-Total-Count"] = str(len(snapshot))
+            return conditional_json(
+                request,
+                snapshot.list_json,
+                etag=snapshot.etag,
+                last_modified=snapshot.last_modified,
+                headers=headers,
+            )
+
+    try:
+        categories, next_cursor = await crud_category.get_page(
+            db, after=after, skip=skip, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # 304 экономит сериализацию и передачу страницы
+    etag = page_etag(request, categories, next_cursor)
+    unchanged = not_modified(request, etag=etag)
+    if unchanged is not None:
+        return unchanged
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers.update(validator_headers(etag))
+
+    # COUNT выполняется, только если клиент его попросил
+    total = await crud_category.count(db, mode=count)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
     return [Category.from_orm(category) for category in categories]
 
 
+@router.get("/suggest", response_model=List[str])
+async def suggest_categories(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Начало имени"),
+    limit: int = Query(10, ge=1, le=100, description="Максимум подсказок"),
+    db: AsyncSession = Depends(get_db),
+) -> List[str]:
+    """
+    Подсказки имен категорий по префиксу (из индекса в памяти).
+
+    Args:
+        prefix: Начало имени (без учета регистра)
+        limit: Максимальное количество подсказок
+        db: Сессия БД
+
+    Returns:
+        Имена категорий по алфавиту
+    """
+    return await category_suggest.lookup(db, prefix, limit)
+
+
+@router.get("/export")
+async def export_categories(
+    request: Request,
+    format: ExportFormat = Query("ndjson", description="Формат: ndjson или csv"),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Выгрузить все категории потоком (NDJSON или CSV).
+
+    Порядок строк - как у GET списка; потоковая выгрузка описана в
+    app/api/export.py.
+    """
+    return export_response(request, primary_engine(db), CategoryModel, Category, format)
+
+
+@router.post("/classify", response_model=List[Classification])
+async def classify(
+    classify_in: ClassifyRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    rules: CRUDCategoryRule = Depends(get_category_rule_crud),
+) -> List[Classification]:
+    """
+    Подобрать категории текстам по правилам текущего пользователя.
+
+    Правила скомпилированы один раз (кеш до их изменения), каждый текст
+    проходится одним проходом автомата ключевых слов и одним поиском по
+    общему выражению.
+
+    Args:
+        classify_in: Тексты (описания операций)
+        response: Ответ (заголовок Vary)
+        db: Сессия БД
+        rules: CRUD правил текущего пользователя
+
+    Returns:
+        Категория и правило для каждого текста, в том же порядке
+
+    Raises:
+        HTTPException: 400 если текстов больше BULK_MAX_ITEMS
+    """
+    check_bulk_size(classify_in.texts)
+    matcher = await rules.matcher(db)
+    response.headers["Vary"] = "X-User-Id"
+    results = []
+    for text in classify_in.texts:
+        match = matcher.classify(text)
+        results.append(
+            Classification(rule_id=match[0], category_id=match[1])
+            if match
+            else Classification()
+        )
+    return results
+
+
+# =========== МАССОВЫЕ ОПЕРАЦИИ ===========
+# Объявлены до /{category_id}, чтобы "bulk" не принимался за ID
+
+DUPLICATE_NAME = "Категория с таким именем уже существует"
+
+
+@router.post("/bulk", response_model=BulkResult[Category])
+async def create_categories_bulk(
+    items: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+) -> BulkResult[Category]:
+    """
+    Создать много категорий одним запросом.
+
+    Дубликаты имен (с БД или внутри запроса) попадают в errors.
+    """
+    check_bulk_size(items)
+    valid, errors = validate_bulk_items(items, CategoryCreate)
+
+    existing = await crud_category.get_by_names(
+        db, names=[obj.name for _, obj in valid]
+    )
+    to_create = []
+    seen_names = set()
+    for index, obj in valid:
+        if obj.name in existing or obj.name in seen_names:
+            errors.append(BulkItemError(index=index, detail=DUPLICATE_NAME))
+            continue
+        seen_names.add(obj.name)
+        to_create.append(obj)
+    errors.sort(key=lambda error: error.index)
+
+    categories = await crud_category.create_many(db, objs_in=to_create)
+    return BulkResult[Category](
+        items=[Category.from_orm(category) for category in categories],
+        errors=errors,
+    )
+
+
+@router.patch("/bulk", response_model=BulkResult[Category])
+async def update_categories_bulk(
+    items: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+) -> BulkResult[Category]:
+    """
+    Обновить много категорий одним запросом.
+
+    Каждый элемент - объект с "id" и полями CategoryUpdate.
+    """
+    check_bulk_size(items)
+    valid, errors = validate_bulk_updates(items, CategoryUpdate)
+
+    existing = await crud_category.get_by_names(
+        db, names=[obj["name"] for _, obj in valid if obj.get("name")]
+    )
+    to_update = []
+    seen_names = set()
+    for index, obj in valid:
+        name = obj.get("name")
+        if name:
+            owner = existing.get(name)
+            if (owner and owner.id != obj["id"]) or name in seen_names:
+                errors.append(
+                    BulkItemError(index=index, id=obj["id"], detail=DUPLICATE_NAME)
+                )
+                continue
+            seen_names.add(name)
+        to_update.append((index, obj))
+
+    categories = await crud_category.update_many(
+        db, objs_in=[obj for _, obj in to_update]
+    )
+    updated_ids = {category.id for category in categories}
+    errors.extend(
+        BulkItemError(index=index, id=obj["id"], detail="Категория не найдена")
+        for index, obj in to_update
+        if obj["id"] not in updated_ids
+    )
+    errors.sort(key=lambda error: error.index)
+
+    return BulkResult[Category](
+        items=[Category.from_orm(category) for category in categories],
+        errors=errors,
+    )
+
+
+@router.delete("/bulk", response_model=BulkResult[Category])
+async def delete_categories_bulk(
+    bulk_in: BulkDelete,
+    db: AsyncSession = Depends(get_db),
+) -> BulkResult[Category]:
+    """
+    Удалить много категорий одним запросом.
+    """
+    check_bulk_size(bulk_in.ids)
+
+    categories = await crud_category.remove_many(db, ids=bulk_in.ids)
+    removed_ids = {category.id for category in categories}
+    errors = [
+        BulkItemError(index=index, id=category_id, detail="Категория не найдена")
+        for index, category_id in enumerate(bulk_in.ids)
+        if category_id not in removed_ids
+    ]
+
+    return BulkResult[Category](
+        items=[Category.from_orm(category) for category in categories],
+        errors=errors,
+    )
+
+
 @router.get("/{category_id}", response_model=Category)
 async def read_category(
+    request: Request,
     category_id: str,
     db: AsyncSession = Depends(get_db),
-) -> Category:
+    loader: ModelLoader = Depends(get_category_loader),
+) -> Union[Category, Response]:
     """
-    Получить категорию по ID.
+    Получить категорию по ID (через кеш сущностей, промах - через
+    загрузчик запроса).
+
+    Поддерживает условные запросы: ETag и Last-Modified по updated_at.
     """
-    category = await crud_category.get(db, id=category_id)
-    if not category:
+    entry = await crud_category.get_json_entry(db, id=category_id, loader=loader)
+    if entry is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена"
         )
-    return Category.from_orm(category)
+    return conditional_json(
+        request,
+        entry.body,
+        etag=row_etag(category_id, entry.updated_at),
+        last_modified=entry.updated_at,
+    )
 
 
 @router.get("/name/{category_name}", response_model=Optional[Category])
@@ -54,8 +328,8 @@ async def read_category_by_name(
     Returns:
         Категория или None если не найдена (не вызывает 404)
     """
-    category = await crud_category.get_by_name(db, name=category_name)
-    return Category.from_orm(category)
+    snapshot = await category_catalog.get(db)
+    return snapshot.by_key.get(category_name)
 
 
 @router.post("/", response_model=Category, status_code=status.HTTP_201_CREATED)
@@ -66,15 +340,23 @@ async def create_category(
     """
     Создать новую категорию.
     """
-    # Проверяем, нет ли уже категории с таким именем
-    existing_category = await crud_category.get_by_name(db, name=category_in.name)
-    if existing_category:
+    # Проверяем, нет ли уже категории с таким именем (по каталогу в памяти)
+    snapshot = await category_catalog.get(db)
+    if category_in.name in snapshot.by_key:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Категория с таким именем уже существует",
+            detail=DUPLICATE_NAME,
         )
 
-    category = await crud_category.create(db, obj_in=category_in)
+    # Каталог другого процесса может отставать - окончательно решает БД
+    try:
+        category = await crud_category.create(db, obj_in=category_in)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=DUPLICATE_NAME,
+        )
     return Category.from_orm(category)
 
 
@@ -87,24 +369,32 @@ async def update_category(
     """
     Обновить категорию.
     """
-    category = await crud_category.get(db, id=category_id)
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена"
-        )
-
-    # Если меняем имя, проверяем что оно уникально
-    if category_in.name and category_in.name != category.name:
-        existing_category = await crud_category.get_by_name(db, name=category_in.name)
-        if existing_category and existing_category.id != category_id:
+    # Занятое другой категорией имя видно по каталогу без запроса к БД
+    if category_in.name:
+        snapshot = await category_catalog.get(db)
+        owner = snapshot.by_key.get(category_in.name)
+        if owner is not None and owner.id != category_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Категория с таким именем уже существует",
+                detail=DUPLICATE_NAME,
             )
 
-    updated_category = await crud_category.update(
-        db, db_obj=category, obj_in=category_in
-    )
+    # Один UPDATE ... RETURNING; окончательно уникальность проверяет БД
+    try:
+        updated_category = await crud_category.update_by_id(
+            db, id=category_id, obj_in=category_in
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Категория с таким именем уже существует",
+        )
+
+    if not updated_category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена"
+        )
     return Category.from_orm(updated_category)
 
 
@@ -115,12 +405,21 @@ async def delete_category(
 ) -> Category:
     """
     Удалить категорию.
+
+    Raises:
+        HTTPException: 404 если не найдена, 400 если у категории есть операции
     """
-    category = await crud_category.get(db, id=category_id)
-    if not category:
+    try:
+        deleted_category = await crud_category.remove(db, id=category_id)
+    except IntegrityError:
+        # transactions.category_id ссылается на категорию (RESTRICT)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Категория используется в операциях",
+        )
+    if not deleted_category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена"
         )
-
-    deleted_category = await crud_category.remove(db, id=category_id)
     return Category.from_orm(deleted_category)
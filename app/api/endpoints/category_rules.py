@@ -0,0 +1,164 @@
+# app/api/endpoints/category_rules.py
+"""
+API endpoints для правил автоматической категоризации операций.
+"""
+
+from typing import List, NoReturn, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_category_rule_crud, get_db
+from app.crud import category_catalog
+from app.crud.crud_category_rule import CRUDCategoryRule
+from app.schemas.category_rule import (
+    CategoryRule,
+    CategoryRuleCreate,
+    CategoryRuleUpdate,
+)
+
+router = APIRouter()
+
+# Ответ зависит от пользователя: общие HTTP кеши не должны отдавать его другим
+VARY_USER = {"Vary": "X-User-Id"}
+
+
+@router.get("/", response_model=List[CategoryRule])
+async def read_category_rules(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDCategoryRule = Depends(get_category_rule_crud),
+    skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
+    limit: int = Query(100, ge=1, le=1000, description="Лимит записей"),
+) -> List[CategoryRule]:
+    """
+    Получить правила категоризации текущего пользователя.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+        skip: Сколько записей пропустить
+        limit: Максимальное количество записей
+
+    Returns:
+        Список правил
+    """
+    rules = await crud.get_multi(db, skip=skip, limit=limit)
+    response.headers.update(VARY_USER)
+    return [CategoryRule.model_validate(item) for item in rules]
+
+
+@router.post("/", response_model=CategoryRule, status_code=status.HTTP_201_CREATED)
+async def create_category_rule(
+    rule_in: CategoryRuleCreate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDCategoryRule = Depends(get_category_rule_crud),
+) -> CategoryRule:
+    """
+    Создать правило категоризации.
+
+    Правило применяется к новым операциям без категории (POST
+    /transactions, /transactions/bulk, /imports); уже сохраненные
+    операции не меняются.
+
+    Args:
+        rule_in: Ключевое слово или выражение и категория
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+
+    Returns:
+        Созданное правило
+
+    Raises:
+        HTTPException: 400 если категории или пользователя не существует
+    """
+    await _check_category(db, rule_in.category_id)
+    try:
+        rule = await crud.create(db, obj_in=rule_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_bad_reference()
+    return CategoryRule.model_validate(rule)
+
+
+@router.put("/{rule_id}", response_model=CategoryRule)
+async def update_category_rule(
+    rule_id: str,
+    rule_in: CategoryRuleUpdate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDCategoryRule = Depends(get_category_rule_crud),
+) -> CategoryRule:
+    """
+    Изменить категорию или приоритет правила.
+
+    Args:
+        rule_id: UUID правила
+        rule_in: Данные для обновления
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+
+    Returns:
+        Обновленное правило
+
+    Raises:
+        HTTPException: 404 если правило не найдено, 400 если нет категории
+    """
+    await _check_category(db, rule_in.category_id)
+    try:
+        updated = await crud.update_by_id(db, id=rule_id, obj_in=rule_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_bad_reference()
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Правило не найдено"
+        )
+    return CategoryRule.model_validate(updated)
+
+
+@router.delete("/{rule_id}", response_model=CategoryRule)
+async def delete_category_rule(
+    rule_id: str,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDCategoryRule = Depends(get_category_rule_crud),
+) -> CategoryRule:
+    """
+    Удалить правило.
+
+    Args:
+        rule_id: UUID правила
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+
+    Returns:
+        Удаленное правило
+
+    Raises:
+        HTTPException: 404 если правило не найдено
+    """
+    deleted = await crud.remove(db, id=rule_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Правило не найдено"
+        )
+    return CategoryRule.model_validate(deleted)
+
+
+async def _check_category(db: AsyncSession, category_id: Optional[str]) -> None:
+    """Категория должна существовать (проверка по каталогу в памяти)."""
+    if category_id is None:
+        return
+    snapshot = await category_catalog.get(db)
+    if category_id not in snapshot.by_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Категория не найдена"
+        )
+
+
+def _raise_bad_reference() -> NoReturn:
+    """Ошибка записи по внешнему ключу (категория удалена или нет пользователя)."""
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Категория или пользователь не найдены",
+    )
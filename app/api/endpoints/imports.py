@@ -0,0 +1,138 @@
+# app/api/endpoints/imports.py
+"""
+API endpoints для импорта банковских выписок.
+"""
+
+import codecs
+from typing import Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import (
+    get_category_rule_crud,
+    get_current_user_id,
+    get_db,
+    get_transaction_crud,
+)
+from app.api.imports import ImportJob, jobs, progress_lines, run_import
+from app.api.statements import StatementFormat
+from app.core.replicas import primary_engine
+from app.crud.crud_category_rule import CRUDCategoryRule
+from app.crud.crud_transaction import CRUDTransaction
+from app.schemas.imports import ImportJobSchema
+
+router = APIRouter()
+
+# Ответ зависит от пользователя: общие HTTP кеши не должны отдавать его другим
+VARY_USER = {"Vary": "X-User-Id"}
+
+# Расширения файлов OFX (QFX - вариант OFX от Intuit)
+OFX_EXTENSIONS = (".ofx", ".qfx")
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+async def import_statement(
+    request: Request,
+    file: UploadFile = File(..., description="Выписка: CSV или OFX"),
+    format: Optional[StatementFormat] = Form(
+        None, description="csv или ofx (по умолчанию - по расширению файла)"
+    ),
+    encoding: str = Form("utf-8", description="Кодировка файла"),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDTransaction = Depends(get_transaction_crud),
+    rules: CRUDCategoryRule = Depends(get_category_rule_crud),
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> StreamingResponse:
+    """
+    Импортировать выписку в операции текущего пользователя.
+
+    Файл разбирается потоком и вставляется пачками; ответ - NDJSON, по
+    строке с состоянием задачи после каждой пачки. Последняя строка -
+    итог (status done или failed) с ошибками строк. ID задачи - в
+    заголовке X-Import-Id, состояние можно запросить через GET
+    /imports/{id}.
+
+    Args:
+        request: Запрос (для отслеживания отключения клиента)
+        file: Файл выписки
+        format: Формат выписки
+        encoding: Кодировка файла (например, cp1251)
+        db: Сессия БД (нужен только ее движок)
+        crud: CRUD операций текущего пользователя
+        rules: CRUD правил категоризации (строки без категории)
+        user_id: Текущий пользователь
+
+    Returns:
+        StreamingResponse с ходом импорта
+
+    Raises:
+        HTTPException: 400 если кодировка неизвестна
+    """
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестная кодировка: {encoding}",
+        )
+    if format is None:
+        filename = (file.filename or "").lower()
+        format = "ofx" if filename.endswith(OFX_EXTENSIONS) else "csv"
+
+    job = jobs.start(ImportJob(user_id=user_id, filename=file.filename, format=format))
+    stream = run_import(
+        request,
+        job,
+        file,
+        bind=primary_engine(db),
+        crud=crud,
+        rules=rules,
+        encoding=encoding,
+    )
+    return StreamingResponse(
+        progress_lines(stream),
+        status_code=status.HTTP_202_ACCEPTED,
+        media_type="application/x-ndjson",
+        headers={"X-Import-Id": job.id, **VARY_USER},
+    )
+
+
+@router.get("/{job_id}", response_model=ImportJobSchema)
+async def read_import(
+    job_id: str,
+    response: Response,
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> ImportJobSchema:
+    """
+    Получить состояние задачи импорта.
+
+    Args:
+        job_id: ID задачи (заголовок X-Import-Id)
+        response: Ответ (заголовок Vary)
+        user_id: Текущий пользователь
+
+    Returns:
+        Состояние задачи
+
+    Raises:
+        HTTPException: 404 если задачи нет (или она уже вытеснена)
+    """
+    job = jobs.get(job_id, user_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Импорт с ID {job_id} не найден",
+        )
+    response.headers.update(VARY_USER)
+    return ImportJobSchema.model_validate(job)
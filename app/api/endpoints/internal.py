@@ -0,0 +1,76 @@
+# app/api/endpoints/internal.py
+"""
+Служебные эндпоинты: состояние пула соединений, метрики и загрузка
+курсов валют.
+
+Подключаются вне API_PREFIX (/internal/...) и не попадают в схему OpenAPI.
+Чтение открыто (сбор метрик), запись требует INTERNAL_TOKEN (см.
+require_internal_token).
+"""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, require_internal_token
+from app.core.config import settings
+from app.core.pool import prometheus_metrics
+from app.crud.fx import load_rate_files, rate_files, store_rates
+from app.database import pool_monitor, replica_pool_monitors, replicas
+
+router = APIRouter(include_in_schema=False)
+
+
+@router.get("/pool")
+async def read_pool() -> Dict[str, Any]:
+    """
+    Состояние пула соединений БД.
+
+    Returns:
+        Размер, выданные соединения, overflow, гистограмма ожидания
+        checkout, таймауты и соединения, удерживаемые дольше
+        DB_LONG_HELD_SECONDS (с обработчиком, который их держит);
+        состояние реплик для чтения и те же счетчики их пулов
+    """
+    replica_stats = [
+        {**state, "pool": monitor.stats()}
+        for state, monitor in zip(replicas.stats(), replica_pool_monitors)
+    ]
+    return {**pool_monitor.stats(), "replicas": replica_stats}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def read_metrics() -> PlainTextResponse:
+    """Метрики пулов в текстовом формате Prometheus (реплики - db_replicaN_pool)."""
+    text = prometheus_metrics(pool_monitor)
+    for number, monitor in enumerate(replica_pool_monitors):
+        text += prometheus_metrics(monitor, prefix=f"db_replica{number}_pool")
+    return PlainTextResponse(
+        text,
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.post("/fx/reload", dependencies=[Depends(require_internal_token)])
+async def reload_fx_rates(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
+    """
+    Загрузить курсы из CSV файлов FX_RATES_DIR (см. scripts/load_fx_rates.py)
+    и сбросить курсы в памяти.
+
+    Returns:
+        Число загруженных курсов
+
+    Raises:
+        HTTPException: 400 если файл курсов не разбирается; 403 без
+            служебного токена
+    """
+    try:
+        count = await store_rates(
+            db, load_rate_files(rate_files(settings.FX_RATES_DIR))
+        )
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"loaded": count}
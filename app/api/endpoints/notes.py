@@ -3,50 +3,352 @@
 API endpoints для работы с заметками.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, Dict, List, NoReturn, Optional, Union
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # from app import schemas
-from app.api.deps import get_db
-from app.crud import note as crud_note
+from app.api.conditional import (
+    conditional_json,
+    not_modified,
+    page_etag,
+    row_etag,
+    validator_headers,
+)
+from app.api.bulk import check_bulk_size, validate_bulk_items, validate_bulk_updates
+from app.api.deps import get_db, get_note_crud, get_note_loader
+from app.api.export import ExportFormat, export_response
+from app.core.replicas import primary_engine
+from app.crud import note_suggest
+from app.crud.base import CountMode
+from app.crud.crud_note import CRUDNote
+from app.crud.loader import ModelLoader
+from app.crud.pagination import InvalidCursorError
+from app.models.note import Note as NoteModel
+from app.schemas.bulk import BulkDelete, BulkItemError, BulkResult
 from app.schemas.note import Note, NoteCreate, NoteUpdate
 
 router = APIRouter()
 
+# Ответ зависит от пользователя: общие HTTP кеши не должны отдавать его другим
+VARY_USER = {"Vary": "X-User-Id"}
+
 
 @router.get("/", response_model=List[Note])
 async def read_notes(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
+    loader: ModelLoader = Depends(get_note_loader),
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(100, ge=1, le=1000, description="Лимит записей"),
-) -> List[Note]:
+    after: Optional[str] = Query(
+        None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"
+    ),
+    count: CountMode = Query(
+        "none",
+        description="Общее количество в X-Total-Count: exact, estimated или none",
+    ),
+    ids: Optional[str] = Query(
+        None, description="Получить заметки по списку ID через запятую"
+    ),
+) -> Union[List[Note], Response]:
     """
     Получить список заметок с пагинацией.
 
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    (нет заголовка - страница последняя). С курсором skip игнорируется.
+    Общее количество (X-Total-Count) считается только при count=exact
+    или count=estimated.
+
+    С параметром ids возвращает найденные заметки в порядке ids одним
+    запросом (вместо N вызовов GET /notes/{note_id}), пагинация при этом
+    не применяется.
+
+    Страницы поддерживают условные запросы: ETag строится по версиям
+    строк страницы и курсору следующей, при совпадении If-None-Match -
+    304 без тела.
+
     Args:
+        request: Запрос (условные заголовки)
+        response: Ответ (для заголовка X-Next-Cursor)
         db: Сессия БД
+        crud: CRUD заметок текущего пользователя
+        loader: Загрузчик заметок запроса (промахи кеша при ids)
         skip: Сколько записей пропустить
         limit: Максимальное количество записей
+        after: Курсор из предыдущего ответа
+        count: Режим подсчета общего количества
+        ids: ID заметок через запятую
 
     Returns:
         Список заметок
+
+    Raises:
+        HTTPException: 400 если курсор некорректный или ID больше 1000
     """
-    notes = await crud_note.get_multi(db, skip=skip, limit=limit)
+    if ids is not None:
+        id_list = [note_id.strip() for note_id in ids.split(",") if note_id.strip()]
+        if len(id_list) > 1000:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Максимум 1000 ID за запрос",
+            )
+        data = await crud.get_many_json(db, ids=id_list, loader=loader)
+        return Response(content=data, media_type="application/json")
+
+    try:
+        notes, next_cursor = await crud.get_page(
+            db, after=after, skip=skip, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # 304 экономит сериализацию и передачу страницы
+    etag = page_etag(request, notes, next_cursor)
+    unchanged = not_modified(request, etag=etag)
+    if unchanged is not None:
+        unchanged.headers.update(VARY_USER)
+        return unchanged
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers.update(validator_headers(etag))
+    response.headers.update(VARY_USER)
+
+    # COUNT выполняется, только если клиент его попросил
+    total = await crud.count(db, mode=count)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
     return [Note.from_orm(note) for note in notes]
 
 
+@router.get("/search", response_model=List[Note])
+async def search_notes(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковая строка"),
+    limit: int = Query(100, ge=1, le=1000, description="Лимит записей"),
+    after: Optional[str] = Query(
+        None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"
+    ),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
+) -> List[Note]:
+    """
+    Полнотекстовый поиск заметок по заголовку и содержимому.
+
+    Результаты отсортированы по релевантности; курсор следующей страницы
+    возвращается в заголовке X-Next-Cursor.
+
+    Args:
+        response: Ответ (для заголовка X-Next-Cursor)
+        q: Поисковая строка
+        limit: Максимальное количество записей
+        after: Курсор из предыдущего ответа
+        db: Сессия БД
+        crud: CRUD заметок текущего пользователя
+
+    Returns:
+        Найденные заметки
+
+    Raises:
+        HTTPException: 400 если курсор некорректный
+    """
+    try:
+        notes, next_cursor = await crud.search(db, query=q, after=after, limit=limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [Note.from_orm(note) for note in notes]
+
+
+@router.get("/suggest", response_model=List[str])
+async def suggest_notes(
+    prefix: str = Query(
+        ..., min_length=1, max_length=100, description="Начало заголовка"
+    ),
+    limit: int = Query(10, ge=1, le=100, description="Максимум подсказок"),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
+) -> List[str]:
+    """
+    Подсказки заголовков заметок по префиксу (для автодополнения).
+
+    Отвечает из индекса в памяти процесса без запроса к БД; пока индекс
+    не построен или переполнен - запросом в БД.
+
+    Args:
+        prefix: Начало заголовка (без учета регистра)
+        limit: Максимальное количество подсказок
+        db: Сессия БД
+        crud: CRUD заметок текущего пользователя
+
+    Returns:
+        Различные заголовки по алфавиту
+    """
+    return await note_suggest.lookup(db, prefix, limit, owner=crud.owner_id)
+
+
+@router.get("/export")
+async def export_notes(
+    request: Request,
+    format: ExportFormat = Query("ndjson", description="Формат: ndjson или csv"),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
+) -> StreamingResponse:
+    """
+    Выгрузить все заметки потоком (NDJSON или CSV).
+
+    Выгружаются только заметки текущего пользователя (X-User-Id); память
+    не зависит от их числа (см. app/api/export.py).
+    """
+    return export_response(
+        request, primary_engine(db), NoteModel, Note, format, where=crud.owner_filter()
+    )
+
+
+# =========== МАССОВЫЕ ОПЕРАЦИИ ===========
+# Объявлены до /{note_id}, чтобы "bulk" не принимался за ID
+
+
+@router.post("/bulk", response_model=BulkResult[Note])
+async def create_notes_bulk(
+    items: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
+) -> BulkResult[Note]:
+    """
+    Создать много заметок одним запросом.
+
+    Невалидные элементы не создаются и попадают в errors с их индексом,
+    валидные вставляются пачками в одной транзакции.
+
+    Args:
+        items: Список данных заметок (как для POST /notes/)
+        db: Сессия БД
+        crud: CRUD заметок текущего пользователя
+
+    Returns:
+        Созданные заметки и ошибки по элементам
+
+    Raises:
+        HTTPException: 400 если пользователя из X-User-Id не существует
+    """
+    check_bulk_size(items)
+    valid, errors = validate_bulk_items(items, NoteCreate)
+
+    try:
+        notes = await crud.create_many(db, objs_in=[obj for _, obj in valid])
+    except IntegrityError:
+        await db.rollback()
+        _raise_unknown_user()
+    return BulkResult[Note](
+        items=[Note.from_orm(note) for note in notes], errors=errors
+    )
+
+
+@router.patch("/bulk", response_model=BulkResult[Note])
+async def update_notes_bulk(
+    items: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
+) -> BulkResult[Note]:
+    """
+    Обновить много заметок одним запросом.
+
+    Каждый элемент - объект с "id" и полями NoteUpdate.
+
+    Args:
+        items: Список изменений
+        db: Сессия БД
+        crud: CRUD заметок текущего пользователя
+
+    Returns:
+        Обновленные заметки и ошибки по элементам (в т.ч. "не найдена")
+    """
+    check_bulk_size(items)
+    valid, errors = validate_bulk_updates(items, NoteUpdate)
+
+    notes = await crud.update_many(db, objs_in=[obj for _, obj in valid])
+    updated_ids = {note.id for note in notes}
+    errors.extend(
+        BulkItemError(index=index, id=obj["id"], detail="Заметка не найдена")
+        for index, obj in valid
+        if obj["id"] not in updated_ids
+    )
+    errors.sort(key=lambda error: error.index)
+
+    return BulkResult[Note](
+        items=[Note.from_orm(note) for note in notes], errors=errors
+    )
+
+
+@router.delete("/bulk", response_model=BulkResult[Note])
+async def delete_notes_bulk(
+    bulk_in: BulkDelete,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
+) -> BulkResult[Note]:
+    """
+    Удалить много заметок одним запросом.
+
+    Args:
+        bulk_in: Список ID
+        db: Сессия БД
+        crud: CRUD заметок текущего пользователя
+
+    Returns:
+        Удаленные заметки и ошибки для ненайденных ID
+    """
+    check_bulk_size(bulk_in.ids)
+
+    notes = await crud.remove_many(db, ids=bulk_in.ids)
+    removed_ids = {note.id for note in notes}
+    errors = [
+        BulkItemError(index=index, id=note_id, detail="Заметка не найдена")
+        for index, note_id in enumerate(bulk_in.ids)
+        if note_id not in removed_ids
+    ]
+
+    return BulkResult[Note](
+        items=[Note.from_orm(note) for note in notes], errors=errors
+    )
+
+
 @router.get("/{note_id}", response_model=Note)
 async def read_note(
+    request: Request,
     note_id: str,
     db: AsyncSession = Depends(get_db),
-) -> Note:
+    crud: CRUDNote = Depends(get_note_crud),
+    loader: ModelLoader = Depends(get_note_loader),
+) -> Union[Note, Response]:
     """
     Получить заметку по ID.
 
+    Поддерживает условные запросы: ETag и Last-Modified по updated_at,
+    при совпадении - 304. Валидаторы хранятся в кеше рядом с JSON.
+
     Args:
+        request: Запрос (условные заголовки)
         note_id: UUID заметки
         db: Сессия БД
+        crud: CRUD заметок текущего пользователя
+        loader: Загрузчик заметок запроса (промах кеша)
 
     Returns:
         Заметка
@@ -54,18 +356,26 @@ async def read_note(
     Raises:
         HTTPException: 404 если заметка не найдена
     """
-    note = await crud_note.get(db, id=note_id)
-    if not note:
+    # Готовый JSON из кеша сущностей (или из БД при промахе)
+    entry = await crud.get_json_entry(db, id=note_id, loader=loader)
+    if entry is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Заметка не найдена"
         )
-    return Note.from_orm(note)
+    return conditional_json(
+        request,
+        entry.body,
+        etag=row_etag(note_id, entry.updated_at),
+        last_modified=entry.updated_at,
+        headers=VARY_USER,
+    )
 
 
 @router.post("/", response_model=Note, status_code=status.HTTP_201_CREATED)
 async def create_note(
     note_in: NoteCreate,
     db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
 ) -> Note:
     """
     Создать новую заметку.
@@ -73,11 +383,20 @@ async def create_note(
     Args:
         note_in: Данные для создания заметки
         db: Сессия БД
+        crud: CRUD заметок текущего пользователя
 
     Returns:
         Созданная заметка
+
+    Raises:
+        HTTPException: 400 если пользователя из X-User-Id не существует
     """
-    note = await crud_note.create(db, obj_in=note_in)
+    try:
+        note = await crud.create(db, obj_in=note_in)
+    except IntegrityError:
+        # Единственное ограничение заметки - внешний ключ на users
+        await db.rollback()
+        _raise_unknown_user()
     return Note.from_orm(note)
 
 
@@ -86,6 +405,7 @@ async def update_note(
     note_id: str,
     note_in: NoteUpdate,
     db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
 ) -> Note:
     """
     Обновить заметку.
@@ -94,6 +414,7 @@ async def update_note(
         note_id: UUID заметки
         note_in: Данные для обновления
         db: Сессия БД
+        crud: CRUD заметок текущего пользователя
 
     Returns:
         Обновленная заметка
@@ -101,13 +422,12 @@ async def update_note(
     Raises:
         HTTPException: 404 если заметка не найдена
     """
-    note = await crud_note.get(db, id=note_id)
-    if not note:
+    # Один UPDATE ... RETURNING: нет строки - нет заметки
+    updated_note = await crud.update_by_id(db, id=note_id, obj_in=note_in)
+    if not updated_note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Заметка не найдена"
         )
-
-    updated_note = await crud_note.update(db, db_obj=note, obj_in=note_in)
     return Note.from_orm(updated_note)
 
 
@@ -115,6 +435,7 @@ async def update_note(
 async def delete_note(
     note_id: str,
     db: AsyncSession = Depends(get_db),
+    crud: CRUDNote = Depends(get_note_crud),
 ) -> Note:
     """
     Удалить заметку.
@@ -122,6 +443,7 @@ async def delete_note(
     Args:
         note_id: UUID заметки
         db: Сессия БД
+        crud: CRUD заметок текущего пользователя
 
     Returns:
         Удаленная заметка
@@ -129,11 +451,18 @@ async def delete_note(
     Raises:
         HTTPException: 404 если заметка не найдена
     """
-    note = await crud_note.get(db, id=note_id)
-    if not note:
+    # Один DELETE ... RETURNING: нет строки - нет заметки
+    deleted_note = await crud.remove(db, id=note_id)
+    if not deleted_note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Заметка не найдена"
         )
-
-    deleted_note = await crud_note.remove(db, id=note_id)
     return Note.from_orm(deleted_note)
+
+
+def _raise_unknown_user() -> NoReturn:
+    """Ошибка вставки по внешнему ключу user_id."""
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Пользователь не найден",
+    )
@@ -0,0 +1,287 @@
+# app/api/endpoints/recurring.py
+"""
+API endpoints для правил повторяющихся операций и их повторений.
+"""
+
+from datetime import date
+from typing import List, NoReturn, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_recurring_rule_crud, get_transaction_crud
+from app.core.config import settings
+from app.crud import category_catalog
+from app.crud.crud_recurring_rule import CRUDRecurringRule, NotAnOccurrenceError
+from app.crud.crud_transaction import CRUDTransaction
+from app.schemas.recurrence import (
+    Occurrence,
+    OccurrenceConfirm,
+    RecurringRule,
+    RecurringRuleCreate,
+    RecurringRuleUpdate,
+)
+from app.schemas.transaction import Transaction
+
+router = APIRouter()
+
+# Ответ зависит от пользователя: общие HTTP кеши не должны отдавать его другим
+VARY_USER = {"Vary": "X-User-Id"}
+
+
+@router.get("/", response_model=List[RecurringRule])
+async def read_rules(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDRecurringRule = Depends(get_recurring_rule_crud),
+    skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
+    limit: int = Query(100, ge=1, le=1000, description="Лимит записей"),
+) -> List[RecurringRule]:
+    """
+    Получить правила повторения текущего пользователя.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+        skip: Сколько записей пропустить
+        limit: Максимальное количество записей
+
+    Returns:
+        Список правил
+    """
+    rules = await crud.get_multi(db, skip=skip, limit=limit)
+    response.headers.update(VARY_USER)
+    return [RecurringRule.model_validate(item) for item in rules]
+
+
+@router.get("/occurrences", response_model=List[Occurrence])
+async def read_occurrences(
+    response: Response,
+    start: date = Query(..., alias="from", description="Первый день, включительно"),
+    end: date = Query(..., alias="to", description="Последний день, включительно"),
+    category_id: Optional[str] = Query(
+        None, alias="category", description="Только эта категория"
+    ),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDRecurringRule = Depends(get_recurring_rule_crud),
+) -> List[Occurrence]:
+    """
+    Повторения правил текущего пользователя за период.
+
+    Подтвержденные повторения (операции) и плановые (рассчитанные по
+    расписанию, в БД их нет) в порядке дат.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        start: Первый день периода
+        end: Последний день периода
+        category_id: ID категории
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+
+    Returns:
+        Список повторений
+
+    Raises:
+        HTTPException: 400 если from позже to или период длиннее
+            RECURRENCE_MAX_DAYS
+    """
+    _check_window(start, end)
+    occurrences = await crud.occurrences(
+        db, start=start, end=end, category_id=category_id
+    )
+    response.headers.update(VARY_USER)
+    return occurrences
+
+
+@router.post("/", response_model=RecurringRule, status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule_in: RecurringRuleCreate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDRecurringRule = Depends(get_recurring_rule_crud),
+) -> RecurringRule:
+    """
+    Создать правило повторения (операции по нему не вставляются).
+
+    Args:
+        rule_in: Шаблон операции и расписание
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+
+    Returns:
+        Созданное правило
+
+    Raises:
+        HTTPException: 400 если категории или пользователя не существует
+    """
+    await _check_category(db, rule_in.category_id)
+    try:
+        rule = await crud.create(db, obj_in=rule_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_bad_reference()
+    return RecurringRule.model_validate(rule)
+
+
+@router.put("/{rule_id}", response_model=RecurringRule)
+async def update_rule(
+    rule_id: str,
+    rule_in: RecurringRuleUpdate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDRecurringRule = Depends(get_recurring_rule_crud),
+) -> RecurringRule:
+    """
+    Изменить шаблон или конец действия правила.
+
+    Подтвержденные повторения не меняются - это уже операции.
+
+    Args:
+        rule_id: UUID правила
+        rule_in: Данные для обновления
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+
+    Returns:
+        Обновленное правило
+
+    Raises:
+        HTTPException: 404 если правило не найдено, 400 если нет категории
+            или ends_on раньше starts_on
+    """
+    await _check_category(db, rule_in.category_id)
+    rule = await crud.get(db, id=rule_id)
+    if rule is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Правило не найдено"
+        )
+    if rule_in.ends_on is not None and rule_in.ends_on < rule.starts_on:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ends_on раньше starts_on",
+        )
+    try:
+        updated = await crud.update(db, db_obj=rule, obj_in=rule_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_bad_reference()
+    return RecurringRule.model_validate(updated)
+
+
+@router.delete("/{rule_id}", response_model=RecurringRule)
+async def delete_rule(
+    rule_id: str,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDRecurringRule = Depends(get_recurring_rule_crud),
+) -> RecurringRule:
+    """
+    Удалить правило (подтвержденные повторения остаются операциями).
+
+    Args:
+        rule_id: UUID правила
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+
+    Returns:
+        Удаленное правило
+
+    Raises:
+        HTTPException: 404 если правило не найдено
+    """
+    deleted = await crud.remove(db, id=rule_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Правило не найдено"
+        )
+    return RecurringRule.model_validate(deleted)
+
+
+@router.post("/{rule_id}/occurrences/{occurrence_date}", response_model=Transaction)
+async def confirm_occurrence(
+    rule_id: str,
+    occurrence_date: date,
+    confirm_in: Optional[OccurrenceConfirm] = None,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDRecurringRule = Depends(get_recurring_rule_crud),
+    transactions: CRUDTransaction = Depends(get_transaction_crud),
+) -> Transaction:
+    """
+    Подтвердить или изменить повторение: оно сохраняется операцией.
+
+    Повторный вызов для той же даты меняет уже сохраненную операцию.
+
+    Args:
+        rule_id: UUID правила
+        occurrence_date: Дата повторения по расписанию
+        confirm_in: Отличия от шаблона правила (сумма, категория,
+            комментарий)
+        db: Сессия БД
+        crud: CRUD правил текущего пользователя
+        transactions: CRUD операций текущего пользователя
+
+    Returns:
+        Операция повторения
+
+    Raises:
+        HTTPException: 404 если правило не найдено, 400 если даты нет в
+            расписании или нет категории
+    """
+    confirm_in = confirm_in or OccurrenceConfirm()
+    await _check_category(db, confirm_in.category_id)
+    rule = await crud.get(db, id=rule_id)
+    if rule is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Правило не найдено"
+        )
+
+    try:
+        transaction = await crud.materialize(
+            db,
+            rule=rule,
+            on=occurrence_date,
+            changes=confirm_in.model_dump(),
+            transactions=transactions,
+        )
+    except NotAnOccurrenceError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError:
+        # Конкурентное подтверждение той же даты или удаленная категория
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Повторение уже подтверждено, повторите запрос",
+        )
+    return Transaction.model_validate(transaction)
+
+
+def _check_window(start: date, end: date) -> None:
+    """Период должен быть непустым и не длиннее RECURRENCE_MAX_DAYS."""
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Начало периода позже конца",
+        )
+    if (end - start).days >= settings.RECURRENCE_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Период длиннее {settings.RECURRENCE_MAX_DAYS} дней",
+        )
+
+
+async def _check_category(db: AsyncSession, category_id: Optional[str]) -> None:
+    """Категория должна существовать (проверка по каталогу в памяти)."""
+    if category_id is None:
+        return
+    snapshot = await category_catalog.get(db)
+    if category_id not in snapshot.by_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Категория не найдена"
+        )
+
+
+def _raise_bad_reference() -> NoReturn:
+    """Ошибка записи по внешнему ключу (категория удалена или нет пользователя)."""
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Категория или пользователь не найдены",
+    )
@@ -0,0 +1,228 @@
+# app/api/endpoints/reports.py
+"""
+API endpoints отчетов по операциям.
+"""
+
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_id, get_db
+from app.crud import recurring_rule, transaction_analytics
+from app.crud.analytics import period_report
+from app.core.config import settings
+from app.crud.rollup import monthly_report
+from app.crud.timeseries import Granularity, bucket_count, timeseries
+from app.schemas.report import AnalyticsReport, MonthlyReportRow, TimeSeries
+
+router = APIRouter()
+
+
+@router.get("/monthly", response_model=List[MonthlyReportRow])
+async def read_monthly_report(
+    response: Response,
+    start: Optional[date] = Query(
+        None, alias="from", description="Первый месяц (любой день), включительно"
+    ),
+    end: Optional[date] = Query(
+        None, alias="to", description="Последний месяц (любой день), включительно"
+    ),
+    category_id: Optional[str] = Query(
+        None, alias="category", description="Только эта категория"
+    ),
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> List[MonthlyReportRow]:
+    """
+    Доходы и расходы текущего пользователя по месяцам и категориям.
+
+    Читает готовые помесячные итоги (monthly_rollups), а не операции:
+    стоимость зависит от числа месяцев и категорий, а не от числа
+    операций. Суммы - в базовой валюте (BASE_CURRENCY), по курсу на день
+    каждой операции на момент ее записи.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        start: Первый месяц периода
+        end: Последний месяц периода
+        category_id: ID категории
+        db: Сессия БД
+        user_id: Текущий пользователь
+
+    Returns:
+        Итоги по (month, category_id)
+
+    Raises:
+        HTTPException: 400 если from позже to
+    """
+    if start is not None and end is not None and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Начало периода позже конца",
+        )
+
+    rows = await monthly_report(
+        db, user_id=user_id, start=start, end=end, category_id=category_id
+    )
+    response.headers["Vary"] = "X-User-Id"
+    return [
+        MonthlyReportRow(
+            month=row.month,
+            category_id=row.category_key or None,
+            income=row.income,
+            expense=row.expense,
+            net=row.income - row.expense,
+            count=row.count,
+        )
+        for row in rows
+    ]
+
+
+@router.get("/timeseries", response_model=TimeSeries)
+async def read_timeseries(
+    response: Response,
+    granularity: Granularity = Query("day", description="Интервал ряда"),
+    start: date = Query(..., alias="from", description="Первый день, включительно"),
+    end: date = Query(..., alias="to", description="Последний день, включительно"),
+    category_id: Optional[str] = Query(
+        None, alias="category", description="Только эта категория"
+    ),
+    include_planned: bool = Query(
+        False, description="Добавить неподтвержденные повторения правил"
+    ),
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> TimeSeries:
+    """
+    Доходы и расходы текущего пользователя по дням, неделям или месяцам.
+
+    Группировка выполняется в БД (date_trunc на Postgres, strftime на
+    SQLite), клиент получает готовый плотный ряд: пустые интервалы - нули.
+    Суммы - в базовой валюте.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        granularity: day, week или month
+        start: Первый день периода
+        end: Последний день периода
+        category_id: ID категории
+        include_planned: Учесть плановые повторения правил (прогноз)
+        db: Сессия БД
+        user_id: Текущий пользователь
+
+    Returns:
+        Ряд параллельными массивами
+
+    Raises:
+        HTTPException: 400 если from позже to, интервалов больше
+            TIMESERIES_MAX_BUCKETS или период с плановыми повторениями
+            длиннее RECURRENCE_MAX_DAYS
+    """
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Начало периода позже конца",
+        )
+    if bucket_count(start, end, granularity) > settings.TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Больше {settings.TIMESERIES_MAX_BUCKETS} интервалов: "
+            "сократите период или укрупните интервал",
+        )
+
+    planned = []
+    if include_planned:
+        if (end - start).days >= settings.RECURRENCE_MAX_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"С плановыми повторениями период - до "
+                f"{settings.RECURRENCE_MAX_DAYS} дней",
+            )
+        # Подтвержденные повторения уже есть среди операций
+        planned = await recurring_rule.for_owner(user_id).occurrences(
+            db, start=start, end=end, category_id=category_id, planned_only=True
+        )
+    series = await timeseries(
+        db,
+        user_id=user_id,
+        granularity=granularity,
+        start=start,
+        end=end,
+        category_id=category_id,
+        planned=planned,
+    )
+    response.headers["Vary"] = "X-User-Id"
+    return TimeSeries(
+        granularity=granularity,
+        currency=settings.BASE_CURRENCY,
+        buckets=series.buckets,
+        income=series.income,
+        expense=series.expense,
+        count=series.count,
+    )
+
+
+@router.get("/analytics", response_model=AnalyticsReport)
+async def read_analytics_report(
+    response: Response,
+    start: Optional[date] = Query(
+        None, alias="from", description="Первый день периода, включительно"
+    ),
+    end: Optional[date] = Query(
+        None, alias="to", description="Последний день периода, включительно"
+    ),
+    window: int = Query(3, ge=1, le=36, description="Окно скользящего среднего"),
+    percentiles: List[float] = Query(
+        [50, 90, 99], alias="percentile", description="Перцентили расходов (0-100)"
+    ),
+    db: AsyncSession = Depends(get_db),
+    user_id: Optional[str] = Depends(get_current_user_id),
+) -> AnalyticsReport:
+    """
+    Аналитика расходов текущего пользователя за период.
+
+    Помесячные ряды со скользящим средним и сравнением год к году, итоги
+    по категориям и перцентили сумм расходов. Считается по колонкам
+    операций в памяти (NumPy), см. app/crud/analytics.py.
+
+    Args:
+        response: Ответ (заголовок Vary)
+        start: Первый день периода
+        end: Последний день периода
+        window: Окно скользящего среднего, месяцев
+        percentiles: Перцентили расходов
+        db: Сессия БД
+        user_id: Текущий пользователь
+
+    Returns:
+        Отчет за период
+
+    Raises:
+        HTTPException: 400 если from позже to или перцентиль вне 0-100,
+            503 если NumPy не установлен
+    """
+    if transaction_analytics is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Аналитика недоступна: не установлен numpy",
+        )
+    if start is not None and end is not None and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Начало периода позже конца",
+        )
+    if not all(0 <= p <= 100 for p in percentiles):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Перцентиль должен быть от 0 до 100",
+        )
+
+    frame = await transaction_analytics.get(db, user_id)
+    response.headers["Vary"] = "X-User-Id"
+    return AnalyticsReport(
+        currency=settings.BASE_CURRENCY,
+        **period_report(
+            frame, start=start, end=end, window=window, percentiles=percentiles
+        ),
+    )
@@ -0,0 +1,326 @@
+# app/api/endpoints/transactions.py
+"""
+API endpoints для работы с операциями (расходами/доходами).
+"""
+
+from typing import Any, Dict, List, NoReturn, Optional, Union
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Request,
+    Response,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.bulk import check_bulk_size, validate_bulk_items
+from app.api.conditional import conditional_json, row_etag
+from app.api.deps import get_category_rule_crud, get_db, get_transaction_crud
+from app.crud import category_catalog
+from app.crud.classifier import Matcher
+from app.crud.crud_category_rule import CRUDCategoryRule
+from app.crud.crud_transaction import CRUDTransaction
+from app.crud.fx import MissingRateError, fx_rates
+from app.crud.pagination import InvalidCursorError
+from app.crud.rollup import day_of
+from app.schemas.bulk import BulkItemError, BulkResult
+from app.schemas.transaction import (
+    Transaction,
+    TransactionCreate,
+    TransactionUpdate,
+)
+
+router = APIRouter()
+
+# Ответ зависит от пользователя: общие HTTP кеши не должны отдавать его другим
+VARY_USER = {"Vary": "X-User-Id"}
+
+
+@router.get("/", response_model=List[Transaction])
+async def read_transactions(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDTransaction = Depends(get_transaction_crud),
+    skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
+    limit: int = Query(100, ge=1, le=1000, description="Лимит записей"),
+    after: Optional[str] = Query(
+        None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"
+    ),
+) -> List[Transaction]:
+    """
+    Получить операции текущего пользователя с пагинацией.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    (нет заголовка - страница последняя). С курсором skip игнорируется.
+
+    Args:
+        response: Ответ (для заголовка X-Next-Cursor)
+        db: Сессия БД
+        crud: CRUD операций текущего пользователя
+        skip: Сколько записей пропустить
+        limit: Максимальное количество записей
+        after: Курсор из предыдущего ответа
+
+    Returns:
+        Список операций в порядке создания
+
+    Raises:
+        HTTPException: 400 если курсор некорректный
+    """
+    try:
+        transactions, next_cursor = await crud.get_page(
+            db, after=after, skip=skip, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers.update(VARY_USER)
+    return [Transaction.model_validate(item) for item in transactions]
+
+
+# Объявлен до /{transaction_id}, чтобы "bulk" не принимался за ID
+
+
+@router.post("/bulk", response_model=BulkResult[Transaction])
+async def create_transactions_bulk(
+    items: List[Dict[str, Any]] = Body(...),
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDTransaction = Depends(get_transaction_crud),
+    rules: CRUDCategoryRule = Depends(get_category_rule_crud),
+) -> BulkResult[Transaction]:
+    """
+    Создать много операций одним запросом.
+
+    Невалидные элементы, элементы с несуществующей категорией и в
+    валюте без курса на дату операции не создаются и попадают в errors с
+    их индексом; остальные получают
+    категорию по правилам (если ее нет) и вставляются пачками в одной
+    транзакции вместе с итогами.
+
+    Args:
+        items: Список данных операций (как для POST /transactions/)
+        db: Сессия БД
+        crud: CRUD операций текущего пользователя
+        rules: CRUD правил категоризации текущего пользователя
+
+    Returns:
+        Созданные операции и ошибки по элементам
+
+    Raises:
+        HTTPException: 400 если пользователя из X-User-Id не существует
+    """
+    check_bulk_size(items)
+    valid, errors = validate_bulk_items(items, TransactionCreate)
+
+    snapshot = await category_catalog.get(db)
+    matcher = await rules.matcher(db)
+    fx = await fx_rates.get(db)
+    objs_in = []
+    for index, obj in valid:
+        if obj.category_id is not None and obj.category_id not in snapshot.by_id:
+            errors.append(BulkItemError(index=index, detail="Категория не найдена"))
+            continue
+        try:
+            fx.rate(obj.currency, day_of(obj.occurred_at))
+        except MissingRateError as e:
+            errors.append(BulkItemError(index=index, detail=str(e)))
+        else:
+            objs_in.append(_categorize(matcher, obj))
+    errors.sort(key=lambda error: error.index)
+
+    try:
+        transactions = await crud.create_many(db, objs_in=objs_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_bad_reference()
+    return BulkResult[Transaction](
+        items=[Transaction.model_validate(item) for item in transactions],
+        errors=errors,
+    )
+
+
+@router.get("/{transaction_id}", response_model=Transaction)
+async def read_transaction(
+    request: Request,
+    transaction_id: str,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDTransaction = Depends(get_transaction_crud),
+) -> Union[Transaction, Response]:
+    """
+    Получить операцию по ID (через кеш сущностей, с ETag/Last-Modified).
+
+    Args:
+        request: Запрос (условные заголовки)
+        transaction_id: UUID операции
+        db: Сессия БД
+        crud: CRUD операций текущего пользователя
+
+    Returns:
+        Операция
+
+    Raises:
+        HTTPException: 404 если операция не найдена
+    """
+    entry = await crud.get_json_entry(db, id=transaction_id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Операция не найдена"
+        )
+    return conditional_json(
+        request,
+        entry.body,
+        etag=row_etag(transaction_id, entry.updated_at),
+        last_modified=entry.updated_at,
+        headers=VARY_USER,
+    )
+
+
+@router.post("/", response_model=Transaction, status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction_in: TransactionCreate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDTransaction = Depends(get_transaction_crud),
+    rules: CRUDCategoryRule = Depends(get_category_rule_crud),
+) -> Transaction:
+    """
+    Создать операцию (помесячные итоги обновляются в той же транзакции).
+
+    Операции без категории категория подбирается по правилам
+    пользователя (POST /categories/rules). Сумма в другой валюте входит
+    в итоги по курсу на день операции.
+
+    Args:
+        transaction_in: Данные операции
+        db: Сессия БД
+        crud: CRUD операций текущего пользователя
+        rules: CRUD правил категоризации текущего пользователя
+
+    Returns:
+        Созданная операция
+
+    Raises:
+        HTTPException: 400 если категории или пользователя не существует
+            или нет курса валюты на дату операции
+    """
+    await _check_category(db, transaction_in.category_id)
+    matcher = await rules.matcher(db)
+    transaction_in = _categorize(matcher, transaction_in)
+    try:
+        transaction = await crud.create(db, obj_in=transaction_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_bad_reference()
+    except MissingRateError as e:
+        await db.rollback()
+        _raise_missing_rate(e)
+    return Transaction.model_validate(transaction)
+
+
+@router.put("/{transaction_id}", response_model=Transaction)
+async def update_transaction(
+    transaction_id: str,
+    transaction_in: TransactionUpdate,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDTransaction = Depends(get_transaction_crud),
+) -> Transaction:
+    """
+    Обновить операцию.
+
+    Args:
+        transaction_id: UUID операции
+        transaction_in: Данные для обновления
+        db: Сессия БД
+        crud: CRUD операций текущего пользователя
+
+    Returns:
+        Обновленная операция
+
+    Raises:
+        HTTPException: 404 если операция не найдена, 400 если нет категории
+            или курса валюты на дату операции
+    """
+    await _check_category(db, transaction_in.category_id)
+    try:
+        updated = await crud.update_by_id(db, id=transaction_id, obj_in=transaction_in)
+    except IntegrityError:
+        await db.rollback()
+        _raise_bad_reference()
+    except MissingRateError as e:
+        await db.rollback()
+        _raise_missing_rate(e)
+
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Операция не найдена"
+        )
+    return Transaction.model_validate(updated)
+
+
+@router.delete("/{transaction_id}", response_model=Transaction)
+async def delete_transaction(
+    transaction_id: str,
+    db: AsyncSession = Depends(get_db),
+    crud: CRUDTransaction = Depends(get_transaction_crud),
+) -> Transaction:
+    """
+    Удалить операцию.
+
+    Args:
+        transaction_id: UUID операции
+        db: Сессия БД
+        crud: CRUD операций текущего пользователя
+
+    Returns:
+        Удаленная операция
+
+    Raises:
+        HTTPException: 404 если операция не найдена
+    """
+    deleted = await crud.remove(db, id=transaction_id)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Операция не найдена"
+        )
+    return Transaction.model_validate(deleted)
+
+
+async def _check_category(db: AsyncSession, category_id: Optional[str]) -> None:
+    """Категория должна существовать (проверка по каталогу в памяти)."""
+    if category_id is None:
+        return
+    snapshot = await category_catalog.get(db)
+    if category_id not in snapshot.by_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Категория не найдена"
+        )
+
+
+def _categorize(
+    matcher: Matcher, transaction_in: TransactionCreate
+) -> TransactionCreate:
+    """Категория по правилам для операции без категории."""
+    if transaction_in.category_id is not None:
+        return transaction_in
+    match = matcher.classify(transaction_in.description)
+    if match is None:
+        return transaction_in
+    return transaction_in.model_copy(update={"category_id": match[1]})
+
+
+def _raise_bad_reference() -> NoReturn:
+    """Ошибка вставки по внешнему ключу (категория удалена или нет пользователя)."""
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Категория или пользователь не найдены",
+    )
+
+
+def _raise_missing_rate(error: MissingRateError) -> NoReturn:
+    """Нет курса валюты операции: итоги в базовой валюте не посчитать."""
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
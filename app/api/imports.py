@@ -0,0 +1,265 @@
+# app/api/imports.py
+"""
+Импорт банковских выписок в операции.
+
+Конвейер из асинхронных генераторов: файл -> текст -> записи выписки
+(app/api/statements.py) -> пачки по IMPORT_BATCH_SIZE -> проверка ->
+вставка пачки (COPY на PostgreSQL, executemany иначе) и COMMIT. Следующая
+пачка читается только после вставки предыдущей, а ход импорта уходит
+клиенту строкой NDJSON после каждой пачки: медленная БД или медленный
+клиент притормаживают чтение файла, память ограничена одной пачкой.
+
+Строки в валюте без курса на дату операции не вставляются и попадают в
+ошибки: итоги считаются в базовой валюте.
+
+Строки, которые уже импортированы (тот же отпечаток даты, суммы и
+описания - см. import_fingerprint), пропускаются и считаются в skipped:
+повторный импорт выписки за пересекающийся период не создает дубликатов.
+
+Пачки фиксируются по отдельности: при ошибке посередине уже
+вставленные пачки остаются (см. imported в состоянии задачи).
+
+Задачи хранятся в памяти процесса (последние IMPORT_MAX_JOBS) - GET
+/imports/{id} видит только задачи своего процесса.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, TypeVar
+from uuid import uuid4
+
+from fastapi import Request
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.api.statements import (
+    Record,
+    StatementFormat,
+    decode,
+    parse_amount,
+    parse_date,
+    parse_ofx_date,
+    parse_records,
+    read_chunks,
+)
+from app.core.config import settings
+from app.crud import category_catalog
+from app.crud.catalog import CatalogSnapshot
+from app.crud.classifier import Matcher
+from app.crud.crud_category_rule import CRUDCategoryRule
+from app.crud.crud_transaction import CRUDTransaction
+from app.crud.fx import FxTable, fx_rates
+from app.crud.rollup import day_of
+from app.schemas.imports import ImportJob as ImportJobSchema
+from app.schemas.imports import ImportRowError
+from app.schemas.transaction import TransactionCreate
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class ImportJob:
+    """Задача импорта одного файла (состояние - см. ImportJobSchema)."""
+
+    user_id: Optional[str]
+    filename: Optional[str]
+    format: StatementFormat
+    id: str = field(default_factory=lambda: str(uuid4()))
+    status: str = "running"
+    rows: int = 0
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = field(default_factory=list)
+    detail: Optional[str] = None
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+    def add_error(self, line: int, detail: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append(ImportRowError(line=line, detail=detail))
+
+    def finish(self, status: str, detail: Optional[str] = None) -> None:
+        self.status = status
+        self.detail = detail
+        self.finished_at = datetime.now(timezone.utc)
+
+
+class ImportJobs:
+    """Последние задачи импорта (старые вытесняются)."""
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+
+    def start(self, job: ImportJob) -> ImportJob:
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str, user_id: Optional[str]) -> Optional[ImportJob]:
+        """Задача, если она принадлежит пользователю."""
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+
+jobs = ImportJobs(settings.IMPORT_MAX_JOBS)
+
+
+async def batched(items: AsyncIterator[T], size: int) -> AsyncIterator[List[T]]:
+    """Пачки по size элементов из асинхронного потока."""
+    batch: List[T] = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def to_row(
+    record: Dict[str, str],
+    format: StatementFormat,
+    catalog: CatalogSnapshot,
+    matcher: Matcher,
+    fx: FxTable,
+) -> Dict[str, Any]:
+    """
+    Поля операции из записи выписки.
+
+    Строка без категории получает категорию по правилам пользователя.
+
+    Raises:
+        ValueError: Нет или не разбирается поле, нет курса валюты
+            (MissingRateError)
+        ValidationError: Операция не проходит TransactionCreate
+    """
+    if "date" not in record or "amount" not in record:
+        raise ValueError("Нет даты или суммы")
+
+    category_id = None
+    category = record.get("category")
+    if category is not None:
+        found = catalog.by_id.get(category) or catalog.by_key.get(category)
+        if found is None:
+            raise ValueError(f"Категория не найдена: {category!r}")
+        category_id = found.id
+
+    description = record.get("description")
+    if category_id is None:
+        match = matcher.classify(description)
+        category_id = match[1] if match else None
+
+    parse = parse_ofx_date if format == "ofx" else parse_date
+    fields: Dict[str, Any] = {}
+    if record.get("currency"):
+        fields["currency"] = record["currency"].strip()
+    transaction = TransactionCreate(
+        amount=parse_amount(record["amount"]),
+        occurred_at=parse(record["date"]),
+        category_id=category_id,
+        description=description[:200] if description else None,
+        **fields,
+    )
+    fx.rate(transaction.currency, day_of(transaction.occurred_at))
+    return transaction.model_dump()
+
+
+def check_batch(
+    batch: List[Record],
+    format: StatementFormat,
+    catalog: CatalogSnapshot,
+    matcher: Matcher,
+    fx: FxTable,
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+    """Проверить пачку: (строки для вставки, [(номер строки, ошибка)])."""
+    rows: List[Dict[str, Any]] = []
+    errors: List[Tuple[int, str]] = []
+    for line, record in batch:
+        try:
+            rows.append(to_row(record, format, catalog, matcher, fx))
+        except ValidationError as e:
+            errors.append((line, "; ".join(err["msg"] for err in e.errors())))
+        except ValueError as e:
+            errors.append((line, str(e)))
+    return rows, errors
+
+
+async def run_import(
+    request: Request,
+    job: ImportJob,
+    file: Any,
+    *,
+    bind: AsyncEngine,
+    crud: CRUDTransaction,
+    rules: CRUDCategoryRule,
+    encoding: str,
+) -> AsyncIterator[ImportJob]:
+    """
+    Выполнить импорт, отдавая состояние задачи после каждой пачки.
+
+    Args:
+        request: Запрос (для отслеживания отключения клиента)
+        job: Задача (меняется по ходу импорта)
+        file: Загруженный файл (async read)
+        bind: Движок БД (импорт идет в своей сессии: сессия запроса
+            закрывается раньше, чем заканчивается поток)
+        crud: CRUD операций пользователя
+        rules: CRUD правил категоризации пользователя
+        encoding: Кодировка файла
+
+    Yields:
+        job после каждой пачки и в конце
+    """
+    records = parse_records(decode(read_chunks(file), encoding), job.format)
+    async with AsyncSession(bind=bind, expire_on_commit=False) as db:
+        try:
+            catalog = await category_catalog.get(db)
+            matcher = await rules.matcher(db)
+            fx = await fx_rates.get(db)
+            async for batch in batched(records, settings.IMPORT_BATCH_SIZE):
+                if await request.is_disconnected():
+                    # Ход импорта некому отдавать: дальше не читаем
+                    job.finish("failed", "Клиент отключился")
+                    return
+                rows, errors = check_batch(batch, job.format, catalog, matcher, fx)
+                for line, detail in errors:
+                    job.add_error(line, detail)
+                inserted = await crud.insert_rows(db, rows)
+                job.imported += inserted
+                job.skipped += len(rows) - inserted
+                job.rows += len(batch)
+                yield job
+        except (ValueError, UnicodeDecodeError) as e:
+            # Файл не разбирается дальше (заголовок, кодировка)
+            job.finish("failed", str(e))
+        except BaseException:
+            # Ошибка БД или клиент отключился посреди импорта
+            logger.exception("Импорт %s прерван", job.id)
+            job.finish("failed", "Импорт прерван")
+            raise
+        else:
+            job.finish("done")
+    yield job
+
+
+async def progress_lines(jobs_stream: AsyncIterator[ImportJob]) -> AsyncIterator[bytes]:
+    """
+    NDJSON хода импорта: счетчики после каждой пачки, в последней строке
+    - полное состояние с ошибками строк.
+    """
+    async for job in jobs_stream:
+        snapshot = ImportJobSchema.model_validate(job)
+        if job.status == "running":
+            yield snapshot.model_dump_json(exclude={"errors"}).encode() + b"\n"
+        else:
+            yield snapshot.model_dump_json().encode() + b"\n"
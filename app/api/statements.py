@@ -0,0 +1,316 @@
+# app/api/statements.py
+"""
+Потоковый разбор банковских выписок (CSV и OFX).
+
+Файл читается кусками и проходит цепочку асинхронных генераторов:
+байты -> текст (инкрементальный декодер) -> записи выписки. Каждый
+генератор берет следующий кусок только когда у него просят запись,
+поэтому в памяти одновременно не больше куска файла и одной записи.
+
+Запись выписки - номер строки файла и сырые значения полей (date,
+amount, description, category, currency); перевод в операцию и проверка - дело
+импорта (app/api/imports.py).
+"""
+
+import codecs
+import csv
+import re
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+
+StatementFormat = Literal["csv", "ofx"]
+
+# (номер строки в файле, сырые поля)
+Record = Tuple[int, Dict[str, str]]
+
+# Размер куска чтения файла, байт
+READ_CHUNK_SIZE = 64 * 1024
+
+# Заголовки колонок CSV (в нижнем регистре) -> поле записи
+CSV_COLUMNS = {
+    "date": "date",
+    "occurred_at": "date",
+    "дата": "date",
+    "дата операции": "date",
+    "amount": "amount",
+    "сумма": "amount",
+    "сумма операции": "amount",
+    "description": "description",
+    "memo": "description",
+    "описание": "description",
+    "назначение платежа": "description",
+    "category": "category",
+    "category_id": "category",
+    "категория": "category",
+    "currency": "currency",
+    "валюта": "currency",
+}
+
+# Поля операции в OFX (<STMTTRN>) -> поле записи
+OFX_FIELDS = {
+    "DTPOSTED": "date",
+    "TRNAMT": "amount",
+    "NAME": "name",
+    "MEMO": "memo",
+    "CURSYM": "currency",
+}
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+# Форматы дат CSV (кроме ISO 8601, который разбирает fromisoformat)
+DATE_FORMATS = ("%d.%m.%Y", "%d.%m.%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%d/%m/%Y")
+
+# Форматы дат OFX по длине (без долей секунды и зоны)
+OFX_DATE_FORMATS = {8: "%Y%m%d", 12: "%Y%m%d%H%M", 14: "%Y%m%d%H%M%S"}
+
+CSV_DELIMITERS = (",", ";", "\t")
+
+
+async def read_chunks(file: Any, size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Куски файла (UploadFile или любой объект с async read(size))."""
+    while chunk := await file.read(size):
+        yield chunk
+
+
+async def decode(chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[str]:
+    """
+    Текст из кусков байт.
+
+    Инкрементальный декодер не ломает многобайтовые символы на границе
+    кусков; BOM в начале utf-8 файла снимается (utf-8-sig).
+
+    Raises:
+        LookupError: Неизвестная кодировка
+        UnicodeDecodeError: Файл не в этой кодировке
+    """
+    if codecs.lookup(encoding).name == "utf-8":
+        encoding = "utf-8-sig"
+    decoder = codecs.getincrementaldecoder(encoding)()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def lines(texts: AsyncIterator[str]) -> AsyncIterator[Tuple[int, str]]:
+    """Строки текста с номерами (с 1), без перевода строки."""
+    number = 0
+    pending = ""
+    async for text in texts:
+        parts = (pending + text).split("\n")
+        pending = parts.pop()
+        for line in parts:
+            number += 1
+            yield number, line.rstrip("\r")
+    if pending:
+        yield number + 1, pending.rstrip("\r")
+
+
+async def parse_csv(texts: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """
+    Записи CSV выписки.
+
+    Первая строка - заголовок (названия колонок см. CSV_COLUMNS),
+    разделитель (",", ";" или табуляция) - самый частый символ в нем. Поле в
+    кавычках может содержать перевод строки.
+
+    Raises:
+        ValueError: Нет заголовка или в нем нет даты и суммы
+    """
+    header: Optional[List[str]] = None
+    delimiter = ","
+    record_start, record = 0, ""
+
+    async for number, line in lines(texts):
+        if not record:
+            record_start = number
+        record = f"{record}\n{line}" if record else line
+        # Нечетное число кавычек - поле в кавычках продолжается
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        if header is None:
+            delimiter = max(CSV_DELIMITERS, key=text.count)
+            header = [
+                CSV_COLUMNS.get(name.strip().lower(), "")
+                for name in next(csv.reader([text], delimiter=delimiter))
+            ]
+            if "date" not in header or "amount" not in header:
+                raise ValueError("В заголовке CSV нужны колонки date и amount")
+            continue
+
+        values = next(csv.reader([text], delimiter=delimiter))
+        yield record_start, {
+            field: value.strip()
+            for field, value in zip(header, values)
+            if field and value.strip()
+        }
+
+    if record:
+        raise ValueError(f"Строка {record_start}: незакрытые кавычки")
+    if header is None:
+        raise ValueError("Пустой файл")
+
+
+async def parse_ofx(texts: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """
+    Записи OFX выписки (блоки <STMTTRN>).
+
+    Подходит и SGML (OFX 1.x, поля без закрывающих тегов), и XML (OFX
+    2.x). Номер строки - строка начала блока операции.
+    """
+    state = _OfxState()
+    pending = ""
+    async for text in texts:
+        buffer = pending + text
+        # Последний тег может быть разрезан куском: оставляем его на потом
+        cut = buffer.rfind("<")
+        if cut < 0:
+            pending = buffer
+            continue
+        buffer, pending = buffer[:cut], buffer[cut:]
+        for record in state.scan(buffer):
+            yield record
+
+    for record in state.scan(pending):
+        yield record
+    # SGML допускает последний блок без </STMTTRN>
+    if state.current:
+        yield state.start, _ofx_record(state.current, state.currency)
+
+
+class _OfxState:
+    """Разбор OFX между кусками: открытый блок операции, номер строки и
+    валюта выписки (<CURDEF>)."""
+
+    def __init__(self) -> None:
+        self.number = 1
+        self.start = 0
+        self.current: Optional[Dict[str, str]] = None
+        self.currency: Optional[str] = None
+
+    def scan(self, buffer: str) -> List[Record]:
+        """Записи, закрытые в этом куске текста."""
+        records = []
+        position = 0
+        for match in OFX_TAG.finditer(buffer):
+            self.number += buffer.count("\n", position, match.start())
+            position = match.start()
+            closing, tag, value = match.group(1), match.group(2).upper(), match.group(3)
+            if tag == "STMTTRN":
+                if closing and self.current is not None:
+                    records.append(
+                        (self.start, _ofx_record(self.current, self.currency))
+                    )
+                    self.current = None
+                elif not closing:
+                    self.current, self.start = {}, self.number
+            elif self.current is not None and not closing and tag in OFX_FIELDS:
+                self.current[OFX_FIELDS[tag]] = value.strip()
+            elif tag == "CURDEF" and not closing:
+                self.currency = value.strip() or None
+        self.number += buffer.count("\n", position)
+        return records
+
+
+def _ofx_record(fields: Dict[str, str], currency: Optional[str]) -> Dict[str, str]:
+    """Поля OFX -> поля записи (описание - NAME и MEMO, валюта - своя
+    валюта операции или валюта выписки)."""
+    description = " ".join(
+        value for value in (fields.get("name"), fields.get("memo")) if value
+    )
+    record: Dict[str, str] = {
+        key: fields[key] for key in ("date", "amount") if key in fields
+    }
+    if description:
+        record["description"] = description
+    currency = fields.get("currency") or currency
+    if currency:
+        record["currency"] = currency
+    return record
+
+
+def parse_records(
+    texts: AsyncIterator[str], format: StatementFormat
+) -> AsyncIterator[Record]:
+    """Записи выписки в нужном формате."""
+    return parse_ofx(texts) if format == "ofx" else parse_csv(texts)
+
+
+# =========== ЗНАЧЕНИЯ ПОЛЕЙ ===========
+
+
+def parse_amount(value: str) -> int:
+    """
+    Сумма в копейках из записи выписки.
+
+    Понимает "-1234.56", "1 234,56", "−1.234,56" (разделитель тысяч -
+    пробел, точка или запятая перед десятичным разделителем).
+
+    Raises:
+        ValueError: Не число или больше двух знаков после запятой
+    """
+    text = value.strip().replace("\u2212", "-")
+    text = text.replace(" ", "").replace("\u00a0", "").replace("\u202f", "")
+    if "," in text and "." in text:
+        # Десятичный разделитель - последний из двух
+        thousands = "." if text.rfind(",") > text.rfind(".") else ","
+        text = text.replace(thousands, "")
+    text = text.replace(",", ".")
+    try:
+        cents = Decimal(text).scaleb(2)
+    except InvalidOperation:
+        raise ValueError(f"Некорректная сумма: {value!r}") from None
+    if not cents.is_finite() or cents != cents.to_integral_value():
+        raise ValueError(f"Некорректная сумма: {value!r}")
+    return int(cents)
+
+
+def parse_date(value: str) -> datetime:
+    """
+    Дата операции из CSV: ISO 8601 или ДД.ММ.ГГГГ [ЧЧ:ММ[:СС]].
+
+    Raises:
+        ValueError: Неизвестный формат
+    """
+    text = value.strip()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    raise ValueError(f"Некорректная дата: {value!r}")
+
+
+def parse_ofx_date(value: str) -> datetime:
+    """
+    Дата OFX: ГГГГММДД[ЧЧММСС[.XXX]][[+-]Ч[.ММ]:ЗОНА].
+
+    Raises:
+        ValueError: Неизвестный формат
+    """
+    text, _, zone = value.strip().partition("[")
+    text = text.split(".")[0]
+    try:
+        moment = datetime.strptime(text, OFX_DATE_FORMATS[len(text)])
+    except (KeyError, ValueError):
+        raise ValueError(f"Некорректная дата OFX: {value!r}") from None
+    offset = zone.split(":")[0].rstrip("]")
+    if offset:
+        try:
+            hours = float(offset)
+        except ValueError:
+            raise ValueError(f"Некорректная дата OFX: {value!r}") from None
+        return moment.replace(tzinfo=timezone(timedelta(hours=hours)))
+    return moment.replace(tzinfo=timezone.utc)
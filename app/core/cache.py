@@ -0,0 +1,176 @@
+# app/core/cache.py
+"""
+Кеш сущностей для чтения по ID.
+
+Хранит уже сериализованные JSON-байты ответа (вместе с updated_at для
+условных запросов, см. JsonEntry в app/crud/base.py), поэтому попадание в кеш не
+требует ни соединения с БД, ни повторной сериализации pydantic.
+Кеш подключается к CRUDBase (см. CRUDBase.get_json), запись через CRUD
+инвалидирует ключи.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class EntityCache:
+    """
+    Интерфейс кеша сущностей. Реализация по умолчанию - LRUTTLCache,
+    для внешнего хранилища (например, Redis) достаточно реализовать
+    те же методы.
+    """
+
+    # Номер поколения: растет при каждой инвалидации. Читатель запоминает
+    # его до похода в БД и передает в set, чтобы не положить в кеш
+    # значение, которое устарело, пока шел запрос
+    generation: int = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, *, generation: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class LRUTTLCache(EntityCache):
+    """
+    Ограниченный по размеру LRU кеш с временем жизни записей.
+
+    Счетчики: hits, misses, evictions (вытеснены по размеру),
+    expirations (истек TTL), invalidations (удалены при записи).
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        """
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        # key -> (момент истечения, значение); порядок = порядок использования
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, *, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        self.generation += 1
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class KeyedLocks:
+    """
+    Блокировки по ключу: значение кеша для ключа загружает один запрос.
+
+    Блокировка ключа удаляется, только когда ее никто не держит и не ждет
+    (счетчик ссылок). Если удалить ее, пока в очереди есть ожидающие,
+    следующий запрос создаст вторую блокировку и загрузит то же значение
+    параллельно с ними.
+    """
+
+    def __init__(self) -> None:
+        # Ключ -> [блокировка, число держащих и ждущих]
+        self._locks: Dict[str, List[Any]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+# Все созданные кеши по имени (для метрик/отладки)
+caches: Dict[str, EntityCache] = {}
+
+
+def build_entity_cache(name: str, enabled: bool) -> Optional[EntityCache]:
+    """
+    Создать кеш для модели, если он включен в настройках.
+
+    Args:
+        name: Имя кеша (обычно имя таблицы)
+        enabled: Флаг из Settings (CACHE_NOTES и т.п.)
+
+    Returns:
+        Кеш или None если кеширование выключено
+    """
+    if not enabled:
+        return None
+
+    cache = LRUTTLCache(
+        maxsize=settings.CACHE_MAX_ENTRIES, ttl=settings.CACHE_TTL_SECONDS
+    )
+    caches[name] = cache
+    return cache
@@ -1,6 +1,6 @@
 # app/config.py
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -23,6 +23,16 @@ class Settings(BaseSettings):
         "http://localhost:8000",
         "http://127.0.0.1:8000",
     ]
+    # Максимум элементов в одном запросе к /bulk эндпоинтам
+    BULK_MAX_ITEMS: int = 10000
+    # Время жизни закешированного COUNT(*) для count=estimated вне Postgres
+    COUNT_CACHE_TTL_SECONDS: float = 5.0
+    # Размер пачки строк при потоковой выгрузке (/export)
+    EXPORT_CHUNK_SIZE: int = 1000
+    # Максимум интервалов в ряду /reports/timeseries
+    TIMESERIES_MAX_BUCKETS: int = 1000
+    # Максимальное окно для повторений правил (/recurring/occurrences), дней
+    RECURRENCE_MAX_DAYS: int = 3660
 
     # =========== БАЗА ДАННЫХ ===========
     POSTGRES_HOST: str = "localhost"
@@ -30,11 +40,105 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = "finance_tracker"
+    # Подготовка БД при старте воркера:
+    # create_all - создать недостающие таблицы и записать отпечаток схемы
+    #   (ошибки только логируются: приложение стартует и без БД);
+    # fingerprint - сверить отпечаток схемы одним запросом, без DDL
+    #   (нет БД или схема не совпадает - старт падает)
+    DB_STARTUP_MODE: Literal["create_all", "fingerprint"] = "create_all"
+
+    # =========== ПУЛ СОЕДИНЕНИЙ ===========
+    DB_POOL_SIZE: int = 5  # Постоянные соединения
+    DB_MAX_OVERFLOW: int = 10  # Дополнительные соединения сверх pool_size
+    DB_POOL_TIMEOUT: float = 30.0  # Сколько ждать свободного соединения, с
+    DB_POOL_RECYCLE: int = 3600  # Пересоздание соединений, с
+    # Настройки сессии Postgres для каждого соединения (0 - не задавать)
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_LOCK_TIMEOUT_MS: int = 0
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 0
+    DB_APPLICATION_NAME: str = "finance-tracker"
+    # Соединение, удерживаемое дольше, попадает в /internal/pool
+    DB_LONG_HELD_SECONDS: float = 5.0
+
+    # =========== РЕПЛИКИ ===========
+    # URL реплик только для чтения (пусто - все запросы на основную БД)
+    DB_REPLICA_URLS: List[str] = []
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = 5.0  # Период проверки реплик
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # Допустимое отставание (Postgres)
+    # Сколько секунд после записи чтения клиента идут на основную БД
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # =========== КЕШ СУЩНОСТЕЙ ===========
+    # Включение кеша чтения по ID для каждой модели
+    CACHE_NOTES: bool = True
+    CACHE_CATEGORIES: bool = True
+    CACHE_USERS: bool = False
+    CACHE_TRANSACTIONS: bool = True
+    CACHE_MAX_ENTRIES: int = 10000  # Максимум записей в кеше одной модели
+    CACHE_TTL_SECONDS: float = 60.0
+
+    # =========== GROUP COMMIT ===========
+    # Объединять конкурентные POST /notes/ в один INSERT и один COMMIT
+    GROUP_COMMIT_NOTES: bool = False
+    GROUP_COMMIT_WINDOW_MS: float = 2.0  # Окно накопления
+    GROUP_COMMIT_MAX_ROWS: int = 256  # Пачка уходит сразу при таком размере
+
+    # =========== ПОИСК ===========
+    # Конфигурация text search Postgres для tsvector заметок
+    SEARCH_TS_CONFIG: str = "simple"
+    # Автодополнение (GET /notes/suggest): индекс префиксов в памяти
+    SUGGEST_MAX_ENTRIES: int = 200000  # Больше строк - подсказки из БД
+    SUGGEST_REBUILD_SECONDS: float = 300.0  # Период полной перестройки
+
+    # =========== КАТАЛОГ КАТЕГОРИЙ ===========
+    # Снимок таблицы categories в памяти; записи других процессов видны
+    # не позже чем через столько секунд
+    CATALOG_TTL_SECONDS: float = 30.0
+
+    # =========== ВЛАДЕЛЬЦЫ ДАННЫХ ===========
+    # Заметки принадлежат пользователю из заголовка X-User-Id; без заголовка
+    # запросы видят только заметки без владельца, если не требовать его
+    REQUIRE_USER_ID: bool = False
+
+    # =========== ИМПОРТ ВЫПИСОК ===========
+    # Строк выписки в одной пачке (проверка + COPY/INSERT + COMMIT)
+    IMPORT_BATCH_SIZE: int = 2000
+    # Сколько ошибок строк хранить в задаче импорта (остальные только считаются)
+    IMPORT_MAX_ERRORS: int = 1000
+    # Сколько последних задач импорта помнить для GET /imports/{id}
+    IMPORT_MAX_JOBS: int = 100
+
+    # =========== КАТЕГОРИЗАЦИЯ ===========
+    # Скомпилированные правила категоризации пользователя держатся в памяти;
+    # записи правил через CRUD сбрасывают их сразу, других процессов - через ttl
+    CATEGORY_RULES_MAX_USERS: int = 1024
+    CATEGORY_RULES_TTL_SECONDS: float = 300.0
+
+    # =========== ВАЛЮТЫ ===========
+    # Валюта отчетов, итогов и бюджетов; операции в других валютах
+    # пересчитываются по курсу на дату операции (см. app/crud/fx.py)
+    BASE_CURRENCY: str = "RUB"
+    # Каталог CSV файлов с курсами (date,currency,rate) для загрузки в
+    # fx_rates: scripts/load_fx_rates.py или POST /internal/fx/reload
+    # (с INTERNAL_TOKEN)
+    FX_RATES_DIR: str = "fx_rates"
+    # Курсы держатся в памяти; загрузка в этом процессе сбрасывает их
+    # сразу, в других процессах - через ttl
+    FX_TTL_SECONDS: float = 3600.0
+
+    # =========== АНАЛИТИКА ===========
+    # Колонки операций пользователя (NumPy) держатся в памяти; записи через
+    # CRUD сбрасывают их сразу, записи других процессов - через ttl
+    ANALYTICS_MAX_USERS: int = 256
+    ANALYTICS_TTL_SECONDS: float = 300.0
 
     # =========== БЕЗОПАСНОСТЬ ===========
     SECRET_KEY: str = "your-secret-key-change-this"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Токен служебных эндпоинтов, меняющих данные (POST /internal/fx/reload,
+    # заголовок X-Internal-Token); не задан - эти эндпоинты выключены
+    INTERNAL_TOKEN: Optional[str] = None
 
     @property
     def database_url(self) -> str:
@@ -0,0 +1,40 @@
+"""
+Отложенный импорт тяжелых необязательных зависимостей.
+
+Импорт NumPy - заметная доля холодного старта воркера, а нужен он только
+отчетам и пересчету валют. optional_module проверяет наличие пакета без
+импорта (find_spec), а сам импорт происходит при первом обращении к
+атрибуту: модули пишут np.array(...) как обычно.
+"""
+
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Модуль, импортируемый при первом обращении к его атрибуту."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        # Вызывается только для атрибутов, которых у прокси еще нет
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        value = getattr(self._module, attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def optional_module(name: str) -> Optional[LazyModule]:
+    """Отложенный модуль или None, если пакет не установлен."""
+    if importlib.util.find_spec(name) is None:
+        return None
+    return LazyModule(name)
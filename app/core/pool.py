@@ -0,0 +1,263 @@
+# app/core/pool.py
+"""
+Наблюдение за пулом соединений БД.
+
+Под нагрузкой задержка часто складывается не из запросов, а из ожидания
+свободного соединения. PoolMonitor собирает по событиям пула:
+
+- гистограмму времени ожидания checkout (InstrumentedPool);
+- число выданных соединений и overflow (из самого пула);
+- соединения, которые держат дольше порога, с именем обработчика,
+  который их держит (current_handler выставляет get_db);
+- таймауты ожидания (pool_timeout).
+
+Данные отдаются эндпоинтами /internal/pool и /internal/metrics.
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, cast
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+logger = logging.getLogger(__name__)
+
+# Обработчик запроса, который сейчас работает с БД ("GET /api/v1/notes/")
+current_handler: ContextVar[Optional[str]] = ContextVar("current_handler", default=None)
+
+# Границы корзин гистограммы ожидания, секунды
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Кумулятивная гистограмма в формате Prometheus (le = верхняя граница)."""
+
+    def __init__(self, buckets: Sequence[float] = WAIT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # Последняя корзина - +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        """Накопленные счетчики по корзинам (последний = count)."""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.cumulative())),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+@dataclass
+class _Held:
+    """Выданное соединение."""
+
+    since: float
+    handler: Optional[str]
+
+
+class PoolMonitor:
+    """
+    Счетчики и состояние пула одного движка.
+
+    Счетчики: checkouts, connects (новые соединения), invalidations,
+    timeouts (ожидание дольше pool_timeout), long_held (возвращены после
+    порога long_held_seconds).
+    """
+
+    def __init__(self, *, long_held_seconds: float):
+        """
+        Args:
+            long_held_seconds: С какого времени удержания соединение
+                считается "долгим"
+        """
+        self.long_held_seconds = long_held_seconds
+        self.wait = Histogram()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.long_held = 0
+        # id(ConnectionRecord) -> кто и с какого момента держит соединение
+        self._held: Dict[int, _Held] = {}
+        self._pool: Optional[Pool] = None
+
+    def attach(self, engine: AsyncEngine) -> "PoolMonitor":
+        """Подписаться на события пула движка."""
+        pool = engine.sync_engine.pool
+        self._pool = pool
+        if isinstance(pool, InstrumentedPool):
+            pool.monitor = self
+
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+        return self
+
+    def held(self) -> List[Dict[str, Any]]:
+        """Соединения, которые держат дольше порога (самые долгие первыми)."""
+        now = time.perf_counter()
+        result = [
+            {"handler": held.handler, "held_seconds": round(now - held.since, 3)}
+            for held in self._held.values()
+            if now - held.since >= self.long_held_seconds
+        ]
+        return sorted(result, key=lambda item: -item["held_seconds"])
+
+    def stats(self) -> Dict[str, Any]:
+        """Текущее состояние пула и накопленные счетчики."""
+        pool = self._pool
+        size = getattr(pool, "size", None)
+        checkedout = getattr(pool, "checkedout", None)
+        overflow = getattr(pool, "overflow", None)
+        return {
+            "pool_class": type(pool).__name__ if pool is not None else None,
+            "size": size() if callable(size) else None,
+            "checked_out": checkedout() if callable(checkedout) else len(self._held),
+            "overflow": overflow() if callable(overflow) else None,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "long_held_total": self.long_held,
+            "long_held": self.held(),
+            "wait_seconds": self.wait.to_dict(),
+        }
+
+    def observe_wait(self, seconds: float, *, timed_out: bool = False) -> None:
+        """Учесть ожидание checkout (вызывается InstrumentedPool)."""
+        self.wait.observe(seconds)
+        if timed_out:
+            self.timeouts += 1
+            logger.warning(
+                "Таймаут ожидания соединения из пула (%.3f с), обработчик: %s",
+                seconds,
+                current_handler.get(),
+            )
+
+    def _on_connect(self, dbapi_connection: Any, record: Any) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection: Any, record: Any, proxy: Any) -> None:
+        self.checkouts += 1
+        self._held[id(record)] = _Held(time.perf_counter(), current_handler.get())
+
+    def _on_checkin(self, dbapi_connection: Any, record: Any) -> None:
+        held = self._held.pop(id(record), None)
+        if held is None:
+            return
+        seconds = time.perf_counter() - held.since
+        if seconds >= self.long_held_seconds:
+            self.long_held += 1
+            logger.warning(
+                "Соединение удерживалось %.3f с, обработчик: %s", seconds, held.handler
+            )
+
+    def _on_invalidate(self, dbapi_connection: Any, record: Any, exc: Any) -> None:
+        self.invalidations += 1
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Очередь соединений с замером ожидания checkout.
+
+    У пула нет события "начали ждать соединение", поэтому время меряется
+    вокруг connect(); туда входит и установка нового соединения.
+    """
+
+    monitor: Optional[PoolMonitor] = None
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.monitor is not None:
+                self.monitor.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.monitor is not None:
+            self.monitor.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> "InstrumentedPool":
+        # engine.dispose() заменяет пул новым: переносим на него монитор
+        pool = cast(InstrumentedPool, super().recreate())
+        pool.monitor = self.monitor
+        if self.monitor is not None:
+            self.monitor._pool = pool
+        return pool
+
+
+def prometheus_metrics(monitor: PoolMonitor, prefix: str = "db_pool") -> str:
+    """
+    Состояние пула в текстовом формате Prometheus.
+
+    Args:
+        monitor: PoolMonitor движка
+        prefix: Префикс имен метрик
+
+    Returns:
+        Текст для эндпоинта /metrics
+    """
+    stats = monitor.stats()
+    lines = []
+
+    def metric(name: str, kind: str, help: str, value: Any) -> None:
+        if value is None:
+            return
+        lines.append(f"# HELP {prefix}_{name} {help}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        lines.append(f"{prefix}_{name} {value}")
+
+    metric("size", "gauge", "Configured pool size", stats["size"])
+    metric("checked_out", "gauge", "Connections in use", stats["checked_out"])
+    metric("overflow", "gauge", "Overflow connections", stats["overflow"])
+    metric(
+        "long_held", "gauge", "Connections held over threshold", len(stats["long_held"])
+    )
+    metric("checkouts_total", "counter", "Checkouts", stats["checkouts"])
+    metric("connects_total", "counter", "New DBAPI connections", stats["connects"])
+    metric(
+        "invalidations_total",
+        "counter",
+        "Invalidated connections",
+        stats["invalidations"],
+    )
+    metric("timeouts_total", "counter", "Checkout timeouts", stats["timeouts"])
+    metric(
+        "long_held_total",
+        "counter",
+        "Connections returned after threshold",
+        stats["long_held_total"],
+    )
+
+    name = f"{prefix}_checkout_wait_seconds"
+    lines.append(f"# HELP {name} Time spent waiting for a pool connection")
+    lines.append(f"# TYPE {name} histogram")
+    for bound, count in stats["wait_seconds"]["buckets"].items():
+        lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+    lines.append(f"{name}_sum {stats['wait_seconds']['sum']}")
+    lines.append(f"{name}_count {stats['wait_seconds']['count']}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,394 @@
+# app/core/prefix_index.py
+"""
+Индекс префиксов для автодополнения (заголовки заметок, имена категорий).
+
+Поле поиска клиента шлет запрос на каждое нажатие клавиши, поэтому
+подсказки отдаются из памяти процесса: отсортированный массив различных
+нормализованных значений, поиск префикса - bisect, выдача - срез до
+первого несовпадения. Индекс строится лениво (при старте или первом
+запросе), дальше обновляется слушателем записей CRUD (см.
+CRUDBase.add_write_listener) и периодически перестраивается целиком,
+чтобы подхватить записи других процессов.
+
+Перестройка идет фоновой задачей в отдельной сессии: запросы не ждут ее
+и до замены отвечают из старых данных (или из БД, если данных еще нет).
+Новые данные подменяют старые одним присваиванием.
+
+Если у строк есть владелец (owner_field), ключи индекса начинаются с ID
+владельца, и подсказки каждого пользователя - отдельный участок того же
+отсортированного массива.
+
+Память ограничена max_entries: если строк больше, индекс выключается до
+следующей перестройки, и подсказки идут запросом в БД. После каждого
+переполнения подряд период перестройки удваивается (до 2**MAX_BACKOFF
+раз): большую таблицу незачем читать целиком каждые rebuild_seconds.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import null, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.replicas import primary_engine
+from app.models.base import BaseModel as AppBaseModel
+
+logger = logging.getLogger(__name__)
+
+# Предел удвоений периода перестройки после переполнений подряд
+MAX_BACKOFF = 5
+
+
+def normalize(value: str) -> str:
+    """Ключ индекса: без регистра и крайних пробелов."""
+    return value.strip().casefold()
+
+
+class _Snapshot:
+    """Данные индекса: различные значения и их ссылки на строки."""
+
+    def __init__(self) -> None:
+        # Отсортированные нормализованные значения (без повторов)
+        self.keys: List[str] = []
+        # Нормализованное значение -> [исходное написание, число строк]
+        self.entries: Dict[str, List[Any]] = {}
+        # ID строки -> нормализованное значение (нужно при update/delete)
+        self.by_id: Dict[str, str] = {}
+
+    def add(self, id: str, value: Optional[str], scope: str = "") -> None:
+        self.remove(id)
+        if not value:
+            return
+        key = scope + normalize(value)
+        self.by_id[id] = key
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [value, 1]
+            insort(self.keys, key)
+        else:
+            entry[1] += 1
+
+    def apply(self, changes: Sequence[Tuple[str, Optional[str], str]]) -> None:
+        """Применить изменения (id, значение, scope); None - строка удалена."""
+        for id, value, scope in changes:
+            if value is None:
+                self.remove(id)
+            else:
+                self.add(id, value, scope)
+
+    def remove(self, id: str) -> None:
+        key = self.by_id.pop(id, None)
+        if key is None:
+            return
+        entry = self.entries[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.entries[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+
+class PrefixIndex:
+    """
+    Индекс префиксов одной колонки модели.
+
+    Счетчики (stats): size (различных значений), rows, hits (ответ из
+    памяти), fallbacks (индекс не готов или переполнен), builds, overflows
+    (переполнений подряд).
+    """
+
+    def __init__(
+        self,
+        model: Type[AppBaseModel],
+        field: str,
+        *,
+        max_entries: int,
+        rebuild_seconds: float,
+        owner_field: Optional[str] = None,
+    ):
+        """
+        Args:
+            model: SQLAlchemy модель
+            field: Имя строковой колонки (title, name)
+            max_entries: Максимум строк в индексе
+            rebuild_seconds: Период полной перестройки
+            owner_field: Колонка владельца строк (подсказки по владельцу)
+        """
+        self.model = model
+        self.field = field
+        self.owner_field = owner_field
+        self.max_entries = max_entries
+        self.rebuild_seconds = rebuild_seconds
+
+        self._data: Optional[_Snapshot] = None
+        self._built_at: Optional[float] = None
+        self._overflow = False
+        # Записи, пришедшие во время перестройки (переигрываются на новых данных)
+        self._pending: Optional[List[Tuple[str, Optional[str], str]]] = None
+        # Фоновая перестройка (одна на индекс)
+        self._task: Optional["asyncio.Task[None]"] = None
+
+        self.hits = 0
+        self.fallbacks = 0
+        self.builds = 0
+        self.overflows = 0
+
+    @property
+    def column(self) -> Any:
+        return getattr(self.model, self.field)
+
+    def scope(self, owner: Optional[str]) -> str:
+        """Префикс ключей владельца (пустой для индекса без владельцев)."""
+        if self.owner_field is None:
+            return ""
+        return (owner or "") + "\x00"
+
+    @property
+    def ready(self) -> bool:
+        """Можно ли отвечать из памяти."""
+        return self._data is not None and not self._overflow
+
+    @property
+    def stale(self) -> bool:
+        """Пора ли перестраивать (с учетом отсрочки после переполнений)."""
+        if self._built_at is None:
+            return True
+        period = self.rebuild_seconds * (1 << min(self.overflows, MAX_BACKOFF))
+        return time.monotonic() - self._built_at >= period
+
+    async def ensure_built(self, db: AsyncSession, *, wait: bool = False) -> bool:
+        """
+        Запустить перестройку, если индекса еще нет или он устарел.
+
+        Перестройка идет в фоне в собственной сессии; пока она не
+        закончилась, индекс отвечает из прежних данных.
+
+        Args:
+            db: Сессия БД (ее движок используется для перестройки)
+            wait: Дождаться окончания перестройки (прогрев при старте, тесты)
+
+        Returns:
+            True если индекс готов отвечать
+        """
+        if self._task is None and self.stale:
+            self._task = asyncio.create_task(self._rebuild(primary_engine(db)))
+        if wait and self._task is not None:
+            await asyncio.shield(self._task)
+        return self.ready
+
+    async def _rebuild(self, bind: AsyncEngine) -> None:
+        """Фоновая перестройка; ошибка оставляет прежние данные."""
+        try:
+            async with AsyncSession(bind, expire_on_commit=False) as db:
+                await self.build(db)
+        except Exception:
+            # Следующая попытка - через период перестройки
+            logger.exception("Индекс префиксов %s не построен", self.field)
+            self._built_at = time.monotonic()
+        finally:
+            self._task = None
+
+    async def build(self, db: AsyncSession) -> None:
+        """Перестроить индекс целиком потоковым чтением (id, значение)."""
+        self._pending = []
+        data = _Snapshot()
+        overflow = False
+        try:
+            owner = (
+                getattr(self.model, self.owner_field)
+                if self.owner_field is not None
+                else null()
+            )
+            query = select(self.model.id, self.column, owner).execution_options(
+                yield_per=settings.EXPORT_CHUNK_SIZE
+            )
+            result = await db.stream(query)
+            async for rows in result.partitions():
+                for id, value, owner_id in rows:
+                    data.add(id, value, self.scope(owner_id))
+                if len(data.by_id) > self.max_entries:
+                    overflow = True
+                    break
+
+            if not overflow:
+                data.apply(self._pending)
+        finally:
+            self._pending = None
+
+        # Замена целиком: запросы видят либо старые данные, либо новые
+        self._data = None if overflow else data
+        self._overflow = overflow
+        self.overflows = self.overflows + 1 if overflow else 0
+        self._built_at = time.monotonic()
+        self.builds += 1
+
+    async def lookup(
+        self,
+        db: AsyncSession,
+        prefix: str,
+        limit: int = 10,
+        *,
+        owner: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Подсказки по префиксу: из памяти, а если индекс недоступен - из БД.
+
+        Args:
+            db: Сессия БД (для ленивой постройки и запасного пути)
+            prefix: Начало значения
+            limit: Максимум подсказок
+            owner: Владелец строк (для индекса с owner_field)
+
+        Returns:
+            Список значений
+        """
+        if await self.ensure_built(db):
+            return self.suggest(prefix, limit, owner=owner)
+        return await self.suggest_from_db(db, prefix, limit, owner=owner)
+
+    def suggest(
+        self, prefix: str, limit: int = 10, *, owner: Optional[str] = None
+    ) -> List[str]:
+        """
+        Значения, начинающиеся с prefix (без учета регистра), по алфавиту.
+
+        Args:
+            prefix: Начало значения
+            limit: Максимум подсказок
+            owner: Владелец строк (None - строки без владельца)
+
+        Returns:
+            Список значений в исходном написании
+        """
+        data = self._data
+        if data is None:
+            return []
+        key = self.scope(owner) + normalize(prefix)
+        self.hits += 1
+
+        result: List[str] = []
+        i = bisect_left(data.keys, key)
+        while i < len(data.keys) and len(result) < limit:
+            candidate = data.keys[i]
+            if not candidate.startswith(key):
+                break
+            result.append(data.entries[candidate][0])
+            i += 1
+        return result
+
+    async def suggest_from_db(
+        self,
+        db: AsyncSession,
+        prefix: str,
+        limit: int = 10,
+        *,
+        owner: Optional[str] = None,
+    ) -> List[str]:
+        """Запасной путь: подсказки запросом в БД (индекс не готов)."""
+        self.fallbacks += 1
+        escaped = prefix.strip().replace("\\", "\\\\").replace("%", "\\%")
+        escaped = escaped.replace("_", "\\_")
+        query = (
+            select(self.column)
+            .where(self.column.ilike(f"{escaped}%", escape="\\"))
+            .where(*self._owner_filter(owner))
+            .distinct()
+            .order_by(self.column)
+            .limit(limit)
+        )
+        result = await db.scalars(query)
+        return list(result.all())
+
+    def on_write(
+        self, written: Sequence[AppBaseModel], removed: Sequence[AppBaseModel]
+    ) -> None:
+        """Слушатель записей CRUD: применить изменения к индексу."""
+        changes = [
+            (obj.id, getattr(obj, self.field), self.scope(self._owner_of(obj)))
+            for obj in written
+        ]
+        changes += [(obj.id, None, "") for obj in removed]
+
+        if self._pending is not None:
+            self._pending.extend(changes)
+
+        data = self._data
+        if data is None:
+            return
+        data.apply(changes)
+
+        if len(data.by_id) > self.max_entries:
+            # Дальше - запросы в БД до следующей перестройки
+            self._data = None
+            self._overflow = True
+            self.overflows += 1
+
+    def _owner_of(self, obj: AppBaseModel) -> Optional[str]:
+        if self.owner_field is None:
+            return None
+        owner: Optional[str] = getattr(obj, self.owner_field)
+        return owner
+
+    def _owner_filter(self, owner: Optional[str]) -> List[Any]:
+        if self.owner_field is None:
+            return []
+        column = getattr(self.model, self.owner_field)
+        return [column.is_(None) if owner is None else column == owner]
+
+    def stats(self) -> Dict[str, Any]:
+        data = self._data
+        return {
+            "ready": self.ready,
+            "size": len(data.keys) if data is not None else 0,
+            "rows": len(data.by_id) if data is not None else 0,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "builds": self.builds,
+            "overflows": self.overflows,
+            "rebuilding": self._task is not None,
+        }
+
+
+# Все созданные индексы по имени (для прогрева при старте и метрик)
+prefix_indexes: Dict[str, PrefixIndex] = {}
+
+
+def build_prefix_index(
+    name: str,
+    model: Type[AppBaseModel],
+    field: str,
+    *,
+    owner_field: Optional[str] = None,
+) -> PrefixIndex:
+    """
+    Создать индекс префиксов колонки и зарегистрировать его.
+
+    Args:
+        name: Имя индекса (обычно имя таблицы)
+        model: SQLAlchemy модель
+        field: Имя строковой колонки
+        owner_field: Колонка владельца строк (подсказки по владельцу)
+
+    Returns:
+        PrefixIndex
+    """
+    index = PrefixIndex(
+        model,
+        field,
+        max_entries=settings.SUGGEST_MAX_ENTRIES,
+        rebuild_seconds=settings.SUGGEST_REBUILD_SECONDS,
+        owner_field=owner_field,
+    )
+    prefix_indexes[name] = index
+    return index
+
+
+async def warm_up(session_factory: Any) -> None:
+    """Построить все индексы (вызывается в фоне при старте приложения)."""
+    for index in prefix_indexes.values():
+        async with session_factory() as db:
+            await index.ensure_built(db, wait=True)
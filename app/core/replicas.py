@@ -0,0 +1,222 @@
+# app/core/replicas.py
+"""
+Маршрутизация чтения на реплики БД.
+
+- ReplicaSet: движки реплик, выбор по кругу среди здоровых, проверки
+  здоровья (SELECT 1 и отставание репликации на Postgres) и пассивная
+  пометка реплики больной при ошибке соединения.
+- RoutingSession: SELECT сессии идут на выбранную для нее реплику, все
+  остальное (flush, INSERT/UPDATE/DELETE, text()) - на основную БД. После
+  первой записи сессия до конца читает с основной БД, чтобы видеть свои
+  изменения в той же транзакции.
+- Read-your-writes: после успешного изменяющего запроса клиент получает
+  cookie (и заголовок) со сроком, до которого его чтения идут на основную
+  БД - реплика может еще не догнать его запись.
+
+Без DB_REPLICA_URLS все работает как раньше: одна основная БД.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+# Имя cookie и заголовка с моментом (unix time), до которого чтения
+# клиента идут на основную БД
+PRIMARY_UNTIL_COOKIE = "primary_until"
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+
+# Отставание реплики Postgres в секундах (NULL на основной БД или без WAL)
+PG_REPLICATION_LAG_SQL = text(
+    "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReplicaSet:
+    """
+    Набор реплик с выбором по кругу.
+
+    Счетчики (stats): picks по каждой реплике, failures (пометки больной).
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], *, max_lag: float):
+        """
+        Args:
+            engines: Движки реплик
+            max_lag: Допустимое отставание репликации, с (Postgres)
+        """
+        self.engines = list(engines)
+        self.max_lag = max_lag
+        self._healthy: Dict[AsyncEngine, bool] = {e: True for e in self.engines}
+        self._cycle = itertools.cycle(self.engines)
+        self.picks: Dict[AsyncEngine, int] = {e: 0 for e in self.engines}
+        self.failures = 0
+
+        for engine in self.engines:
+            event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """
+        Следующая здоровая реплика или None (читать с основной БД).
+        """
+        for _ in range(len(self.engines)):
+            engine = next(self._cycle)
+            if self._healthy[engine]:
+                self.picks[engine] += 1
+                return engine
+        return None
+
+    def mark(self, engine: AsyncEngine, healthy: bool) -> None:
+        """Изменить состояние реплики."""
+        if self._healthy.get(engine) and not healthy:
+            self.failures += 1
+            logger.warning("Реплика %s исключена из чтения", engine.url)
+        elif healthy and self._healthy.get(engine) is False:
+            logger.info("Реплика %s снова принимает чтение", engine.url)
+        self._healthy[engine] = healthy
+
+    async def check(self) -> None:
+        """Проверить все реплики (SELECT 1 / отставание репликации)."""
+        for engine in self.engines:
+            self.mark(engine, await self._probe(engine))
+
+    async def run_health_checks(self, interval: float) -> None:
+        """Проверять реплики каждые interval секунд (фоновая задача)."""
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self._healthy[engine],
+                "picks": self.picks[engine],
+            }
+            for engine in self.engines
+        ]
+
+    async def _probe(self, engine: AsyncEngine) -> bool:
+        try:
+            async with engine.connect() as conn:
+                if engine.dialect.name == "postgresql":
+                    lag = (await conn.execute(PG_REPLICATION_LAG_SQL)).scalar()
+                    return lag is None or lag <= self.max_lag
+                await conn.execute(text("SELECT 1"))
+                return True
+        except Exception:
+            return False
+
+    def _on_error(self, context: Any) -> None:
+        """Ошибка соединения с репликой - не выбирать ее до проверки."""
+        if context.is_disconnect:
+            for engine in self.engines:
+                if engine.sync_engine is context.engine:
+                    self.mark(engine, False)
+
+
+class RoutingSession(Session):
+    """
+    Сессия, которая читает с реплики и пишет в основную БД.
+
+    Реплика задается на время сессии через info["replica"] (AsyncEngine
+    или None); get_db выбирает ее только для безопасных запросов.
+    """
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        *,
+        clause: Any = None,
+        **kw: Any,
+    ) -> Any:
+        replica: Optional[AsyncEngine] = self.info.get("replica")
+        if replica is None or self.info.get("wrote"):
+            return super().get_bind(mapper, clause=clause, **kw)
+
+        if (
+            not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return replica.sync_engine
+
+        if self._flushing or clause is not None:
+            # Запись (или неизвестный запрос): дальше только основная БД
+            self.info["wrote"] = True
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def reads_from_replica(db: Any) -> bool:
+    """
+    Пойдут ли SELECT сессии на реплику (см. RoutingSession).
+
+    Прочитанное с реплики может отставать от основной БД, поэтому такими
+    строками не заполняют кеши процесса: иначе кеш вернул бы строку, уже
+    замененную записью этого же процесса.
+    """
+    return db.info.get("replica") is not None and not db.info.get("wrote")
+
+
+def primary_engine(db: Any) -> AsyncEngine:
+    """
+    Движок основной БД сессии - для собственных сессий фоновых задач
+    (выгрузка, импорт, перестройка индексов).
+
+    Raises:
+        TypeError: Сессия привязана не к AsyncEngine
+    """
+    if not isinstance(db.bind, AsyncEngine):
+        raise TypeError(f"Сессия привязана к {db.bind!r}, нужен AsyncEngine")
+    return db.bind
+
+
+def primary_pinned(request: Request, *, now: Optional[float] = None) -> bool:
+    """
+    Нужно ли читать с основной БД: клиент недавно что-то изменил.
+
+    Срок берется из cookie или заголовка X-Primary-Until (для клиентов без
+    cookie - они возвращают значение из ответа на запись).
+    """
+    value = request.headers.get(PRIMARY_UNTIL_HEADER) or request.cookies.get(
+        PRIMARY_UNTIL_COOKIE
+    )
+    if not value:
+        return False
+    try:
+        until = float(value)
+    except ValueError:
+        return False
+    return until > (time.time() if now is None else now)
+
+
+def pin_to_primary(response: Response, window: float) -> None:
+    """Направлять чтения клиента на основную БД в течение window секунд."""
+    until = f"{time.time() + window:.3f}"
+    response.headers[PRIMARY_UNTIL_HEADER] = until
+    response.set_cookie(
+        PRIMARY_UNTIL_COOKIE,
+        until,
+        max_age=max(1, int(window + 0.999)),
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def use_replica(request: Request) -> bool:
+    """Можно ли отправить чтения этого запроса на реплику."""
+    return request.method in SAFE_METHODS and not primary_pinned(request)
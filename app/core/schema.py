@@ -0,0 +1,150 @@
+"""
+Отпечаток схемы БД для быстрого старта.
+
+create_all на каждом старте воркера - запросы к каталогу СУБД по каждой
+таблице и индексу, хотя схема меняется только при деплое. Вместо этого
+после create_all в schema_version записывается отпечаток схемы моделей,
+а воркер с DB_STARTUP_MODE=fingerprint сверяет его одним SELECT и DDL
+не выполняет.
+
+Отпечаток - SHA-256 от DDL моделей, скомпилированного для диалекта БД
+(CREATE TABLE и CREATE INDEX по всем таблицам, плюс DDL поиска из
+app/models/search.py). Любое изменение колонок, типов, ограничений или
+индексов меняет отпечаток; порядок колонок и ограничений - нет.
+
+create_all не меняет уже существующие таблицы, поэтому перед записью
+отпечатка колонки каждой таблицы БД сверяются с моделями: если таблица
+осталась от старых моделей (колонки, добавленные в модели позже,
+накатываются отдельно, см. scripts/), отпечаток не записывается.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import MetaData, delete, insert, inspect, select
+from sqlalchemy.engine import Connection, Dialect
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.models.schema_version import SchemaVersion
+from app.models.search import POSTGRES_DDL, SQLITE_DDL
+
+
+class SchemaMismatchError(RuntimeError):
+    """Схема БД не создана или создана по другим моделям."""
+
+
+def schema_fingerprint(metadata: MetaData, dialect: Dialect) -> str:
+    """
+    Отпечаток схемы моделей для диалекта.
+
+    Args:
+        metadata: Метаданные моделей (Base.metadata)
+        dialect: Диалект БД (DDL отличается между СУБД)
+
+    Returns:
+        SHA-256, hex
+    """
+    digest = hashlib.sha256(dialect.name.encode())
+    for table in metadata.sorted_tables:
+        statements = [str(CreateTable(table).compile(dialect=dialect))]
+        statements += [
+            str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes
+        ]
+        # Порядок ограничений в CREATE TABLE зависит от порядка создания
+        # объектов в процессе, поэтому строки DDL сортируются
+        lines = sorted(
+            line.strip().rstrip(",")
+            for statement in statements
+            for line in statement.splitlines()
+        )
+        digest.update("\n".join(lines).encode())
+    extra = POSTGRES_DDL if dialect.name == "postgresql" else SQLITE_DDL
+    for statement in extra:
+        digest.update(b"\x00" + statement.strip().encode())
+    return digest.hexdigest()
+
+
+def column_differences(conn: Connection, metadata: MetaData) -> List[str]:
+    """
+    Расхождения колонок таблиц БД с моделями (по именам колонок).
+
+    Args:
+        conn: Синхронное соединение (через AsyncConnection.run_sync)
+        metadata: Метаданные моделей
+
+    Returns:
+        Описания расхождений; пустой список - колонки совпадают
+    """
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    differences = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            differences.append(f"{table.name}: нет таблицы")
+            continue
+        actual = {column["name"] for column in inspector.get_columns(table.name)}
+        expected = {column.name for column in table.columns}
+        for name in sorted(expected - actual):
+            differences.append(f"{table.name}.{name}: нет колонки")
+        for name in sorted(actual - expected):
+            differences.append(f"{table.name}.{name}: нет в моделях")
+    return differences
+
+
+async def store_fingerprint(conn: AsyncConnection, metadata: MetaData) -> str:
+    """
+    Записать отпечаток схемы (после create_all, в той же транзакции).
+
+    create_all не меняет существующие таблицы, поэтому отпечаток
+    записывается только если колонки всех таблиц совпадают с моделями.
+
+    Returns:
+        Записанный отпечаток
+
+    Raises:
+        SchemaMismatchError: Колонки таблиц БД расходятся с моделями
+    """
+    differences = await conn.run_sync(column_differences, metadata)
+    if differences:
+        raise SchemaMismatchError(
+            "Таблицы БД созданы по другим моделям, отпечаток не записан "
+            f"(обновите схему): {'; '.join(differences)}"
+        )
+    fingerprint = schema_fingerprint(metadata, conn.dialect)
+    await conn.execute(delete(SchemaVersion))
+    await conn.execute(
+        insert(SchemaVersion).values(
+            fingerprint=fingerprint, applied_at=datetime.now(timezone.utc)
+        )
+    )
+    return fingerprint
+
+
+async def check_fingerprint(conn: AsyncConnection, metadata: MetaData) -> str:
+    """
+    Сверить отпечаток схемы БД с моделями (один SELECT, без DDL).
+
+    Returns:
+        Отпечаток
+
+    Raises:
+        SchemaMismatchError: Отпечатка нет или он другой
+    """
+    expected = schema_fingerprint(metadata, conn.dialect)
+    try:
+        stored = (await conn.execute(select(SchemaVersion.fingerprint))).scalar()
+    except (OperationalError, ProgrammingError) as e:
+        # Нет таблицы schema_version: схема не создавалась
+        raise SchemaMismatchError(
+            "Схема БД не инициализирована: запустите с "
+            "DB_STARTUP_MODE=create_all или scripts/create_tables.py"
+        ) from e
+    if stored != expected:
+        raise SchemaMismatchError(
+            f"Схема БД ({stored or 'нет отпечатка'}) не совпадает с моделями "
+            f"({expected}): обновите схему и запустите с DB_STARTUP_MODE=create_all"
+        )
+    return expected
@@ -2,8 +2,24 @@
 Инициализация CRUD модуля.
 """
 
-from app.crud.crud_note import note
-from app.crud.crud_category import category
+from app.crud.crud_note import note, note_suggest
+from app.crud.crud_category import category, category_catalog, category_suggest
 from app.crud.crud_user import user
+from app.crud.crud_transaction import transaction, transaction_analytics
+from app.crud.crud_budget import budget
+from app.crud.crud_recurring_rule import recurring_rule
+from app.crud.crud_category_rule import category_rule
 
-__all__ = ["note", "category", "user"]
+__all__ = [
+    "note",
+    "category",
+    "user",
+    "transaction",
+    "budget",
+    "recurring_rule",
+    "category_rule",
+    "note_suggest",
+    "category_suggest",
+    "category_catalog",
+    "transaction_analytics",
+]
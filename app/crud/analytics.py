@@ -0,0 +1,360 @@
+"""
+Колоночная аналитика операций пользователя на NumPy.
+
+Операции пользователя один раз читаются из БД (потоком, по индексу
+(user_id, occurred_at)) в колонки NumPy, отсортированные по времени, и
+держатся в LRU кеше по пользователю. Суммы берутся в базовой валюте
+(base_amount, посчитана при записи операции), как и в monthly_rollups,
+поэтому отчеты сходятся с итогами и после загрузки новых курсов. Запись
+операций через CRUD сбрасывает кеш ее владельца (слушатель записей);
+записи других процессов подхватываются по истечении ttl.
+
+Отчеты считаются векторными ядрами по колонкам, без объектов на строку:
+
+- срез периода - два searchsorted по отсортированному времени;
+- суммы по группам - np.add.reduceat по границам групп (по месяцам
+  колонка уже упорядочена, по категориям - после argsort), количество -
+  np.bincount; суммы целые (копейки), без округлений float;
+- скользящее среднее - через cumsum, год к году - разность со сдвигом 12.
+
+NumPy - необязательная зависимость (extra "analytics"): без него модуль
+импортируется, но AVAILABLE = False и отчеты недоступны. Импортируется
+он при первом отчете, а не при старте приложения.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import KeyedLocks, LRUTTLCache, caches
+from app.core.config import settings
+from app.core.lazy import optional_module
+from app.core.replicas import reads_from_replica
+from app.models.transaction import Transaction
+
+# Импортируется при первом отчете (см. app/core/lazy.py)
+np: Any = optional_module("numpy")
+
+AVAILABLE = np is not None
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    Операции пользователя в колонках, по возрастанию occurred_at.
+
+    Срезы (between) - представления тех же массивов, без копирования.
+    """
+
+    # datetime64[us], UTC
+    occurred: Any
+    # int64, копейки базовой валюты (> 0 доход, < 0 расход)
+    amount: Any
+    # int32, код категории: индекс в categories
+    category: Any
+    # Код -> category_id (код 0 - без категории)
+    categories: Tuple[Optional[str], ...]
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def between(self, start: Optional[date], end: Optional[date]) -> "Frame":
+        """Операции с start по end включительно (дни, UTC)."""
+        lo, hi = 0, len(self)
+        if start is not None:
+            lo = int(np.searchsorted(self.occurred, np.datetime64(start, "us")))
+        if end is not None:
+            stop = np.datetime64(end + timedelta(days=1), "us")
+            hi = int(np.searchsorted(self.occurred, stop))
+        return Frame(
+            self.occurred[lo:hi],
+            self.amount[lo:hi],
+            self.category[lo:hi],
+            self.categories,
+        )
+
+
+# =========== ЯДРА ===========
+
+
+def group_sums(codes: Any, values: Any, size: int) -> Any:
+    """
+    Целочисленные суммы values по кодам групп 0..size-1.
+
+    Сортировка по коду (argsort) + np.add.reduceat по границам групп:
+    точные int64 суммы, в отличие от bincount с весами (float64).
+    """
+    result = np.zeros(size, dtype=np.int64)
+    if len(codes) == 0:
+        return result
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    result[sorted_codes[starts]] = np.add.reduceat(values[order], starts)
+    return result
+
+
+def split_amounts(amount: Any) -> Tuple[Any, Any]:
+    """Доходы и расходы (положительные числа) как две колонки."""
+    income = np.where(amount > 0, amount, 0)
+    expense = np.where(amount < 0, -amount, 0)
+    return income, expense
+
+
+def category_totals(frame: Frame) -> List[Dict[str, Any]]:
+    """Доходы, расходы и число операций по категориям (только непустые)."""
+    size = len(frame.categories)
+    income, expense = split_amounts(frame.amount)
+    counts = np.bincount(frame.category, minlength=size)
+    income_sums = group_sums(frame.category, income, size)
+    expense_sums = group_sums(frame.category, expense, size)
+    return [
+        {
+            "category_id": frame.categories[code],
+            "income": int(income_sums[code]),
+            "expense": int(expense_sums[code]),
+            "count": int(counts[code]),
+        }
+        for code in np.flatnonzero(counts)
+    ]
+
+
+def monthly_totals(
+    frame: Frame, first: date, last: date
+) -> Tuple[List[date], Any, Any]:
+    """
+    Плотные помесячные ряды доходов и расходов (пустые месяцы - нули).
+
+    Колонка времени отсортирована, поэтому номера месяцев не убывают и
+    группы идут подряд: reduceat по границам без сортировки.
+
+    Args:
+        frame: Операции (срез по периоду)
+        first: Первый месяц ряда (любой день)
+        last: Последний месяц ряда (любой день)
+
+    Returns:
+        (месяцы, доходы по месяцам, расходы по месяцам)
+    """
+    first_month = np.datetime64(first, "M")
+    size = int(np.datetime64(last, "M") - first_month) + 1
+    months = [
+        (first_month + i).astype("datetime64[D]").item() for i in range(max(size, 0))
+    ]
+    income = np.zeros(max(size, 0), dtype=np.int64)
+    expense = np.zeros(max(size, 0), dtype=np.int64)
+    if len(frame) == 0 or size <= 0:
+        return months, income, expense
+
+    index = (frame.occurred.astype("datetime64[M]") - first_month).astype(np.int64)
+    inside = (index >= 0) & (index < size)
+    index = index[inside]
+    if len(index) == 0:
+        return months, income, expense
+
+    starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+    month_income, month_expense = split_amounts(frame.amount[inside])
+    income[index[starts]] = np.add.reduceat(month_income, starts)
+    expense[index[starts]] = np.add.reduceat(month_expense, starts)
+    return months, income, expense
+
+
+def moving_average(values: Any, window: int) -> Any:
+    """Скользящее среднее по window точкам; первые window-1 - NaN."""
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) < window:
+        return result
+    sums = np.cumsum(np.r_[0, values], dtype=np.float64)
+    result[window - 1 :] = (sums[window:] - sums[:-window]) / window
+    return result
+
+
+def year_over_year(values: Any) -> Any:
+    """Разница с тем же месяцем год назад; первые 12 месяцев - NaN."""
+    result = np.full(len(values), np.nan)
+    if len(values) > 12:
+        result[12:] = values[12:] - values[:-12]
+    return result
+
+
+def expense_percentiles(frame: Frame, q: Sequence[float]) -> Dict[str, float]:
+    """Перцентили сумм расходов (копейки); пусто, если расходов нет."""
+    expenses = -frame.amount[frame.amount < 0]
+    if len(expenses) == 0 or not q:
+        return {}
+    values = np.percentile(expenses, q)
+    return {f"{p:g}": float(value) for p, value in zip(q, values)}
+
+
+def period_report(
+    frame: Frame,
+    *,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    window: int = 3,
+    percentiles: Sequence[float] = (50, 90, 99),
+) -> Dict[str, Any]:
+    """
+    Аналитика периода для /reports/analytics.
+
+    Скользящее среднее и год к году в первых месяцах периода считаются по
+    месяцам до start, поэтому ряды строятся с запасом и обрезаются.
+
+    Args:
+        frame: Все операции пользователя
+        start: Первый день периода (None - с первой операции)
+        end: Последний день периода (None - по последнюю операцию)
+        window: Окно скользящего среднего, месяцев
+        percentiles: Какие перцентили расходов считать
+
+    Returns:
+        Поля AnalyticsReport
+    """
+    period = frame.between(start, end)
+    first = start or (period.occurred[0].item().date() if len(period) else None)
+    last = end or (period.occurred[-1].item().date() if len(period) else None)
+    if first is None or last is None:
+        return {
+            "months": [],
+            "income": [],
+            "expense": [],
+            "expense_moving_avg": [],
+            "expense_yoy": [],
+            "by_category": [],
+            "expense_percentiles": {},
+        }
+
+    lead = max(12, window - 1)
+    history_start = (np.datetime64(first, "M") - lead).astype("datetime64[D]").item()
+    months, income, expense = monthly_totals(
+        frame.between(history_start, last), history_start, last
+    )
+    average = moving_average(expense, window)[lead:]
+    yoy = year_over_year(expense)[lead:]
+
+    return {
+        "months": months[lead:],
+        "income": income[lead:].tolist(),
+        "expense": expense[lead:].tolist(),
+        "expense_moving_avg": [None if np.isnan(v) else float(v) for v in average],
+        "expense_yoy": [None if np.isnan(v) else int(v) for v in yoy],
+        "by_category": category_totals(period),
+        "expense_percentiles": expense_percentiles(period, percentiles),
+    }
+
+
+# =========== КЕШ КОЛОНОК ===========
+
+
+class AnalyticsCache:
+    """
+    Колонки операций по пользователям (LRU с TTL).
+
+    Счетчики (stats): loads и счетчики кеша.
+    """
+
+    def __init__(self, *, max_users: int, ttl: float):
+        """
+        Args:
+            max_users: Сколько пользователей держать в памяти
+            ttl: Время жизни колонок, с (записи других процессов)
+        """
+        self.cache = LRUTTLCache(maxsize=max_users, ttl=ttl)
+        self.loads = 0
+        self._locks = KeyedLocks()
+
+    async def get(self, db: AsyncSession, user_id: Optional[str]) -> Frame:
+        """
+        Колонки операций пользователя (из кеша или из БД).
+
+        Args:
+            db: Сессия БД
+            user_id: Владелец (None - операции без владельца)
+
+        Returns:
+            Frame
+        """
+        key = user_id or ""
+        frame: Optional[Frame] = self.cache.get(key)
+        if frame is not None:
+            return frame
+
+        # Конкурентные запросы одного пользователя грузят колонки один раз
+        async with self._locks.hold(key):
+            frame = self.cache.get(key)
+            if frame is None:
+                generation = self.cache.generation
+                frame = await self._load(db, user_id)
+                self.cache.set(key, frame, generation=generation)
+        return frame
+
+    def on_write(self, written: Sequence[Any], removed: Sequence[Any]) -> None:
+        """Слушатель записей CRUD: сбросить колонки владельцев."""
+        for user_id in {obj.user_id for obj in (*written, *removed)}:
+            self.cache.delete(user_id or "")
+
+    def stats(self) -> Dict[str, int]:
+        return {"loads": self.loads, **self.cache.stats()}
+
+    async def _load(self, db: AsyncSession, user_id: Optional[str]) -> Frame:
+        """Прочитать операции пользователя потоком и собрать колонки."""
+        if reads_from_replica(db):
+            # Колонки живут ttl и отдаются и после записи: основная БД
+            async with AsyncSession(db.bind, expire_on_commit=False) as primary:
+                return await self._load(primary, user_id)
+
+        owner = (
+            Transaction.user_id.is_(None)
+            if user_id is None
+            else Transaction.user_id == user_id
+        )
+        query = (
+            select(
+                Transaction.occurred_at,
+                Transaction.base_amount,
+                Transaction.category_id,
+            )
+            .where(owner)
+            .order_by(Transaction.occurred_at)
+            .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+        )
+
+        micros: List[int] = []
+        amounts: List[int] = []
+        codes: List[int] = []
+        category_codes: Dict[Optional[str], int] = {None: 0}
+        one = timedelta(microseconds=1)
+
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            for occurred_at, amount, category_id in rows:
+                if occurred_at.tzinfo is None:
+                    occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+                micros.append((occurred_at - EPOCH) // one)
+                amounts.append(amount)
+                code = category_codes.setdefault(category_id, len(category_codes))
+                codes.append(code)
+
+        self.loads += 1
+        return Frame(
+            occurred=np.array(micros, dtype=np.int64).view("datetime64[us]"),
+            amount=np.array(amounts, dtype=np.int64),
+            category=np.array(codes, dtype=np.int32),
+            categories=tuple(category_codes),
+        )
+
+
+def build_analytics_cache() -> Optional[AnalyticsCache]:
+    """Кеш колонок, если NumPy установлен (иначе None)."""
+    if not AVAILABLE:
+        return None
+    analytics = AnalyticsCache(
+        max_users=settings.ANALYTICS_MAX_USERS, ttl=settings.ANALYTICS_TTL_SECONDS
+    )
+    caches["analytics"] = analytics.cache
+    return analytics
@@ -2,20 +2,88 @@
 Базовый класс для CRUD операций.
 """
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
-from fastapi.encoders import jsonable_encoder
+import copy
+import time
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    TypeVar,
+    Union,
+    overload,
+)
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    tuple_,
+    update,
+)
 
 # Импортируем Base из ваших моделей
+from app.core.cache import EntityCache
+from app.core.config import settings
+from app.core.replicas import reads_from_replica
 from app.models.base import BaseModel as AppBaseModel
+from app.crud.pagination import decode_cursor, encode_cursor
+
+if TYPE_CHECKING:
+    from app.crud.group_commit import GroupCommitter
+    from app.crud.loader import ModelLoader
 
 # Типы для дженериков
 # Используем AppBaseModel вместо Base, так как он имеет поле id
 ModelType = TypeVar("ModelType", bound=AppBaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+CRUDType = TypeVar("CRUDType", bound="CRUDBase[Any, Any, Any]")
+
+
+class JsonEntry(NamedTuple):
+    """Сериализованный объект в кеше сущностей."""
+
+    body: bytes
+    updated_at: datetime
+    # Владелец объекта (см. CRUDBase.for_owner): проверяется при попадании
+    owner: Optional[str] = None
+
+
+# Слушатель записей: (записанные объекты, удаленные объекты) после COMMIT
+WriteListener = Callable[[Sequence[Any], Sequence[Any]], None]
+
+# Режим подсчета общего количества строк для списков
+CountMode = Literal["exact", "estimated", "none"]
+
+# Оценка числа строк по статистике планировщика Postgres. Для
+# партиционированной таблицы складываем оценки партиций; -1 значит
+# "таблицу еще ни разу не анализировали"
+PG_ESTIMATE_SQL = text("""
+    SELECT COALESCE(SUM(c.reltuples) FILTER (WHERE c.reltuples >= 0), -1)
+    FROM pg_class c
+    WHERE c.oid = CAST(:table AS regclass)
+       OR c.oid IN (
+           SELECT inhrelid FROM pg_inherits
+           WHERE inhparent = CAST(:table AS regclass)
+       )
+    """)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
@@ -28,14 +96,97 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     - UpdateSchemaType: Pydantic схема для обновления
     """
 
-    def __init__(self, model: Type[ModelType]):
+    # Размер пачки для массовых операций: держит число bind-параметров
+    # в одном запросе далеко от лимитов asyncpg (32767) и SQLite (32766)
+    bulk_chunk_size: int = 500
+
+    # Колонка владельца строк (user_id) или None, если у таблицы его нет
+    # (см. for_owner)
+    owner_field: Optional[str] = None
+
+    # Есть ли у таблицы производные таблицы, которые пересчитываются в той
+    # же транзакции (см. _sync_derived), и вычисляемые при записи колонки
+    # (см. _derive_values); несовместимо с group commit
+    has_derived: bool = False
+
+    def __init__(
+        self,
+        model: Type[ModelType],
+        *,
+        schema: Optional[Type[BaseModel]] = None,
+        cache: Optional[EntityCache] = None,
+        group_commit: Optional["GroupCommitter[ModelType]"] = None,
+    ):
         """
         Инициализация CRUD с указанием модели.
 
         Args:
             model: SQLAlchemy модель
+            schema: Pydantic схема ответа (для get_json)
+            cache: Кеш сериализованных объектов (None - без кеша)
+            group_commit: Накопитель для create (None - обычная вставка)
         """
+        if group_commit is not None and self.has_derived:
+            raise ValueError("group commit не совместим с производными таблицами")
+
         self.model = model
+        self.schema = schema
+        self.cache = cache
+        self.group_commit = group_commit
+        # Кеш точного количества для оценочного режима без Postgres:
+        # движок -> (момент истечения, количество)
+        self._count_cache: Dict[Any, Tuple[float, int]] = {}
+        # Производные структуры в памяти (индексы, каталоги), которые
+        # обновляются после каждой записи через CRUD
+        self.write_listeners: List[WriteListener] = []
+        # Фильтр по владельцу (выставляется в копии через for_owner)
+        self.scoped = False
+        self.owner_id: Optional[str] = None
+
+    def add_write_listener(self, listener: WriteListener) -> None:
+        """
+        Подписаться на записи через этот CRUD.
+
+        Слушатель вызывается после COMMIT с уже записанными объектами
+        (create/update) и удаленными объектами (remove).
+
+        Args:
+            listener: Функция (written, removed) -> None
+        """
+        self.write_listeners.append(listener)
+
+    def for_owner(self: CRUDType, owner_id: Optional[str]) -> CRUDType:
+        """
+        Копия CRUD, ограниченная строками одного владельца.
+
+        Все чтения, обновления и удаления копии фильтруются по owner_field,
+        новые строки получают этого владельца. Кеш, слушатели записей и
+        group commit общие с исходным CRUD.
+
+        Args:
+            owner_id: ID владельца (None - строки без владельца)
+
+        Returns:
+            CRUD того же класса с фильтром по владельцу
+
+        Raises:
+            TypeError: Если у модели нет колонки владельца
+        """
+        if self.owner_field is None:
+            raise TypeError(f"У {self.model.__name__} нет колонки владельца")
+        scoped = copy.copy(self)
+        scoped.scoped = True
+        scoped.owner_id = owner_id
+        return scoped
+
+    def owner_filter(self) -> List[ColumnElement[bool]]:
+        """Условия WHERE для строк владельца (пусто без for_owner)."""
+        if not self.scoped or self.owner_field is None:
+            return []
+        column = getattr(self.model, self.owner_field)
+        if self.owner_id is None:
+            return [column.is_(None)]
+        return [column == self.owner_id]
 
     async def get(self, db: AsyncSession, id: str) -> Optional[ModelType]:
         """
@@ -48,7 +199,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             Объект модели или None если не найден
         """
-        query = select(self.model).where(self.model.id == id)
+        query = select(self.model).where(self.model.id == id, *self.owner_filter())
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
@@ -56,7 +207,10 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
         """
-        Получить несколько объектов с пагинацией.
+        Получить несколько объектов с пагинацией (OFFSET/LIMIT).
+
+        Оставлен для совместимости: OFFSET заставляет БД прочитать и
+        отбросить skip строк, для глубоких страниц используйте get_page.
 
         Args:
             db: Сессия БД
@@ -64,12 +218,132 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             limit: Максимальное количество
 
         Returns:
-            Список объектов
+            Список объектов, упорядоченный по (created_at, id)
         """
-        query = select(self.model).offset(skip).limit(limit)
+        query = (
+            select(self.model)
+            .where(*self.owner_filter())
+            .order_by(*self._page_order())
+            .offset(skip)
+            .limit(limit)
+        )
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    async def count(
+        self, db: AsyncSession, *, mode: CountMode = "exact"
+    ) -> Optional[int]:
+        """
+        Общее количество объектов.
+
+        Режимы:
+        - exact: SELECT COUNT(*) (полный проход по индексу/таблице)
+        - estimated: на Postgres - оценка планировщика из pg_class.reltuples
+          (один lookup в каталоге); на остальных СУБД - точное значение,
+          закешированное на COUNT_CACHE_TTL_SECONDS
+        - none: ничего не считать
+
+        Args:
+            db: Сессия БД
+            mode: Режим подсчета
+
+        Returns:
+            Количество или None для mode="none"
+        """
+        if mode == "none":
+            return None
+        if mode == "estimated":
+            return await self._count_estimated(db)
+        return await self._count_exact(db)
+
+    async def _count_exact(self, db: AsyncSession) -> int:
+        query = select(func.count()).select_from(self.model)
+        result = await db.execute(query.where(*self.owner_filter()))
+        return result.scalar_one()
+
+    async def _count_estimated(self, db: AsyncSession) -> int:
+        if self.scoped:
+            # Статистика планировщика - по всей таблице, а не по владельцу;
+            # точный COUNT идет по индексу (владелец, created_at, id)
+            return await self._count_exact(db)
+
+        bind = db.get_bind()
+        if bind.dialect.name == "postgresql":
+            result = await db.execute(
+                PG_ESTIMATE_SQL, {"table": self.model.__tablename__}
+            )
+            estimate = result.scalar_one()
+            if estimate >= 0:
+                return int(estimate)
+            # Статистики еще нет (таблица новая и маленькая) - считаем точно
+            return await self._count_exact(db)
+
+        now = time.monotonic()
+        cached = self._count_cache.get(bind)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        count = await self._count_exact(db)
+        self._count_cache[bind] = (now + settings.COUNT_CACHE_TTL_SECONDS, count)
+        return count
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        after: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Получить страницу объектов и курсор следующей страницы.
+
+        С курсором after выборка идет по индексу (created_at, id) с условием
+        "строго после", поэтому стоимость не зависит от глубины страницы.
+        Без курсора работает как get_multi (skip учитывается только в этом
+        случае).
+
+        Args:
+            db: Сессия БД
+            after: Курсор из предыдущего ответа (next_cursor)
+            skip: Сколько пропустить (только без курсора)
+            limit: Максимальное количество
+
+        Returns:
+            Кортеж (список объектов, курсор следующей страницы или None)
+
+        Raises:
+            InvalidCursorError: Если курсор поврежден
+        """
+        query = (
+            select(self.model).where(*self.owner_filter()).order_by(*self._page_order())
+        )
+
+        if after is not None:
+            created_at, last_id = decode_cursor(after)
+            query = query.where(
+                tuple_(self.model.created_at, self.model.id)
+                > tuple_(created_at, last_id)
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        # Берем на одну строку больше, чтобы понять, есть ли следующая страница
+        result = await db.execute(query.limit(limit + 1))
+        items = list(result.scalars().all())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+        return items, next_cursor
+
+    def _page_order(self) -> tuple:
+        """Порядок сортировки для пагинации: (created_at, id)."""
+        return (self.model.created_at, self.model.id)
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """
         Создать новый объект.
@@ -82,15 +356,29 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             Созданный объект
         """
         # Конвертируем Pydantic объект в dict
-        obj_in_data = jsonable_encoder(obj_in)
+        obj_in_data = self._create_data(obj_in)
+
+        if self.group_commit is not None:
+            # Конкурентные create объединяются в один INSERT и один COMMIT
+            db_obj = await self.group_commit.submit(db, obj_in_data)
+            self._notify(written=[db_obj])
+            return db_obj
+
+        if self.has_derived:
+            await self._derive_values(db, [(obj_in_data, None)])
 
         # Создаем объект модели
         db_obj = self.model(**obj_in_data)
 
-        # Сохраняем в БД
+        # Сохраняем в БД (created_at/updated_at приходят через RETURNING,
+        # см. eager_defaults в BaseModel)
         db.add(db_obj)
+        if self.has_derived:
+            await db.flush()
+            await self._sync_derived(db, old=(), new=[db_obj])
         await db.commit()
-        await db.refresh(db_obj)
+        await self._refresh_if_expired(db, db_obj)
+        self._notify(written=[db_obj])
 
         return db_obj
 
@@ -112,27 +400,81 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             Обновленный объект
         """
-        # Получаем данные для обновления
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.model_dump(exclude_unset=True)
+        update_data = self._update_data(obj_in)
+        old = []
+        if self.has_derived:
+            old = await self._rows_before(db, self.model.id == db_obj.id)
+            await self._derive_values(db, [(update_data, row._mapping) for row in old])
 
         # Обновляем поля объекта
         for field, value in update_data.items():
-            if hasattr(db_obj, field) and value is not None:
-                setattr(db_obj, field, value)
+            setattr(db_obj, field, value)
 
         # Сохраняем изменения
         db.add(db_obj)
+        if self.has_derived:
+            await db.flush()
+            await self._sync_derived(db, old=old, new=[db_obj])
         await db.commit()
-        await db.refresh(db_obj)
+        self._invalidate([db_obj.id])
+        await self._refresh_if_expired(db, db_obj)
+        self._notify(written=[db_obj])
 
         return db_obj
 
+    async def update_by_id(
+        self,
+        db: AsyncSession,
+        *,
+        id: str,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+    ) -> Optional[ModelType]:
+        """
+        Обновить объект по ID одним UPDATE ... RETURNING.
+
+        В отличие от update не требует предварительного get: отсутствие
+        строки в RETURNING означает, что объекта нет. updated_at (onupdate)
+        возвращается тем же запросом, refresh не нужен.
+
+        Args:
+            db: Сессия БД
+            id: ID объекта
+            obj_in: Данные для обновления (схема или dict)
+
+        Returns:
+            Обновленный объект или None если не найден
+        """
+        update_data = self._update_data(obj_in)
+        if not update_data:
+            # Менять нечего - просто отдаем текущее состояние
+            return await self.get(db, id)
+
+        old = []
+        if self.has_derived:
+            old = await self._rows_before(db, self.model.id == id)
+            await self._derive_values(db, [(update_data, row._mapping) for row in old])
+
+        stmt = (
+            update(self.model)
+            .where(self.model.id == id, *self.owner_filter())
+            .values(**update_data)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await db.scalars(stmt)
+        obj = result.one_or_none()
+
+        if self.has_derived and obj is not None:
+            await self._sync_derived(db, old=old, new=[obj])
+        await db.commit()
+        self._invalidate([id])
+        if obj is not None:
+            self._notify(written=[obj])
+        return obj
+
     async def remove(self, db: AsyncSession, *, id: str) -> Optional[ModelType]:
         """
-        Удалить объект по ID.
+        Удалить объект по ID одним DELETE ... RETURNING.
 
         Args:
             db: Сессия БД
@@ -141,12 +483,469 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Returns:
             Удаленный объект или None если не найден
         """
-        # Получаем объект
-        obj = await self.get(db, id)
+        removed = await self._delete_returning(db, self.model.id == id)
+        if self.has_derived:
+            await self._sync_derived(db, old=removed, new=())
+        await db.commit()
+        self._invalidate([id])
+        self._notify(removed=removed)
 
-        if obj:
-            # Удаляем
-            await db.delete(obj)
-            await db.commit()
+        return removed[0] if removed else None
 
-        return obj
+    # =========== МАССОВЫЕ ОПЕРАЦИИ ===========
+
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: Sequence[CreateSchemaType]
+    ) -> List[ModelType]:
+        """
+        Создать много объектов многострочным INSERT ... RETURNING.
+
+        Вставка идет пачками по bulk_chunk_size строк в одной транзакции,
+        коммит один на весь вызов.
+
+        Args:
+            db: Сессия БД
+            objs_in: Данные для создания (Pydantic схемы)
+
+        Returns:
+            Созданные объекты в порядке objs_in
+        """
+        if not objs_in:
+            return []
+
+        rows = [self._create_data(obj_in) for obj_in in objs_in]
+        if self.has_derived:
+            await self._derive_values(db, [(row, None) for row in rows])
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+
+        created: List[ModelType] = []
+        for chunk in self._chunks(rows):
+            result = await db.scalars(stmt, chunk)
+            created.extend(result.all())
+
+        if self.has_derived:
+            await self._sync_derived(db, old=(), new=created)
+        await db.commit()
+        self._notify(written=created)
+        return created
+
+    async def update_many(
+        self, db: AsyncSession, *, objs_in: Sequence[Dict[str, Any]]
+    ) -> List[ModelType]:
+        """
+        Обновить много объектов по первичному ключу.
+
+        Каждый элемент - dict с ключом "id" и полями для обновления
+        (None-значения пропускаются, как в update). Строки обновляются
+        пачками (UPDATE ... WHERE id = ? через executemany), затем
+        результат читается одним SELECT ... WHERE id IN на пачку.
+
+        Args:
+            db: Сессия БД
+            objs_in: Список dict с id и новыми значениями
+
+        Returns:
+            Обновленные объекты (несуществующие id пропускаются)
+        """
+        if not objs_in:
+            return []
+
+        ids = [obj_in["id"] for obj_in in objs_in]
+        existing = await self._existing_ids(db, ids)
+        old = []
+        if self.has_derived:
+            for chunk in self._chunks(list(existing)):
+                old.extend(await self._rows_before(db, self.model.id.in_(chunk)))
+
+        rows = []
+        for obj_in in objs_in:
+            row = {
+                k: v
+                for k, v in obj_in.items()
+                if v is not None and not (self.scoped and k == self.owner_field)
+            }
+            if row["id"] in existing and len(row) > 1:
+                rows.append(row)
+
+        if self.has_derived:
+            # Повторный id меняет строку, уже измененную предыдущим элементом
+            current = {row.id: dict(row._mapping) for row in old}
+            changes = []
+            for row in rows:
+                changes.append((row, dict(current[row["id"]])))
+                current[row["id"]].update(row)
+            await self._derive_values(db, changes)
+
+        # Группируем строки по набору полей: executemany работает пачкой
+        # только для одинаковых UPDATE ... SET
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        for rows in groups.values():
+            for chunk in self._chunks(rows):
+                await db.execute(update(self.model), chunk)
+        if self.has_derived:
+            new = await self.get_many(db, ids=list(existing))
+            await self._sync_derived(db, old=old, new=new)
+        await db.commit()
+        self._invalidate(existing)
+
+        # get_many читает с populate_existing, так что в ответе новые значения
+        updated = await self.get_many(db, ids=[id for id in ids if id in existing])
+        self._notify(written=updated)
+        return updated
+
+    async def remove_many(
+        self, db: AsyncSession, *, ids: Sequence[str]
+    ) -> List[ModelType]:
+        """
+        Удалить объекты по списку ID (DELETE ... WHERE id IN ... RETURNING).
+
+        Args:
+            db: Сессия БД
+            ids: ID объектов для удаления
+
+        Returns:
+            Удаленные объекты (несуществующие id пропускаются)
+        """
+        removed: List[ModelType] = []
+        for chunk in self._chunks(list(ids)):
+            removed.extend(await self._delete_returning(db, self.model.id.in_(chunk)))
+
+        if self.has_derived:
+            await self._sync_derived(db, old=removed, new=())
+        await db.commit()
+        self._invalidate(obj.id for obj in removed)
+        self._notify(removed=removed)
+        return removed
+
+    async def remove_by_filter(
+        self, db: AsyncSession, *where: ColumnElement[bool]
+    ) -> List[ModelType]:
+        """
+        Удалить все объекты, подходящие под условие.
+
+        Пример:
+            await crud.note.remove_by_filter(db, Note.title == "tmp")
+
+        Args:
+            db: Сессия БД
+            where: SQLAlchemy условия (объединяются через AND)
+
+        Returns:
+            Удаленные объекты
+        """
+        if not where:
+            raise ValueError("remove_by_filter требует хотя бы одно условие")
+
+        removed = await self._delete_returning(db, *where)
+        if self.has_derived:
+            await self._sync_derived(db, old=removed, new=())
+        await db.commit()
+        self._invalidate(obj.id for obj in removed)
+        self._notify(removed=removed)
+        return removed
+
+    async def get_many(
+        self, db: AsyncSession, *, ids: Sequence[str]
+    ) -> List[ModelType]:
+        """
+        Получить объекты по списку ID (SELECT ... WHERE id IN, пачками).
+
+        Args:
+            db: Сессия БД
+            ids: ID объектов
+
+        Returns:
+            Найденные объекты в порядке ids (без дублей и ненайденных)
+        """
+        found: Dict[str, ModelType] = {}
+        for chunk in self._chunks(list(dict.fromkeys(ids))):
+            query = (
+                select(self.model)
+                .where(self.model.id.in_(chunk), *self.owner_filter())
+                .execution_options(populate_existing=True)
+            )
+            result = await db.execute(query)
+            found.update((obj.id, obj) for obj in result.scalars())
+
+        return [found[id] for id in dict.fromkeys(ids) if id in found]
+
+    # =========== КЕШ СЕРИАЛИЗОВАННЫХ ОБЪЕКТОВ ===========
+
+    async def get_json(self, db: AsyncSession, id: str) -> Optional[bytes]:
+        """
+        Получить объект по ID сразу в виде JSON ответа (read-through кеш).
+
+        При попадании в кеш запрос в БД не выполняется, и сессия не берет
+        соединение из пула. Кеш сбрасывается записью через update/remove
+        и массовые методы (create не трогает кеш: новых id в нем нет).
+        Прочитанное с реплики в кеш не попадает (реплика может отставать).
+
+        Args:
+            db: Сессия БД
+            id: ID объекта
+
+        Returns:
+            JSON байты (по схеме self.schema) или None если не найден
+        """
+        entry = await self.get_json_entry(db, id)
+        return entry.body if entry is not None else None
+
+    async def get_json_entry(
+        self,
+        db: AsyncSession,
+        id: str,
+        *,
+        loader: Optional["ModelLoader[ModelType]"] = None,
+    ) -> Optional[JsonEntry]:
+        """
+        То же, что get_json, но вместе с updated_at объекта.
+
+        updated_at хранится в кеше рядом с байтами, поэтому валидаторы
+        условного запроса (ETag/Last-Modified) тоже не требуют БД.
+
+        Args:
+            db: Сессия БД
+            id: ID объекта
+            loader: Загрузчик запроса (промахи конкурентных вызовов
+                объединяются в один SELECT ... WHERE id IN)
+
+        Returns:
+            JsonEntry или None если не найден
+        """
+        generation = None
+        if self.cache is not None:
+            entry = self.cache.get(id)
+            if entry is not None:
+                # Объект другого владельца для этой копии CRUD не существует
+                return entry if self._visible(entry) else None
+            generation = self.cache.generation
+        # Прочитанное с реплики в кеш не попадает
+        fill = None if reads_from_replica(db) else self.cache
+
+        obj = await (loader.load(id) if loader is not None else self.get(db, id))
+        if obj is None:
+            return None
+
+        entry = self._json_entry(obj)
+        if fill is not None:
+            fill.set(id, entry, generation=generation)
+        return entry
+
+    async def get_many_json(
+        self,
+        db: AsyncSession,
+        *,
+        ids: Sequence[str],
+        loader: Optional["ModelLoader[ModelType]"] = None,
+    ) -> bytes:
+        """
+        Получить объекты по списку ID в виде JSON массива.
+
+        Из БД читаются только промахи кеша (одним get_many или через
+        загрузчик запроса).
+
+        Args:
+            db: Сессия БД
+            ids: ID объектов
+            loader: Загрузчик запроса (промахи - одной пачкой load_many,
+                заодно видны другим load того же запроса)
+
+        Returns:
+            JSON массив в порядке ids (без дублей и ненайденных)
+        """
+        ids = list(dict.fromkeys(ids))
+        found: Dict[str, bytes] = {}
+        missing = ids
+
+        if self.cache is not None:
+            generation = self.cache.generation
+            cached = {}
+            for id in ids:
+                entry = self.cache.get(id)
+                if entry is not None:
+                    cached[id] = entry
+            found = {id: e.body for id, e in cached.items() if self._visible(e)}
+            missing = [id for id in ids if id not in cached]
+        fill = None if reads_from_replica(db) else self.cache
+
+        if missing:
+            if loader is not None:
+                objs = [obj for obj in await loader.load_many(missing) if obj]
+            else:
+                objs = await self.get_many(db, ids=missing)
+            for obj in objs:
+                entry = self._json_entry(obj)
+                found[obj.id] = entry.body
+                if fill is not None:
+                    fill.set(obj.id, entry, generation=generation)
+
+        return b"[" + b",".join(found[id] for id in ids if id in found) + b"]"
+
+    def serialize(self, obj: ModelType) -> bytes:
+        """Сериализовать объект модели в JSON по схеме ответа."""
+        if self.schema is None:
+            raise RuntimeError(f"Для {self.model.__name__} не задана схема ответа")
+        return self.schema.model_validate(obj).model_dump_json().encode()
+
+    def _json_entry(self, obj: ModelType) -> JsonEntry:
+        """Запись кеша: JSON ответа, updated_at и владелец объекта."""
+        owner = getattr(obj, self.owner_field) if self.owner_field else None
+        return JsonEntry(self.serialize(obj), _as_utc(obj.updated_at), owner)
+
+    def _visible(self, entry: JsonEntry) -> bool:
+        """Виден ли закешированный объект этой копии CRUD (см. for_owner)."""
+        return not self.scoped or entry.owner == self.owner_id
+
+    def _create_data(self, obj_in: CreateSchemaType) -> Dict[str, Any]:
+        """Строка для INSERT: поля схемы (python-типы, не JSON) и владелец."""
+        data = obj_in.model_dump() if isinstance(obj_in, BaseModel) else dict(obj_in)
+        return {**data, **self._owner_values()}
+
+    def _owner_values(self) -> Dict[str, Any]:
+        """Колонка владельца для новых строк (у всех строк одинаковый набор)."""
+        if self.owner_field is None:
+            return {}
+        return {self.owner_field: self.owner_id}
+
+    def _invalidate(self, ids: Iterable[str]) -> None:
+        """Сбросить закешированные объекты после записи."""
+        if self.cache is not None:
+            for id in ids:
+                self.cache.delete(id)
+
+    def _notify(
+        self,
+        *,
+        written: Sequence[Any] = (),
+        removed: Sequence[Any] = (),
+    ) -> None:
+        """Сообщить слушателям о записи (см. add_write_listener)."""
+        if written or removed:
+            for listener in self.write_listeners:
+                listener(written, removed)
+
+    def _update_data(
+        self, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Поля для обновления: только колонки модели и не None."""
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+
+        # Владельца через обновление не меняем, если CRUD ограничен им
+        return {
+            field: value
+            for field, value in update_data.items()
+            if hasattr(self.model, field)
+            and value is not None
+            and not (self.scoped and field == self.owner_field)
+        }
+
+    async def _refresh_if_expired(self, db: AsyncSession, db_obj: ModelType) -> None:
+        """
+        Перечитать объект, только если commit его "протушил".
+
+        С expire_on_commit=False (как в AsyncSessionLocal) все значения,
+        включая серверные, уже получены через RETURNING.
+        """
+        if db.sync_session.expire_on_commit:
+            await db.refresh(db_obj)
+
+    async def _sync_derived(
+        self, db: AsyncSession, *, old: Sequence[Any], new: Sequence[Any]
+    ) -> None:
+        """
+        Пересчитать производные таблицы до COMMIT (при has_derived).
+
+        Вызывается каждым методом записи в его транзакции: old - строки до
+        записи (удаленные и прежние значения обновленных), new - созданные
+        и обновленные. Изменение = вычесть old и прибавить new.
+
+        Args:
+            db: Сессия БД (транзакция записи)
+            old: Строки до записи
+            new: Строки после записи
+        """
+
+    async def _derive_values(
+        self,
+        db: AsyncSession,
+        changes: Sequence[Tuple[Dict[str, Any], Optional[Mapping[str, Any]]]],
+    ) -> None:
+        """
+        Дополнить значения записи вычисляемыми колонками (при has_derived).
+
+        Вызывается перед INSERT/UPDATE каждым методом записи. Значения
+        дополняются на месте.
+
+        Args:
+            db: Сессия БД (транзакция записи)
+            changes: Пары (значения INSERT или SET UPDATE, строка до
+                записи; None для INSERT)
+        """
+
+    async def _rows_before(
+        self, db: AsyncSession, *where: ColumnElement[bool]
+    ) -> List[Any]:
+        """
+        Текущие значения строк до UPDATE (Core строки, не объекты сессии).
+
+        Строки блокируются (FOR UPDATE на Postgres) до конца транзакции,
+        чтобы конкурентное обновление не посчиталось дважды.
+        """
+        query = (
+            select(self.model.__table__)
+            .where(*where, *self.owner_filter())
+            .with_for_update()
+        )
+        result = await db.execute(query)
+        return list(result.all())
+
+    async def _existing_ids(self, db: AsyncSession, ids: Sequence[str]) -> Set[str]:
+        """Какие из ids есть в таблице (читаем только колонку id)."""
+        existing: Set[str] = set()
+        for chunk in self._chunks(list(set(ids))):
+            result = await db.scalars(
+                select(self.model.id).where(
+                    self.model.id.in_(chunk), *self.owner_filter()
+                )
+            )
+            existing.update(result.all())
+        return existing
+
+    async def _delete_returning(
+        self, db: AsyncSession, *where: ColumnElement[bool]
+    ) -> List[ModelType]:
+        """DELETE ... RETURNING без синхронизации сессии."""
+        stmt = (
+            delete(self.model)
+            .where(*where, *self.owner_filter())
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.scalars(stmt)
+        return list(result.all())
+
+    def _chunks(self, items: List[Any]) -> List[List[Any]]:
+        """Разбить список на пачки по bulk_chunk_size."""
+        size = self.bulk_chunk_size
+        return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+@overload
+def _as_utc(value: datetime) -> datetime: ...
+
+
+@overload
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]: ...
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite отдает naive datetime (UTC), Postgres - aware."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
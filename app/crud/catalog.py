@@ -0,0 +1,165 @@
+"""
+Каталог маленькой справочной таблицы в памяти процесса (категории).
+
+Категории читаются намного чаще, чем пишутся, и их мало, поэтому вся
+таблица держится неизменяемым снимком: объекты по id и по имени и уже
+закодированный JSON полного списка. Снимок несет номер версии (растет при
+каждой записи через CRUD) и сильный ETag - хеш содержимого, одинаковый во
+всех процессах для одинаковых данных.
+
+Запись через CRUD сбрасывает снимок, следующий читатель загружает новый.
+Записи других процессов подхватываются по истечении ttl. Снимок всегда
+читается с основной БД: отстающая реплика вернула бы таблицу до записи,
+и старый снимок жил бы весь ttl.
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Sequence, Type
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.replicas import reads_from_replica
+from app.crud.base import CRUDBase
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Неизменяемый снимок таблицы."""
+
+    version: int
+    # Схемы ответа (pydantic), а не ORM объекты: не привязаны к сессии
+    by_id: Mapping[str, Any]
+    by_key: Mapping[str, Any]
+    # JSON полного списка в порядке (created_at, id), как у GET списка
+    list_json: bytes
+    # Сильный ETag (в кавычках, готов для заголовка)
+    etag: str
+    # max(updated_at) по таблице (Last-Modified), None для пустой таблицы
+    last_modified: Optional[datetime]
+    loaded_at: float
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+
+class Catalog:
+    """
+    Каталог одной таблицы поверх ее CRUD.
+
+    Счетчики (stats): version, loads, hits (ответ из готового снимка).
+    """
+
+    def __init__(self, crud: CRUDBase, *, key: str, ttl: float):
+        """
+        Args:
+            crud: CRUD таблицы (нужны model и schema)
+            key: Уникальная колонка для поиска по значению (name)
+            ttl: Сколько секунд снимок считается свежим
+
+        Raises:
+            RuntimeError: Если у CRUD не задана схема ответа
+        """
+        if crud.schema is None:
+            raise RuntimeError(f"Для {crud.model.__name__} не задана схема ответа")
+        self.crud = crud
+        self.schema: Type[BaseModel] = crud.schema
+        self.key = key
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+
+        self.loads = 0
+        self.hits = 0
+
+    async def get(self, db: AsyncSession) -> CatalogSnapshot:
+        """
+        Текущий снимок; загружается из БД, только если его нет или он устарел.
+
+        Args:
+            db: Сессия БД (соединение берется только при загрузке)
+
+        Returns:
+            CatalogSnapshot
+        """
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        async with self._lock:
+            # Пока ждали блокировку, снимок мог загрузить другой запрос
+            snapshot = self._fresh()
+            if snapshot is None:
+                snapshot = await self._load(db)
+            return snapshot
+
+    def on_write(self, written: Sequence[Any], removed: Sequence[Any]) -> None:
+        """Слушатель записей CRUD: новая версия, снимок сбрасывается."""
+        self.version += 1
+        self._snapshot = None
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "size": len(snapshot) if snapshot is not None else 0,
+            "loads": self.loads,
+            "hits": self.hits,
+        }
+
+    def _fresh(self) -> Optional[CatalogSnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at >= self.ttl:
+            return None
+        return snapshot
+
+    async def _load(self, db: AsyncSession) -> CatalogSnapshot:
+        """Прочитать таблицу целиком и собрать снимок."""
+        if reads_from_replica(db):
+            # Отдельная сессия без маршрутизации: основная БД
+            async with AsyncSession(db.bind, expire_on_commit=False) as primary:
+                return await self._load(primary)
+
+        version = self.version
+        model = self.crud.model
+        # populate_existing: значения из БД, а не из identity map сессии,
+        # чтобы JSON (и ETag) был одинаковым во всех процессах
+        query = (
+            select(model)
+            .order_by(model.created_at, model.id)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.scalars(query)
+        items: List[Any] = [self.schema.model_validate(obj) for obj in result]
+
+        list_json = b"[" + b",".join(item.model_dump_json().encode() for item in items)
+        list_json += b"]"
+        last_modified = max((_as_utc(item.updated_at) for item in items), default=None)
+        snapshot = CatalogSnapshot(
+            version=version,
+            by_id=MappingProxyType({item.id: item for item in items}),
+            by_key=MappingProxyType({getattr(item, self.key): item for item in items}),
+            list_json=list_json,
+            etag='"' + hashlib.blake2b(list_json, digest_size=16).hexdigest() + '"',
+            last_modified=last_modified,
+            loaded_at=time.monotonic(),
+        )
+        self.loads += 1
+
+        # Запись во время загрузки: снимок мог ее не увидеть, не сохраняем
+        if self.version == version:
+            self._snapshot = snapshot
+        return snapshot
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite отдает naive datetime (UTC), Postgres - aware."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,238 @@
+"""
+Автоматическая категоризация операций по правилам пользователя.
+
+Правила пользователя компилируются один раз в Matcher:
+
+- ключевые слова - в автомат Ахо-Корасик: текст проходится один раз,
+  сколько бы слов ни было;
+- регулярные выражения - в одно выражение-альтернацию (группа на
+  правило), поиск по тексту тоже один.
+
+При нескольких совпадениях побеждает правило с меньшим priority (при
+равном - созданное раньше): правила нумеруются в этом порядке, и у
+каждого состояния автомата хранится лучший номер среди слов, которые в
+нем заканчиваются.
+
+Скомпилированные правила держатся в кеше по пользователям и
+сбрасываются записью правил через CRUD (и удалением категорий).
+"""
+
+import logging
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import KeyedLocks, LRUTTLCache, caches
+from app.core.config import settings
+from app.models.category_rule import CategoryRule
+from app.schemas.category_rule import validate_rule_pattern
+
+logger = logging.getLogger(__name__)
+
+# (rule_id, category_id) сработавшего правила
+Match = Tuple[str, str]
+
+# Номер "нет совпадения": больше любого номера правила
+NO_MATCH = 1 << 62
+
+
+class KeywordAutomaton:
+    """Автомат Ахо-Корасик: лучший (минимальный) номер слова в тексте."""
+
+    def __init__(self, keywords: Sequence[Tuple[str, int]]):
+        """
+        Args:
+            keywords: (слово, номер правила); слова сравниваются casefold
+        """
+        self.goto: List[Dict[str, int]] = [{}]
+        self.best: List[int] = [NO_MATCH]
+        for word, rank in keywords:
+            state = 0
+            for char in word.casefold():
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.best.append(NO_MATCH)
+                state = next_state
+            self.best[state] = min(self.best[state], rank)
+
+        # Ссылки неудач обходом в ширину; best состояния включает слова,
+        # которые заканчиваются в нем как суффиксы (через fail)
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.best[next_state] = min(
+                    self.best[next_state], self.best[self.fail[next_state]]
+                )
+                queue.append(next_state)
+
+    def search(self, text: str) -> int:
+        """Лучший номер слова, встретившегося в тексте (NO_MATCH - никакого)."""
+        goto, fail, best = self.goto, self.fail, self.best
+        found = NO_MATCH
+        state = 0
+        for char in text.casefold():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best[state] < found:
+                found = best[state]
+        return found
+
+
+class Matcher:
+    """Скомпилированные правила одного пользователя."""
+
+    def __init__(self, rules: Sequence[Any]):
+        """
+        Args:
+            rules: Правила (id, category_id, kind, pattern) в порядке
+                применения (priority, created_at)
+        """
+        self.matches: List[Match] = [(rule.id, rule.category_id) for rule in rules]
+        self.keywords = KeywordAutomaton(
+            [(r.pattern, rank) for rank, r in enumerate(rules) if r.kind == "keyword"]
+        )
+
+        # Номер внешней группы каждого правила -> номер правила
+        self.groups: Dict[int, int] = {}
+        parts = []
+        group = 1
+        for rank, rule in enumerate(rules):
+            if rule.kind != "regex":
+                continue
+            try:
+                validate_rule_pattern(rule.kind, rule.pattern)
+            except ValueError as e:
+                # Правило, сохраненное до проверки шаблонов, не должно
+                # ломать запись операций пользователя: оно пропускается
+                logger.warning("Правило %s пропущено: %s", rule.id, e)
+                continue
+            part = f"({rule.pattern})"
+            self.groups[group] = rank
+            parts.append(part)
+            group += re.compile(part).groups
+        self.regex = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def classify(self, text: Optional[str]) -> Optional[Match]:
+        """
+        Правило, которое подходит к тексту.
+
+        Returns:
+            (rule_id, category_id) или None, если ни одно не подошло
+        """
+        if not text or not self.matches:
+            return None
+        found = self.keywords.search(text)
+        if self.regex is not None:
+            # Внешняя группа правила закрывается последней: lastindex -
+            # ее номер, даже если внутри есть свои группы
+            for match in self.regex.finditer(text):
+                rank = self.groups[cast(int, match.lastindex)]
+                if rank < found:
+                    found = rank
+        return self.matches[found] if found != NO_MATCH else None
+
+
+# =========== КЕШ ПРАВИЛ ===========
+
+
+class MatcherCache:
+    """
+    Скомпилированные правила по пользователям (LRU с TTL).
+
+    Счетчики (stats): builds и счетчики кеша.
+    """
+
+    def __init__(self, *, max_users: int, ttl: float):
+        """
+        Args:
+            max_users: Сколько пользователей держать в памяти
+            ttl: Время жизни правил, с (записи других процессов)
+        """
+        self.cache = LRUTTLCache(maxsize=max_users, ttl=ttl)
+        self.builds = 0
+        self._locks = KeyedLocks()
+
+    async def get(self, db: AsyncSession, user_id: Optional[str]) -> Matcher:
+        """
+        Правила пользователя (из кеша или из БД).
+
+        Args:
+            db: Сессия БД
+            user_id: Владелец (None - правила без владельца)
+
+        Returns:
+            Matcher
+        """
+        key = user_id or ""
+        matcher: Optional[Matcher] = self.cache.get(key)
+        if matcher is not None:
+            return matcher
+
+        # Конкурентные запросы одного пользователя компилируют правила один раз
+        async with self._locks.hold(key):
+            matcher = self.cache.get(key)
+            if matcher is None:
+                generation = self.cache.generation
+                matcher = await self._build(db, user_id)
+                self.cache.set(key, matcher, generation=generation)
+        return matcher
+
+    def on_write(self, written: Sequence[Any], removed: Sequence[Any]) -> None:
+        """Слушатель записей правил: сбросить правила владельцев."""
+        for user_id in {obj.user_id for obj in (*written, *removed)}:
+            self.cache.delete(user_id or "")
+
+    def on_category_write(self, written: Sequence[Any], removed: Sequence[Any]) -> None:
+        """Слушатель записей категорий: правила удаленной категории удалены
+        каскадом у всех пользователей (категории общие) - сбросить все."""
+        if removed:
+            self.cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"builds": self.builds, **self.cache.stats()}
+
+    async def _build(self, db: AsyncSession, user_id: Optional[str]) -> Matcher:
+        owner = (
+            CategoryRule.user_id.is_(None)
+            if user_id is None
+            else CategoryRule.user_id == user_id
+        )
+        result = await db.execute(
+            select(
+                CategoryRule.id,
+                CategoryRule.category_id,
+                CategoryRule.kind,
+                CategoryRule.pattern,
+            )
+            .where(owner)
+            .order_by(CategoryRule.priority, CategoryRule.created_at, CategoryRule.id)
+        )
+        self.builds += 1
+        return Matcher(result.all())
+
+
+def build_matcher_cache() -> MatcherCache:
+    """Кеш скомпилированных правил категоризации."""
+    matchers = MatcherCache(
+        max_users=settings.CATEGORY_RULES_MAX_USERS,
+        ttl=settings.CATEGORY_RULES_TTL_SECONDS,
+    )
+    caches["category_rules"] = matchers.cache
+    return matchers
@@ -0,0 +1,76 @@
+"""
+CRUD операции для бюджетов.
+"""
+
+from datetime import date
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.budget import Budget
+from app.models.rollup import MonthlyRollup
+from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetSchema
+
+
+class CRUDBudget(CRUDBase[Budget, BudgetCreate, BudgetUpdate]):
+    """
+    CRUD бюджетов с исполнением за месяц.
+
+    Потраченное по бюджету - это расходы из monthly_rollups за
+    (пользователь, месяц, категория): их поддерживает каждая запись
+    операций (O(1) UPSERT в той же транзакции), поэтому статус не
+    суммирует операции, а изменение лимита не требует пересчета.
+    """
+
+    owner_field = "user_id"
+
+    async def status(
+        self, db: AsyncSession, *, month: date
+    ) -> List[Tuple[Budget, int]]:
+        """
+        Бюджеты пользователя и потраченное по ним за месяц.
+
+        Два запроса независимо от числа операций: бюджеты пользователя и
+        итоги его месяца (диапазон первичного ключа monthly_rollups).
+
+        Args:
+            db: Сессия БД
+            month: Месяц (любой день)
+
+        Returns:
+            Список (бюджет, потрачено в копейках) в порядке создания
+        """
+        result = await db.execute(
+            select(Budget)
+            .where(*self.owner_filter())
+            .order_by(Budget.created_at, Budget.id)
+        )
+        budgets = list(result.scalars().all())
+        if not budgets:
+            return []
+
+        rollups = await db.execute(
+            select(MonthlyRollup.category_key, MonthlyRollup.expense).where(
+                MonthlyRollup.user_key == (self.owner_id or ""),
+                MonthlyRollup.month == month.replace(day=1),
+            )
+        )
+        spent: Dict[str, int] = dict(rollups.tuples().all())
+        total = sum(spent.values())
+        return [
+            (
+                budget,
+                (
+                    total
+                    if budget.category_id is None
+                    else spent.get(budget.category_id, 0)
+                ),
+            )
+            for budget in budgets
+        ]
+
+
+# Создаем экземпляр для использования
+budget = CRUDBudget(Budget, schema=BudgetSchema)
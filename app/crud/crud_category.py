@@ -2,14 +2,22 @@
 CRUD операции для категорий.
 """
 
-from typing import Optional
+from typing import Dict, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.cache import build_entity_cache
+from app.core.config import settings
+from app.core.prefix_index import build_prefix_index
 from app.crud.base import CRUDBase
+from app.crud.catalog import Catalog
 from app.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.schemas.category import (
+    CategoryCreate,
+    CategoryUpdate,
+    Category as CategorySchema,
+)
 
 
 class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
@@ -29,6 +37,37 @@ class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
         result = await db.execute(select(Category).where(Category.name == name))
         return result.scalar_one_or_none()
 
+    async def get_by_names(
+        self, db: AsyncSession, *, names: Sequence[str]
+    ) -> Dict[str, Category]:
+        """
+        Получить категории по списку имен одним запросом на пачку.
+
+        Args:
+            db: Асинхронная сессия БД
+            names: Имена категорий
+
+        Returns:
+            Словарь {имя: категория} для найденных
+        """
+        found: Dict[str, Category] = {}
+        for chunk in self._chunks(list(set(names))):
+            result = await db.execute(select(Category).where(Category.name.in_(chunk)))
+            found.update((category.name, category) for category in result.scalars())
+        return found
+
 
 # Создаем экземпляр CRUDCategory для использования в приложении
-category = CRUDCategory(Category)
+category = CRUDCategory(
+    Category,
+    schema=CategorySchema,
+    cache=build_entity_cache("categories", settings.CACHE_CATEGORIES),
+)
+
+# Индекс префиксов для автодополнения, обновляется при каждой записи
+category_suggest = build_prefix_index("categories", Category, "name")
+category.add_write_listener(category_suggest.on_write)
+
+# Снимок всей таблицы для списка, поиска по имени и проверок уникальности
+category_catalog = Catalog(category, key="name", ttl=settings.CATALOG_TTL_SECONDS)
+category.add_write_listener(category_catalog.on_write)
@@ -0,0 +1,34 @@
+"""
+CRUD операции для правил категоризации операций.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.crud.classifier import Matcher, build_matcher_cache
+from app.crud.crud_category import category
+from app.models.category_rule import CategoryRule
+from app.schemas.category_rule import (
+    CategoryRuleCreate,
+    CategoryRuleSchema,
+    CategoryRuleUpdate,
+)
+
+
+class CRUDCategoryRule(CRUDBase[CategoryRule, CategoryRuleCreate, CategoryRuleUpdate]):
+    """CRUD правил категоризации со скомпилированными правилами в кеше."""
+
+    owner_field = "user_id"
+
+    async def matcher(self, db: AsyncSession) -> Matcher:
+        """Скомпилированные правила владельца (см. app/crud/classifier.py)."""
+        return await category_rule_matchers.get(db, self.owner_id)
+
+
+# Создаем экземпляр для использования
+category_rule = CRUDCategoryRule(CategoryRule, schema=CategoryRuleSchema)
+
+# Скомпилированные правила по пользователям, сбрасываются при записи правил
+category_rule_matchers = build_matcher_cache()
+category_rule.add_write_listener(category_rule_matchers.on_write)
+category.add_write_listener(category_rule_matchers.on_category_write)
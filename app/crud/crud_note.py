@@ -2,20 +2,32 @@
 CRUD операции для заметок.
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select
 
+from app.core.cache import build_entity_cache
+from app.core.config import settings
+from app.core.prefix_index import build_prefix_index
 from app.crud.base import CRUDBase
+from app.crud.group_commit import build_group_committer
+from app.crud.pagination import decode_score_cursor, encode_score_cursor
+from app.crud.search import get_search_backend
 from app.models.note import Note
-from app.schemas.note import NoteCreate, NoteUpdate
+from app.schemas.note import NoteCreate, NoteUpdate, NoteSchema
 
 
 class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
     """
     CRUD операции для Note с дополнительными методами.
+
+    Заметки принадлежат пользователям: API работает с копией
+    note.for_owner(user_id), все запросы которой ограничены заметками
+    этого пользователя.
     """
 
+    owner_field = "user_id"
+
     async def search_by_title(
         self, db: AsyncSession, *, title: str, skip: int = 0, limit: int = 100
     ) -> List[Note]:
@@ -32,16 +44,73 @@ class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
             Список найденных заметок
         """
         query = (
-            select(Note).where(Note.title.ilike(f"%{title}%")).offset(skip).limit(limit)
+            select(Note)
+            .where(Note.title.ilike(f"%{title}%"), *self.owner_filter())
+            .offset(skip)
+            .limit(limit)
         )
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        after: Optional[str] = None,
+        limit: int = 100,
+    ) -> Tuple[List[Note], Optional[str]]:
+        """
+        Полнотекстовый поиск по заголовку и содержимому с ранжированием.
+
+        Использует индекс поиска своей СУБД (см. app/crud/search.py):
+        tsvector + pg_trgm на PostgreSQL, FTS5 на SQLite. Выдача
+        отсортирована по релевантности и листается курсором (score, id).
+
+        Args:
+            db: Сессия БД
+            query: Поисковая строка
+            after: Курсор из предыдущего ответа
+            limit: Максимальное количество
+
+        Returns:
+            Кортеж (заметки по убыванию релевантности, курсор или None)
+
+        Raises:
+            InvalidCursorError: Если курсор поврежден
+        """
+        backend = get_search_backend(db.get_bind().dialect.name)
+        ranked = backend.ranked(query).subquery("ranked")
+
+        stmt = (
+            select(Note, ranked.c.score)
+            .join(ranked, Note.id == ranked.c.id)
+            .where(*self.owner_filter())
+        )
+        if after is not None:
+            score, last_id = decode_score_cursor(after)
+            stmt = stmt.where(
+                or_(
+                    ranked.c.score < score,
+                    and_(ranked.c.score == score, ranked.c.id > last_id),
+                )
+            )
+        stmt = stmt.order_by(ranked.c.score.desc(), ranked.c.id).limit(limit + 1)
+
+        rows = (await db.execute(stmt)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_note, last_score = rows[-1]
+            next_cursor = encode_score_cursor(last_score, last_note.id)
+
+        return [note for note, _ in rows], next_cursor
+
     async def get_multi_by_user(
         self, db: AsyncSession, *, user_id: str, skip: int = 0, limit: int = 100
     ) -> List[Note]:
         """
-        Получить заметки пользователя (заготовка на будущее).
+        Получить заметки пользователя по индексу (user_id, created_at, id).
 
         Args:
             db: Сессия БД
@@ -50,12 +119,20 @@ class CRUDNote(CRUDBase[Note, NoteCreate, NoteUpdate]):
             limit: Максимальное количество
 
         Returns:
-            Список заметок пользователя
+            Список заметок пользователя, упорядоченный по (created_at, id)
         """
-        # Пока просто возвращаем все заметки
-        # В будущем добавим связь Note -> User
-        return await self.get_multi(db, skip=skip, limit=limit)
+        return await self.for_owner(user_id).get_multi(db, skip=skip, limit=limit)
 
 
 # Создаем экземпляр для использования
-note = CRUDNote(Note)
+note = CRUDNote(
+    Note,
+    schema=NoteSchema,
+    cache=build_entity_cache("notes", settings.CACHE_NOTES),
+    group_commit=build_group_committer("notes", Note, settings.GROUP_COMMIT_NOTES),
+)
+
+# Индекс префиксов для автодополнения, обновляется при каждой записи
+# (у каждого пользователя свои подсказки)
+note_suggest = build_prefix_index("notes", Note, "title", owner_field="user_id")
+note.add_write_listener(note_suggest.on_write)
@@ -0,0 +1,176 @@
+"""
+CRUD операции для правил повторяющихся операций.
+"""
+
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.crud.crud_transaction import CRUDTransaction
+from app.crud.recurrence import merge_occurrences, occurrence_dates
+from app.models.recurrence import RecurringRule
+from app.models.transaction import Transaction
+from app.schemas.recurrence import (
+    Occurrence,
+    RecurringRuleCreate,
+    RecurringRuleSchema,
+    RecurringRuleUpdate,
+)
+
+
+class NotAnOccurrenceError(ValueError):
+    """Дата не попадает в расписание правила."""
+
+
+class CRUDRecurringRule(
+    CRUDBase[RecurringRule, RecurringRuleCreate, RecurringRuleUpdate]
+):
+    """
+    CRUD правил с повторениями по запросу.
+
+    Плановые повторения не хранятся: для окна читаются только правила,
+    действующие в нем, и подтвержденные повторения из transactions за это
+    окно (индекс (rule_id, occurrence_date)), даты считаются на лету.
+    """
+
+    owner_field = "user_id"
+
+    async def active_in(
+        self, db: AsyncSession, *, start: date, end: date
+    ) -> List[RecurringRule]:
+        """Правила пользователя, действующие хотя бы день из окна."""
+        result = await db.execute(
+            select(RecurringRule)
+            .where(
+                *self.owner_filter(),
+                RecurringRule.starts_on <= end,
+                or_(RecurringRule.ends_on.is_(None), RecurringRule.ends_on >= start),
+            )
+            .order_by(RecurringRule.id)
+        )
+        return list(result.scalars().all())
+
+    async def occurrences(
+        self,
+        db: AsyncSession,
+        *,
+        start: date,
+        end: date,
+        category_id: Optional[str] = None,
+        planned_only: bool = False,
+    ) -> List[Occurrence]:
+        """
+        Подтвержденные и плановые повторения в окне, по (дата, правило).
+
+        Args:
+            db: Сессия БД
+            start: Первый день окна
+            end: Последний день окна
+            category_id: Только повторения этой категории
+            planned_only: Только неподтвержденные (для отчетов поверх
+                операций, где подтвержденные уже учтены)
+
+        Returns:
+            Список повторений
+        """
+        rules = await self.active_in(db, start=start, end=end)
+        if not rules:
+            return []
+
+        result = await db.execute(
+            select(Transaction)
+            .where(
+                Transaction.rule_id.in_([rule.id for rule in rules]),
+                Transaction.occurrence_date >= start,
+                Transaction.occurrence_date <= end,
+            )
+            .order_by(Transaction.occurrence_date, Transaction.rule_id)
+        )
+        materialized: List[Transaction] = list(result.scalars().all())
+
+        occurrences = []
+        for value, rule_id, rule, transaction in merge_occurrences(
+            rules, materialized, start, end
+        ):
+            if planned_only and transaction is not None:
+                continue
+            source = transaction if transaction is not None else rule
+            if category_id is not None and source.category_id != category_id:
+                continue
+            occurrences.append(
+                Occurrence(
+                    rule_id=rule_id,
+                    occurrence_date=value,
+                    amount=source.amount,
+                    category_id=source.category_id,
+                    description=source.description,
+                    transaction_id=transaction.id if transaction else None,
+                )
+            )
+        return occurrences
+
+    async def materialize(
+        self,
+        db: AsyncSession,
+        *,
+        rule: RecurringRule,
+        on: date,
+        changes: Dict[str, Any],
+        transactions: CRUDTransaction,
+    ) -> Transaction:
+        """
+        Подтвердить повторение: сохранить его операцией (или изменить ее).
+
+        Операция пишется через CRUD операций, поэтому помесячные итоги и
+        бюджеты учитывают ее как любую другую.
+
+        Args:
+            db: Сессия БД
+            rule: Правило
+            on: Дата повторения по расписанию
+            changes: Отличия от шаблона правила (amount, category_id,
+                description; None - как в правиле)
+            transactions: CRUD операций того же пользователя
+
+        Returns:
+            Операция повторения
+
+        Raises:
+            NotAnOccurrenceError: Дата не из расписания правила
+        """
+        if not occurrence_dates(rule, on, on):
+            raise NotAnOccurrenceError(f"{on} нет в расписании правила")
+
+        changes = {key: value for key, value in changes.items() if value is not None}
+        result = await db.execute(
+            select(Transaction).where(
+                *transactions.owner_filter(),
+                Transaction.rule_id == rule.id,
+                Transaction.occurrence_date == on,
+            )
+        )
+        existing = result.scalar_one_or_none()
+        if existing is not None:
+            if not changes:
+                return existing
+            return await transactions.update(db, db_obj=existing, obj_in=changes)
+
+        # rule_id и occurrence_date нет в TransactionCreate: create берет
+        # строку как есть (см. CRUDBase._create_data)
+        row: Any = {
+            "amount": rule.amount,
+            "category_id": rule.category_id,
+            "description": rule.description,
+            **changes,
+            "occurred_at": datetime.combine(on, time(), timezone.utc),
+            "rule_id": rule.id,
+            "occurrence_date": on,
+        }
+        return await transactions.create(db, obj_in=row)
+
+
+# Создаем экземпляр для использования
+recurring_rule = CRUDRecurringRule(RecurringRule, schema=RecurringRuleSchema)
@@ -0,0 +1,229 @@
+"""
+CRUD операции для операций (расходов/доходов).
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, cast
+from uuid import uuid4
+
+from sqlalchemy import Column, MetaData, Table, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import build_entity_cache
+from app.core.config import settings
+from app.crud.analytics import build_analytics_cache
+from app.crud.base import CRUDBase
+from app.crud.fx import fx_rates
+from app.crud.rollup import (
+    UPSERT_INSERTS,
+    apply_rollup_deltas,
+    day_of,
+    rollup_deltas,
+)
+from app.models.transaction import Transaction
+from app.schemas.transaction import (
+    TransactionCreate,
+    TransactionUpdate,
+    TransactionSchema,
+    as_utc,
+)
+
+
+class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate]):
+    """
+    CRUD операций с помесячными итогами.
+
+    Любая запись через этот CRUD в той же транзакции меняет
+    monthly_rollups (см. app/crud/rollup.py). Запись в transactions в
+    обход CRUD итоги не обновит.
+
+    Сумма в базовой валюте (base_amount) считается при записи по курсу
+    на день операции; запись в валюте без курса на эту дату не проходит
+    (MissingRateError). Итоги меняются на base_amount строк до и после
+    записи, поэтому вычитается ровно то, что было прибавлено, даже если
+    курсы с тех пор перезагрузили.
+    """
+
+    owner_field = "user_id"
+    has_derived = True
+
+    async def _derive_values(
+        self,
+        db: AsyncSession,
+        changes: Sequence[Tuple[Dict[str, Any], Optional[Mapping[str, Any]]]],
+    ) -> None:
+        base = settings.BASE_CURRENCY
+        pending = []
+        for values, before in changes:
+            # base_amount зависит только от суммы, валюты и дня операции
+            if before is not None and not BASE_AMOUNT_SOURCES.intersection(values):
+                continue
+            row = {**(before or {}), **values}
+            if row.get("currency", base) == base:
+                values["base_amount"] = row["amount"]
+            else:
+                pending.append((values, row))
+        if not pending:
+            return
+
+        # Курс на день операции, одной векторной операцией на валюту
+        fx = await fx_rates.get(db)
+        converted = fx.convert_rows(
+            [row["amount"] for _, row in pending],
+            [row["currency"] for _, row in pending],
+            [day_of(row["occurred_at"]) for _, row in pending],
+        )
+        for (values, _), base_amount in zip(pending, converted):
+            values["base_amount"] = base_amount
+
+    async def _sync_derived(
+        self, db: AsyncSession, *, old: Sequence[Any], new: Sequence[Any]
+    ) -> None:
+        await apply_rollup_deltas(db, rollup_deltas(old, new))
+
+    async def insert_rows(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+        """
+        Вставить пачку проверенных строк выписки в обход ORM (импорт).
+
+        Строки с одинаковым отпечатком (import_fingerprint) внутри пачки
+        отсекаются множеством, уже импортированные раньше - уникальным
+        индексом: одним INSERT ... ON CONFLICT DO NOTHING RETURNING на
+        пачку. На PostgreSQL с asyncpg пачка сначала идет через COPY во
+        временную таблицу, оттуда - INSERT ... SELECT с тем же ON CONFLICT.
+        Итоги обновляются по строкам из RETURNING (только вставленным), и
+        транзакция фиксируется, как в create_many.
+
+        Raises:
+            MissingRateError: Нет курса валюты строки на ее дату
+
+        Args:
+            db: Сессия БД
+            rows: Поля операций (amount, occurred_at, category_id,
+                description); id, владелец, отпечаток и даты создания
+                добавляются здесь
+
+        Returns:
+            Число вставленных строк (остальные - дубликаты)
+        """
+        owner = self._owner_values()
+        now = datetime.now(timezone.utc)
+        unique: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            key = import_fingerprint(owner.get("user_id"), **row)
+            if key not in unique:
+                unique[key] = {
+                    "id": str(uuid4()),
+                    "created_at": now,
+                    "updated_at": now,
+                    "rule_id": None,
+                    "occurrence_date": None,
+                    **row,
+                    **owner,
+                    "fingerprint": key,
+                }
+        if not unique:
+            return 0
+        await self._derive_values(db, [(row, None) for row in unique.values()])
+
+        table = cast(Table, self.model.__table__)
+        returning = [table.c[name] for name in ROLLUP_COLUMNS]
+        connection = await db.connection()
+        if connection.dialect.driver == "asyncpg":
+            columns = list(next(iter(unique.values())))
+            # Временная таблица живет в соединении и очищается при COMMIT
+            await connection.exec_driver_sql(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {IMPORT_STAGING.name} "
+                f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            raw = await connection.get_raw_connection()
+            # Соединение asyncpg (у пула SQLAlchemy оно Optional)
+            driver: Any = raw.driver_connection
+            await driver.copy_records_to_table(
+                IMPORT_STAGING.name,
+                records=[tuple(row[c] for c in columns) for row in unique.values()],
+                columns=columns,
+            )
+            stmt = postgresql.insert(table).from_select(
+                columns, select(*(IMPORT_STAGING.c[c] for c in columns))
+            )
+            result = await db.execute(
+                stmt.on_conflict_do_nothing(index_elements=["fingerprint"]).returning(
+                    *returning
+                )
+            )
+        else:
+            insert = UPSERT_INSERTS[connection.dialect.name]
+            stmt = insert(table).on_conflict_do_nothing(index_elements=["fingerprint"])
+            result = await db.execute(stmt.returning(*returning), list(unique.values()))
+
+        created = [SimpleNamespace(**row) for row in result.mappings()]
+        await self._sync_derived(db, old=(), new=created)
+        await db.commit()
+        self._notify(written=created)
+        return len(created)
+
+
+def import_fingerprint(
+    user_id: Optional[str],
+    *,
+    occurred_at: datetime,
+    amount: int,
+    description: Optional[str] = None,
+    currency: Optional[str] = None,
+    **_: Any,
+) -> str:
+    """
+    Отпечаток строки выписки: дата, сумма (с валютой, если она не
+    базовая) и описание без учета регистра и лишних пробелов.
+
+    Владелец тоже входит в отпечаток: уникальный индекс общий для всех
+    пользователей, а одинаковые строки у разных владельцев - не дубликаты.
+
+    Returns:
+        32 шестнадцатеричных символа (blake2b, 16 байт)
+    """
+    text = " ".join((description or "").casefold().split())
+    moment = as_utc(occurred_at).isoformat()
+    value = str(amount)
+    if currency is not None and currency != settings.BASE_CURRENCY:
+        value = f"{value} {currency}"
+    key = "\x1f".join((user_id or "", moment, value, text))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+# Колонки вставленных строк, по которым обновляются итоги и слушатели
+ROLLUP_COLUMNS = (
+    "id",
+    "user_id",
+    "amount",
+    "currency",
+    "base_amount",
+    "occurred_at",
+    "category_id",
+)
+
+# Поля, при изменении которых пересчитывается base_amount
+BASE_AMOUNT_SOURCES = frozenset({"amount", "currency", "occurred_at"})
+
+# Временная таблица импорта на PostgreSQL (COPY не умеет ON CONFLICT)
+IMPORT_STAGING = Table(
+    "transactions_import",
+    MetaData(),
+    *(Column(column.name, column.type) for column in Transaction.__table__.columns),
+)
+
+
+# Создаем экземпляр для использования
+transaction = CRUDTransaction(
+    Transaction,
+    schema=TransactionSchema,
+    cache=build_entity_cache("transactions", settings.CACHE_TRANSACTIONS),
+)
+
+# Колонки операций для аналитики (None без NumPy), сбрасываются при записи
+transaction_analytics = build_analytics_cache()
+if transaction_analytics is not None:
+    transaction.add_write_listener(transaction_analytics.on_write)
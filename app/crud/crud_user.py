@@ -6,9 +6,11 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.cache import build_entity_cache
+from app.core.config import settings
 from app.crud.base import CRUDBase
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
@@ -77,4 +79,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
 
 # Создаем экземпляр для использования
-user = CRUDUser(User)
+user = CRUDUser(
+    User,
+    schema=UserSchema,
+    cache=build_entity_cache("users", settings.CACHE_USERS),
+)
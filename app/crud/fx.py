@@ -0,0 +1,303 @@
+"""
+Курсы валют и пересчет сумм в базовую валюту (BASE_CURRENCY).
+
+Курсы хранятся в fx_rates: (валюта, дата, курс) - сколько единиц базовой
+валюты стоит единица валюты с этой даты. Загружаются из локальных CSV
+файлов (load_rate_files + store_rates, см. scripts/load_fx_rates.py),
+сеть не нужна.
+
+В памяти курсы держатся снимком FxTable: на каждую пару (валюта ->
+база) отсортированный массив дат и массив курсов. Курс "на дату" -
+последний известный не позже нее:
+
+- одна сумма - bisect по датам;
+- колонка сумм (пачка операций при записи) - np.searchsorted по всем
+  датам сразу и умножение массивов: по векторной операции на валюту, без
+  вызова на строку (без NumPy - bisect по строке, см. convert_rows).
+
+Пересчет выполняется один раз - при записи операции, результат хранится
+в transactions.base_amount. Итоги, отчеты и аналитика читают его, поэтому
+сходятся между собой и не меняются при загрузке новых курсов. Суммы
+округляются до копейки по каждой операции (round half even и в Python, и
+в NumPy).
+"""
+
+import asyncio
+import csv
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.lazy import optional_module
+from app.crud.rollup import UPSERT_INSERTS
+from app.models.fx_rate import FxRate
+
+# Импортируется при первом отчете (см. app/core/lazy.py)
+np: Any = optional_module("numpy")
+
+# (валюта, дата, курс)
+Rate = Tuple[str, date, Decimal]
+
+
+class MissingRateError(ValueError):
+    """Нет курса валюты на дату (курсов нет или все позже)."""
+
+
+class RateSeries:
+    """Курсы одной валюты к базовой по возрастанию дат."""
+
+    def __init__(self, days: List[date], rates: List[float]):
+        self.ordinals = [day.toordinal() for day in days]
+        self.rates = rates
+        if np is not None:
+            self.day_array = np.array(days, dtype="datetime64[D]")
+            self.rate_array = np.array(rates, dtype=np.float64)
+
+    def at(self, day: date) -> Optional[float]:
+        """Курс на дату (None - раньше первого курса)."""
+        index = bisect_right(self.ordinals, day.toordinal()) - 1
+        return self.rates[index] if index >= 0 else None
+
+    def at_many(self, days: Any) -> Tuple[Any, Any]:
+        """
+        Курсы на даты колонки.
+
+        Args:
+            days: datetime64[D]
+
+        Returns:
+            (курсы float64, маска дат раньше первого курса)
+        """
+        index = np.searchsorted(self.day_array, days, side="right") - 1
+        missing = index < 0
+        return self.rate_array[np.maximum(index, 0)], missing
+
+
+@dataclass(frozen=True)
+class FxTable:
+    """Снимок курсов: валюта -> RateSeries."""
+
+    base: str
+    series: Mapping[str, RateSeries]
+
+    def rate(self, currency: str, day: date) -> float:
+        """
+        Курс валюты к базовой на дату.
+
+        Raises:
+            MissingRateError: Нет курса на эту дату
+        """
+        if currency == self.base:
+            return 1.0
+        series = self.series.get(currency)
+        rate = series.at(day) if series is not None else None
+        if rate is None:
+            raise MissingRateError(f"Нет курса {currency} на {day}")
+        return rate
+
+    def convert(self, amount: int, currency: str, day: date) -> int:
+        """Сумма в копейках базовой валюты (см. rate)."""
+        if currency == self.base:
+            return amount
+        return round(amount * self.rate(currency, day))
+
+    def convert_many(
+        self, amounts: Any, currency: Any, currencies: Tuple[str, ...], days: Any
+    ) -> Any:
+        """
+        Пересчитать колонку сумм (NumPy).
+
+        Args:
+            amounts: int64, копейки в валюте операции
+            currency: Коды валют (индексы в currencies)
+            currencies: Код -> валюта
+            days: datetime64[D], даты операций (UTC)
+
+        Returns:
+            int64, копейки базовой валюты
+
+        Raises:
+            MissingRateError: Нет курса хотя бы для одной операции
+        """
+        converted = amounts.copy()
+        for code, name in enumerate(currencies):
+            if name == self.base:
+                continue
+            mask = currency == code
+            if not mask.any():
+                continue
+            series = self.series.get(name)
+            if series is None:
+                raise MissingRateError(f"Нет курсов {name}")
+            rates, missing = series.at_many(days[mask])
+            if missing.any():
+                first = days[mask][missing][0].item()
+                raise MissingRateError(f"Нет курса {name} на {first}")
+            converted[mask] = np.rint(amounts[mask] * rates).astype(np.int64)
+        return converted
+
+    def convert_rows(
+        self, amounts: List[int], currencies: List[str], days: List[date]
+    ) -> List[int]:
+        """
+        Пересчитать суммы строк: convert_many, если есть NumPy, иначе
+        convert по строке.
+
+        Raises:
+            MissingRateError: Нет курса хотя бы для одной операции
+        """
+        if np is None:
+            return [
+                self.convert(amount, currency, day)
+                for amount, currency, day in zip(amounts, currencies, days)
+            ]
+        codes: Dict[str, int] = {}
+        converted = self.convert_many(
+            np.array(amounts, dtype=np.int64),
+            np.array(
+                [codes.setdefault(c, len(codes)) for c in currencies], dtype=np.int32
+            ),
+            tuple(codes),
+            np.array(days, dtype="datetime64[D]"),
+        )
+        result: List[int] = converted.tolist()
+        return result
+
+
+# =========== ЗАГРУЗКА ИЗ ФАЙЛОВ ===========
+
+
+def load_rate_files(paths: Iterable[Path]) -> Iterator[Rate]:
+    """
+    Курсы из CSV файлов с колонками date (ISO), currency, rate.
+
+    Raises:
+        ValueError: Нет колонок или значение не разбирается (с файлом и
+            строкой)
+    """
+    for path in paths:
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.DictReader(file)
+            if not {"date", "currency", "rate"} <= set(reader.fieldnames or ()):
+                raise ValueError(f"{path}: нужны колонки date, currency, rate")
+            for row in reader:
+                try:
+                    rate = Decimal(row["rate"])
+                    day = date.fromisoformat(row["date"].strip())
+                except (InvalidOperation, ValueError):
+                    raise ValueError(
+                        f"{path}:{reader.line_num}: некорректная строка"
+                    ) from None
+                if not rate.is_finite() or rate <= 0:
+                    raise ValueError(f"{path}:{reader.line_num}: курс должен быть > 0")
+                yield row["currency"].strip().upper(), day, rate
+
+
+def rate_files(directory: str) -> List[Path]:
+    """CSV файлы каталога курсов по имени (нет каталога - пусто)."""
+    root = Path(directory)
+    return sorted(root.glob("*.csv")) if root.is_dir() else []
+
+
+async def store_rates(db: AsyncSession, rates: Iterable[Rate]) -> int:
+    """
+    Записать курсы (UPSERT по (валюта, дата)) и сбросить снимок в памяти.
+
+    Returns:
+        Число записанных курсов
+    """
+    rows = [
+        {"currency": currency, "day": day, "rate": rate}
+        for currency, day, rate in rates
+    ]
+    if rows:
+        insert = UPSERT_INSERTS[db.get_bind().dialect.name]
+        stmt = insert(FxRate)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["currency", "day"], set_={"rate": stmt.excluded.rate}
+        )
+        # executemany: драйвер шлет строки пачками
+        await db.execute(stmt, rows)
+    await db.commit()
+    fx_rates.invalidate()
+    return len(rows)
+
+
+# =========== КЕШ КУРСОВ ===========
+
+
+class FxCache:
+    """
+    Снимок курсов в памяти, перечитывается через ttl или после загрузки.
+
+    Новые курсы действуют только на следующие записи операций: уже
+    записанные хранят base_amount, посчитанную по курсам на момент записи,
+    и по ней же считаются итоги, отчеты и аналитика.
+    """
+
+    def __init__(self, *, ttl: float):
+        self.ttl = ttl
+        self.loads = 0
+        self._table: Optional[FxTable] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> FxTable:
+        """Курсы (из памяти или из БД)."""
+        table = self._table
+        if table is not None and self._expires_at > time.monotonic():
+            return table
+        async with self._lock:
+            if self._table is None or self._expires_at <= time.monotonic():
+                generation = self._generation
+                table = await self._load(db)
+                if generation == self._generation:
+                    self._table = table
+                    self._expires_at = time.monotonic() + self.ttl
+                return table
+            return self._table
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._table = None
+
+    async def _load(self, db: AsyncSession) -> FxTable:
+        result = await db.execute(
+            select(FxRate.currency, FxRate.day, FxRate.rate).order_by(
+                FxRate.currency, FxRate.day
+            )
+        )
+        grouped: Dict[str, Tuple[List[date], List[float]]] = {}
+        for currency, day, rate in result:
+            days, rates = grouped.setdefault(currency, ([], []))
+            days.append(day)
+            rates.append(float(rate))
+        self.loads += 1
+        return FxTable(
+            base=settings.BASE_CURRENCY,
+            series={
+                currency: RateSeries(days, rates)
+                for currency, (days, rates) in grouped.items()
+            },
+        )
+
+
+fx_rates = FxCache(ttl=settings.FX_TTL_SECONDS)
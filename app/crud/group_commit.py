@@ -0,0 +1,212 @@
+"""
+Group commit: объединение конкурентных create в один INSERT и один COMMIT.
+
+При всплеске вставок каждый POST делает свой COMMIT, и пропускная
+способность упирается в частоту fsync на стороне БД. GroupCommitter
+копит строки, пришедшие в течение короткого окна (или до max_rows),
+и вставляет их одним многострочным INSERT ... RETURNING в одной
+транзакции. Каждый вызывающий получает свою строку или свою ошибку.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generic, List, Optional, Set, Type, Union
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.base import BaseModel as AppBaseModel
+from app.crud.base import ModelType
+
+
+@dataclass
+class _Pending:
+    """Строка, ожидающая вставки."""
+
+    row: Dict[str, Any]
+    future: "asyncio.Future[Any]"
+    enqueued_at: float
+
+
+@dataclass
+class _Queue:
+    """Очередь строк для одного движка БД."""
+
+    items: List[_Pending] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class GroupCommitter(Generic[ModelType]):
+    """
+    Накопитель вставок одной модели.
+
+    Счетчики (stats):
+    - batches, rows: сколько пачек и строк вставлено
+    - max_batch_size: самая большая пачка
+    - wait_seconds_total / wait_seconds_max: добавленная задержка
+      (от постановки в очередь до начала вставки)
+    - fallbacks: пачки, которые пришлось вставлять построчно из-за ошибки
+    """
+
+    def __init__(self, model: Type[ModelType], *, window: float, max_rows: int):
+        """
+        Args:
+            model: SQLAlchemy модель
+            window: Окно накопления в секундах
+            max_rows: Размер пачки, при котором она отправляется сразу
+        """
+        self.model = model
+        self.window = window
+        self.max_rows = max_rows
+        self._queues: Dict[Any, _Queue] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_size = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.fallbacks = 0
+
+    async def submit(
+        self, db: AsyncSession, obj_in: Union[BaseModel, Dict[str, Any]]
+    ) -> ModelType:
+        """
+        Поставить объект в очередь и дождаться его вставки.
+
+        Вставка идет в отдельной сессии на том же движке, что и db,
+        поэтому возвращаемый объект не привязан к сессии вызывающего.
+
+        Args:
+            db: Сессия БД вызывающего (используется ее движок)
+            obj_in: Данные для создания (схема или готовая строка)
+
+        Returns:
+            Созданный объект
+
+        Raises:
+            Exception: Ошибка вставки именно этой строки
+        """
+        loop = asyncio.get_running_loop()
+        bind = db.bind
+        queue = self._queues.setdefault(bind, _Queue())
+
+        pending = _Pending(
+            row=obj_in if isinstance(obj_in, dict) else jsonable_encoder(obj_in),
+            future=loop.create_future(),
+            enqueued_at=loop.time(),
+        )
+        queue.items.append(pending)
+
+        if len(queue.items) >= self.max_rows:
+            self._schedule_flush(bind)
+        elif queue.timer is None:
+            queue.timer = loop.call_later(self.window, self._schedule_flush, bind)
+
+        db_obj: ModelType = await pending.future
+        return db_obj
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+            "fallbacks": self.fallbacks,
+        }
+
+    def _schedule_flush(self, bind: Any) -> None:
+        """Забрать очередь движка и запустить ее вставку."""
+        queue = self._queues.pop(bind, None)
+        if queue is None:
+            return
+        if queue.timer is not None:
+            queue.timer.cancel()
+
+        task = asyncio.ensure_future(self._flush(bind, queue.items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, bind: Any, batch: List[_Pending]) -> None:
+        """Вставить пачку одним INSERT ... RETURNING и одним COMMIT."""
+        started_at = asyncio.get_running_loop().time()
+        for pending in batch:
+            wait = started_at - pending.enqueued_at
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+
+        try:
+            objs = await self._insert(bind, [pending.row for pending in batch])
+        except Exception:
+            # Одна плохая строка не должна ронять чужие: вставляем по одной
+            self.fallbacks += 1
+            for pending in batch:
+                try:
+                    (obj,) = await self._insert(bind, [pending.row])
+                except Exception as e:
+                    _resolve(pending, exception=e)
+                else:
+                    _resolve(pending, result=obj)
+            return
+
+        for pending, obj in zip(batch, objs):
+            _resolve(pending, result=obj)
+
+    async def _insert(self, bind: Any, rows: List[Dict[str, Any]]) -> List[ModelType]:
+        """Вставить строки в собственной транзакции."""
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        async with AsyncSession(bind=bind, expire_on_commit=False) as session:
+            result = await session.scalars(stmt, rows)
+            objs = list(result.all())
+            await session.commit()
+        return objs
+
+
+def _resolve(
+    pending: _Pending, *, result: Any = None, exception: Optional[Exception] = None
+) -> None:
+    """Отдать результат ожидающему (если он еще ждет)."""
+    if pending.future.done():
+        return
+    if exception is not None:
+        pending.future.set_exception(exception)
+    else:
+        pending.future.set_result(result)
+
+
+# Все созданные накопители по имени (для метрик/отладки)
+committers: Dict[str, GroupCommitter] = {}
+
+
+def build_group_committer(
+    name: str, model: Type[AppBaseModel], enabled: bool
+) -> Optional[GroupCommitter]:
+    """
+    Создать накопитель для модели, если group commit включен в настройках.
+
+    Args:
+        name: Имя (обычно имя таблицы)
+        model: SQLAlchemy модель
+        enabled: Флаг из Settings (GROUP_COMMIT_NOTES)
+
+    Returns:
+        GroupCommitter или None
+    """
+    if not enabled:
+        return None
+
+    committer = GroupCommitter(
+        model,
+        window=settings.GROUP_COMMIT_WINDOW_MS / 1000,
+        max_rows=settings.GROUP_COMMIT_MAX_ROWS,
+    )
+    committers[name] = committer
+    return committer
@@ -0,0 +1,102 @@
+"""
+DataLoader для батчевого чтения объектов по ID.
+
+Все load(id), вызванные конкурентно в пределах одного тика event loop,
+собираются в один CRUDBase.get_many (SELECT ... WHERE id IN). Загрузчик
+живет в рамках одного запроса (одной сессии БД) и кеширует результаты,
+поэтому повторный load того же id не идет в БД.
+"""
+
+import asyncio
+from typing import Dict, Generic, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase, ModelType
+
+
+class ModelLoader(Generic[ModelType]):
+    """
+    Загрузчик объектов одной модели с коалесценцией запросов.
+
+    Пример:
+        loader = ModelLoader(crud.note, db)
+        a, b = await asyncio.gather(loader.load(id_a), loader.load(id_b))
+        # -> один SELECT ... WHERE id IN (id_a, id_b)
+    """
+
+    def __init__(self, crud: CRUDBase, db: AsyncSession):
+        """
+        Args:
+            crud: CRUD объект модели
+            db: Сессия БД текущего запроса
+        """
+        self.crud = crud
+        self.db = db
+        self._cache: Dict[str, "asyncio.Future[Optional[ModelType]]"] = {}
+        self._queue: List[Tuple[str, "asyncio.Future[Optional[ModelType]]"]] = []
+        # AsyncSession нельзя использовать конкурентно: пачки идут по одной
+        self._lock = asyncio.Lock()
+        # Ссылки на запущенные задачи, чтобы их не собрал GC
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def load(self, id: str) -> Optional[ModelType]:
+        """
+        Получить объект по ID (батчится с другими конкурентными вызовами).
+
+        Args:
+            id: ID объекта
+
+        Returns:
+            Объект модели или None если не найден
+        """
+        future = self._cache.get(id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._cache[id] = future
+            self._queue.append((id, future))
+            if len(self._queue) == 1:
+                # Первый id в новой пачке: отправляем ее в конце текущего тика
+                asyncio.get_running_loop().call_soon(self._dispatch)
+        return await future
+
+    async def load_many(self, ids: Sequence[str]) -> List[Optional[ModelType]]:
+        """
+        Получить объекты по списку ID (один запрос на все ненайденные в кеше).
+
+        Returns:
+            Объекты в порядке ids (None для ненайденных)
+        """
+        return list(await asyncio.gather(*(self.load(id) for id in ids)))
+
+    def clear(self, id: str) -> None:
+        """Забыть закешированный объект (например, после его изменения)."""
+        self._cache.pop(id, None)
+
+    def _dispatch(self) -> None:
+        """Забрать накопленные id и запустить загрузку пачки."""
+        batch, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._load_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load_batch(
+        self, batch: List[Tuple[str, "asyncio.Future[Optional[ModelType]]"]]
+    ) -> None:
+        """Загрузить пачку и разрешить futures ожидающих вызовов."""
+        try:
+            async with self._lock:
+                objs = await self.crud.get_many(self.db, ids=[id for id, _ in batch])
+        except Exception as e:
+            for id, future in batch:
+                # Ошибку не кешируем: следующий load попробует снова
+                if self._cache.get(id) is future:
+                    del self._cache[id]
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        found = {obj.id: obj for obj in objs}
+        for id, future in batch:
+            if not future.done():
+                future.set_result(found.get(id))
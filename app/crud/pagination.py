@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) пагинация.
+
+Курсор - это непрозрачная для клиента строка, в которой закодирован ключ
+сортировки последней отданной записи: (created_at, id). Следующая страница
+выбирается условием ``(created_at, id) > (:created_at, :id)`` по индексу,
+поэтому глубокие страницы стоят столько же, сколько первая.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Курсор поврежден или имеет неверный формат."""
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """
+    Закодировать ключ сортировки записи в курсор.
+
+    Args:
+        created_at: Дата создания записи
+        id: ID записи
+
+    Returns:
+        Строка курсора (base64url без паддинга)
+    """
+    return _encode([created_at.isoformat(), id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Раскодировать курсор обратно в ключ сортировки.
+
+    Args:
+        cursor: Строка курсора из запроса клиента
+
+    Returns:
+        Кортеж (created_at, id)
+
+    Raises:
+        InvalidCursorError: Если курсор не удалось разобрать
+    """
+    try:
+        created_at, id = _decode(cursor)
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Некорректный курсор пагинации") from e
+
+
+def encode_score_cursor(score: float, id: str) -> str:
+    """
+    Курсор для выдачи, отсортированной по релевантности: (score, id).
+
+    float в JSON сериализуется без потери точности, поэтому сравнение
+    с границей страницы на стороне БД точное.
+    """
+    return _encode([score, id])
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Раскодировать курсор релевантности.
+
+    Raises:
+        InvalidCursorError: Если курсор не удалось разобрать
+    """
+    try:
+        score, id = _decode(cursor)
+        return float(score), str(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Некорректный курсор пагинации") from e
+
+
+def _encode(key: list) -> str:
+    raw = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    values: list = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    return values
@@ -0,0 +1,114 @@
+"""
+Даты повторений правил (recurring_rules) для окна.
+
+Даты не перебираются от начала правила: при шаге в днях (daily, weekly)
+повторения - арифметическая прогрессия порядковых номеров дней, при шаге
+в месяцах - прогрессия номеров месяцев. Первый член в окне вычисляется
+делением, дальше range() с шагом правила, поэтому стоимость зависит
+только от числа повторений в окне, а не от возраста правила.
+"""
+
+import calendar
+import heapq
+from datetime import date
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+
+def first_date(rule: Any) -> date:
+    """Первое повторение правила (weekly - ближайший weekday от starts_on)."""
+    if rule.frequency == "weekly" and rule.weekday is not None:
+        shift = (rule.weekday - rule.starts_on.weekday()) % 7
+        return date.fromordinal(rule.starts_on.toordinal() + shift)
+    starts_on: date = rule.starts_on
+    return starts_on
+
+
+def occurrence_dates(rule: Any, start: date, end: date) -> List[date]:
+    """
+    Даты повторений правила с start по end включительно.
+
+    Args:
+        rule: RecurringRule (или объект с теми же полями)
+        start: Первый день окна
+        end: Последний день окна
+
+    Returns:
+        Даты по возрастанию
+    """
+    lo = max(start, rule.starts_on)
+    hi = min(end, rule.ends_on) if rule.ends_on is not None else end
+    if lo > hi:
+        return []
+
+    anchor = first_date(rule)
+    if rule.frequency == "monthly":
+        return _monthly(rule, anchor, lo, hi)
+
+    step = rule.interval * (7 if rule.frequency == "weekly" else 1)
+    # Номер первого повторения не раньше lo: ceil((lo - anchor) / step)
+    skip = max(0, -((anchor.toordinal() - lo.toordinal()) // step))
+    first = anchor.toordinal() + skip * step
+    return [date.fromordinal(day) for day in range(first, hi.toordinal() + 1, step)]
+
+
+def _monthly(rule: Any, anchor: date, lo: date, hi: date) -> List[date]:
+    day = rule.month_day or anchor.day
+    anchor_month = anchor.year * 12 + anchor.month - 1
+    lo_month = lo.year * 12 + lo.month - 1
+    hi_month = hi.year * 12 + hi.month - 1
+    skip = max(0, -((anchor_month - lo_month) // rule.interval))
+
+    dates = []
+    for month in range(
+        anchor_month + skip * rule.interval, hi_month + 1, rule.interval
+    ):
+        year, month0 = divmod(month, 12)
+        last_day = calendar.monthrange(year, month0 + 1)[1]
+        value = date(year, month0 + 1, min(day, last_day))
+        # В первом и последнем месяце окна дата может выйти за его границы
+        if lo <= value <= hi:
+            dates.append(value)
+    return dates
+
+
+def merge_occurrences(
+    rules: Sequence[Any],
+    materialized: Sequence[Any],
+    start: date,
+    end: date,
+) -> Iterator[Tuple[date, str, Any, Optional[Any]]]:
+    """
+    Подтвержденные и плановые повторения в порядке (дата, правило).
+
+    Слияние отсортированных потоков (heapq.merge): по потоку на правило
+    и поток подтвержденных операций; плановое повторение, для которого
+    есть операция, пропускается.
+
+    Args:
+        rules: Правила, действующие в окне
+        materialized: Операции-повторения этих правил в окне
+        start: Первый день окна
+        end: Последний день окна
+
+    Yields:
+        (дата, rule_id, правило, операция или None для планового)
+    """
+    by_rule = {rule.id: rule for rule in rules}
+    confirmed = {(t.rule_id, t.occurrence_date) for t in materialized}
+
+    def planned(rule: Any) -> Iterator[Tuple[date, str, Any, Optional[Any]]]:
+        for value in occurrence_dates(rule, start, end):
+            if (rule.id, value) not in confirmed:
+                yield value, rule.id, rule, None
+
+    done = sorted(
+        (
+            (t.occurrence_date, t.rule_id, by_rule[t.rule_id], t)
+            for t in materialized
+            if t.rule_id in by_rule
+        ),
+        key=lambda item: (item[0], item[1]),
+    )
+    yield from heapq.merge(
+        done, *(planned(rule) for rule in rules), key=lambda item: (item[0], item[1])
+    )
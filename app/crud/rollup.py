@@ -0,0 +1,163 @@
+"""
+Помесячные итоги операций (monthly_rollups).
+
+Итоги хранятся по (пользователь, месяц, категория) в базовой валюте
+(base_amount операций, см. app/models/transaction.py) и меняются на дельту
+каждой записи операций: вычитаем вклад прежних строк, прибавляем вклад
+новых. Дельты применяются одним UPSERT (INSERT ... ON CONFLICT DO UPDATE
+SET x = x + excluded.x) в транзакции самой записи, поэтому итоги всегда
+согласованы с операциями, а отчет не сканирует операции.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.rollup import MonthlyRollup
+
+# (user_key, month, category_key)
+RollupKey = Tuple[str, date, str]
+
+# UPSERT есть у обеих поддерживаемых СУБД, но в разных диалектах
+UPSERT_INSERTS: Dict[str, Any] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def day_of(value: datetime) -> date:
+    """День операции (по UTC)."""
+    if value.tzinfo is None:
+        return value.date()
+    return value.astimezone(timezone.utc).date()
+
+
+def month_of(value: datetime) -> date:
+    """Первое число месяца операции (по UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def rollup_key(row: Any) -> RollupKey:
+    """Ключ итогов строки операции (ORM объект или Core строка)."""
+    return (row.user_id or "", month_of(row.occurred_at), row.category_id or "")
+
+
+def rollup_deltas(old: Sequence[Any], new: Sequence[Any]) -> Dict[RollupKey, List[int]]:
+    """
+    Изменения итогов: -old +new.
+
+    Суммы берутся из base_amount строк (записаны при записи операции), а
+    не пересчитываются по текущим курсам: иначе после загрузки курсов
+    вычиталось бы не то, что было прибавлено.
+
+    Args:
+        old: Строки операций до записи
+        new: Строки операций после записи
+
+    Returns:
+        {ключ: [income, expense, count]} только для ненулевых изменений
+    """
+    deltas: Dict[RollupKey, List[int]] = {}
+    for rows, sign in ((old, -1), (new, 1)):
+        for row in rows:
+            delta = deltas.setdefault(rollup_key(row), [0, 0, 0])
+            amount = row.base_amount
+            if amount > 0:
+                delta[0] += sign * amount
+            else:
+                delta[1] -= sign * amount
+            delta[2] += sign
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+async def apply_rollup_deltas(
+    db: AsyncSession, deltas: Dict[RollupKey, List[int]]
+) -> None:
+    """
+    Прибавить дельты к итогам одним UPSERT (executemany).
+
+    Строки идут в порядке ключей: конкурентные транзакции блокируют
+    строки итогов в одном порядке и не попадают в deadlock. Итоги, у
+    которых не осталось операций, удаляются.
+
+    Args:
+        db: Сессия БД (транзакция записи операций)
+        deltas: Результат rollup_deltas
+    """
+    if not deltas:
+        return
+
+    insert = UPSERT_INSERTS[db.get_bind().dialect.name]
+    stmt = insert(MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_key", "month", "category_key"],
+        set_={
+            "income": MonthlyRollup.income + stmt.excluded.income,
+            "expense": MonthlyRollup.expense + stmt.excluded.expense,
+            "count": MonthlyRollup.count + stmt.excluded.count,
+        },
+    )
+    rows = [
+        {
+            "user_key": user_key,
+            "month": month,
+            "category_key": category_key,
+            "income": income,
+            "expense": expense,
+            "count": count,
+        }
+        for (user_key, month, category_key), (income, expense, count) in sorted(
+            deltas.items()
+        )
+    ]
+    await db.execute(stmt, rows)
+
+    users = {user_key for user_key, _, _ in deltas}
+    await db.execute(
+        delete(MonthlyRollup).where(
+            MonthlyRollup.user_key.in_(users), MonthlyRollup.count <= 0
+        )
+    )
+
+
+async def monthly_report(
+    db: AsyncSession,
+    *,
+    user_id: Optional[str],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category_id: Optional[str] = None,
+) -> List[MonthlyRollup]:
+    """
+    Итоги пользователя по месяцам и категориям.
+
+    Читается диапазон первичного ключа (user_key, month, ...): число строк
+    - месяцы x категории, независимо от числа операций.
+
+    Args:
+        db: Сессия БД
+        user_id: Владелец (None - операции без владельца)
+        start: Первый месяц (любой день месяца), включительно
+        end: Последний месяц (любой день месяца), включительно
+        category_id: Только эта категория
+
+    Returns:
+        Строки итогов по (month, category_key)
+    """
+    query = select(MonthlyRollup).where(MonthlyRollup.user_key == (user_id or ""))
+    if start is not None:
+        query = query.where(MonthlyRollup.month >= start.replace(day=1))
+    if end is not None:
+        query = query.where(MonthlyRollup.month <= end.replace(day=1))
+    if category_id is not None:
+        query = query.where(MonthlyRollup.category_key == category_id)
+
+    query = query.order_by(MonthlyRollup.month, MonthlyRollup.category_key)
+    result = await db.execute(query)
+    return list(result.scalars().all())
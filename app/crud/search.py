@@ -0,0 +1,104 @@
+"""
+Бэкенды полнотекстового поиска по заметкам.
+
+Каждый бэкенд строит подзапрос (id, score) по совпадениям, где больший
+score - более релевантный результат. CRUDNote.search сортирует по
+(score DESC, id) и листает выдачу курсором по этой паре.
+
+Структуры для поиска (tsvector/pg_trgm, FTS5) создаются в
+app/models/search.py.
+"""
+
+import re
+from typing import Any
+
+from sqlalchemy import (
+    ColumnClause,
+    Select,
+    cast,
+    column,
+    false,
+    func,
+    literal_column,
+    select,
+    table,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from app.core.config import settings
+from app.models.note import Note
+
+
+class SearchBackend:
+    """Базовый бэкенд поиска: подстрока в заголовке (ILIKE), score = 0."""
+
+    def ranked(self, query: str) -> Select:
+        """
+        Подзапрос совпадений.
+
+        Args:
+            query: Поисковая строка пользователя
+
+        Returns:
+            SELECT с колонками id и score
+        """
+        return select(Note.id, literal_column("0.0").label("score")).where(
+            Note.title.ilike(f"%{query}%")
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    PostgreSQL: tsvector + GIN для слов и pg_trgm для опечаток.
+
+    Совпадением считается попадание по tsquery или trigram-похожесть
+    заголовка; score = ts_rank + similarity.
+    """
+
+    def ranked(self, query: str) -> Select:
+        tsquery = func.websearch_to_tsquery(
+            cast(settings.SEARCH_TS_CONFIG, REGCONFIG), query
+        )
+        vector: ColumnClause[Any] = literal_column("notes.search_vector")
+        score = func.ts_rank(vector, tsquery) + func.similarity(Note.title, query)
+        return select(Note.id, score.label("score")).where(
+            vector.op("@@")(tsquery) | Note.title.op("%")(query)
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    SQLite: FTS5 таблица notes_fts, заметка - через notes_fts_ids.
+
+    Каждое слово запроса ищется как префикс (терпимость к окончаниям и
+    недописанным словам), score = -bm25 (в FTS5 меньше - лучше).
+    """
+
+    fts = table("notes_fts", column("rowid"))
+    fts_ids = table("notes_fts_ids", column("rowid"), column("note_id"))
+
+    def ranked(self, query: str) -> Select:
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return select(Note.id, literal_column("0.0").label("score")).where(false())
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        fts_table: ColumnClause[Any] = literal_column("notes_fts")
+        return (
+            select(Note.id, (-func.bm25(fts_table)).label("score"))
+            .select_from(self.fts)
+            .join(self.fts_ids, self.fts_ids.c.rowid == self.fts.c.rowid)
+            .join(Note.__table__, Note.id == self.fts_ids.c.note_id)
+            .where(fts_table.op("MATCH")(match))
+        )
+
+
+_backends = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SQLiteSearchBackend(),
+}
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    """Бэкенд поиска для СУБД (для неизвестных - ILIKE по заголовку)."""
+    return _backends.get(dialect_name, SearchBackend())
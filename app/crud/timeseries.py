@@ -0,0 +1,162 @@
+"""
+Ряды доходов и расходов по дням, неделям и месяцам.
+
+Группировка выполняется в БД: операции пользователя за период читаются
+по индексу (user_id, occurred_at), в ответ уходит по строке на непустой
+интервал. Интервал считается по UTC функциями СУБД:
+
+- PostgreSQL: date_trunc('day' | 'week' | 'month', occurred_at в UTC);
+- SQLite: date() / strftime(); неделя начинается с понедельника, как
+  у date_trunc('week').
+
+Суммы - в базовой валюте: base_amount операций (посчитана при записи по
+курсу на день операции), как и в monthly_rollups.
+
+Пустые интервалы дополняются нулями здесь же, чтобы ряд был плотным.
+Плановые повторения правил (их нет в transactions) можно добавить к
+ряду, передав их в planned.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Literal, Optional, Sequence
+
+from sqlalchemy import Date, case, cast, func, literal_column, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.transaction import Transaction
+
+Granularity = Literal["day", "week", "month"]
+
+
+@dataclass
+class Series:
+    """Плотный ряд: значения i-го интервала лежат в i-х элементах списков."""
+
+    buckets: List[date]
+    income: List[int]
+    expense: List[int]
+    count: List[int]
+
+
+def bucket_start(value: date, granularity: Granularity) -> date:
+    """Начало интервала, в который попадает день."""
+    if granularity == "week":
+        return value - timedelta(days=value.weekday())
+    if granularity == "month":
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value: date, granularity: Granularity) -> date:
+    """Начало следующего интервала (value - начало интервала)."""
+    if granularity == "day":
+        return value + timedelta(days=1)
+    if granularity == "week":
+        return value + timedelta(weeks=1)
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def bucket_count(start: date, end: date, granularity: Granularity) -> int:
+    """Число интервалов в плотном ряду с start по end включительно."""
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == "day":
+        return (last - first).days + 1
+    if granularity == "week":
+        return (last - first).days // 7 + 1
+    return (last.year - first.year) * 12 + last.month - first.month + 1
+
+
+def bucket_expr(dialect: str, granularity: Granularity) -> Any:
+    """Выражение начала интервала операции (тип Date) для диалекта."""
+    column = Transaction.occurred_at
+    if dialect == "postgresql":
+        # Литералы, а не параметры: иначе выражения в SELECT и GROUP BY
+        # получат разные параметры, и Postgres не сочтет их одинаковыми
+        utc = func.timezone(literal_column("'UTC'"), column)
+        return cast(func.date_trunc(literal_column(f"'{granularity}'"), utc), Date)
+    if granularity == "week":
+        # Ближайшее воскресенье (или тот же день) минус 6 дней - понедельник
+        expr = func.date(column, "weekday 0", "-6 days")
+    elif granularity == "month":
+        expr = func.strftime("%Y-%m-01", column)
+    else:
+        expr = func.date(column)
+    # SQLite возвращает строку 'YYYY-MM-DD', тип Date ее разбирает
+    return type_coerce(expr, Date)
+
+
+async def timeseries(
+    db: AsyncSession,
+    *,
+    user_id: Optional[str],
+    granularity: Granularity,
+    start: date,
+    end: date,
+    category_id: Optional[str] = None,
+    planned: Sequence[Any] = (),
+) -> Series:
+    """
+    Доходы, расходы и число операций пользователя по интервалам.
+
+    Args:
+        db: Сессия БД
+        user_id: Владелец (None - операции без владельца)
+        granularity: Интервал: day, week или month
+        start: Первый день периода, включительно
+        end: Последний день периода, включительно
+        category_id: Только эта категория
+        planned: Плановые повторения правил (Occurrence), которые
+            добавляются к операциям
+
+    Returns:
+        Плотный ряд с первого по последний интервал периода
+    """
+    filters = [
+        (
+            Transaction.user_id.is_(None)
+            if user_id is None
+            else Transaction.user_id == user_id
+        ),
+        # Полуинтервал по самой колонке - диапазон индекса (user_id, occurred_at)
+        Transaction.occurred_at >= datetime.combine(start, time(), timezone.utc),
+        Transaction.occurred_at
+        < datetime.combine(end + timedelta(days=1), time(), timezone.utc),
+    ]
+    if category_id is not None:
+        filters.append(Transaction.category_id == category_id)
+
+    bucket = bucket_expr(db.get_bind().dialect.name, granularity).label("bucket")
+    amount = Transaction.base_amount
+    query = (
+        select(
+            bucket,
+            func.sum(case((amount > 0, amount), else_=0)),
+            func.sum(case((amount < 0, -amount), else_=0)),
+            func.count(),
+        )
+        .where(*filters)
+        .group_by(bucket)
+    )
+
+    rows: Dict[date, List[int]] = {
+        row[0]: [int(row[1]), int(row[2]), row[3]] for row in await db.execute(query)
+    }
+    for occurrence in planned:
+        key = bucket_start(occurrence.occurrence_date, granularity)
+        totals = rows.setdefault(key, [0, 0, 0])
+        totals[0 if occurrence.amount > 0 else 1] += abs(occurrence.amount)
+        totals[2] += 1
+
+    series = Series(buckets=[], income=[], expense=[], count=[])
+    current = bucket_start(start, granularity)
+    for _ in range(bucket_count(start, end, granularity)):
+        row = rows.get(current)
+        series.buckets.append(current)
+        series.income.append(row[0] if row else 0)
+        series.expense.append(row[1] if row else 0)
+        series.count.append(row[2] if row else 0)
+        current = next_bucket(current, granularity)
+    return series
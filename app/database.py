@@ -6,8 +6,11 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine,
 )
 from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
+from app.core.pool import InstrumentedPool, PoolMonitor
+from app.core.replicas import ReplicaSet, RoutingSession
 
 
 # class Base(DeclarativeBase):
@@ -18,19 +21,67 @@ from app.core.config import settings
 # Используем SQLite для разработки, PostgreSQL для продакшена
 DATABASE_URL = settings.database_url if not settings.DEBUG else settings.sqlite_url
 
+
+def server_settings() -> dict:
+    """Параметры сессии Postgres, которые asyncpg задает каждому соединению"""
+    options = {
+        "statement_timeout": settings.DB_STATEMENT_TIMEOUT_MS,
+        "lock_timeout": settings.DB_LOCK_TIMEOUT_MS,
+        "idle_in_transaction_session_timeout": (
+            settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS
+        ),
+    }
+    result = {name: str(value) for name, value in options.items() if value}
+    if settings.DB_APPLICATION_NAME:
+        result["application_name"] = settings.DB_APPLICATION_NAME
+    return result
+
+
+def engine_options(url: str) -> dict:
+    """Параметры create_async_engine: пул из Settings, настройки соединения"""
+    options = dict(
+        echo=settings.DEBUG,  # Показывать SQL запросы в консоли при DEBUG=true
+        future=True,
+        pool_pre_ping=True,  # Проверка соединения перед использованием
+        poolclass=InstrumentedPool,  # Очередь с замером ожидания
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if make_url(url).get_backend_name() == "postgresql":
+        options["connect_args"] = {"server_settings": server_settings()}
+    return options
+
+
 # Создаем движок для подключения
-engine: AsyncEngine = create_async_engine(
-    DATABASE_URL,
-    echo=settings.DEBUG,  # Показывать SQL запросы в консоли при DEBUG=true
-    future=True,
-    pool_pre_ping=True,  # Проверка соединения перед использованием
-    pool_recycle=3600,  # Пересоздание соединений каждый час
+engine: AsyncEngine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+# Счетчики пула: /internal/pool и /internal/metrics
+pool_monitor = PoolMonitor(long_held_seconds=settings.DB_LONG_HELD_SECONDS).attach(
+    engine
+)
+
+# Реплики для чтения (см. app/core/replicas.py); пустой набор - без реплик
+replicas = ReplicaSet(
+    [
+        create_async_engine(url, **engine_options(url))
+        for url in settings.DB_REPLICA_URLS
+    ],
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
 )
 
-# Создаем фабрику сессий
+# Счетчики пулов реплик (в порядке replicas.engines)
+replica_pool_monitors = [
+    PoolMonitor(long_held_seconds=settings.DB_LONG_HELD_SECONDS).attach(replica)
+    for replica in replicas.engines
+]
+
+# Создаем фабрику сессий (SELECT может уйти на реплику, см. get_db)
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -57,6 +108,8 @@ class Database:
     async def disconnect(self):
         """Закрыть соединения с БД"""
         await self.engine.dispose()
+        for replica in replicas.engines:
+            await replica.dispose()
 
 
 # Создаем глобальный экземпляр для использования в скриптах
@@ -2,20 +2,29 @@
 Основной файл приложения FastAPI.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import List, Optional
 from uuid import UUID, uuid4
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import api_router
+from app.api.endpoints import internal
 from app.core.config import settings
-from app.database import database, AsyncSessionLocal
+from app.core.prefix_index import warm_up
+from app.core.schema import (
+    SchemaMismatchError,
+    check_fingerprint,
+    store_fingerprint,
+)
+from app.core.replicas import SAFE_METHODS, pin_to_primary
+from app.database import database, AsyncSessionLocal, replicas
 from app.models.base import Base  # Импортируем Base из моделей
 
 
@@ -29,17 +38,57 @@ async def lifespan(app: FastAPI):
     # Startup: инициализация БД
     print("🚀 Инициализация базы данных...")
     await init_database()
+    # Индексы автодополнения строятся в фоне: старт их не ждет
+    warm_up_task = asyncio.create_task(warm_up_suggest())
+    # Проверка реплик (если они настроены)
+    health_task = None
+    if replicas:
+        health_task = asyncio.create_task(
+            replicas.run_health_checks(settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS)
+        )
 
     yield
 
+    warm_up_task.cancel()
+    if health_task is not None:
+        health_task.cancel()
+
     # Shutdown: очистка ресурсов
     print("👋 Закрытие соединений с БД...")
     await database.disconnect()
 
 
+# =========== ПРОГРЕВ АВТОДОПОЛНЕНИЯ ===========
+async def warm_up_suggest():
+    """Построить индексы префиксов (GET /notes/suggest) после старта"""
+    try:
+        await warm_up(AsyncSessionLocal)
+        print("✅ Индексы автодополнения построены")
+    except Exception as e:
+        # Не страшно: индекс построится при первом запросе подсказок
+        print(f"⚠️  Индексы автодополнения не построены: {e}")
+
+
 # =========== ФУНКЦИЯ ИНИЦИАЛИЗАЦИИ БД ===========
 async def init_database():
-    """Создание таблиц в базе данных, если они не существуют"""
+    """
+    Подготовка БД при старте (DB_STARTUP_MODE, см. app/core/schema.py).
+
+    create_all - создание недостающих таблиц и запись отпечатка схемы
+    (если колонки существующих таблиц совпадают с моделями);
+    fingerprint - сверка отпечатка одним запросом без DDL.
+
+    Raises:
+        SchemaMismatchError: (fingerprint) схема не создана или другая
+        Exception: (fingerprint) нет подключения к БД
+    """
+    if settings.DB_STARTUP_MODE == "fingerprint":
+        # Без БД или со старой схемой воркер не должен принимать запросы
+        async with database.engine.connect() as conn:
+            fingerprint = await check_fingerprint(conn, Base.metadata)
+        print(f"✅ Схема БД совпадает с моделями ({fingerprint[:12]})")
+        return
+
     try:
         # Проверяем подключение
         await database.connect()
@@ -51,6 +100,13 @@ async def init_database():
 
         print("✅ Таблицы созданы/проверены")
 
+        # Отпечаток - только если create_all не оставил старые таблицы
+        try:
+            async with database.engine.begin() as conn:
+                await store_fingerprint(conn, Base.metadata)
+        except SchemaMismatchError as e:
+            print(f"⚠️  {e}")
+
         # await create_initial_data()
 
     except Exception as e:
@@ -106,7 +162,24 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Last-Modified"],
     )
 
+
+# =========== READ-YOUR-WRITES ===========
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """
+    После успешной записи чтения клиента какое-то время идут на основную
+    БД: реплика может еще не получить его изменения.
+    """
+    response = await call_next(request)
+    if replicas and request.method not in SAFE_METHODS and response.status_code < 400:
+        pin_to_primary(response, settings.READ_YOUR_WRITES_SECONDS)
+    return response
+
+
 # =========== ПОДКЛЮЧЕНИЕ API РОУТЕРОВ ===========
 app.include_router(api_router, prefix=settings.API_PREFIX)
+# Служебные эндпоинты (пул соединений, метрики) - вне API_PREFIX
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
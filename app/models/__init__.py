@@ -7,5 +7,28 @@ from app.models.base import Base, BaseModel
 from app.models.note import Note
 from app.models.category import Category
 from app.models.user import User
+from app.models.transaction import Transaction
+from app.models.rollup import MonthlyRollup
+from app.models.budget import Budget
+from app.models.recurrence import RecurringRule
+from app.models.category_rule import CategoryRule
+from app.models.fx_rate import FxRate
+from app.models.schema_version import SchemaVersion
 
-__all__ = ["Base", "BaseModel", "Note", "Category", "User"]
+# Регистрирует DDL полнотекстового поиска для таблицы notes
+from app.models import search  # noqa: F401
+
+__all__ = [
+    "Base",
+    "BaseModel",
+    "Note",
+    "Category",
+    "User",
+    "Transaction",
+    "MonthlyRollup",
+    "Budget",
+    "RecurringRule",
+    "CategoryRule",
+    "FxRate",
+    "SchemaVersion",
+]
@@ -1,7 +1,7 @@
 import uuid
-from datetime import datetime
-from sqlalchemy import DateTime, String, func, null
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from datetime import datetime, timezone
+from sqlalchemy import DateTime, Index, String, func, null
+from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, mapped_column
 
 
 class Base(DeclarativeBase):
@@ -21,9 +21,28 @@ class BaseModel(Base):
     - id: уникальный идентификатор (UUID)
     - created_at: когда создана запись
     - updated_at: когда обновлена запись
+
+    Индекс (created_at, id) нужен для keyset пагинации (см. CRUDBase.get_page).
     """
 
     __abstract__ = True
+
+    # Серверные значения (created_at/updated_at) забираются тем же
+    # INSERT/UPDATE через RETURNING, без отдельного refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        return (
+            Index(f"ix_{cls.__tablename__}_created_at_id", "created_at", "id"),
+            *cls._extra_indexes(),
+        )
+
+    @classmethod
+    def _extra_indexes(cls) -> tuple:
+        """Дополнительные индексы модели (к индексу пагинации)."""
+        return ()
+
     id: Mapped[str] = mapped_column(
         String(36),
         primary_key=True,
@@ -31,14 +50,23 @@ class BaseModel(Base):
         index=True,
     )
 
+    # Python-default дает микросекунды и одинаковый формат хранения на всех
+    # СУБД (на SQLite CURRENT_TIMESTAMP округляет до секунд); server_default
+    # остается для вставок в обход ORM
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
     )
 
+    # По updated_at строятся ETag/Last-Modified, поэтому нужны микросекунды
+    # и при обновлении (см. created_at)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
         server_default=func.now(),
-        onupdate=func.now(),
+        onupdate=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
 
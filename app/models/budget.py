@@ -0,0 +1,71 @@
+from typing import Optional
+
+from sqlalchemy import BigInteger, ForeignKey, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import BaseModel
+
+# Строки, которые не различает ix_budgets_user_id_category_id
+_NULL_KEYS = "user_id IS NULL OR category_id IS NULL"
+
+
+class Budget(BaseModel):
+    """
+    Модель для месячного бюджета расходов.
+
+    Таблица: budgets
+    Поля:
+    - id, created_at, updated_at (из BaseModel)
+    - user_id: владелец бюджета
+    - category_id: категория; NULL - бюджет на все расходы месяца
+    - amount: лимит расходов за месяц, копейки
+
+    Потраченное за месяц не хранится в бюджете: оно уже лежит в
+    monthly_rollups (пользователь, месяц, категория) и меняется в той же
+    транзакции, что и операции, поэтому изменение лимита ничего не
+    пересчитывает (см. app/crud/crud_budget.py).
+    """
+
+    __tablename__ = "budgets"
+
+    # Владелец; NULL - бюджет без владельца (создан без X-User-Id)
+    user_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    # Категория; бюджет удаляется вместе с категорией
+    category_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    # Лимит в копейках (> 0)
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    @classmethod
+    def _extra_indexes(cls) -> tuple:
+        return (
+            # Один бюджет на категорию у пользователя
+            Index(
+                "ix_budgets_user_id_category_id",
+                "user_id",
+                "category_id",
+                unique=True,
+            ),
+            # NULL в уникальном индексе не конфликтуют: один общий бюджет
+            # (и бюджет без владельца) - через "" вместо NULL, как ключи
+            # monthly_rollups
+            Index(
+                "ix_budgets_null_keys",
+                text("coalesce(user_id, '')"),
+                text("coalesce(category_id, '')"),
+                unique=True,
+                sqlite_where=text(_NULL_KEYS),
+                postgresql_where=text(_NULL_KEYS),
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"<Budget(id={self.id}, category_id={self.category_id})>"
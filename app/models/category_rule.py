@@ -0,0 +1,62 @@
+from typing import Optional
+
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import BaseModel
+
+
+class CategoryRule(BaseModel):
+    """
+    Модель для правила автоматической категоризации операций.
+
+    Таблица: category_rules
+    Поля:
+    - id, created_at, updated_at (из BaseModel)
+    - user_id: владелец правила
+    - category_id: категория, которую правило назначает
+    - kind: keyword (подстрока без учета регистра) или regex
+    - pattern: ключевое слово или регулярное выражение
+    - priority: при нескольких совпадениях побеждает меньший priority
+
+    Правила пользователя компилируются в один автомат (см.
+    app/crud/classifier.py) и применяются к описанию операций без
+    категории.
+    """
+
+    __tablename__ = "category_rules"
+
+    # Владелец; NULL - правило без владельца (создано без X-User-Id)
+    user_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    # Категория; правило удаляется вместе с ней
+    category_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("categories.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # keyword или regex
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)
+
+    pattern: Mapped[str] = mapped_column(String(200), nullable=False)
+
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    @classmethod
+    def _extra_indexes(cls) -> tuple:
+        # Правила пользователя в порядке применения
+        return (
+            Index(
+                "ix_category_rules_user_id_priority",
+                "user_id",
+                "priority",
+                "created_at",
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"<CategoryRule(id={self.id}, {self.kind}={self.pattern!r})>"
@@ -0,0 +1,37 @@
+from datetime import date
+
+from sqlalchemy import Date, Index, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import BaseModel
+
+
+class FxRate(BaseModel):
+    """
+    Модель для курса валюты к базовой валюте (BASE_CURRENCY) на дату.
+
+    Таблица: fx_rates
+    Поля:
+    - id, created_at, updated_at (из BaseModel)
+    - currency: код валюты ISO 4217
+    - day: дата курса
+    - rate: сколько единиц базовой валюты стоит единица currency
+
+    Курс действует с даты day до следующего курса той же валюты.
+    Загружается из локальных файлов (см. app/crud/fx.py).
+    """
+
+    __tablename__ = "fx_rates"
+
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+
+    rate: Mapped[float] = mapped_column(Numeric(20, 10), nullable=False)
+
+    @classmethod
+    def _extra_indexes(cls) -> tuple:
+        # Один курс валюты на дату (ключ UPSERT загрузки)
+        return (Index("ix_fx_rates_currency_day", "currency", "day", unique=True),)
+
+    def __repr__(self) -> str:
+        return f"<FxRate({self.currency} {self.day}: {self.rate})>"
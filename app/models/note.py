@@ -1,4 +1,6 @@
-from sqlalchemy import String, Text
+from typing import Optional
+
+from sqlalchemy import ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.models.base import BaseModel
 
@@ -12,6 +14,10 @@ class Note(BaseModel):
     - id, created_at, updated_at (из BaseModel)
     - title: заголовок заметки
     - content: описание/комментарий
+    - user_id: владелец заметки
+
+    Индекс (user_id, created_at, id) - keyset пагинация заметок одного
+    пользователя (см. CRUDBase.for_owner).
     """
 
     __tablename__ = "notes"  # Имя таблицы в БД
@@ -30,6 +36,17 @@ class Note(BaseModel):
         default=None,  # Значение по умолчанию
     )
 
+    # Владелец заметки; NULL - заметка без владельца (создана без X-User-Id)
+    user_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    @classmethod
+    def _extra_indexes(cls) -> tuple:
+        return (Index("ix_notes_user_id_created_at_id", "user_id", "created_at", "id"),)
+
     def __repr__(self) -> str:
         """Более информативное строковое представление"""
         return f"<Note(id={self.id}, title='{self.title[:20]}...')>"
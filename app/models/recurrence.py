@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import BaseModel
+
+
+class RecurringRule(BaseModel):
+    """
+    Модель для правила повторяющейся операции (аренда, подписка, зарплата).
+
+    Таблица: recurring_rules
+    Поля:
+    - id, created_at, updated_at (из BaseModel)
+    - user_id: владелец правила
+    - amount, category_id, description: шаблон операции
+    - frequency: daily, weekly или monthly
+    - interval: каждые N дней/недель/месяцев
+    - weekday: день недели для weekly (0 - понедельник)
+    - month_day: число для monthly (в коротком месяце - последний день)
+    - starts_on, ends_on: период действия (ends_on NULL - бессрочно)
+
+    Будущие операции по правилу не вставляются: даты считаются на лету
+    для запрошенного окна (см. app/crud/recurrence.py). В transactions
+    попадают только подтвержденные или измененные повторения - с rule_id
+    и occurrence_date.
+    """
+
+    __tablename__ = "recurring_rules"
+
+    # Владелец; NULL - правило без владельца (создано без X-User-Id)
+    user_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    # Шаблон операции
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    category_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("categories.id", ondelete="RESTRICT"),
+        nullable=True,
+    )
+    description: Mapped[Optional[str]] = mapped_column(
+        String(200),
+        nullable=True,
+        default=None,
+    )
+
+    # Расписание
+    frequency: Mapped[str] = mapped_column(String(10), nullable=False)
+    interval: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    weekday: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    month_day: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    starts_on: Mapped[date] = mapped_column(Date, nullable=False)
+    ends_on: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+    @classmethod
+    def _extra_indexes(cls) -> tuple:
+        return (
+            # Правила пользователя, действующие в окне
+            Index("ix_recurring_rules_user_id_starts_on", "user_id", "starts_on"),
+        )
+
+    def __repr__(self) -> str:
+        return f"<RecurringRule(id={self.id}, frequency={self.frequency!r})>"
@@ -0,0 +1,43 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class MonthlyRollup(Base):
+    """
+    Помесячные итоги операций по (пользователь, категория, месяц).
+
+    Таблица: monthly_rollups
+    Производная от transactions: строки меняются только вместе с
+    операциями, в той же транзакции (см. CRUDTransaction), поэтому отчет
+    читает O(месяцы x категории) строк вместо всех операций.
+
+    Поля:
+    - user_key: ID владельца, "" - операции без владельца
+    - category_key: ID категории, "" - операции без категории
+    - month: первое число месяца (UTC)
+    - income: сумма доходов, копейки
+    - expense: сумма расходов (положительное число), копейки
+    - count: число операций
+
+    Пустые ключи вместо NULL: NULL в первичном ключе не допускается, а
+    ON CONFLICT не находит строки с NULL.
+    """
+
+    __tablename__ = "monthly_rollups"
+
+    user_key: Mapped[str] = mapped_column(String(36), primary_key=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    category_key: Mapped[str] = mapped_column(String(36), primary_key=True)
+
+    income: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    expense: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<MonthlyRollup(user={self.user_key!r}, month={self.month}, "
+            f"category={self.category_key!r})>"
+        )
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class SchemaVersion(Base):
+    """
+    Отпечаток схемы, с которой создана БД.
+
+    Таблица: schema_version
+    Поля:
+    - fingerprint: SHA-256 DDL моделей (см. app/core/schema.py)
+    - applied_at: когда схема создана или проверена create_all
+
+    Одна строка: пишется после create_all, читается при старте с
+    DB_STARTUP_MODE=fingerprint вместо DDL.
+    """
+
+    __tablename__ = "schema_version"
+
+    fingerprint: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    applied_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<SchemaVersion({self.fingerprint[:12]})>"
@@ -0,0 +1,102 @@
+"""
+DDL полнотекстового поиска по заметкам.
+
+Индексы поиска зависят от СУБД и не описываются колонками модели, поэтому
+создаются слушателями after_create таблицы notes:
+
+- PostgreSQL: генерируемая колонка search_vector (tsvector по title +
+  content) с GIN индексом и trigram индекс по title (pg_trgm) для
+  поиска с опечатками;
+- SQLite: FTS5 таблица notes_fts без копии текста (content=''), ключ
+  строки - целый rowid из notes_fts_ids (note_id -> rowid); обе
+  синхронизируются триггерами на INSERT/UPDATE/DELETE.
+
+Запросы к этим структурам - в app/crud/search.py.
+"""
+
+from sqlalchemy import DDL, event
+
+from app.core.config import settings
+from app.models.note import Note
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    ALTER TABLE notes ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector(
+            '{settings.SEARCH_TS_CONFIG}'::regconfig,
+            coalesce(title, '') || ' ' || coalesce(content, '')
+        )
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_notes_search_vector "
+    "ON notes USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_notes_title_trgm "
+    "ON notes USING GIN (title gin_trgm_ops)",
+]
+
+SQLITE_DDL = [
+    # Ключ FTS: у notes строковый первичный ключ, и ее неявный rowid
+    # VACUUM может перенумеровать. У notes_fts_ids rowid - INTEGER PRIMARY
+    # KEY (псевдоним, VACUUM его сохраняет)
+    """
+    CREATE TABLE IF NOT EXISTS notes_fts_ids (
+        rowid INTEGER PRIMARY KEY,
+        note_id VARCHAR(36) NOT NULL UNIQUE
+    )
+    """,
+    # Без своей копии текста (content=''): поиску нужны только rowid и bm25
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, content,
+        content='',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts_ids (note_id) VALUES (new.id);
+        INSERT INTO notes_fts (rowid, title, content)
+        SELECT rowid, new.title, new.content
+        FROM notes_fts_ids WHERE note_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        SELECT 'delete', rowid, old.title, old.content
+        FROM notes_fts_ids WHERE note_id = old.id;
+        DELETE FROM notes_fts_ids WHERE note_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE ON notes BEGIN
+        INSERT INTO notes_fts (notes_fts, rowid, title, content)
+        SELECT 'delete', rowid, old.title, old.content
+        FROM notes_fts_ids WHERE note_id = old.id;
+        UPDATE notes_fts_ids SET note_id = new.id WHERE note_id = old.id;
+        INSERT INTO notes_fts (rowid, title, content)
+        SELECT rowid, new.title, new.content
+        FROM notes_fts_ids WHERE note_id = new.id;
+    END
+    """,
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(
+        Note.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+
+for statement in SQLITE_DDL:
+    event.listen(
+        Note.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+
+# Триггеры удаляются вместе с notes, а таблицы поиска нужно удалить явно
+for name in ("notes_fts", "notes_fts_ids"):
+    event.listen(
+        Note.__table__,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {name}").execute_if(dialect="sqlite"),
+    )
@@ -0,0 +1,122 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.config import settings
+from app.models.base import BaseModel
+
+
+class Transaction(BaseModel):
+    """
+    Модель для операций (расходов/доходов) с суммой.
+
+    Таблица: transactions
+    Поля:
+    - id, created_at, updated_at (из BaseModel)
+    - amount: сумма в минимальных единицах валюты (копейках), > 0 - доход,
+      < 0 - расход; целое число, без ошибок округления float
+    - currency: валюта суммы (ISO 4217), по умолчанию BASE_CURRENCY
+    - base_amount: сумма в копейках BASE_CURRENCY по курсу на день
+      операции; считается при записи (см. CRUDTransaction), итоги и
+      отчеты берут ее, поэтому загрузка новых курсов их не сдвигает
+    - occurred_at: когда произошла операция
+    - category_id: категория (может не быть)
+    - user_id: владелец операции
+    - description: комментарий
+    - rule_id, occurrence_date: повторение правила, которое подтвердили
+      или изменили (у обычных операций NULL)
+    - fingerprint: отпечаток строки выписки, из которой операция
+      импортирована (у остальных операций NULL)
+
+    Помесячные итоги лежат в monthly_rollups и обновляются в той же
+    транзакции, что и операции (см. CRUDTransaction); суммы в других
+    валютах входят в них суммой base_amount (см. app/crud/fx.py).
+    """
+
+    __tablename__ = "transactions"
+
+    # Сумма в копейках
+    amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    # Валюта суммы
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default=settings.BASE_CURRENCY
+    )
+
+    # Сумма в копейках базовой валюты (для операций в ней равна amount)
+    base_amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    # Дата и время операции
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    # Категория; удалить категорию с операциями нельзя (RESTRICT)
+    category_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("categories.id", ondelete="RESTRICT"),
+        nullable=True,
+    )
+
+    # Владелец; NULL - операция без владельца (создана без X-User-Id)
+    user_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+
+    # Комментарий
+    description: Mapped[Optional[str]] = mapped_column(
+        String(200),
+        nullable=True,
+        default=None,
+    )
+
+    # Правило повторения и дата повторения по расписанию; операция
+    # остается, если правило удалено
+    rule_id: Mapped[Optional[str]] = mapped_column(
+        String(36),
+        ForeignKey("recurring_rules.id", ondelete="SET NULL"),
+        nullable=True,
+        default=None,
+    )
+    occurrence_date: Mapped[Optional[date]] = mapped_column(
+        Date, nullable=True, default=None
+    )
+
+    # Отпечаток импортированной строки (см. import_fingerprint): повторный
+    # импорт той же строки отсекается уникальным индексом. После изменения
+    # операции отпечаток остается прежним - строка выписки та же
+    fingerprint: Mapped[Optional[str]] = mapped_column(
+        String(32), nullable=True, default=None
+    )
+
+    @classmethod
+    def _extra_indexes(cls) -> tuple:
+        return (
+            # Одно подтвержденное повторение на дату правила
+            Index(
+                "ix_transactions_rule_id_occurrence_date",
+                "rule_id",
+                "occurrence_date",
+                unique=True,
+            ),
+            # Одна операция на строку выписки (NULL не конфликтуют)
+            Index("ix_transactions_fingerprint", "fingerprint", unique=True),
+            # Страницы операций пользователя (см. CRUDBase.for_owner)
+            Index(
+                "ix_transactions_user_id_created_at_id", "user_id", "created_at", "id"
+            ),
+            # Выборки пользователя по периоду (отчеты); на Postgres сумма и
+            # категория лежат в индексе - ряды считаются index-only scan
+            Index(
+                "ix_transactions_user_id_occurred_at",
+                "user_id",
+                "occurred_at",
+                postgresql_include=["base_amount", "category_id"],
+            ),
+        )
+
+    def __repr__(self) -> str:
+        return f"<Transaction(id={self.id}, amount={self.amount})>"
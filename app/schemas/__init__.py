@@ -6,6 +6,33 @@
 from app.schemas.note import NoteSchema, NoteCreate, NoteUpdate, Note
 from app.schemas.category import Category, CategoryCreate, CategoryUpdate
 from app.schemas.user import User, UserCreate, UserUpdate
+from app.schemas.transaction import (
+    Transaction,
+    TransactionCreate,
+    TransactionUpdate,
+)
+from app.schemas.budget import Budget, BudgetCreate, BudgetUpdate, BudgetStatus
+from app.schemas.recurrence import (
+    Occurrence,
+    OccurrenceConfirm,
+    RecurringRule,
+    RecurringRuleCreate,
+    RecurringRuleUpdate,
+)
+from app.schemas.category_rule import (
+    CategoryRule,
+    CategoryRuleCreate,
+    CategoryRuleUpdate,
+    Classification,
+    ClassifyRequest,
+)
+from app.schemas.imports import ImportJob, ImportRowError
+from app.schemas.report import (
+    AnalyticsReport,
+    CategoryTotals,
+    MonthlyReportRow,
+    TimeSeries,
+)
 
 __all__ = [
     # Note schemas
@@ -21,4 +48,33 @@ __all__ = [
     "User",
     "UserCreate",
     "UserUpdate",
+    # Transaction schemas
+    "Transaction",
+    "TransactionCreate",
+    "TransactionUpdate",
+    # Budget schemas
+    "Budget",
+    "BudgetCreate",
+    "BudgetUpdate",
+    "BudgetStatus",
+    # Recurring rule schemas
+    "RecurringRule",
+    "RecurringRuleCreate",
+    "RecurringRuleUpdate",
+    "Occurrence",
+    "OccurrenceConfirm",
+    # Category rule schemas
+    "CategoryRule",
+    "CategoryRuleCreate",
+    "CategoryRuleUpdate",
+    "ClassifyRequest",
+    "Classification",
+    # Import schemas
+    "ImportJob",
+    "ImportRowError",
+    # Report schemas
+    "MonthlyReportRow",
+    "CategoryTotals",
+    "AnalyticsReport",
+    "TimeSeries",
 ]
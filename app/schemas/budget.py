@@ -0,0 +1,67 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional
+from datetime import date, datetime
+
+from app.schemas.transaction import MAX_AMOUNT
+
+
+class BudgetBase(BaseModel):
+    category_id: Optional[str] = Field(
+        default=None,
+        max_length=36,
+        description="ID категории (null - все расходы месяца)",
+    )
+
+    amount: int = Field(
+        ...,
+        gt=0,
+        le=MAX_AMOUNT,
+        description="Лимит расходов за месяц, копейки",
+        examples=[3000000],
+    )
+
+
+class BudgetCreate(BudgetBase):
+    pass
+
+
+class BudgetUpdate(BaseModel):
+    amount: Optional[int] = Field(
+        default=None, gt=0, le=MAX_AMOUNT, description="Новый лимит, копейки"
+    )
+
+
+class BudgetSchema(BudgetBase):
+    id: str = Field(..., description="Уникальный идентификатор бюджета")
+    user_id: Optional[str] = Field(default=None, description="ID владельца")
+    created_at: datetime = Field(..., description="Дата создания")
+    updated_at: datetime = Field(..., description="Дата последнего обновления")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BudgetStatus(BaseModel):
+    """Исполнение бюджета за месяц"""
+
+    budget_id: str = Field(..., description="ID бюджета")
+    category_id: Optional[str] = Field(
+        default=None, description="ID категории (null - все расходы)"
+    )
+    month: date = Field(..., description="Первое число месяца")
+    amount: int = Field(..., description="Лимит, копейки")
+    spent: int = Field(..., description="Потрачено за месяц, копейки")
+    remaining: int = Field(..., description="Остаток (< 0 - перерасход), копейки")
+    percent_used: float = Field(..., description="Потрачено от лимита, %")
+    over_budget: bool = Field(..., description="Потрачено больше лимита")
+
+
+Budget = BudgetSchema
+
+__all__ = [
+    "BudgetBase",
+    "BudgetCreate",
+    "BudgetUpdate",
+    "BudgetSchema",
+    "BudgetStatus",
+    "Budget",
+]
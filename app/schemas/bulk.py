@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Any, Generic, List, Optional, TypeVar
+
+ItemType = TypeVar("ItemType")
+
+
+class BulkItemError(BaseModel):
+    """Ошибка обработки одного элемента массовой операции"""
+
+    index: int = Field(..., description="Позиция элемента в запросе")
+    id: Optional[str] = Field(default=None, description="ID объекта, если известен")
+    detail: Any = Field(..., description="Описание ошибки")
+
+
+class BulkResult(BaseModel, Generic[ItemType]):
+    """Результат массовой операции: успешные объекты и ошибки по элементам"""
+
+    items: List[ItemType] = Field(default_factory=list)
+    errors: List[BulkItemError] = Field(default_factory=list)
+
+
+class BulkDelete(BaseModel):
+    """Схема для массового удаления"""
+
+    ids: List[str] = Field(..., min_length=1, description="ID объектов для удаления")
+
+
+__all__ = ["BulkItemError", "BulkResult", "BulkDelete"]
@@ -0,0 +1,120 @@
+import re
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List, Literal, Optional
+from datetime import datetime
+
+RuleKind = Literal["keyword", "regex"]
+
+# Ссылки на группы ломаются, когда выражения склеиваются в одно
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P[=<]|\(\?<(?![=!])")
+
+
+def validate_rule_pattern(kind: str, pattern: str) -> str:
+    """
+    Шаблон правила должен работать внутри общего выражения всех правил.
+
+    Raises:
+        ValueError: Пустое ключевое слово, некорректное выражение (в том
+            числе выходящее за скобки своей группы), именованные
+            группы или ссылки на группы, выражение совпадает с пустой строкой
+    """
+    if kind == "keyword":
+        if not pattern.strip():
+            raise ValueError("Пустое ключевое слово")
+        return pattern
+    if _GROUP_REFERENCE.search(pattern):
+        raise ValueError("Именованные группы и ссылки на группы не поддерживаются")
+    try:
+        bare = re.compile(pattern, re.IGNORECASE)
+        compiled = re.compile(f"({pattern})", re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Некорректное выражение: {e}") from None
+    # Выражение не должно выходить за скобки своей группы: "a)|(b"
+    # компилируется только внутри них
+    if compiled.groups != bare.groups + 1:
+        raise ValueError("Некорректное выражение: несбалансированные скобки")
+    if compiled.match(""):
+        raise ValueError("Выражение совпадает с пустой строкой")
+    return pattern
+
+
+class CategoryRuleBase(BaseModel):
+    category_id: str = Field(..., max_length=36, description="ID категории")
+
+    kind: RuleKind = Field(
+        ..., description="keyword (подстрока без учета регистра) или regex"
+    )
+
+    pattern: str = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description="Ключевое слово или регулярное выражение",
+        examples=["пятерочка"],
+    )
+
+    priority: int = Field(
+        default=0,
+        ge=-1000,
+        le=1000,
+        description="При нескольких совпадениях побеждает меньший priority",
+    )
+
+    @model_validator(mode="after")
+    def validate_pattern(self) -> "CategoryRuleBase":
+        validate_rule_pattern(self.kind, self.pattern)
+        return self
+
+
+class CategoryRuleCreate(CategoryRuleBase):
+    pass
+
+
+class CategoryRuleUpdate(BaseModel):
+    """Меняются категория и приоритет; для нового шаблона - новое правило"""
+
+    category_id: Optional[str] = Field(
+        default=None, max_length=36, description="Новая категория"
+    )
+
+    priority: Optional[int] = Field(
+        default=None, ge=-1000, le=1000, description="Новый приоритет"
+    )
+
+
+class CategoryRuleSchema(CategoryRuleBase):
+    id: str = Field(..., description="Уникальный идентификатор правила")
+    user_id: Optional[str] = Field(default=None, description="ID владельца")
+    created_at: datetime = Field(..., description="Дата создания")
+    updated_at: datetime = Field(..., description="Дата последнего обновления")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ClassifyRequest(BaseModel):
+    """Тексты для категоризации (описания операций)"""
+
+    texts: List[str] = Field(..., description="Тексты", examples=[["Пятерочка 123"]])
+
+
+class Classification(BaseModel):
+    """Категория текста по правилам"""
+
+    category_id: Optional[str] = Field(
+        default=None, description="ID категории (null - ни одно правило не подошло)"
+    )
+    rule_id: Optional[str] = Field(default=None, description="ID сработавшего правила")
+
+
+CategoryRule = CategoryRuleSchema
+
+__all__ = [
+    "CategoryRuleBase",
+    "CategoryRuleCreate",
+    "CategoryRuleUpdate",
+    "CategoryRuleSchema",
+    "CategoryRule",
+    "ClassifyRequest",
+    "Classification",
+    "validate_rule_pattern",
+]
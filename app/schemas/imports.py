@@ -0,0 +1,42 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
+from datetime import datetime
+
+
+class ImportRowError(BaseModel):
+    """Строка выписки, которая не импортирована"""
+
+    line: int = Field(..., description="Номер строки в файле (с 1)")
+    detail: str = Field(..., description="Причина")
+
+
+class ImportJobSchema(BaseModel):
+    """Состояние задачи импорта"""
+
+    id: str = Field(..., description="ID задачи")
+    status: Literal["running", "done", "failed"] = Field(
+        ..., description="running, done или failed"
+    )
+    filename: Optional[str] = Field(default=None, description="Имя файла")
+    format: Literal["csv", "ofx"] = Field(..., description="Формат выписки")
+    rows: int = Field(..., description="Прочитано строк-операций")
+    imported: int = Field(..., description="Импортировано операций")
+    skipped: int = Field(
+        default=0, description="Пропущено дубликатов (уже импортированных строк)"
+    )
+    failed: int = Field(..., description="Строк с ошибками")
+    errors: List[ImportRowError] = Field(
+        default_factory=list, description="Ошибки строк (первые IMPORT_MAX_ERRORS)"
+    )
+    detail: Optional[str] = Field(
+        default=None, description="Причина, если весь импорт не удался"
+    )
+    started_at: datetime = Field(..., description="Начало импорта")
+    finished_at: Optional[datetime] = Field(default=None, description="Конец импорта")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+ImportJob = ImportJobSchema
+
+__all__ = ["ImportRowError", "ImportJobSchema", "ImportJob"]
@@ -41,6 +41,7 @@ class NoteUpdate(BaseModel):
 
 class NoteSchema(NoteBase):
     id: str = Field(..., description="Уникальный идентификатор заметки")
+    user_id: Optional[str] = Field(default=None, description="ID владельца")
     created_at: datetime = Field(..., description="Дата создания")
     updated_at: datetime = Field(..., description="Дата последнего обновления")
 
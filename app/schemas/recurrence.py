@@ -0,0 +1,163 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from typing import Literal, Optional
+from datetime import date, datetime
+
+from app.schemas.transaction import MAX_AMOUNT, validate_amount
+
+Frequency = Literal["daily", "weekly", "monthly"]
+
+
+class RecurringRuleBase(BaseModel):
+    amount: int = Field(
+        ...,
+        ge=-MAX_AMOUNT,
+        le=MAX_AMOUNT,
+        description="Сумма повторения в копейках: > 0 доход, < 0 расход",
+        examples=[-4500000],
+    )
+
+    category_id: Optional[str] = Field(
+        default=None, max_length=36, description="ID категории"
+    )
+
+    description: Optional[str] = Field(
+        default=None,
+        max_length=200,
+        description="Комментарий (до 200 символов)",
+        examples=["Аренда квартиры"],
+    )
+
+    frequency: Frequency = Field(..., description="Частота: daily, weekly, monthly")
+
+    interval: int = Field(
+        default=1, ge=1, le=1000, description="Каждые N дней/недель/месяцев"
+    )
+
+    weekday: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=6,
+        description="День недели для weekly (0 - понедельник), по умолчанию "
+        "день недели starts_on",
+    )
+
+    month_day: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=31,
+        description="Число месяца для monthly (в коротком месяце - последний "
+        "день), по умолчанию число starts_on",
+    )
+
+    starts_on: date = Field(..., description="Первый день действия правила")
+
+    ends_on: Optional[date] = Field(
+        default=None, description="Последний день действия (null - бессрочно)"
+    )
+
+    @field_validator("amount")
+    @classmethod
+    def validate_amount(cls, v: Optional[int]) -> Optional[int]:
+        return validate_amount(v)
+
+    @model_validator(mode="after")
+    def validate_schedule(self) -> "RecurringRuleBase":
+        if self.weekday is not None and self.frequency != "weekly":
+            raise ValueError("weekday задается только для weekly")
+        if self.month_day is not None and self.frequency != "monthly":
+            raise ValueError("month_day задается только для monthly")
+        if self.ends_on is not None and self.ends_on < self.starts_on:
+            raise ValueError("ends_on раньше starts_on")
+        return self
+
+
+class RecurringRuleCreate(RecurringRuleBase):
+    pass
+
+
+class RecurringRuleUpdate(BaseModel):
+    """Меняется шаблон и конец действия; для нового расписания - новое правило"""
+
+    amount: Optional[int] = Field(
+        default=None,
+        ge=-MAX_AMOUNT,
+        le=MAX_AMOUNT,
+        description="Новая сумма в копейках",
+    )
+
+    category_id: Optional[str] = Field(
+        default=None, max_length=36, description="Новая категория"
+    )
+
+    description: Optional[str] = Field(
+        default=None, max_length=200, description="Новый комментарий"
+    )
+
+    ends_on: Optional[date] = Field(default=None, description="Новый последний день")
+
+    @field_validator("amount")
+    @classmethod
+    def validate_amount(cls, v: Optional[int]) -> Optional[int]:
+        return validate_amount(v)
+
+
+class RecurringRuleSchema(RecurringRuleBase):
+    id: str = Field(..., description="Уникальный идентификатор правила")
+    user_id: Optional[str] = Field(default=None, description="ID владельца")
+    created_at: datetime = Field(..., description="Дата создания")
+    updated_at: datetime = Field(..., description="Дата последнего обновления")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OccurrenceConfirm(BaseModel):
+    """Изменения повторения при подтверждении (пусто - как в правиле)"""
+
+    amount: Optional[int] = Field(
+        default=None,
+        ge=-MAX_AMOUNT,
+        le=MAX_AMOUNT,
+        description="Фактическая сумма в копейках",
+    )
+
+    category_id: Optional[str] = Field(
+        default=None, max_length=36, description="Другая категория"
+    )
+
+    description: Optional[str] = Field(
+        default=None, max_length=200, description="Другой комментарий"
+    )
+
+    @field_validator("amount")
+    @classmethod
+    def validate_amount(cls, v: Optional[int]) -> Optional[int]:
+        return validate_amount(v)
+
+
+class Occurrence(BaseModel):
+    """Повторение правила: подтвержденное (есть transaction_id) или плановое"""
+
+    rule_id: str = Field(..., description="ID правила")
+    occurrence_date: date = Field(..., description="Дата повторения по расписанию")
+    amount: int = Field(..., description="Сумма, копейки")
+    category_id: Optional[str] = Field(default=None, description="ID категории")
+    description: Optional[str] = Field(default=None, description="Комментарий")
+    transaction_id: Optional[str] = Field(
+        default=None, description="ID операции (null - повторение не подтверждено)"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+RecurringRule = RecurringRuleSchema
+
+__all__ = [
+    "Frequency",
+    "RecurringRuleBase",
+    "RecurringRuleCreate",
+    "RecurringRuleUpdate",
+    "RecurringRuleSchema",
+    "RecurringRule",
+    "OccurrenceConfirm",
+    "Occurrence",
+]
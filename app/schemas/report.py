@@ -0,0 +1,64 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Literal, Optional
+from datetime import date
+
+
+class MonthlyReportRow(BaseModel):
+    """Итоги одного месяца по одной категории"""
+
+    month: date = Field(..., description="Первое число месяца")
+    category_id: Optional[str] = Field(
+        default=None, description="ID категории (null - без категории)"
+    )
+    income: int = Field(..., description="Доходы, копейки")
+    expense: int = Field(..., description="Расходы (положительное число), копейки")
+    net: int = Field(..., description="Доходы минус расходы, копейки")
+    count: int = Field(..., description="Число операций")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CategoryTotals(BaseModel):
+    """Итоги периода по одной категории"""
+
+    category_id: Optional[str] = Field(
+        default=None, description="ID категории (null - без категории)"
+    )
+    income: int = Field(..., description="Доходы, копейки")
+    expense: int = Field(..., description="Расходы (положительное число), копейки")
+    count: int = Field(..., description="Число операций")
+
+
+class AnalyticsReport(BaseModel):
+    """Аналитика периода: помесячные ряды, категории и перцентили"""
+
+    currency: str = Field(..., description="Валюта сумм (базовая)")
+    months: List[date] = Field(..., description="Месяцы периода (первые числа)")
+    income: List[int] = Field(..., description="Доходы по месяцам, копейки")
+    expense: List[int] = Field(..., description="Расходы по месяцам, копейки")
+    expense_moving_avg: List[Optional[float]] = Field(
+        ..., description="Скользящее среднее расходов (null - мало данных)"
+    )
+    expense_yoy: List[Optional[int]] = Field(
+        ..., description="Расходы минус расходы того же месяца год назад"
+    )
+    by_category: List[CategoryTotals] = Field(..., description="Итоги по категориям")
+    expense_percentiles: Dict[str, float] = Field(
+        ..., description="Перцентили сумм расходов, копейки"
+    )
+
+
+class TimeSeries(BaseModel):
+    """Плотный ряд по интервалам: i-й элемент каждого списка - i-й интервал"""
+
+    granularity: Literal["day", "week", "month"] = Field(..., description="Интервал")
+    currency: str = Field(..., description="Валюта сумм (базовая)")
+    buckets: List[date] = Field(
+        ..., description="Начала интервалов (неделя - с понедельника)"
+    )
+    income: List[int] = Field(..., description="Доходы, копейки")
+    expense: List[int] = Field(..., description="Расходы (положительные), копейки")
+    count: List[int] = Field(..., description="Число операций")
+
+
+__all__ = ["MonthlyReportRow", "CategoryTotals", "AnalyticsReport", "TimeSeries"]
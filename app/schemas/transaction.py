@@ -0,0 +1,159 @@
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, overload
+from datetime import date, datetime, timezone
+
+from app.core.config import settings
+
+# Максимальная сумма операции по модулю, копейки (запас до BIGINT)
+MAX_AMOUNT = 10**15
+
+
+def validate_amount(amount: Optional[int]) -> Optional[int]:
+    """Нулевая операция ничего не значит"""
+    if amount == 0:
+        raise ValueError("Сумма не может быть нулевой")
+    return amount
+
+
+def validate_currency(currency: Optional[str]) -> Optional[str]:
+    """Код валюты ISO 4217 в верхнем регистре"""
+    if currency is None:
+        return None
+    currency = currency.upper()
+    if len(currency) != 3 or not currency.isascii() or not currency.isalpha():
+        raise ValueError("Код валюты - три буквы ISO 4217")
+    return currency
+
+
+@overload
+def as_utc(value: datetime) -> datetime: ...
+
+
+@overload
+def as_utc(value: Optional[datetime]) -> Optional[datetime]: ...
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Дата приводится к UTC; дата без часового пояса считается UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    # SQLite хранит время без смещения: храним всегда UTC
+    return value.astimezone(timezone.utc)
+
+
+class TransactionBase(BaseModel):
+    amount: int = Field(
+        ...,
+        ge=-MAX_AMOUNT,
+        le=MAX_AMOUNT,
+        description="Сумма в копейках: > 0 доход, < 0 расход",
+        examples=[-125050],
+    )
+
+    currency: str = Field(
+        default_factory=lambda: settings.BASE_CURRENCY,
+        description="Валюта суммы (ISO 4217), по умолчанию базовая",
+        examples=["RUB"],
+    )
+
+    occurred_at: datetime = Field(
+        ...,
+        description="Дата и время операции (без пояса - UTC)",
+        examples=["2024-03-15T12:30:00Z"],
+    )
+
+    category_id: Optional[str] = Field(
+        default=None, max_length=36, description="ID категории"
+    )
+
+    description: Optional[str] = Field(
+        default=None,
+        max_length=200,
+        description="Комментарий (до 200 символов)",
+        examples=["Продукты на неделю"],
+    )
+
+    @field_validator("amount")
+    @classmethod
+    def validate_amount(cls, v: Optional[int]) -> Optional[int]:
+        return validate_amount(v)
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, v: Optional[str]) -> Optional[str]:
+        return validate_currency(v)
+
+    @field_validator("occurred_at")
+    @classmethod
+    def validate_occurred_at(cls, v: Optional[datetime]) -> Optional[datetime]:
+        return as_utc(v)
+
+
+class TransactionCreate(TransactionBase):
+    pass
+
+
+class TransactionUpdate(BaseModel):
+    amount: Optional[int] = Field(
+        default=None,
+        ge=-MAX_AMOUNT,
+        le=MAX_AMOUNT,
+        description="Новая сумма в копейках",
+    )
+
+    currency: Optional[str] = Field(default=None, description="Новая валюта суммы")
+
+    occurred_at: Optional[datetime] = Field(
+        default=None, description="Новые дата и время операции"
+    )
+
+    category_id: Optional[str] = Field(
+        default=None, max_length=36, description="Новая категория"
+    )
+
+    description: Optional[str] = Field(
+        default=None, max_length=200, description="Новый комментарий"
+    )
+
+    @field_validator("amount")
+    @classmethod
+    def validate_amount(cls, v: Optional[int]) -> Optional[int]:
+        return validate_amount(v)
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, v: Optional[str]) -> Optional[str]:
+        return validate_currency(v)
+
+    @field_validator("occurred_at")
+    @classmethod
+    def validate_occurred_at(cls, v: Optional[datetime]) -> Optional[datetime]:
+        return as_utc(v)
+
+
+class TransactionSchema(TransactionBase):
+    id: str = Field(..., description="Уникальный идентификатор операции")
+    user_id: Optional[str] = Field(default=None, description="ID владельца")
+    rule_id: Optional[str] = Field(
+        default=None, description="ID правила, если это подтвержденное повторение"
+    )
+    occurrence_date: Optional[date] = Field(
+        default=None, description="Дата повторения по расписанию правила"
+    )
+    created_at: datetime = Field(..., description="Дата создания")
+    updated_at: datetime = Field(..., description="Дата последнего обновления")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+Transaction = TransactionSchema
+
+__all__ = [
+    "TransactionBase",
+    "TransactionCreate",
+    "TransactionUpdate",
+    "TransactionSchema",
+    "Transaction",
+]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Замер аналитики операций: колонки NumPy против запросов через ORM.
+
+Сравнивает на одних данных (итоги по категориям, помесячные ряды и
+перцентили расходов одного пользователя):
+
+- orm: объекты Transaction и подсчет в Python;
+- sql: GROUP BY по категориям и месяцам в БД (перцентили - в Python по
+  отсортированным суммам);
+- numpy cold: загрузка колонок из БД + ядра app/crud/analytics.py;
+- numpy warm: только ядра по колонкам из кеша.
+
+Данные вставляются напрямую в transactions (без помесячных итогов) во
+временную SQLite базу, если не задан --url.
+
+Примеры:
+    python scripts/bench_analytics.py
+    python scripts/bench_analytics.py --rows 1000000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+# Добавляем корень проекта в PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.crud import analytics
+from app.models import Base, Transaction
+
+CATEGORIES = [str(uuid4()) for _ in range(20)]
+
+
+async def seed(engine, rows: int) -> None:
+    """Вставить rows случайных операций (без владельца) за ~3 года."""
+    rng = random.Random(42)
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # FK на categories в SQLite не проверяются, в Postgres category_id = NULL
+        use_categories = engine.dialect.name == "sqlite"
+
+        def operation() -> dict:
+            amount = rng.choice((-1, -1, -1, 1)) * rng.randint(1, 500000)
+            return {
+                "id": str(uuid4()),
+                "user_id": None,
+                "amount": amount,
+                # Все операции в базовой валюте
+                "base_amount": amount,
+                "occurred_at": start
+                + timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+                "category_id": rng.choice(CATEGORIES) if use_categories else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+
+        for offset in range(0, rows, 10000):
+            await conn.execute(
+                insert(Transaction),
+                [operation() for _ in range(min(10000, rows - offset))],
+            )
+
+
+async def run_orm(db: AsyncSession) -> None:
+    result = await db.execute(select(Transaction).where(Transaction.user_id.is_(None)))
+    by_category: dict = {}
+    by_month: dict = {}
+    expenses = []
+    for obj in result.scalars():
+        income, expense = max(obj.amount, 0), max(-obj.amount, 0)
+        totals = by_category.setdefault(obj.category_id, [0, 0, 0])
+        totals[0] += income
+        totals[1] += expense
+        totals[2] += 1
+        month = obj.occurred_at.date().replace(day=1)
+        monthly = by_month.setdefault(month, [0, 0])
+        monthly[0] += income
+        monthly[1] += expense
+        if obj.amount < 0:
+            expenses.append(-obj.amount)
+    expenses.sort()
+
+
+async def run_sql(db: AsyncSession) -> None:
+    income = func.sum(func.max(Transaction.amount, 0))
+    expense = func.sum(func.max(-Transaction.amount, 0))
+    if db.bind.dialect.name == "postgresql":
+        income = func.sum(func.greatest(Transaction.amount, 0))
+        expense = func.sum(func.greatest(-Transaction.amount, 0))
+        month = func.date_trunc("month", Transaction.occurred_at)
+    else:
+        month = func.strftime("%Y-%m", Transaction.occurred_at)
+    owner = Transaction.user_id.is_(None)
+
+    await db.execute(
+        select(Transaction.category_id, income, expense, func.count())
+        .where(owner)
+        .group_by(Transaction.category_id)
+    )
+    await db.execute(
+        select(month, income, expense).where(owner).group_by(month).order_by(month)
+    )
+    result = await db.execute(
+        select(-Transaction.amount)
+        .where(owner, Transaction.amount < 0)
+        .order_by(Transaction.amount.desc())
+    )
+    result.scalars().all()
+
+
+def run_kernels(frame: analytics.Frame) -> None:
+    analytics.period_report(frame, start=date(2022, 1, 1), end=date(2024, 12, 31))
+
+
+async def bench(url: str, rows: int, repeat: int) -> None:
+    engine = create_async_engine(url)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    print(f"📥 Вставка {rows} операций...")
+    await seed(engine, rows)
+
+    cache = analytics.AnalyticsCache(max_users=1, ttl=3600)
+
+    async def numpy_cold(db: AsyncSession) -> None:
+        cache.cache.clear()
+        run_kernels(await cache.get(db, None))
+
+    async def numpy_warm(db: AsyncSession) -> None:
+        run_kernels(await cache.get(db, None))
+
+    for name, case in [
+        ("orm", run_orm),
+        ("sql", run_sql),
+        ("numpy cold", numpy_cold),
+        ("numpy warm", numpy_warm),
+    ]:
+        timings = []
+        for _ in range(repeat):
+            async with sessions() as db:
+                started = time.perf_counter()
+                await case(db)
+                timings.append(time.perf_counter() - started)
+        print(f"  {name:<12} {min(timings) * 1000:10.1f} мс (лучшее из {repeat})")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=200000, help="Число операций")
+    parser.add_argument("--repeat", type=int, default=3, help="Повторов на замер")
+    parser.add_argument(
+        "--url",
+        default="sqlite+aiosqlite:///:memory:",
+        help="URL пустой БД для замера",
+    )
+    args = parser.parse_args()
+
+    if not analytics.AVAILABLE:
+        print("❌ Нужен numpy: pip install -e .[analytics]")
+        sys.exit(1)
+
+    asyncio.run(bench(args.url, args.rows, args.repeat))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Проверка холодного старта: время импорта приложения (python -X importtime).
+
+Импорт app.main запускается в отдельном интерпретаторе; скрипт падает,
+если суммарное время импорта больше бюджета или при старте импортирован
+модуль, который должен загружаться лениво (NumPy - см. app/core/lazy.py).
+
+Примеры:
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 800 --top 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+project_root = Path(__file__).parent.parent
+
+# Модули, которые не должны импортироваться при старте
+DEFERRED_MODULES = ("numpy",)
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Время импорта модуля и всех его зависимостей в новом интерпретаторе.
+
+    Returns:
+        {модуль: (собственное время, суммарное время)}, мкс
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # заголовок таблицы
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def check(module: str, budget_ms: float, top: int) -> List[str]:
+    """Проблемы холодного старта (пусто - все в порядке)."""
+    times = import_times(module)
+    total_ms = times[module][1] / 1000
+
+    print(f"{module}: {total_ms:.0f} мс (бюджет {budget_ms:.0f} мс)")
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (self_us, cumulative_us) in slowest[:top]:
+        print(f"  {self_us / 1000:7.1f} {cumulative_us / 1000:8.1f}  {name}")
+
+    problems = [
+        f"{name} импортируется при старте" for name in DEFERRED_MODULES if name in times
+    ]
+    if total_ms > budget_ms:
+        problems.append(f"импорт {total_ms:.0f} мс больше бюджета {budget_ms:.0f} мс")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main", help="Модуль приложения")
+    parser.add_argument(
+        "--budget-ms", type=float, default=1500.0, help="Бюджет импорта, мс"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="Сколько самых медленных модулей показать"
+    )
+    args = parser.parse_args()
+
+    problems = check(args.module, args.budget_ms, args.top)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print("✅ Холодный старт в бюджете")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
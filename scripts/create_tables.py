@@ -11,6 +11,7 @@ from typing import List, Tuple
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from app.core.schema import store_fingerprint
 from app.database import engine
 from app.models import Base
 
@@ -29,6 +30,8 @@ async def create_tables():
             # Создаем таблицы
             print("📝 Создание новых таблиц...")
             await conn.run_sync(Base.metadata.create_all)
+            # Отпечаток схемы для старта с DB_STARTUP_MODE=fingerprint
+            await store_fingerprint(conn, Base.metadata)
 
         print("✅ Таблицы успешно созданы!")
 
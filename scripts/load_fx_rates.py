@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Загрузка курсов валют из CSV файлов в fx_rates.
+
+Файл - колонки date (ISO), currency, rate: сколько единиц базовой
+валюты (BASE_CURRENCY) стоит единица валюты с этой даты. Курс на уже
+загруженную дату перезаписывается. Сеть не нужна: файлы выгружаются
+заранее (например, архив курсов ЦБ).
+
+Без аргументов читаются все *.csv из FX_RATES_DIR. Запущенный сервер
+подхватит курсы через FX_TTL_SECONDS или сразу после POST
+/internal/fx/reload (с заголовком X-Internal-Token, см. INTERNAL_TOKEN).
+
+Примеры:
+    python scripts/load_fx_rates.py
+    python scripts/load_fx_rates.py rates/usd.csv rates/eur.csv
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Добавляем корень проекта в PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.config import settings
+from app.crud.fx import load_rate_files, rate_files, store_rates
+from app.database import AsyncSessionLocal
+
+
+async def load(paths: list) -> int:
+    """Записать курсы из файлов, вернуть их число."""
+    async with AsyncSessionLocal() as db:
+        return await store_rates(db, load_rate_files(paths))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help=f"CSV файлы курсов (по умолчанию - {settings.FX_RATES_DIR}/*.csv)",
+    )
+    args = parser.parse_args()
+
+    paths = args.paths or rate_files(settings.FX_RATES_DIR)
+    if not paths:
+        print(f"❌ Нет файлов курсов в {settings.FX_RATES_DIR}")
+        return 1
+    try:
+        count = asyncio.run(load(paths))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Загружено курсов: {count} (базовая валюта {settings.BASE_CURRENCY})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Миграция notes на PostgreSQL: владелец заметки и hash-партиционирование.
+
+Шаги (каждый идемпотентен):
+
+1. Колонка user_id (FK на users) и индекс (user_id, created_at, id) -
+   для баз, созданных до появления владельца заметок.
+2. С --partitions N: таблица notes пересоздается как PARTITION BY HASH
+   (user_id) с N партициями. Список заметок пользователя тогда читается
+   из одной партиции и ее локального индекса, а не из общего индекса на
+   сотни миллионов строк.
+
+Второй шаг выполняется в одной транзакции под ACCESS EXCLUSIVE
+блокировкой (данные копируются, запись в notes на это время стоит) и
+требует, чтобы у всех заметок был владелец: ключ партиционирования
+входит в первичный ключ (id, user_id) и не может быть NULL. После
+миграции включите REQUIRE_USER_ID=true, иначе создание заметок без
+X-User-Id будет падать.
+
+Примеры:
+    python scripts/partition_notes.py                     # только шаг 1
+    python scripts/partition_notes.py --partitions 16 --dry-run
+    python scripts/partition_notes.py --partitions 16
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import List
+
+# Добавляем корень проекта в PYTHONPATH
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+
+OWNER_COLUMN_SQL = [
+    "ALTER TABLE notes ADD COLUMN IF NOT EXISTS user_id VARCHAR(36) "
+    "REFERENCES users (id) ON DELETE CASCADE",
+    "CREATE INDEX IF NOT EXISTS ix_notes_user_id_created_at_id "
+    "ON notes (user_id, created_at, id)",
+]
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    """Уже ли notes партиционирована."""
+    result = await conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = 'notes'::regclass")
+    )
+    return result.scalar_one() == "p"
+
+
+async def count_orphans(conn: AsyncConnection) -> int:
+    """Число заметок без владельца (0, если колонки еще нет - dry-run)."""
+    exists = (
+        await conn.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = 'notes' "
+                "AND column_name = 'user_id'"
+            )
+        )
+    ).scalar()
+    if not exists:
+        return 0
+    result = await conn.execute(
+        text("SELECT count(*) FROM notes WHERE user_id IS NULL")
+    )
+    return result.scalar_one()
+
+
+async def partition_sql(conn: AsyncConnection, partitions: int) -> List[str]:
+    """
+    Команды пересоздания notes как партиционированной таблицы.
+
+    Индексы (кроме уникальных - их заменяет первичный ключ (id, user_id))
+    и триггеры переносятся со старой таблицы по их определениям из
+    каталога, поэтому индексы поиска (GIN по search_vector и pg_trgm)
+    сохраняются.
+
+    Args:
+        conn: Соединение с БД
+        partitions: Число hash-партиций
+
+    Returns:
+        Список SQL команд
+    """
+    indexes = (
+        await conn.execute(
+            text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = 'notes' "
+                "AND indexdef NOT LIKE 'CREATE UNIQUE INDEX%'"
+            )
+        )
+    ).all()
+    triggers = (
+        await conn.execute(
+            text(
+                "SELECT pg_get_triggerdef(oid) FROM pg_trigger "
+                "WHERE tgrelid = 'notes'::regclass AND NOT tgisinternal"
+            )
+        )
+    ).scalars()
+    # Генерируемые колонки (search_vector) не копируются, а вычисляются
+    columns = (
+        await conn.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = 'notes' "
+                "AND is_generated = 'NEVER' ORDER BY ordinal_position"
+            )
+        )
+    ).scalars()
+    column_list = ", ".join(f'"{name}"' for name in columns)
+
+    sql = [
+        "LOCK TABLE notes IN ACCESS EXCLUSIVE MODE",
+        "ALTER TABLE notes RENAME TO notes_unpartitioned",
+    ]
+    # Имена индексов освобождаются для новой таблицы
+    sql += [
+        f'ALTER INDEX "{name}" RENAME TO "{name[:50]}_unpartitioned"'
+        for name, _ in indexes
+    ]
+    sql += [
+        "ALTER TABLE notes_unpartitioned "
+        "RENAME CONSTRAINT notes_pkey TO notes_unpartitioned_pkey",
+        "CREATE TABLE notes (LIKE notes_unpartitioned INCLUDING DEFAULTS "
+        "INCLUDING GENERATED INCLUDING STORAGE) PARTITION BY HASH (user_id)",
+        "ALTER TABLE notes ALTER COLUMN user_id SET NOT NULL",
+        "ALTER TABLE notes ADD PRIMARY KEY (id, user_id)",
+        "ALTER TABLE notes ADD FOREIGN KEY (user_id) "
+        "REFERENCES users (id) ON DELETE CASCADE",
+    ]
+    sql += [
+        f"CREATE TABLE notes_p{i} PARTITION OF notes "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})"
+        for i in range(partitions)
+    ]
+    # Индекс на партиционированной таблице создается на каждой партиции
+    sql += [definition for _, definition in indexes]
+    sql += list(triggers)
+    sql += [
+        f"INSERT INTO notes ({column_list}) "
+        f"SELECT {column_list} FROM notes_unpartitioned",
+        "DROP TABLE notes_unpartitioned",
+        "ANALYZE notes",
+    ]
+    return sql
+
+
+async def migrate(partitions: int, dry_run: bool) -> bool:
+    """Выполнить миграцию (или только показать SQL при dry_run)."""
+    if engine.dialect.name != "postgresql":
+        print(f"❌ Нужен PostgreSQL, а не {engine.dialect.name}")
+        return False
+
+    async with engine.begin() as conn:
+        print("🔑 Колонка владельца и индекс (user_id, created_at, id)...")
+        for statement in OWNER_COLUMN_SQL:
+            print(f"  {statement}")
+            if not dry_run:
+                await conn.execute(text(statement))
+
+    if not partitions:
+        return True
+
+    async with engine.begin() as conn:
+        if await is_partitioned(conn):
+            print("✅ notes уже партиционирована")
+            return True
+
+        orphans = await count_orphans(conn)
+        if orphans:
+            print(f"❌ {orphans} заметок без владельца: назначьте им user_id")
+            return False
+
+        print(f"🧩 Партиционирование notes по HASH (user_id), партиций: {partitions}")
+        for statement in await partition_sql(conn, partitions):
+            print(f"  {statement}")
+            if not dry_run:
+                await conn.execute(text(statement))
+
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=0,
+        help="Число hash-партиций (0 - только колонка и индекс)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Только показать SQL")
+    args = parser.parse_args()
+
+    if args.partitions < 0:
+        parser.error("--partitions должно быть >= 0")
+
+    success = asyncio.run(migrate(args.partitions, args.dry_run))
+    sys.exit(0 if success else 1)
@@ -3,6 +3,8 @@
 Общие фикстуры для тестов.
 """
 
+import asyncio
+
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
@@ -10,10 +12,19 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
+from app.api.deps import get_db
 from app.core.config import settings
 from app.models.base import Base
 
 
+@pytest.fixture(scope="session")
+def event_loop():
+    """Один event loop на всю сессию (нужен для session-фикстуры test_engine)."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
 # Фикстура для тестовой базы данных в памяти
 @pytest_asyncio.fixture(scope="session")
 async def test_engine():
@@ -55,10 +66,20 @@ async def db_session(test_engine):
 
 
 @pytest_asyncio.fixture
-async def client():
-    """HTTP клиент для тестирования API."""
+async def client(test_engine):
+    """HTTP клиент для тестирования API (работает с тестовой БД в памяти)."""
+    AsyncTestSessionLocal = sessionmaker(
+        test_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def override_get_db():
+        async with AsyncTestSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
+    app.dependency_overrides.clear()
 
 
 # Автоматически переопределяем настройки для тестов
@@ -0,0 +1,183 @@
+"""
+Тесты бюджетов и их исполнения.
+"""
+
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.crud import budget, transaction
+from app.models import Base
+from app.schemas.budget import BudgetCreate
+from app.schemas.transaction import TransactionCreate
+
+
+def at(year: int, month: int, day: int = 1) -> datetime:
+    return datetime(year, month, day, 12, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+class TestCRUDBudget:
+    """Статус бюджетов читается из итогов, а не из операций."""
+
+    @pytest.fixture(autouse=True)
+    async def setup_db(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        yield
+        await self.engine.dispose()
+
+    async def test_status_follows_writes(self):
+        user_id = str(uuid4())
+        budgets = budget.for_owner(user_id)
+        transactions = transaction.for_owner(user_id)
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        async with self.AsyncSessionLocal() as db:
+            food = await budgets.create(
+                db, obj_in=BudgetCreate(category_id="food", amount=1000)
+            )
+            await budgets.create(db, obj_in=BudgetCreate(amount=5000))
+            await transactions.create_many(
+                db,
+                objs_in=[
+                    TransactionCreate(
+                        amount=-400, occurred_at=at(2024, 5), category_id=c
+                    )
+                    for c in ("food", "food", "fun", None)
+                ]
+                + [
+                    TransactionCreate(amount=99999, occurred_at=at(2024, 5)),
+                    TransactionCreate(amount=-9999, occurred_at=at(2024, 4)),
+                ],
+            )
+
+            event.listen(self.engine.sync_engine, "before_cursor_execute", count)
+            try:
+                status = await budgets.status(db, month=date(2024, 5, 20))
+            finally:
+                event.remove(self.engine.sync_engine, "before_cursor_execute", count)
+            assert [(b.category_id, spent) for b, spent in status] == [
+                ("food", 800),
+                (None, 1600),
+            ]
+            assert len(statements) == 2
+
+            # Новая операция сразу видна в статусе; смена лимита ничего не
+            # пересчитывает
+            await transactions.create(
+                db,
+                obj_in=TransactionCreate(
+                    amount=-300, occurred_at=at(2024, 5, 31), category_id="food"
+                ),
+            )
+            await budgets.update(db, db_obj=food, obj_in={"amount": 2000})
+            status = await budgets.status(db, month=date(2024, 5, 1))
+            assert [(b.amount, spent) for b, spent in status] == [
+                (2000, 1100),
+                (5000, 1900),
+            ]
+
+            # Чужие бюджеты не видны
+            assert (
+                await budget.for_owner(str(uuid4())).status(db, month=date(2024, 5, 1))
+                == []
+            )
+
+
+@pytest.mark.asyncio
+class TestBudgetsAPI:
+    """Тесты /budgets."""
+
+    async def test_budget_status(self, client: AsyncClient):
+        user = {"X-User-Id": str(uuid4())}
+        response = await client.post(
+            "/api/v1/categories/", json={"name": f"Бюджет {uuid4().hex[:8]}"}
+        )
+        category_id = response.json()["id"]
+
+        response = await client.post(
+            "/api/v1/budgets/",
+            json={"category_id": category_id, "amount": 1000},
+            headers=user,
+        )
+        assert response.status_code == 201
+        created = response.json()
+        response = await client.post(
+            "/api/v1/transactions/",
+            json={
+                "amount": -1500,
+                "occurred_at": "2024-06-10T10:00:00Z",
+                "category_id": category_id,
+            },
+            headers=user,
+        )
+        operation = response.json()
+
+        try:
+            response = await client.get(
+                "/api/v1/budgets/status", params={"month": "2024-06-30"}, headers=user
+            )
+            assert response.status_code == 200
+            assert response.json() == [
+                {
+                    "budget_id": created["id"],
+                    "category_id": category_id,
+                    "month": "2024-06-01",
+                    "amount": 1000,
+                    "spent": 1500,
+                    "remaining": -500,
+                    "percent_used": 150.0,
+                    "over_budget": True,
+                }
+            ]
+            response = await client.get(
+                "/api/v1/budgets/status", params={"month": "2024-07-01"}, headers=user
+            )
+            assert response.json()[0]["spent"] == 0
+
+            # Второй бюджет на ту же категорию и неизвестная категория
+            response = await client.post(
+                "/api/v1/budgets/",
+                json={"category_id": category_id, "amount": 5},
+                headers=user,
+            )
+            assert response.status_code == 400
+            response = await client.post(
+                "/api/v1/budgets/",
+                json={"category_id": str(uuid4()), "amount": 5},
+                headers=user,
+            )
+            assert response.status_code == 400
+
+            # Общий бюджет (category_id NULL) тоже один на пользователя
+            response = await client.post(
+                "/api/v1/budgets/", json={"amount": 100}, headers=user
+            )
+            assert response.status_code == 201
+            overall = response.json()
+            response = await client.post(
+                "/api/v1/budgets/", json={"amount": 200}, headers=user
+            )
+            assert response.status_code == 400
+            await client.delete(f"/api/v1/budgets/{overall['id']}", headers=user)
+
+            response = await client.put(
+                f"/api/v1/budgets/{created['id']}", json={"amount": 3000}
+            )
+            assert response.status_code == 404
+        finally:
+            await client.delete(f"/api/v1/transactions/{operation['id']}", headers=user)
+            await client.delete(f"/api/v1/budgets/{created['id']}", headers=user)
+            await client.delete(f"/api/v1/categories/{category_id}")
@@ -0,0 +1,121 @@
+"""
+Тесты кеша сущностей.
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.core.cache import KeyedLocks, LRUTTLCache
+
+
+class TestLRUTTLCache:
+    """Тесты LRU+TTL кеша."""
+
+    def test_lru_eviction(self):
+        """Тест вытеснения самой давно использованной записи."""
+        cache = LRUTTLCache(maxsize=2, ttl=60)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        assert cache.get("a") == b"1"  # "a" становится свежей
+
+        cache.set("c", b"3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.get("c") == b"3"
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiration(self, monkeypatch):
+        """Тест истечения TTL."""
+        now = [1000.0]
+        monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+        cache = LRUTTLCache(maxsize=10, ttl=5)
+        cache.set("a", b"1")
+
+        now[0] += 6
+
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_stale_set_is_dropped(self):
+        """Тест: значение, прочитанное до инвалидации, не попадает в кеш."""
+        cache = LRUTTLCache()
+        generation = cache.generation
+        cache.delete("a")  # запись произошла, пока шел запрос в БД
+
+        cache.set("a", b"old", generation=generation)
+
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats["hits"] == 0
+        assert stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+class TestKeyedLocks:
+    """Тесты блокировок по ключу."""
+
+    async def test_waiters_keep_lock(self):
+        """Тест: пока есть ожидающие, новый запрос встает в ту же очередь."""
+        locks = KeyedLocks()
+        release = asyncio.Event()
+        inside = []
+
+        async def load(name: str, wait: asyncio.Event = None) -> None:
+            async with locks.hold("user"):
+                inside.append(name)
+                await (wait.wait() if wait else asyncio.sleep(0))
+                inside.remove(name)
+
+        first = asyncio.create_task(load("first", release))
+        second = asyncio.create_task(load("second"))
+        await asyncio.sleep(0)  # first держит блокировку, second ждет
+
+        release.set()
+        await asyncio.sleep(0)  # first отпустил, second еще не проснулся
+        async with locks.hold("user"):
+            await asyncio.sleep(0)
+            assert inside == []
+
+        await asyncio.gather(first, second)
+        assert len(locks) == 0
+
+
+@pytest.mark.asyncio
+class TestEntityCacheAPI:
+    """Тесты кеша на эндпоинтах чтения по ID."""
+
+    async def test_cache_hit_skips_pool(self, client: AsyncClient, test_engine):
+        """Тест: попадание в кеш не берет соединение из пула."""
+        response = await client.post("/api/v1/notes/", json={"title": "Кеш"})
+        note_id = response.json()["id"]
+
+        checkouts = []
+
+        def on_checkout(*args):
+            checkouts.append(args)
+
+        pool = test_engine.sync_engine.pool
+        try:
+            response = await client.get(f"/api/v1/notes/{note_id}")
+            assert response.status_code == 200
+
+            event.listen(pool, "checkout", on_checkout)
+            response = await client.get(f"/api/v1/notes/{note_id}")
+            assert response.status_code == 200
+            assert response.json()["title"] == "Кеш"
+            assert checkouts == []
+            event.remove(pool, "checkout", on_checkout)
+
+            # Обновление сбрасывает кеш
+            await client.put(f"/api/v1/notes/{note_id}", json={"title": "Новый"})
+            response = await client.get(f"/api/v1/notes/{note_id}")
+            assert response.json()["title"] == "Новый"
+        finally:
+            await client.delete(f"/api/v1/notes/{note_id}")
+
+        response = await client.get(f"/api/v1/notes/{note_id}")
+        assert response.status_code == 404
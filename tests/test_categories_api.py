@@ -175,6 +175,87 @@ class TestCategoriesAPI:
             await client.delete(f"/api/v1/categories/{cat1_id}")
             await client.delete(f"/api/v1/categories/{cat2_id}")
 
+    async def test_categories_catalog_etag(self, client: AsyncClient):
+        """Тест списка категорий из каталога: ETag и 304."""
+        response = await client.post(
+            "/api/v1/categories/", json={"name": f"Каталог {uuid4().hex[:8]}"}
+        )
+        category = response.json()
+
+        try:
+            response = await client.get("/api/v1/categories/")
+            assert response.status_code == 200
+            etag = response.headers["ETag"]
+            assert category["id"] in {c["id"] for c in response.json()}
+
+            response = await client.get(
+                "/api/v1/categories/", headers={"If-None-Match": etag}
+            )
+            assert response.status_code == 304
+            assert response.content == b""
+
+            response = await client.get(f"/api/v1/categories/name/{category['name']}")
+            assert response.json()["id"] == category["id"]
+
+            response = await client.get(f"/api/v1/categories/{category['id']}")
+            response = await client.get(
+                f"/api/v1/categories/{category['id']}",
+                headers={"If-None-Match": response.headers["ETag"]},
+            )
+            assert response.status_code == 304
+
+            response = await client.post(
+                "/api/v1/categories/", json={"name": category["name"]}
+            )
+            assert response.status_code == 400
+
+            # Запись меняет версию каталога и ETag
+            await client.put(
+                f"/api/v1/categories/{category['id']}", json={"color": "#123456"}
+            )
+            response = await client.get(
+                "/api/v1/categories/", headers={"If-None-Match": etag}
+            )
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etag
+        finally:
+            await client.delete(f"/api/v1/categories/{category['id']}")
+
+    async def test_bulk_categories(self, client: AsyncClient):
+        """Тест массовых эндпоинтов /categories/bulk."""
+        response = await client.post(
+            "/api/v1/categories/bulk",
+            json=[
+                {"name": "Пачка А", "color": "#FF0000"},
+                {"name": "Пачка А", "color": "#00FF00"},
+                {"name": "Пачка Б", "color": "не цвет"},
+                {"name": "Пачка В"},
+            ],
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [c["name"] for c in data["items"]] == ["Пачка А", "Пачка В"]
+        assert [error["index"] for error in data["errors"]] == [1, 2]
+        ids = [c["id"] for c in data["items"]]
+
+        try:
+            response = await client.patch(
+                "/api/v1/categories/bulk",
+                json=[
+                    {"id": ids[0], "color": "#0000FF"},
+                    {"id": ids[1], "name": "Пачка А"},
+                ],
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["items"][0]["color"] == "#0000FF"
+            assert "уже существует" in data["errors"][0]["detail"]
+        finally:
+            response = await client.request(
+                "DELETE", "/api/v1/categories/bulk", json={"ids": ids}
+            )
+            assert len(response.json()["items"]) == 2
+
     async def test_delete_category_success(self, client: AsyncClient):
         """Тест успешного удаления категории."""
         if not hasattr(TestCategoriesAPI, "category_id"):
@@ -0,0 +1,274 @@
+"""
+Тесты правил автоматической категоризации.
+"""
+
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.classifier import KeywordAutomaton, Matcher, NO_MATCH
+from app.crud.crud_category_rule import category_rule_matchers
+from app.models.category_rule import CategoryRule as CategoryRuleModel
+from app.schemas.category_rule import CategoryRuleCreate
+
+
+def rule(kind: str, pattern: str, category_id: str = "c") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=f"{kind}:{pattern}", category_id=category_id, kind=kind, pattern=pattern
+    )
+
+
+class TestMatcher:
+    """Один проход по тексту находит лучшее правило."""
+
+    def test_automaton_overlapping_keywords(self):
+        automaton = KeywordAutomaton([("he", 3), ("she", 1), ("his", 2), ("hers", 0)])
+        assert automaton.search("USHERS") == 0
+        assert automaton.search("ushe") == 1
+        assert automaton.search("ahisx") == 2
+        assert automaton.search("the") == 3
+        assert automaton.search("xyz") == NO_MATCH
+        assert KeywordAutomaton([]).search("anything") == NO_MATCH
+
+    def test_priority_across_kinds(self):
+        matcher = Matcher(
+            [
+                rule("regex", r"такси\s+(яндекс|uber)", "taxi"),
+                rule("keyword", "Пятерочка", "food"),
+                rule("regex", r"(\d+)\s*(руб|₽)", "cash"),
+                rule("keyword", "кафе", "cafe"),
+            ]
+        )
+        assert matcher.classify("ПЯТЕРОЧКА 1234") == ("keyword:Пятерочка", "food")
+        # Оба правила подходят - побеждает первое по порядку
+        assert matcher.classify("Такси Uber, пятерочка") == (
+            r"regex:такси\s+(яндекс|uber)",
+            "taxi",
+        )
+        # Внутренние группы выражения не сбивают номер правила
+        assert matcher.classify("кафе 300 руб") == (r"regex:(\d+)\s*(руб|₽)", "cash")
+        assert matcher.classify("кафе") == ("keyword:кафе", "cafe")
+        assert matcher.classify("аптека") is None
+        assert matcher.classify(None) is None
+        assert Matcher([]).classify("кафе") is None
+
+    def test_invalid_stored_rule_skipped(self):
+        matcher = Matcher(
+            [
+                rule("regex", "taxi)|(uber", "bad"),
+                rule("regex", r"(metro)", "transport"),
+            ]
+        )
+        assert matcher.classify("uber") is None
+        assert matcher.classify("METRO") == ("regex:(metro)", "transport")
+
+    def test_pattern_validation(self):
+        CategoryRuleCreate(category_id="c", kind="regex", pattern=r"(?<=\s)кафе")
+        for pattern in (r"(\w)\1", r"(?P<x>a)", "(", "a*", "taxi)|(uber"):
+            with pytest.raises(ValidationError):
+                CategoryRuleCreate(category_id="c", kind="regex", pattern=pattern)
+        with pytest.raises(ValidationError):
+            CategoryRuleCreate(category_id="c", kind="keyword", pattern="  ")
+
+
+@pytest.mark.asyncio
+class TestCategoryRulesAPI:
+    """Тесты /categories/rules и /categories/classify."""
+
+    async def test_rules_applied_on_write_paths(self, client: AsyncClient):
+        user = {"X-User-Id": str(uuid4())}
+        categories = []
+        for name in ("Еда", "Транспорт"):
+            response = await client.post(
+                "/api/v1/categories/", json={"name": f"{name} {uuid4().hex[:8]}"}
+            )
+            categories.append(response.json()["id"])
+        food, transport = categories
+
+        response = await client.post(
+            "/api/v1/categories/rules/",
+            json={"category_id": food, "kind": "keyword", "pattern": "пятерочка"},
+            headers=user,
+        )
+        assert response.status_code == 201
+        keyword_rule = response.json()
+        response = await client.post(
+            "/api/v1/categories/rules/",
+            json={"category_id": transport, "kind": "regex", "pattern": r"metro|такси"},
+            headers=user,
+        )
+        regex_rule = response.json()
+        response = await client.post(
+            "/api/v1/categories/rules/",
+            json={"category_id": str(uuid4()), "kind": "keyword", "pattern": "x"},
+            headers=user,
+        )
+        assert response.status_code == 400
+
+        try:
+            response = await client.post(
+                "/api/v1/categories/classify",
+                json={"texts": ["Пятерочка #12", "Такси до дома", "аптека"]},
+                headers=user,
+            )
+            assert response.status_code == 200
+            assert response.json() == [
+                {"category_id": food, "rule_id": keyword_rule["id"]},
+                {"category_id": transport, "rule_id": regex_rule["id"]},
+                {"category_id": None, "rule_id": None},
+            ]
+            # Правила другого пользователя не применяются
+            response = await client.post(
+                "/api/v1/categories/classify", json={"texts": ["Пятерочка"]}
+            )
+            assert response.json() == [{"category_id": None, "rule_id": None}]
+
+            # Создание: категория по правилу, явная категория не меняется
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={
+                    "amount": -100,
+                    "occurred_at": "2024-03-05T10:00:00Z",
+                    "description": "ПЯТЕРОЧКА",
+                },
+                headers=user,
+            )
+            assert response.json()["category_id"] == food
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={
+                    "amount": -100,
+                    "occurred_at": "2024-03-05T11:00:00Z",
+                    "description": "такси",
+                    "category_id": food,
+                },
+                headers=user,
+            )
+            assert response.json()["category_id"] == food
+
+            # Массовое создание
+            response = await client.post(
+                "/api/v1/transactions/bulk",
+                json=[
+                    {"amount": -1, "occurred_at": "2024-03-06", "description": "metro"},
+                    {"amount": 0, "occurred_at": "2024-03-06"},
+                    {
+                        "amount": -1,
+                        "occurred_at": "2024-03-06",
+                        "category_id": str(uuid4()),
+                    },
+                ],
+                headers=user,
+            )
+            result = response.json()
+            assert [item["category_id"] for item in result["items"]] == [transport]
+            assert [error["index"] for error in result["errors"]] == [1, 2]
+
+            # Импорт
+            statement = "date,amount,description\n2024-03-07,-5,Пятерочка у дома\n"
+            response = await client.post(
+                "/api/v1/imports/",
+                files={"file": ("statement.csv", statement.encode())},
+                headers=user,
+            )
+            assert json.loads(response.text.splitlines()[-1])["imported"] == 1
+
+            response = await client.get("/api/v1/transactions/", headers=user)
+            by_description = {
+                item["description"]: item["category_id"] for item in response.json()
+            }
+            assert by_description["Пятерочка у дома"] == food
+
+            # Изменение правила сбрасывает скомпилированные правила
+            builds = category_rule_matchers.builds
+            await client.post(
+                "/api/v1/categories/classify", json={"texts": ["a"]}, headers=user
+            )
+            assert category_rule_matchers.builds == builds
+            response = await client.put(
+                f"/api/v1/categories/rules/{keyword_rule['id']}",
+                json={"category_id": transport},
+                headers=user,
+            )
+            assert response.status_code == 200
+            response = await client.post(
+                "/api/v1/categories/classify",
+                json={"texts": ["пятерочка"]},
+                headers=user,
+            )
+            assert response.json()[0]["category_id"] == transport
+            assert category_rule_matchers.builds == builds + 1
+        finally:
+            response = await client.get("/api/v1/transactions/", headers=user)
+            for item in response.json():
+                await client.delete(f"/api/v1/transactions/{item['id']}", headers=user)
+            for created in (keyword_rule, regex_rule):
+                await client.delete(
+                    f"/api/v1/categories/rules/{created['id']}", headers=user
+                )
+            for category_id in categories:
+                await client.delete(f"/api/v1/categories/{category_id}")
+
+        response = await client.get("/api/v1/categories/rules/", headers=user)
+        assert response.json() == []
+
+    async def test_broken_pattern_rejected_and_skipped(
+        self, client: AsyncClient, db_session: AsyncSession
+    ):
+        user = {"X-User-Id": str(uuid4())}
+        response = await client.post(
+            "/api/v1/categories/", json={"name": f"Такси {uuid4().hex[:8]}"}
+        )
+        category_id = response.json()["id"]
+        rule_in = {"category_id": category_id, "kind": "regex"}
+
+        # Выражение выходит за скобки своей группы
+        response = await client.post(
+            "/api/v1/categories/rules/",
+            json={**rule_in, "pattern": "taxi)|(uber"},
+            headers=user,
+        )
+        assert response.status_code == 422
+
+        # Такое правило уже сохранено (до проверки): записи не ломаются
+        response = await client.post(
+            "/api/v1/categories/rules/",
+            json={**rule_in, "pattern": "taxi"},
+            headers=user,
+        )
+        assert response.status_code == 201
+        await db_session.execute(
+            update(CategoryRuleModel)
+            .where(CategoryRuleModel.id == response.json()["id"])
+            .values(pattern="taxi)|(uber")
+        )
+        await db_session.commit()
+        category_rule_matchers.cache.clear()
+        try:
+            response = await client.post(
+                "/api/v1/categories/classify", json={"texts": ["uber"]}, headers=user
+            )
+            assert response.status_code == 200
+            assert response.json() == [{"category_id": None, "rule_id": None}]
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={
+                    "amount": -100,
+                    "occurred_at": "2024-03-05T10:00:00Z",
+                    "description": "uber",
+                },
+                headers=user,
+            )
+            assert response.status_code == 201
+            assert response.json()["category_id"] is None
+            await client.delete(
+                f"/api/v1/transactions/{response.json()['id']}", headers=user
+            )
+        finally:
+            await client.delete(f"/api/v1/categories/{category_id}")
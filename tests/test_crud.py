@@ -2,11 +2,23 @@
 Тесты CRUD операций.
 """
 
+import asyncio
+import json
+
 import pytest
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
-from app.models import Base
+from app.models import Base, Category, Note
 from app.crud import note, category, user
+from app.core.prefix_index import PrefixIndex
+from app.crud.catalog import Catalog
+from app.crud.crud_category import CRUDCategory
+from app.crud.crud_note import CRUDNote
+from app.crud.group_commit import GroupCommitter
+from app.crud.loader import ModelLoader
 from app.schemas.note import NoteCreate, NoteUpdate
 from app.schemas.category import CategoryCreate, CategoryUpdate
 from app.schemas.user import UserCreate, UserUpdate
@@ -94,6 +106,37 @@ class TestCRUDNote:
             # ИЛИ: проверяем, что объект был обновлен
             assert updated_note.title != note_in.title
 
+    async def test_update_by_id_single_statement(self):
+        """Тест обновления одним UPDATE ... RETURNING без refresh."""
+        async with self.AsyncSessionLocal() as db:
+            note_obj = await note.create(db, obj_in=NoteCreate(title="Старый"))
+
+            statements = []
+
+            def listener(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(self.engine.sync_engine, "before_cursor_execute", listener)
+            try:
+                updated = await note.update_by_id(
+                    db, id=note_obj.id, obj_in=NoteUpdate(title="Новый")
+                )
+                missing = await note.update_by_id(
+                    db, id="нет-такого", obj_in=NoteUpdate(title="Новый")
+                )
+            finally:
+                event.remove(self.engine.sync_engine, "before_cursor_execute", listener)
+
+            assert updated.title == "Новый"
+            assert updated.updated_at is not None
+            assert missing is None
+            assert len(statements) == 2
+            assert all(st.startswith("UPDATE") for st in statements)
+
+            removed = await note.remove(db, id=note_obj.id)
+            assert removed.id == note_obj.id
+            assert await note.remove(db, id=note_obj.id) is None
+
     async def test_delete_note(self):
         """Тест удаления заметки."""
         async with self.AsyncSessionLocal() as db:
@@ -131,6 +174,151 @@ class TestCRUDNote:
             notes_limited = await note.get_multi(db, skip=2, limit=2)
             assert len(notes_limited) == 2
 
+    async def test_get_page_cursor_notes(self):
+        """Тест keyset пагинации: страницы по курсору без пропусков и дублей."""
+        async with self.AsyncSessionLocal() as db:
+            for i in range(7):
+                note_in = NoteCreate(title=f"Заметка {i}", content=None)
+                await note.create(db, obj_in=note_in)
+
+            seen = []
+            page, cursor = await note.get_page(db, limit=3)
+            seen.extend(n.id for n in page)
+            while cursor:
+                page, cursor = await note.get_page(db, after=cursor, limit=3)
+                seen.extend(n.id for n in page)
+
+            all_notes = await note.get_multi(db, limit=100)
+            assert seen == [n.id for n in all_notes]
+            assert len(seen) == 7
+
+    async def test_bulk_notes(self):
+        """Тест массового создания, обновления и удаления заметок."""
+        async with self.AsyncSessionLocal() as db:
+            created = await note.create_many(
+                db, objs_in=[NoteCreate(title=f"Пачка {i}") for i in range(10)]
+            )
+            assert [n.title for n in created] == [f"Пачка {i}" for i in range(10)]
+            assert all(n.created_at is not None for n in created)
+
+            updated = await note.update_many(
+                db,
+                objs_in=[
+                    {"id": created[0].id, "title": "Новый"},
+                    {"id": created[1].id, "content": "Текст"},
+                    {"id": "нет-такого", "title": "X"},
+                ],
+            )
+            assert [n.id for n in updated] == [created[0].id, created[1].id]
+            assert updated[0].title == "Новый"
+            assert updated[1].content == "Текст"
+
+            removed = await note.remove_many(
+                db, ids=[created[2].id, created[3].id, "нет-такого"]
+            )
+            assert {n.id for n in removed} == {created[2].id, created[3].id}
+
+            removed = await note.remove_by_filter(db, Note.title.like("Пачка%"))
+            assert len(removed) == 7
+            assert await note.get_multi(db) == [updated[0]]
+
+    async def test_loader_coalesces_gets(self):
+        """Тест DataLoader: конкурентные load() - один SELECT."""
+        async with self.AsyncSessionLocal() as db:
+            created = await note.create_many(
+                db, objs_in=[NoteCreate(title=f"Загрузка {i}") for i in range(5)]
+            )
+            ids = [n.id for n in created]
+
+            statements = []
+
+            def listener(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(self.engine.sync_engine, "before_cursor_execute", listener)
+            try:
+                loader = ModelLoader(note, db)
+                loaded = await asyncio.gather(
+                    *(loader.load(id) for id in ids + ["нет-такого", ids[0]])
+                )
+                # Повторный load берется из кеша загрузчика
+                assert await loader.load(ids[1]) is loaded[1]
+            finally:
+                event.remove(self.engine.sync_engine, "before_cursor_execute", listener)
+
+            assert [n.id for n in loaded[:5]] == ids
+            assert loaded[5] is None
+            assert loaded[6] is loaded[0]
+            assert len(statements) == 1
+
+            # Промахи кеша JSON конкурентных get_json_entry - тоже один SELECT
+            fresh = await note.create_many(
+                db, objs_in=[NoteCreate(title=f"Промах {i}") for i in range(3)]
+            )
+            statements.clear()
+            event.listen(self.engine.sync_engine, "before_cursor_execute", listener)
+            try:
+                loader = ModelLoader(note, db)
+                entries = await asyncio.gather(
+                    *(note.get_json_entry(db, n.id, loader=loader) for n in fresh)
+                )
+            finally:
+                event.remove(self.engine.sync_engine, "before_cursor_execute", listener)
+            assert all(entry is not None for entry in entries)
+            assert len(statements) == 1
+
+    async def test_notes_scoped_by_owner(self):
+        """Тест for_owner: чтение и запись только своих заметок."""
+        alice, bob = str(uuid4()), str(uuid4())
+        alice_notes = note.for_owner(alice)
+        bob_notes = note.for_owner(bob)
+
+        async with self.AsyncSessionLocal() as db:
+            mine = await alice_notes.create(db, obj_in=NoteCreate(title="Моя"))
+            await alice_notes.create_many(
+                db, objs_in=[NoteCreate(title=f"Моя {i}") for i in range(3)]
+            )
+            await bob_notes.create(db, obj_in=NoteCreate(title="Чужая"))
+            await note.create(db, obj_in=NoteCreate(title="Ничья"))
+            assert mine.user_id == alice
+
+            assert await alice_notes.count(db) == 4
+            assert await alice_notes.count(db, mode="estimated") == 4
+            assert await note.for_owner(None).count(db) == 1
+            assert await note.count(db) == 6
+
+            page, _ = await alice_notes.get_page(db, limit=10)
+            assert {n.user_id for n in page} == {alice}
+            by_user = await note.get_multi_by_user(db, user_id=bob)
+            assert [n.title for n in by_user] == ["Чужая"]
+
+            # Чужую заметку не видно, не обновить и не удалить (и из кеша)
+            assert await alice_notes.get_json(db, mine.id) is not None
+            assert await bob_notes.get_json(db, mine.id) is None
+            assert await bob_notes.get(db, mine.id) is None
+            assert await bob_notes.get_many(db, ids=[mine.id]) == []
+            assert (
+                await bob_notes.update_by_id(db, id=mine.id, obj_in={"title": "X"})
+                is None
+            )
+            assert (
+                await bob_notes.update_many(db, objs_in=[{"id": mine.id, "title": "X"}])
+                == []
+            )
+            assert await bob_notes.remove(db, id=mine.id) is None
+            assert await bob_notes.get_many_json(db, ids=[mine.id]) == b"[]"
+
+            # Владельца нельзя поменять обновлением
+            updated = await alice_notes.update_by_id(
+                db, id=mine.id, obj_in={"title": "Моя!", "user_id": bob}
+            )
+            assert (updated.title, updated.user_id) == ("Моя!", alice)
+
+            found, _ = await bob_notes.search(db, query="Моя")
+            assert found == []
+            found, _ = await alice_notes.search(db, query="Моя")
+            assert len(found) == 4
+
     async def test_search_by_title_notes(self):
         """Тест поиска заметок по заголовку."""
         async with self.AsyncSessionLocal() as db:
@@ -157,6 +345,120 @@ class TestCRUDNote:
                 # Если метода нет, пропускаем этот тест
                 pytest.skip("Метод search_by_title не реализован")
 
+    async def test_search_notes_ranked(self):
+        """Тест полнотекстового поиска (FTS5) с ранжированием и курсором."""
+        async with self.AsyncSessionLocal() as db:
+            await note.create_many(
+                db,
+                objs_in=[
+                    NoteCreate(title="Продукты", content="молоко хлеб молоко"),
+                    NoteCreate(title="Молоко", content="молоко молоко молоко"),
+                    NoteCreate(title="Бензин", content="заправка"),
+                    NoteCreate(title="Кафе", content="кофе и молочный коктейль"),
+                ],
+            )
+
+            found, cursor = await note.search(db, query="молок", limit=1)
+            assert [n.title for n in found] == ["Молоко"]
+
+            rest, cursor = await note.search(db, query="молок", after=cursor)
+            assert [n.title for n in rest] == ["Продукты"]
+            assert cursor is None
+
+            # Триггеры держат индекс в синхронизации с таблицей
+            await note.update_by_id(
+                db, id=found[0].id, obj_in=NoteUpdate(content="бензин")
+            )
+            found, _ = await note.search(db, query="бензин")
+            assert {n.title for n in found} == {"Бензин", "Молоко"}
+
+            await note.remove(db, id=found[0].id)
+            found, _ = await note.search(db, query="бензин")
+            assert len(found) == 1
+
+    async def test_search_survives_vacuum(self):
+        """Ключ FTS не зависит от неявного rowid notes (VACUUM его меняет)."""
+        async with self.AsyncSessionLocal() as db:
+            created = await note.create_many(
+                db,
+                objs_in=[
+                    NoteCreate(title=f"Заметка {i}", content=f"слово{i}")
+                    for i in range(6)
+                ],
+            )
+            await note.remove_many(db, ids=[n.id for n in created[:3]])
+
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("VACUUM")
+
+        async with self.AsyncSessionLocal() as db:
+            for index, expected in enumerate(created):
+                found, _ = await note.search(db, query=f"слово{index}")
+                assert [n.id for n in found] == ([expected.id] if index >= 3 else [])
+
+    async def test_prefix_index_incremental(self):
+        """Тест индекса префиксов: ленивая постройка и обновление при записи."""
+        crud = CRUDNote(Note)
+        index = PrefixIndex(Note, "title", max_entries=3, rebuild_seconds=3600)
+        crud.add_write_listener(index.on_write)
+
+        async with self.AsyncSessionLocal() as db:
+            first = await crud.create(db, obj_in=NoteCreate(title="Продукты"))
+            assert await index.ensure_built(db, wait=True)
+            assert index.suggest("прод") == ["Продукты"]
+
+            # Дальше индекс живет без запросов к БД
+            await crud.create_many(
+                db,
+                objs_in=[NoteCreate(title="продукты"), NoteCreate(title="Проезд")],
+            )
+            assert index.suggest("ПРО") == ["Продукты", "Проезд"]
+            assert index.suggest("про", limit=1) == ["Продукты"]
+
+            await crud.update_by_id(db, id=first.id, obj_in=NoteUpdate(title="Кафе"))
+            assert index.suggest("к") == ["Кафе"]
+            # Одинаковые без учета регистра значения хранятся один раз
+            assert index.suggest("прод") == ["Продукты"]
+
+            await crud.remove(db, id=first.id)
+            assert index.suggest("к") == []
+
+            # Сверх max_entries индекс выключается, подсказки идут из БД
+            await crud.create_many(
+                db, objs_in=[NoteCreate(title="Кино"), NoteCreate(title="Книги")]
+            )
+            assert not index.ready
+            assert await index.lookup(db, "Кн") == ["Книги"]
+            assert index.stats()["fallbacks"] == 1
+            assert index.stats()["overflows"] == 1
+
+    async def test_prefix_index_background_rebuild(self):
+        """Тест индекса префиксов: перестройка в фоне, до замены - старые данные."""
+        index = PrefixIndex(Note, "title", max_entries=2, rebuild_seconds=0)
+
+        async with self.AsyncSessionLocal() as db:
+            await note.create(db, obj_in=NoteCreate(title="Продукты"))
+            assert await index.ensure_built(db, wait=True)
+
+            # Запись другого процесса: индекс о ней не знает до перестройки
+            await note.create(db, obj_in=NoteCreate(title="Пицца"))
+            assert await index.ensure_built(db)
+            assert index.stats()["rebuilding"]
+            assert index.suggest("п") == ["Продукты"]
+
+            await index.ensure_built(db, wait=True)
+            assert index.suggest("п") == ["Пицца", "Продукты"]
+            assert index.stats()["builds"] == 2
+
+            # Переполнение: подсказки из БД, следующая перестройка отложена
+            await note.create(db, obj_in=NoteCreate(title="Проезд"))
+            await index.ensure_built(db, wait=True)
+            assert not index.ready
+            assert index.overflows == 1
+            index.rebuild_seconds = 3600
+            assert not index.stale
+
 
 @pytest.mark.asyncio
 class TestCRUDCategory:
@@ -227,6 +529,96 @@ class TestCRUDCategory:
             assert category_db.id == category_obj.id  # Сравниваем строки
             assert category_db.name == "Тестовая категория"
 
+    async def test_group_commit_create(self):
+        """Тест group commit: конкурентные create - один INSERT на пачку."""
+        committer = GroupCommitter(Category, window=0.01, max_rows=100)
+        crud = CRUDCategory(Category, group_commit=committer)
+
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            async with self.AsyncSessionLocal() as db:
+                results = await asyncio.gather(
+                    *(
+                        crud.create(db, obj_in=CategoryCreate(name=f"Пачка {i}"))
+                        for i in range(5)
+                    ),
+                    # Дубликат имени: ошибка только у этого вызова
+                    crud.create(db, obj_in=CategoryCreate(name="Пачка 0")),
+                    return_exceptions=True,
+                )
+        finally:
+            event.remove(self.engine.sync_engine, "before_cursor_execute", listener)
+
+        assert [c.name for c in results[:5]] == [f"Пачка {i}" for i in range(5)]
+        assert isinstance(results[5], IntegrityError)
+        # Одна неудачная пачка + построчный повтор
+        stats = committer.stats()
+        assert stats["batches"] == 1
+        assert stats["rows"] == 6
+        assert stats["fallbacks"] == 1
+        assert len([st for st in statements if st.startswith("INSERT")]) == 7
+
+        statements.clear()
+        event.listen(self.engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            async with self.AsyncSessionLocal() as db:
+                await asyncio.gather(
+                    *(
+                        crud.create(db, obj_in=CategoryCreate(name=f"Вторая {i}"))
+                        for i in range(3)
+                    )
+                )
+        finally:
+            event.remove(self.engine.sync_engine, "before_cursor_execute", listener)
+
+        assert len([st for st in statements if st.startswith("INSERT")]) == 1
+        assert committer.stats()["max_batch_size"] == 6
+
+    async def test_catalog_snapshot(self):
+        """Тест каталога: снимок из памяти, новая версия после записи."""
+        crud = CRUDCategory(Category, schema=category.schema)
+        catalog = Catalog(crud, key="name", ttl=3600)
+        crud.add_write_listener(catalog.on_write)
+
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        async with self.AsyncSessionLocal() as db:
+            food = await crud.create(db, obj_in=CategoryCreate(name="Еда"))
+
+            event.listen(self.engine.sync_engine, "before_cursor_execute", listener)
+            try:
+                first = await catalog.get(db)
+                again = await catalog.get(db)
+            finally:
+                event.remove(self.engine.sync_engine, "before_cursor_execute", listener)
+
+            assert again is first
+            assert len(statements) == 1
+            assert first.by_key["Еда"].id == food.id
+            assert first.by_id[food.id].name == "Еда"
+            assert first.etag.startswith('"')
+
+            await crud.create(db, obj_in=CategoryCreate(name="Транспорт"))
+            second = await catalog.get(db)
+            assert second.version == first.version + 1
+            assert second.etag != first.etag
+            assert [c["name"] for c in json.loads(second.list_json)] == [
+                "Еда",
+                "Транспорт",
+            ]
+            assert catalog.stats()["loads"] == 2
+
+            with pytest.raises(TypeError):
+                second.by_key["Новая"] = food
+
 
 @pytest.mark.asyncio
 class TestCRUDUser:
@@ -0,0 +1,223 @@
+"""
+Тесты курсов валют и пересчета в базовую валюту.
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.crud import transaction_analytics
+from app.crud.fx import FxTable, MissingRateError, RateSeries, load_rate_files
+
+RATES = "date,currency,rate\n2024-01-01,USD,90.5\n2024-02-01,USD,100\n"
+
+
+def usd_table() -> FxTable:
+    return FxTable(
+        base="RUB",
+        series={"USD": RateSeries([date(2024, 1, 1), date(2024, 2, 1)], [90.5, 100.0])},
+    )
+
+
+class TestFxTable:
+    """Курс на дату - последний известный не позже нее."""
+
+    def test_rate_and_convert(self):
+        fx = usd_table()
+        assert fx.rate("USD", date(2024, 1, 31)) == 90.5
+        assert fx.rate("USD", date(2024, 2, 1)) == 100.0
+        assert fx.rate("RUB", date(1990, 1, 1)) == 1.0
+        assert fx.convert(-1001, "USD", date(2024, 1, 15)) == -90590
+        assert fx.convert(-1001, "RUB", date(2024, 1, 15)) == -1001
+        for currency, day in (("USD", date(2023, 12, 31)), ("EUR", date(2024, 1, 1))):
+            with pytest.raises(MissingRateError):
+                fx.convert(100, currency, day)
+
+    def test_convert_many_matches_convert(self):
+        np = pytest.importorskip("numpy")
+        fx = usd_table()
+        days = [date(2024, 1, 1), date(2024, 1, 31), date(2024, 3, 1), date(2024, 3, 1)]
+        amounts = [101, -333, 7, 5]
+        currencies = ("RUB", "USD")
+        codes = [1, 1, 1, 0]
+        converted = fx.convert_many(
+            np.array(amounts, dtype=np.int64),
+            np.array(codes, dtype=np.int32),
+            currencies,
+            np.array(days, dtype="datetime64[D]"),
+        )
+        expected = [
+            fx.convert(amount, currencies[code], day)
+            for amount, code, day in zip(amounts, codes, days)
+        ]
+        assert converted.tolist() == expected
+        rows = fx.convert_rows(amounts, [currencies[code] for code in codes], days)
+        assert rows == expected
+        with pytest.raises(MissingRateError):
+            fx.convert_many(
+                np.array([1], dtype=np.int64),
+                np.array([1], dtype=np.int32),
+                currencies,
+                np.array([date(2023, 1, 1)], dtype="datetime64[D]"),
+            )
+
+    def test_load_rate_files(self, tmp_path):
+        path = tmp_path / "usd.csv"
+        path.write_text(RATES.replace("USD", "usd", 1))
+        assert list(load_rate_files([path])) == [
+            ("USD", date(2024, 1, 1), Decimal("90.5")),
+            ("USD", date(2024, 2, 1), Decimal("100")),
+        ]
+        path.write_text("date,currency,rate\n2024-01-01,USD,0\n")
+        with pytest.raises(ValueError, match="usd.csv:2"):
+            list(load_rate_files([path]))
+        path.write_text("day,rate\n")
+        with pytest.raises(ValueError):
+            list(load_rate_files([path]))
+
+
+@pytest.mark.asyncio
+class TestMultiCurrencyAPI:
+    """Операции в валюте: итоги и отчеты в базовой валюте."""
+
+    async def test_foreign_currency_in_reports(
+        self, client: AsyncClient, tmp_path, monkeypatch
+    ):
+        (tmp_path / "usd.csv").write_text(RATES)
+        monkeypatch.setattr(settings, "FX_RATES_DIR", str(tmp_path))
+        # Без токена в настройках загрузка через HTTP выключена
+        response = await client.post("/internal/fx/reload")
+        assert response.status_code == 403
+        monkeypatch.setattr(settings, "INTERNAL_TOKEN", "secret")
+        for headers in ({}, {"X-Internal-Token": "wrong"}):
+            response = await client.post("/internal/fx/reload", headers=headers)
+            assert response.status_code == 403
+        internal = {"X-Internal-Token": "secret"}
+        response = await client.post("/internal/fx/reload", headers=internal)
+        assert response.json() == {"loaded": 2}
+
+        user = {"X-User-Id": str(uuid4())}
+        created = []
+        try:
+            for amount, day in [(-1000, "2024-01-15"), (250, "2024-02-10")]:
+                response = await client.post(
+                    "/api/v1/transactions/",
+                    json={"amount": amount, "currency": "usd", "occurred_at": day},
+                    headers=user,
+                )
+                assert response.status_code == 201
+                assert response.json()["currency"] == "USD"
+                created.append(response.json())
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={"amount": -100, "occurred_at": "2024-01-20"},
+                headers=user,
+            )
+            assert response.json()["currency"] == settings.BASE_CURRENCY
+            created.append(response.json())
+
+            # Нет курса: валюта без курсов или дата раньше первого курса
+            for currency, day in (("EUR", "2024-01-15"), ("USD", "2023-12-31")):
+                response = await client.post(
+                    "/api/v1/transactions/",
+                    json={"amount": -1, "currency": currency, "occurred_at": day},
+                    headers=user,
+                )
+                assert response.status_code == 400
+            response = await client.put(
+                f"/api/v1/transactions/{created[1]['id']}",
+                json={"currency": "EUR"},
+                headers=user,
+            )
+            assert response.status_code == 400
+            response = await client.put(
+                f"/api/v1/transactions/{created[1]['id']}",
+                json={"amount": 500},
+                headers=user,
+            )
+            assert response.status_code == 200
+
+            response = await client.post(
+                "/api/v1/transactions/bulk",
+                json=[
+                    {"amount": -1, "currency": "EUR", "occurred_at": "2024-01-15"},
+                    {"amount": -1, "currency": "USD", "occurred_at": "2024-01-15"},
+                ],
+                headers=user,
+            )
+            result = response.json()
+            assert [error["index"] for error in result["errors"]] == [0]
+            created.extend(result["items"])
+
+            statement = (
+                "date,amount,currency,description\n"
+                "2024-01-20,-0.10,usd,Кофе\n"
+                "2024-01-20,-0.10,GBP,Чай\n"
+            )
+            response = await client.post(
+                "/api/v1/imports/",
+                files={"file": ("statement.csv", statement.encode())},
+                headers=user,
+            )
+            final = json.loads(response.text.splitlines()[-1])
+            assert final["imported"] == 1
+            assert [error["line"] for error in final["errors"]] == [3]
+
+            # Итоги в копейках базовой валюты по курсу на день операции:
+            # январь - 1000 * 90.5 + 100 + 1 * 90.5 (округление) + 10 * 90.5
+            response = await client.get("/api/v1/reports/monthly", headers=user)
+            assert [
+                (row["month"], row["income"], row["expense"]) for row in response.json()
+            ] == [("2024-01-01", 0, 90500 + 100 + 90 + 905), ("2024-02-01", 50000, 0)]
+
+            response = await client.get(
+                "/api/v1/reports/timeseries",
+                params={
+                    "granularity": "month",
+                    "from": "2024-01-01",
+                    "to": "2024-02-29",
+                },
+                headers=user,
+            )
+            data = response.json()
+            assert data["currency"] == settings.BASE_CURRENCY
+            assert (data["income"], data["expense"], data["count"]) == (
+                [0, 50000],
+                [91595, 0],
+                [4, 1],
+            )
+
+            if transaction_analytics is not None:
+                response = await client.get("/api/v1/reports/analytics", headers=user)
+                assert response.json()["expense"] == [91595, 0]
+                assert response.json()["income"] == [0, 50000]
+
+            # Новые курсы не сдвигают записанные итоги; изменение операции
+            # вычитает ее прежнюю сумму и прибавляет новую по новому курсу
+            (tmp_path / "usd.csv").write_text(RATES.replace("90.5", "80"))
+            await client.post("/internal/fx/reload", headers=internal)
+            response = await client.get("/api/v1/reports/monthly", headers=user)
+            assert response.json()[0]["expense"] == 91595
+            response = await client.put(
+                f"/api/v1/transactions/{created[0]['id']}",
+                json={"amount": -2000},
+                headers=user,
+            )
+            assert response.status_code == 200
+            response = await client.get("/api/v1/reports/monthly", headers=user)
+            assert response.json()[0]["expense"] == 91595 - 90500 + 160000
+            if transaction_analytics is not None:
+                response = await client.get("/api/v1/reports/analytics", headers=user)
+                assert response.json()["expense"] == [161095, 0]
+        finally:
+            response = await client.get("/api/v1/transactions/", headers=user)
+            for item in response.json():
+                await client.delete(f"/api/v1/transactions/{item['id']}", headers=user)
+
+        response = await client.get("/api/v1/reports/monthly", headers=user)
+        assert response.json() == []
@@ -0,0 +1,304 @@
+"""
+Тесты импорта банковских выписок.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.statements import (
+    decode,
+    parse_amount,
+    parse_csv,
+    parse_date,
+    parse_ofx,
+    parse_ofx_date,
+)
+from app.core.config import settings
+from app.crud import transaction
+from app.crud.crud_transaction import import_fingerprint
+from app.crud.rollup import monthly_report
+from app.models import Base
+
+
+async def texts_of(*parts: str):
+    for part in parts:
+        yield part
+
+
+async def collect(records):
+    return [record async for record in records]
+
+
+OFX = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240305120000[+3:MSK]
+<TRNAMT>-1250.50
+<NAME>Магазин
+<MEMO>Продукты
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240310
+<TRNAMT>90000.00
+<NAME>Зарплата
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class TestStatementParsing:
+    """Разбор выписок не зависит от того, как файл порезан на куски."""
+
+    def test_parse_amount(self):
+        assert parse_amount("-1234.56") == -123456
+        assert parse_amount("1 234,5") == 123450
+        assert parse_amount("−1.234,56") == -123456
+        assert parse_amount("1,234.56") == 123456
+        assert parse_amount("100") == 10000
+        for value in ("", "abc", "1.234", "nan"):
+            with pytest.raises(ValueError):
+                parse_amount(value)
+
+    def test_parse_dates(self):
+        assert parse_date("2024-03-05") == datetime(2024, 3, 5)
+        assert parse_date("05.03.2024 10:30") == datetime(2024, 3, 5, 10, 30)
+        with pytest.raises(ValueError):
+            parse_date("March 5")
+
+        msk = timezone(timedelta(hours=3))
+        assert parse_ofx_date("20240305120000.000[+3:MSK]") == datetime(
+            2024, 3, 5, 12, tzinfo=msk
+        )
+        assert parse_ofx_date("20240305") == datetime(2024, 3, 5, tzinfo=timezone.utc)
+        with pytest.raises(ValueError):
+            parse_ofx_date("2024")
+
+    async def test_csv_quotes_and_semicolons(self):
+        text = (
+            "Дата;Сумма;Описание;Лишняя\r\n"
+            '05.03.2024;-1 250,50;"Кафе; ""Уют""\nвторая строка";x\r\n'
+            "\r\n"
+            "06.03.2024;100;;\r\n"
+        )
+        expected = [
+            (
+                2,
+                {
+                    "date": "05.03.2024",
+                    "amount": "-1 250,50",
+                    "description": 'Кафе; "Уют"\nвторая строка',
+                },
+            ),
+            (5, {"date": "06.03.2024", "amount": "100"}),
+        ]
+        assert await collect(parse_csv(texts_of(text))) == expected
+        # Те же записи, если текст приходит по символу
+        assert await collect(parse_csv(texts_of(*text))) == expected
+
+        with pytest.raises(ValueError):
+            await collect(parse_csv(texts_of("name,value\n1,2\n")))
+        with pytest.raises(ValueError):
+            await collect(parse_csv(texts_of("")))
+
+    async def test_ofx_split_across_chunks(self):
+        expected = [
+            (
+                5,
+                {
+                    "date": "20240305120000[+3:MSK]",
+                    "amount": "-1250.50",
+                    "description": "Магазин Продукты",
+                },
+            ),
+            (
+                12,
+                {"date": "20240310", "amount": "90000.00", "description": "Зарплата"},
+            ),
+        ]
+        assert await collect(parse_ofx(texts_of(OFX))) == expected
+        chunks = [OFX[i : i + 7] for i in range(0, len(OFX), 7)]
+        assert await collect(parse_ofx(texts_of(*chunks))) == expected
+
+    async def test_decode_keeps_multibyte_characters(self):
+        data = "﻿Дата,Сумма".encode()
+
+        async def one_byte_chunks():
+            for i in range(len(data)):
+                yield data[i : i + 1]
+
+        assert "".join(await collect(decode(one_byte_chunks(), "utf-8"))) == (
+            "Дата,Сумма"
+        )
+
+    def test_fingerprint_is_stable(self):
+        moment = datetime(2024, 3, 5, 15, tzinfo=timezone(timedelta(hours=3)))
+        key = import_fingerprint(
+            None, occurred_at=moment, amount=-100, description="Кофе  в  пути"
+        )
+        assert len(key) == 32
+        assert key == import_fingerprint(
+            None,
+            occurred_at=datetime(2024, 3, 5, 12),
+            amount=-100,
+            description="кофе в пути",
+        )
+        assert key != import_fingerprint(None, occurred_at=moment, amount=-101)
+
+
+@pytest.mark.asyncio
+class TestInsertRows:
+    """Повторно импортированные строки не вставляются и не попадают в итоги."""
+
+    @pytest.fixture(autouse=True)
+    async def setup_db(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        yield
+        await self.engine.dispose()
+
+    async def test_duplicates_skipped(self):
+        user_id = str(uuid4())
+        transactions = transaction.for_owner(user_id)
+        moment = datetime(2024, 3, 5, 12, tzinfo=timezone.utc)
+        coffee = {"amount": -100, "occurred_at": moment, "description": "Кофе"}
+        tea = {"amount": -50, "occurred_at": moment, "description": "Чай"}
+
+        async with self.AsyncSessionLocal() as db:
+            # Дубликат внутри пачки (описание отличается регистром и пробелами)
+            twin = {**coffee, "description": "  кофе "}
+            assert await transactions.insert_rows(db, [coffee, twin]) == 1
+            # Дубликат уже вставленной строки
+            assert await transactions.insert_rows(db, [coffee, tea]) == 1
+            # Та же строка у другого владельца - не дубликат
+            other = transaction.for_owner(str(uuid4()))
+            assert await other.insert_rows(db, [coffee]) == 1
+
+            report = await monthly_report(db, user_id=user_id)
+            assert [(row.expense, row.count) for row in report] == [(150, 2)]
+
+
+@pytest.mark.asyncio
+class TestImportsAPI:
+    """Тесты /imports."""
+
+    async def test_import_csv(self, client: AsyncClient, monkeypatch):
+        monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+        user = {"X-User-Id": str(uuid4())}
+        response = await client.post(
+            "/api/v1/categories/", json={"name": f"Импорт {uuid4().hex[:8]}"}
+        )
+        category = response.json()
+
+        statement = (
+            "date;amount;description;category\n"
+            f"2024-03-05;-100,00;Кофе;{category['name']}\n"
+            "2024-03-06;abc;Ошибка;\n"
+            f"2024-03-07;-50;Чай;{category['id']}\n"
+            "2024-03-08;1000;Зарплата;\n"
+            "2024-03-09;-1;Неизвестная;Нет такой\n"
+        )
+        response = await client.post(
+            "/api/v1/imports/",
+            files={"file": ("statement.csv", statement.encode("cp1251"))},
+            data={"encoding": "cp1251"},
+            headers=user,
+        )
+        assert response.status_code == 202
+        assert response.headers["content-type"] == "application/x-ndjson"
+        job_id = response.headers["X-Import-Id"]
+        progress = [json.loads(line) for line in response.text.splitlines()]
+
+        try:
+            # Пачка из двух строк - строка хода, затем итог
+            assert [(p["status"], p["rows"], p["imported"]) for p in progress] == [
+                ("running", 2, 1),
+                ("running", 4, 3),
+                ("running", 5, 3),
+                ("done", 5, 3),
+            ]
+            assert "errors" not in progress[0]
+            assert progress[-1]["failed"] == 2
+            assert [e["line"] for e in progress[-1]["errors"]] == [3, 6]
+
+            # Повторный импорт той же выписки ничего не добавляет
+            response = await client.post(
+                "/api/v1/imports/",
+                files={"file": ("statement.csv", statement.encode("cp1251"))},
+                data={"encoding": "cp1251"},
+                headers=user,
+            )
+            result = json.loads(response.text.splitlines()[-1])
+            assert (result["imported"], result["skipped"]) == (0, 3)
+
+            response = await client.get(f"/api/v1/imports/{job_id}", headers=user)
+            assert response.status_code == 200
+            assert response.json()["imported"] == 3
+            response = await client.get(f"/api/v1/imports/{job_id}")
+            assert response.status_code == 404
+
+            # Итоги обновлены вместе со вставкой
+            response = await client.get(
+                "/api/v1/reports/monthly",
+                params={"from": "2024-03-01", "category": category["id"]},
+                headers=user,
+            )
+            assert [(r["expense"], r["count"]) for r in response.json()] == [(15000, 2)]
+        finally:
+            response = await client.get("/api/v1/transactions/", headers=user)
+            for item in response.json():
+                await client.delete(f"/api/v1/transactions/{item['id']}", headers=user)
+            await client.delete(f"/api/v1/categories/{category['id']}")
+
+    async def test_import_ofx(self, client: AsyncClient):
+        user = {"X-User-Id": str(uuid4())}
+        response = await client.post(
+            "/api/v1/imports/",
+            files={"file": ("statement.ofx", OFX.encode())},
+            headers=user,
+        )
+        result = json.loads(response.text.splitlines()[-1])
+        assert (result["format"], result["status"], result["imported"]) == (
+            "ofx",
+            "done",
+            2,
+        )
+
+        response = await client.get("/api/v1/transactions/", headers=user)
+        created = {item["amount"]: item for item in response.json()}
+        try:
+            assert created[-125050]["occurred_at"].startswith("2024-03-05T09:00:00")
+            assert created[-125050]["description"] == "Магазин Продукты"
+            assert created[9000000]["occurred_at"].startswith("2024-03-10T00:00:00")
+        finally:
+            for item in created.values():
+                await client.delete(f"/api/v1/transactions/{item['id']}", headers=user)
+
+    async def test_import_bad_file(self, client: AsyncClient):
+        response = await client.post(
+            "/api/v1/imports/",
+            files={"file": ("statement.csv", b"name,value\n1,2\n")},
+        )
+        result = json.loads(response.text.splitlines()[-1])
+        assert result["status"] == "failed"
+        assert result["detail"]
+        assert result["finished_at"]
+
+        response = await client.post(
+            "/api/v1/imports/",
+            files={"file": ("statement.csv", b"date,amount\n")},
+            data={"encoding": "no-such-codec"},
+        )
+        assert response.status_code == 400
@@ -2,10 +2,19 @@
 Тесты для API эндпоинтов заметок.
 """
 
+import csv
+import io
+import json
+from datetime import datetime
+
 import pytest
 from uuid import uuid4
 from httpx import AsyncClient
 
+from app.api.conditional import row_version
+from app.crud import note_suggest
+from app.models import Note
+
 
 @pytest.mark.asyncio
 class TestNotesAPI:
@@ -67,6 +76,48 @@ class TestNotesAPI:
         response = await client.get("/api/v1/notes/", params={"skip": 0, "limit": 5})
         assert response.status_code == 200
 
+    async def test_get_notes_cursor_pagination(self, client: AsyncClient):
+        """Тест пагинации по курсору (заголовок X-Next-Cursor)."""
+        created = []
+        for i in range(3):
+            response = await client.post(
+                "/api/v1/notes/", json={"title": f"Курсор {i}", "content": None}
+            )
+            created.append(response.json()["id"])
+
+        try:
+            response = await client.get("/api/v1/notes/", params={"limit": 1})
+            assert response.status_code == 200
+            cursor = response.headers.get("X-Next-Cursor")
+            assert cursor
+
+            response = await client.get(
+                "/api/v1/notes/", params={"after": cursor, "limit": 1}
+            )
+            assert response.status_code == 200
+            assert len(response.json()) == 1
+
+            # Некорректный курсор
+            response = await client.get("/api/v1/notes/", params={"after": "???"})
+            assert response.status_code == 400
+        finally:
+            for note_id in created:
+                await client.delete(f"/api/v1/notes/{note_id}")
+
+    async def test_get_notes_total_count(self, client: AsyncClient):
+        """Тест X-Total-Count: считается только по запросу."""
+        response = await client.get("/api/v1/notes/")
+        assert "X-Total-Count" not in response.headers
+        total = len(response.json())
+
+        for mode in ("exact", "estimated"):
+            response = await client.get("/api/v1/notes/", params={"count": mode})
+            assert response.status_code == 200
+            assert int(response.headers["X-Total-Count"]) == total
+
+        response = await client.get("/api/v1/notes/", params={"count": "bad"})
+        assert response.status_code == 422
+
     async def test_get_note_by_id_success(self, client: AsyncClient):
         """Тест успешного получения заметки по ID."""
         if not hasattr(TestNotesAPI, "note_id"):
@@ -161,6 +212,269 @@ class TestNotesAPI:
         assert "detail" in data
         assert "не найдена" in data["detail"].lower()
 
+    async def test_bulk_notes(self, client: AsyncClient):
+        """Тест массовых эндпоинтов /notes/bulk."""
+        response = await client.post(
+            "/api/v1/notes/bulk",
+            json=[{"title": "Пачка 1"}, {"title": ""}, {"title": "Пачка 2"}],
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [note["title"] for note in data["items"]] == ["Пачка 1", "Пачка 2"]
+        assert [error["index"] for error in data["errors"]] == [1]
+        ids = [note["id"] for note in data["items"]]
+
+        response = await client.patch(
+            "/api/v1/notes/bulk",
+            json=[{"id": ids[0], "title": "Пачка 1+"}, {"id": str(uuid4())}],
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"][0]["title"] == "Пачка 1+"
+        assert data["errors"][0]["index"] == 1
+
+        response = await client.request(
+            "DELETE", "/api/v1/notes/bulk", json={"ids": ids + [str(uuid4())]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert {note["id"] for note in data["items"]} == set(ids)
+        assert [error["index"] for error in data["errors"]] == [2]
+
+    async def test_get_notes_by_ids(self, client: AsyncClient):
+        """Тест получения заметок по списку ID (?ids=a,b,c)."""
+        response = await client.post(
+            "/api/v1/notes/bulk", json=[{"title": "По ID 1"}, {"title": "По ID 2"}]
+        )
+        ids = [note["id"] for note in response.json()["items"]]
+
+        try:
+            response = await client.get(
+                "/api/v1/notes/",
+                params={"ids": ",".join([ids[1], str(uuid4()), ids[0]])},
+            )
+            assert response.status_code == 200
+            assert [note["id"] for note in response.json()] == [ids[1], ids[0]]
+        finally:
+            await client.request("DELETE", "/api/v1/notes/bulk", json={"ids": ids})
+
+    async def test_export_notes(self, client: AsyncClient):
+        """Тест потоковой выгрузки заметок в NDJSON и CSV."""
+        response = await client.post(
+            "/api/v1/notes/bulk",
+            json=[{"title": "Выгрузка 1"}, {"title": "Выгрузка 2"}],
+        )
+        ids = [note["id"] for note in response.json()["items"]]
+
+        try:
+            response = await client.get("/api/v1/notes/export")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert set(ids) <= {line["id"] for line in lines}
+
+            response = await client.get(
+                "/api/v1/notes/export", params={"format": "csv"}
+            )
+            assert response.status_code == 200
+            rows = list(csv.DictReader(io.StringIO(response.text)))
+            assert {"Выгрузка 1", "Выгрузка 2"} <= {row["title"] for row in rows}
+
+            response = await client.get(
+                "/api/v1/notes/export", params={"format": "xml"}
+            )
+            assert response.status_code == 422
+        finally:
+            await client.request("DELETE", "/api/v1/notes/bulk", json={"ids": ids})
+
+    async def test_full_text_search(self, client: AsyncClient):
+        """Тест GET /notes/search."""
+        response = await client.post(
+            "/api/v1/notes/bulk",
+            json=[
+                {"title": "Абонемент в бассейн", "content": "спорт"},
+                {"title": "Бассейн", "content": "разовое посещение бассейна"},
+            ],
+        )
+        ids = [note["id"] for note in response.json()["items"]]
+
+        try:
+            response = await client.get(
+                "/api/v1/notes/search", params={"q": "бассейн", "limit": 1}
+            )
+            assert response.status_code == 200
+            assert len(response.json()) == 1
+            cursor = response.headers["X-Next-Cursor"]
+
+            response = await client.get(
+                "/api/v1/notes/search", params={"q": "бассейн", "after": cursor}
+            )
+            assert len(response.json()) == 1
+            assert "X-Next-Cursor" not in response.headers
+        finally:
+            await client.request("DELETE", "/api/v1/notes/bulk", json={"ids": ids})
+
+    async def test_suggest_notes(self, client: AsyncClient, db_session):
+        """Тест GET /notes/suggest."""
+        # Индекс строится в фоне; здесь, как при старте, дожидаемся его
+        await note_suggest.ensure_built(db_session, wait=True)
+        response = await client.post(
+            "/api/v1/notes/bulk",
+            json=[
+                {"title": "Автодополнение: кофе"},
+                {"title": "Автодополнение: Бензин"},
+                {"title": "автодополнение: кофе"},
+            ],
+        )
+        ids = [note["id"] for note in response.json()["items"]]
+
+        try:
+            response = await client.get(
+                "/api/v1/notes/suggest", params={"prefix": "АВТОДОПОЛНЕНИЕ"}
+            )
+            assert response.status_code == 200
+            assert response.json() == [
+                "Автодополнение: Бензин",
+                "Автодополнение: кофе",
+            ]
+        finally:
+            await client.request("DELETE", "/api/v1/notes/bulk", json={"ids": ids})
+
+        response = await client.get(
+            "/api/v1/notes/suggest", params={"prefix": "автодополнение"}
+        )
+        assert response.json() == []
+
+    async def test_conditional_get_notes(self, client: AsyncClient):
+        """Тест ETag / Last-Modified / 304 для заметки и списка."""
+        response = await client.post("/api/v1/notes/", json={"title": "Условный"})
+        note_id = response.json()["id"]
+
+        try:
+            response = await client.get(f"/api/v1/notes/{note_id}")
+            etag = response.headers["ETag"]
+            last_modified = response.headers["Last-Modified"]
+
+            response = await client.get(
+                f"/api/v1/notes/{note_id}", headers={"If-None-Match": etag}
+            )
+            assert response.status_code == 304
+            assert response.headers["ETag"] == etag
+
+            response = await client.get(
+                f"/api/v1/notes/{note_id}",
+                headers={"If-Modified-Since": last_modified},
+            )
+            assert response.status_code == 304
+
+            response = await client.get("/api/v1/notes/", params={"limit": 1000})
+            list_etag = response.headers["ETag"]
+            response = await client.get(
+                "/api/v1/notes/",
+                params={"limit": 1000},
+                headers={"If-None-Match": list_etag},
+            )
+            assert response.status_code == 304
+
+            # Запись меняет оба валидатора
+            await client.put(f"/api/v1/notes/{note_id}", json={"title": "Новый"})
+            response = await client.get(
+                f"/api/v1/notes/{note_id}", headers={"If-None-Match": etag}
+            )
+            assert response.status_code == 200
+            assert response.json()["title"] == "Новый"
+
+            response = await client.get(
+                "/api/v1/notes/",
+                params={"limit": 1000},
+                headers={"If-None-Match": list_etag},
+            )
+            assert response.status_code == 200
+        finally:
+            await client.delete(f"/api/v1/notes/{note_id}")
+
+    async def test_page_etag_tracks_next_page(self, client: AsyncClient):
+        """Тест: ETag последней страницы меняется, когда за ней есть строки."""
+        user = {"X-User-Id": str(uuid4())}
+        ids = []
+        try:
+            response = await client.post(
+                "/api/v1/notes/", json={"title": "Первая"}, headers=user
+            )
+            ids.append(response.json()["id"])
+            page = {"limit": 1}
+            response = await client.get("/api/v1/notes/", params=page, headers=user)
+            assert "X-Next-Cursor" not in response.headers
+            etag = response.headers["ETag"]
+
+            response = await client.post(
+                "/api/v1/notes/", json={"title": "Вторая"}, headers=user
+            )
+            ids.append(response.json()["id"])
+            response = await client.get(
+                "/api/v1/notes/", params=page, headers={**user, "If-None-Match": etag}
+            )
+            assert response.status_code == 200
+            assert "X-Next-Cursor" in response.headers
+        finally:
+            for note_id in ids:
+                await client.delete(f"/api/v1/notes/{note_id}", headers=user)
+
+    async def test_row_version_ignores_timestamp_precision(self):
+        """Тест: правка в ту же секунду меняет версию строки."""
+        updated_at = datetime(2024, 3, 5, 10, 0, 0)
+        versions = [
+            row_version(Note(id="n", title=title, updated_at=updated_at))
+            for title in ("Было", "Было", "Стало")
+        ]
+        assert versions[0] == versions[1] != versions[2]
+
+    async def test_notes_scoped_by_user(self, client: AsyncClient):
+        """Тест X-User-Id: пользователь видит и меняет только свои заметки."""
+        alice = {"X-User-Id": str(uuid4())}
+        bob = {"X-User-Id": str(uuid4())}
+
+        response = await client.post(
+            "/api/v1/notes/", json={"title": "Владелец: Алиса"}, headers=alice
+        )
+        assert response.status_code == 201
+        note = response.json()
+        assert note["user_id"] == alice["X-User-Id"]
+
+        try:
+            response = await client.get("/api/v1/notes/", headers=alice)
+            assert [n["id"] for n in response.json()] == [note["id"]]
+            assert "X-User-Id" in response.headers["Vary"]
+
+            response = await client.get("/api/v1/notes/", headers=bob)
+            assert response.json() == []
+            response = await client.get("/api/v1/notes/")
+            assert note["id"] not in [n["id"] for n in response.json()]
+
+            response = await client.get(f"/api/v1/notes/{note['id']}", headers=bob)
+            assert response.status_code == 404
+            response = await client.put(
+                f"/api/v1/notes/{note['id']}", json={"title": "Нет"}, headers=bob
+            )
+            assert response.status_code == 404
+            response = await client.delete(f"/api/v1/notes/{note['id']}", headers=bob)
+            assert response.status_code == 404
+
+            response = await client.get(
+                "/api/v1/notes/suggest", params={"prefix": "Владелец"}, headers=bob
+            )
+            assert response.json() == []
+            response = await client.get(
+                "/api/v1/notes/suggest", params={"prefix": "Владелец"}, headers=alice
+            )
+            assert response.json() == ["Владелец: Алиса"]
+
+            response = await client.get("/api/v1/notes/export", headers=bob)
+            assert response.text == ""
+        finally:
+            response = await client.delete(f"/api/v1/notes/{note['id']}", headers=alice)
+            assert response.status_code == 200
+
     async def test_search_notes_by_title(self, client: AsyncClient):
         """Тест поиска заметок по заголовку (если есть такой эндпоинт)."""
         # Сначала создаем заметку для поиска
@@ -0,0 +1,100 @@
+"""
+Тесты наблюдения за пулом соединений.
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.pool import (
+    Histogram,
+    InstrumentedPool,
+    PoolMonitor,
+    current_handler,
+    prometheus_metrics,
+)
+
+
+class TestHistogram:
+    """Тесты гистограммы ожидания."""
+
+    def test_cumulative_buckets(self):
+        """Тест: счетчики корзин накопленные, последняя - +Inf."""
+        histogram = Histogram(buckets=(0.01, 0.1))
+        for value in (0.001, 0.05, 0.05, 3.0):
+            histogram.observe(value)
+
+        data = histogram.to_dict()
+        assert data["buckets"] == {"0.01": 1, "0.1": 3, "+Inf": 4}
+        assert data["count"] == 4
+
+
+@pytest.mark.asyncio
+class TestPoolMonitor:
+    """Тесты монитора пула на SQLite файле."""
+
+    @pytest.fixture(autouse=True)
+    async def setup_engine(self, tmp_path):
+        """Пул из одного соединения без overflow и с коротким таймаутом."""
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedPool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        self.monitor = PoolMonitor(long_held_seconds=0.0).attach(self.engine)
+
+        yield
+
+        await self.engine.dispose()
+
+    async def test_checkout_timeout_and_long_held(self):
+        """Тест: ожидание, таймаут и удерживающий соединение обработчик."""
+        token = current_handler.set("GET /api/v1/notes/")
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+                stats = self.monitor.stats()
+                assert stats["checked_out"] == 1
+                assert stats["long_held"][0]["handler"] == "GET /api/v1/notes/"
+
+                # Единственное соединение занято - второй checkout ждет и падает
+                with pytest.raises(PoolTimeoutError):
+                    async with self.engine.connect() as other:
+                        await other.execute(text("SELECT 1"))
+        finally:
+            current_handler.reset(token)
+
+        stats = self.monitor.stats()
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["timeouts"] == 1
+        assert stats["long_held_total"] == 1
+        assert stats["wait_seconds"]["count"] == 2
+        assert stats["wait_seconds"]["sum"] >= 0.05
+
+        metrics = prometheus_metrics(self.monitor)
+        assert "db_pool_timeouts_total 1" in metrics
+        assert 'db_pool_checkout_wait_seconds_bucket{le="+Inf"} 2' in metrics
+
+
+@pytest.mark.asyncio
+class TestPoolAPI:
+    """Тесты служебных эндпоинтов."""
+
+    async def test_internal_pool(self, client: AsyncClient):
+        """Тест GET /internal/pool и /internal/metrics."""
+        response = await client.get("/internal/pool")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["pool_class"] == "InstrumentedPool"
+        assert "+Inf" in data["wait_seconds"]["buckets"]
+
+        response = await client.get("/internal/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE db_pool_checkout_wait_seconds histogram" in response.text
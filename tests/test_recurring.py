@@ -0,0 +1,258 @@
+"""
+Тесты правил повторения и повторений по запросу.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.crud import recurring_rule, transaction
+from app.crud.recurrence import occurrence_dates
+from app.models import Base, Transaction
+from app.schemas.recurrence import RecurringRuleCreate
+
+
+def rule(frequency: str, starts_on: date, **kwargs) -> SimpleNamespace:
+    fields = {"interval": 1, "weekday": None, "month_day": None, "ends_on": None}
+    fields.update(kwargs)
+    return SimpleNamespace(frequency=frequency, starts_on=starts_on, **fields)
+
+
+class TestOccurrenceDates:
+    """Тесты расчета дат повторений."""
+
+    def test_monthly_clamps_to_month_end(self):
+        rent = rule("monthly", date(2024, 1, 31))
+        assert occurrence_dates(rent, date(2024, 1, 1), date(2024, 4, 30)) == [
+            date(2024, 1, 31),
+            date(2024, 2, 29),
+            date(2024, 3, 31),
+            date(2024, 4, 30),
+        ]
+        quarterly = rule("monthly", date(2024, 1, 20), interval=3, month_day=5)
+        assert occurrence_dates(quarterly, date(2024, 1, 1), date(2024, 12, 31)) == [
+            date(2024, 4, 5),
+            date(2024, 7, 5),
+            date(2024, 10, 5),
+        ]
+
+    def test_weekly_and_daily(self):
+        # 2024-01-03 - среда, повторения по пятницам раз в две недели
+        salary = rule(
+            "weekly", date(2024, 1, 3), weekday=4, interval=2, ends_on=date(2024, 2, 9)
+        )
+        assert occurrence_dates(salary, date(2024, 1, 6), date(2024, 12, 31)) == [
+            date(2024, 1, 19),
+            date(2024, 2, 2),
+        ]
+        daily = rule("daily", date(2024, 1, 1), interval=10)
+        assert occurrence_dates(daily, date(2024, 1, 5), date(2024, 1, 31)) == [
+            date(2024, 1, 11),
+            date(2024, 1, 21),
+            date(2024, 1, 31),
+        ]
+
+    def test_window_far_from_start_is_cheap(self):
+        # Окно через 200 лет от начала: даты не перебираются с начала правила
+        daily = rule("daily", date(1900, 1, 1))
+        dates = occurrence_dates(daily, date(2100, 1, 1), date(2100, 1, 3))
+        assert dates == [date(2100, 1, 1), date(2100, 1, 2), date(2100, 1, 3)]
+        assert occurrence_dates(daily, date(1800, 1, 1), date(1899, 12, 31)) == []
+
+
+@pytest.mark.asyncio
+class TestCRUDRecurringRule:
+    """Сохраняются только подтвержденные повторения."""
+
+    @pytest.fixture(autouse=True)
+    async def setup_db(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        yield
+        await self.engine.dispose()
+
+    async def test_materialize_and_merge(self):
+        user_id = str(uuid4())
+        rules = recurring_rule.for_owner(user_id)
+        transactions = transaction.for_owner(user_id)
+
+        async with self.AsyncSessionLocal() as db:
+            rent = await rules.create(
+                db,
+                obj_in=RecurringRuleCreate(
+                    amount=-50000, frequency="monthly", starts_on=date(2024, 1, 10)
+                ),
+            )
+            coffee = await rules.create(
+                db,
+                obj_in=RecurringRuleCreate(
+                    amount=-300,
+                    frequency="weekly",
+                    weekday=2,
+                    starts_on=date(2024, 1, 1),
+                    ends_on=date(2024, 1, 31),
+                ),
+            )
+
+            # Правила ничего не вставляют
+            count = select(func.count()).select_from(Transaction)
+            assert (await db.execute(count)).scalar_one() == 0
+
+            confirmed = await rules.materialize(
+                db,
+                rule=rent,
+                on=date(2024, 2, 10),
+                changes={"amount": -52000},
+                transactions=transactions,
+            )
+            assert (confirmed.rule_id, confirmed.amount) == (rent.id, -52000)
+            # Повторное подтверждение меняет ту же операцию
+            again = await rules.materialize(
+                db,
+                rule=rent,
+                on=date(2024, 2, 10),
+                changes={"description": "С пеней"},
+                transactions=transactions,
+            )
+            assert again.id == confirmed.id
+            assert (await db.execute(count)).scalar_one() == 1
+
+            occurrences = await rules.occurrences(
+                db, start=date(2024, 1, 15), end=date(2024, 3, 15)
+            )
+            assert [
+                (o.occurrence_date, o.amount, o.transaction_id) for o in occurrences
+            ] == [
+                (date(2024, 1, 17), -300, None),
+                (date(2024, 1, 24), -300, None),
+                (date(2024, 1, 31), -300, None),
+                (date(2024, 2, 10), -52000, confirmed.id),
+                (date(2024, 3, 10), -50000, None),
+            ]
+            assert coffee.id in {o.rule_id for o in occurrences}
+
+            planned = await rules.occurrences(
+                db, start=date(2024, 2, 1), end=date(2024, 3, 31), planned_only=True
+            )
+            assert [o.occurrence_date for o in planned] == [date(2024, 3, 10)]
+
+            with pytest.raises(ValueError):
+                await rules.materialize(
+                    db,
+                    rule=rent,
+                    on=date(2024, 2, 11),
+                    changes={},
+                    transactions=transactions,
+                )
+
+            # Чужие правила не видны
+            other = recurring_rule.for_owner(str(uuid4()))
+            assert (
+                await other.occurrences(
+                    db, start=date(2024, 1, 1), end=date(2025, 1, 1)
+                )
+                == []
+            )
+
+
+@pytest.mark.asyncio
+class TestRecurringAPI:
+    """Тесты /recurring."""
+
+    async def test_confirm_occurrence(self, client: AsyncClient):
+        user = {"X-User-Id": str(uuid4())}
+        response = await client.post(
+            "/api/v1/recurring/",
+            json={
+                "amount": -1000,
+                "frequency": "monthly",
+                "month_day": 31,
+                "starts_on": "2024-01-01",
+                "ends_on": "2024-03-31",
+            },
+            headers=user,
+        )
+        assert response.status_code == 201
+        rule_id = response.json()["id"]
+        created = []
+
+        try:
+            response = await client.post(
+                f"/api/v1/recurring/{rule_id}/occurrences/2024-02-29",
+                json={"amount": -1200},
+                headers=user,
+            )
+            assert response.status_code == 200
+            operation = response.json()
+            created.append(operation)
+            assert operation["occurrence_date"] == "2024-02-29"
+            assert operation["occurred_at"].startswith("2024-02-29T00:00:00")
+
+            response = await client.get(
+                "/api/v1/recurring/occurrences",
+                params={"from": "2024-01-01", "to": "2024-12-31"},
+                headers=user,
+            )
+            assert [
+                (o["occurrence_date"], o["amount"], o["transaction_id"])
+                for o in response.json()
+            ] == [
+                ("2024-01-31", -1000, None),
+                ("2024-02-29", -1200, operation["id"]),
+                ("2024-03-31", -1000, None),
+            ]
+
+            # Отчет: подтвержденное - из операций, плановые - по запросу
+            params = {
+                "granularity": "month",
+                "from": "2024-01-01",
+                "to": "2024-03-31",
+            }
+            response = await client.get(
+                "/api/v1/reports/timeseries", params=params, headers=user
+            )
+            assert response.json()["expense"] == [0, 1200, 0]
+            response = await client.get(
+                "/api/v1/reports/timeseries",
+                params={**params, "include_planned": True},
+                headers=user,
+            )
+            assert response.json()["expense"] == [1000, 1200, 1000]
+
+            # Дата не из расписания, чужое правило, неверное расписание
+            response = await client.post(
+                f"/api/v1/recurring/{rule_id}/occurrences/2024-02-28", headers=user
+            )
+            assert response.status_code == 400
+            response = await client.post(
+                f"/api/v1/recurring/{rule_id}/occurrences/2024-01-31"
+            )
+            assert response.status_code == 404
+            response = await client.post(
+                "/api/v1/recurring/",
+                json={
+                    "amount": -1,
+                    "frequency": "daily",
+                    "weekday": 1,
+                    "starts_on": "2024-01-01",
+                },
+            )
+            assert response.status_code == 422
+            response = await client.get(
+                "/api/v1/recurring/occurrences",
+                params={"from": "2000-01-01", "to": "2100-01-01"},
+            )
+            assert response.status_code == 400
+        finally:
+            for item in created:
+                await client.delete(f"/api/v1/transactions/{item['id']}", headers=user)
+            await client.delete(f"/api/v1/recurring/{rule_id}", headers=user)
@@ -0,0 +1,188 @@
+"""
+Тесты маршрутизации чтения на реплики.
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.cache import LRUTTLCache
+from app.core.replicas import (
+    ReplicaSet,
+    RoutingSession,
+    pin_to_primary,
+    primary_pinned,
+    reads_from_replica,
+    use_replica,
+)
+from app.crud import category
+from app.crud.analytics import AnalyticsCache
+from app.crud.catalog import Catalog
+from app.crud.crud_category import CRUDCategory
+from app.crud.crud_note import CRUDNote
+from app.models import Base, Category, Note, Transaction
+from app.schemas.category import CategoryCreate
+from app.schemas.note import NoteCreate
+
+
+def make_request(method: str = "GET", headers: dict = None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "headers": raw})
+
+
+@pytest.mark.asyncio
+class TestRoutingSession:
+    """Тесты RoutingSession на двух независимых SQLite БД."""
+
+    @pytest.fixture(autouse=True)
+    async def setup_db(self):
+        """Основная БД и "реплика" (пустая, без репликации)."""
+        self.primary = create_async_engine("sqlite+aiosqlite:///:memory:")
+        self.replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+        for engine in (self.primary, self.replica):
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        self.SessionLocal = async_sessionmaker(
+            self.primary,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            expire_on_commit=False,
+        )
+        self.crud = CRUDNote(Note)
+
+        yield
+
+        await self.primary.dispose()
+        await self.replica.dispose()
+
+    async def test_reads_go_to_replica_writes_to_primary(self):
+        """Тест: SELECT - на реплику, запись и чтение после нее - на основную."""
+        async with self.SessionLocal() as db:
+            db.info["replica"] = self.replica
+            created = await self.crud.create(db, obj_in=NoteCreate(title="Запись"))
+            # После записи сессия читает с основной БД
+            assert await self.crud.get(db, created.id) is not None
+
+        async with self.SessionLocal() as db:
+            db.info["replica"] = self.replica
+            # Реплика ничего не знает о записи
+            assert await self.crud.get(db, created.id) is None
+            assert await self.crud.count(db, mode="exact") == 0
+
+        async with self.SessionLocal() as db:
+            # Без реплики - основная БД
+            assert await self.crud.get(db, created.id) is not None
+
+    async def test_caches_not_filled_from_replica(self):
+        """Тест: прочитанное с реплики не попадает в кеш и каталог."""
+        crud = CRUDCategory(Category, schema=category.schema, cache=LRUTTLCache())
+        catalog = Catalog(crud, key="name", ttl=3600)
+
+        async with self.SessionLocal() as db:
+            food = await crud.create(db, obj_in=CategoryCreate(name="Еда"))
+
+        # "Реплика" отстает: у нее та же строка со старым именем
+        async with self.replica.begin() as conn:
+            await conn.run_sync(
+                lambda sync: sync.execute(
+                    Category.__table__.insert().values(
+                        id=food.id,
+                        name="Старое",
+                        created_at=food.created_at,
+                        updated_at=food.updated_at,
+                    )
+                )
+            )
+
+        async with self.SessionLocal() as db:
+            db.info["replica"] = self.replica
+            assert reads_from_replica(db)
+            entry = await crud.get_json_entry(db, food.id)
+            assert json.loads(entry.body)["name"] == "Старое"
+            assert crud.cache.get(food.id) is None
+            await crud.get_many_json(db, ids=[food.id])
+            assert crud.cache.get(food.id) is None
+
+            # Снимок каталога живет ttl, поэтому читается с основной БД
+            snapshot = await catalog.get(db)
+            assert list(snapshot.by_key) == ["Еда"]
+
+        async with self.SessionLocal() as db:
+            assert not reads_from_replica(db)
+            entry = await crud.get_json_entry(db, food.id)
+            assert crud.cache.get(food.id).body == entry.body
+
+    async def test_analytics_frame_loaded_from_primary(self):
+        """Тест: колонки аналитики не грузятся с отстающей реплики."""
+        pytest.importorskip("numpy")
+        analytics = AnalyticsCache(max_users=10, ttl=3600)
+        async with self.SessionLocal() as db:
+            db.add(
+                Transaction(
+                    amount=-500,
+                    base_amount=-500,
+                    currency="RUB",
+                    occurred_at=datetime(2024, 3, 5, tzinfo=timezone.utc),
+                )
+            )
+            await db.commit()
+
+        async with self.SessionLocal() as db:
+            db.info["replica"] = self.replica
+            assert reads_from_replica(db)
+            frame = await analytics.get(db, None)
+        # Реплика пуста, но кешированы строки основной БД
+        assert frame.amount.tolist() == [-500]
+        assert analytics.cache.get("") is frame
+
+
+@pytest.mark.asyncio
+class TestReplicaSet:
+    """Тесты выбора реплик."""
+
+    async def test_round_robin_and_health(self, tmp_path):
+        """Тест: выбор по кругу, недоступная реплика исключается."""
+        good = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ok.db'}")
+        bad = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'bad.db'}"
+        )
+        replicas = ReplicaSet([good, bad], max_lag=5.0)
+        try:
+            assert [replicas.pick(), replicas.pick()] == [good, bad]
+
+            await replicas.check()
+            assert [replicas.pick(), replicas.pick()] == [good, good]
+            assert replicas.failures == 1
+
+            replicas.mark(good, False)
+            assert replicas.pick() is None
+        finally:
+            await good.dispose()
+            await bad.dispose()
+
+
+class TestReadYourWrites:
+    """Тесты окна read-your-writes."""
+
+    def test_pin_and_expire(self):
+        """Тест: после записи чтения клиента идут на основную БД."""
+        response = Response()
+        pin_to_primary(response, 5.0)
+        until = response.headers["X-Primary-Until"]
+        assert "primary_until=" in response.headers["set-cookie"]
+
+        pinned = make_request(headers={"X-Primary-Until": until})
+        assert primary_pinned(pinned)
+        assert not use_replica(pinned)
+        assert not primary_pinned(pinned, now=time.time() + 10)
+
+        cookie = make_request(headers={"Cookie": f"primary_until={until}"})
+        assert primary_pinned(cookie)
+
+        assert use_replica(make_request())
+        assert not use_replica(make_request("POST"))
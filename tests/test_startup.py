@@ -0,0 +1,108 @@
+"""
+Тесты быстрого старта: отпечаток схемы и отложенные импорты.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.lazy import LazyModule, optional_module
+from app.core.schema import (
+    SchemaMismatchError,
+    check_fingerprint,
+    schema_fingerprint,
+    store_fingerprint,
+)
+from app.models import Base
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.mark.asyncio
+class TestSchemaFingerprint:
+    """Старт с DB_STARTUP_MODE=fingerprint: один SELECT вместо DDL."""
+
+    async def test_check_after_create_all(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        try:
+            async with engine.connect() as conn:
+                with pytest.raises(SchemaMismatchError, match="не инициализирована"):
+                    await check_fingerprint(conn, Base.metadata)
+
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                stored = await store_fingerprint(conn, Base.metadata)
+            async with engine.connect() as conn:
+                assert await check_fingerprint(conn, Base.metadata) == stored
+
+                # Модели изменились после создания схемы
+                changed = MetaData()
+                for table in Base.metadata.sorted_tables:
+                    table.to_metadata(changed)
+                # Копия моделей (другой порядок создания ограничений) совпадает
+                assert await check_fingerprint(conn, changed) == stored
+                changed.tables["fx_rates"].append_column(Column("extra", Integer))
+                with pytest.raises(SchemaMismatchError, match="не совпадает"):
+                    await check_fingerprint(conn, changed)
+        finally:
+            await engine.dispose()
+
+    async def test_store_refuses_old_tables(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            # В модели добавлена колонка: create_all старую таблицу не меняет
+            changed = MetaData()
+            for table in Base.metadata.sorted_tables:
+                table.to_metadata(changed)
+            changed.tables["fx_rates"].append_column(Column("extra", Integer))
+            async with engine.begin() as conn:
+                await conn.run_sync(changed.create_all)
+                with pytest.raises(
+                    SchemaMismatchError, match="fx_rates.extra: нет колонки"
+                ):
+                    await store_fingerprint(conn, changed)
+            async with engine.connect() as conn:
+                with pytest.raises(SchemaMismatchError):
+                    await check_fingerprint(conn, changed)
+        finally:
+            await engine.dispose()
+
+    async def test_fingerprint_depends_on_dialect(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        sqlite = schema_fingerprint(Base.metadata, engine.dialect)
+        await engine.dispose()
+        assert sqlite == schema_fingerprint(Base.metadata, engine.dialect)
+        assert sqlite != schema_fingerprint(Base.metadata, postgresql.dialect())
+
+
+class TestColdImport:
+    """Тяжелые необязательные модули не импортируются при старте."""
+
+    def test_lazy_module(self):
+        module = optional_module("json")
+        assert isinstance(module, LazyModule)
+        assert module.dumps([1]) == "[1]"
+        assert optional_module("no_such_package_xyz") is None
+
+    def test_app_import_skips_deferred_modules(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                str(ROOT / "scripts" / "check_import_time.py"),
+                # Время зависит от машины: здесь проверяются только модули
+                "--budget-ms",
+                "60000",
+            ],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,504 @@
+"""
+Тесты операций и помесячных итогов.
+"""
+
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.crud import analytics, transaction
+from app.crud.rollup import month_of, monthly_report, rollup_deltas
+from app.crud.timeseries import timeseries
+from app.models import Base, MonthlyRollup, Transaction
+from app.schemas.transaction import TransactionCreate
+
+
+def at(year: int, month: int, day: int = 1) -> datetime:
+    return datetime(year, month, day, 12, tzinfo=timezone.utc)
+
+
+async def rollups(db: AsyncSession) -> dict:
+    """Итоги из monthly_rollups: ключ -> (income, expense, count)."""
+    result = await db.execute(select(MonthlyRollup))
+    return {
+        (r.user_key, r.month, r.category_key): (r.income, r.expense, r.count)
+        for r in result.scalars()
+    }
+
+
+async def recomputed(db: AsyncSession) -> dict:
+    """Те же итоги, посчитанные полным проходом по операциям."""
+    result = await db.execute(
+        select(
+            Transaction.user_id,
+            Transaction.occurred_at,
+            Transaction.category_id,
+            Transaction.amount,
+        )
+    )
+    totals: dict = {}
+    for user_id, occurred_at, category_id, amount in result:
+        key = (user_id or "", month_of(occurred_at), category_id or "")
+        income, expense, count = totals.get(key, (0, 0, 0))
+        totals[key] = (
+            income + max(amount, 0),
+            expense + max(-amount, 0),
+            count + 1,
+        )
+    return totals
+
+
+class TestRollupDeltas:
+    """Тесты вычисления дельт итогов."""
+
+    def test_month_of_uses_utc(self):
+        moscow = datetime.fromisoformat("2024-03-01T01:00:00+03:00")
+        assert month_of(moscow) == date(2024, 2, 1)
+        assert month_of(datetime(2024, 3, 31, 23)) == date(2024, 3, 1)
+
+    def test_update_moves_amount_between_months(self):
+        old = Transaction(base_amount=-500, occurred_at=at(2024, 1), category_id="c")
+        new = Transaction(base_amount=-700, occurred_at=at(2024, 2), category_id="c")
+        assert rollup_deltas([old], [new]) == {
+            ("", date(2024, 1, 1), "c"): [0, -500, -1],
+            ("", date(2024, 2, 1), "c"): [0, 700, 1],
+        }
+        # Запись без изменения суммы, месяца и категории итоги не трогает
+        assert rollup_deltas([old], [old]) == {}
+
+
+@pytest.mark.asyncio
+class TestCRUDTransaction:
+    """Итоги должны совпадать с полным пересчетом после любой записи."""
+
+    @pytest.fixture(autouse=True)
+    async def setup_db(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        yield
+        await self.engine.dispose()
+
+    async def test_rollups_follow_writes(self):
+        user_id = str(uuid4())
+        crud = transaction.for_owner(user_id)
+
+        async with self.AsyncSessionLocal() as db:
+            first = await crud.create(
+                db,
+                obj_in=TransactionCreate(
+                    amount=-1000, occurred_at=at(2024, 1, 5), category_id="food"
+                ),
+            )
+            many = await crud.create_many(
+                db,
+                objs_in=[
+                    TransactionCreate(
+                        amount=amount, occurred_at=at(2024, month), category_id=cat
+                    )
+                    for amount, month, cat in [
+                        (-250, 1, "food"),
+                        (50000, 1, None),
+                        (-300, 2, "food"),
+                        (-999, 2, "fun"),
+                    ]
+                ],
+            )
+            await transaction.create(
+                db, obj_in=TransactionCreate(amount=-1, occurred_at=at(2024, 1))
+            )
+            assert await rollups(db) == await recomputed(db)
+            assert (await rollups(db))[(user_id, date(2024, 1, 1), "food")] == (
+                0,
+                1250,
+                2,
+            )
+
+            # Перенос в другой месяц и категорию, смена знака
+            await crud.update_by_id(
+                db,
+                id=first.id,
+                obj_in={"occurred_at": at(2024, 2, 10), "category_id": "fun"},
+            )
+            await crud.update(db, db_obj=many[0], obj_in={"amount": 250})
+            await crud.update_many(
+                db, objs_in=[{"id": many[2].id, "amount": -350, "category_id": "fun"}]
+            )
+            assert await rollups(db) == await recomputed(db)
+
+            await crud.remove(db, id=many[1].id)
+            await crud.remove_many(db, ids=[many[3].id])
+            await crud.remove_by_filter(db, Transaction.amount < 0)
+            assert await rollups(db) == await recomputed(db)
+
+            # Итоги без операций удаляются
+            report = await monthly_report(db, user_id=user_id)
+            assert [(r.month, r.category_key, r.income) for r in report] == [
+                (date(2024, 1, 1), "food", 250)
+            ]
+
+            # Чужие операции не меняются и не попадают в отчет
+            assert await crud.remove(db, id=str(uuid4())) is None
+            assert len(await monthly_report(db, user_id=None)) == 1
+
+    async def test_timeseries_buckets_in_sql(self):
+        user_id = str(uuid4())
+        async with self.AsyncSessionLocal() as db:
+            await transaction.for_owner(user_id).create_many(
+                db,
+                objs_in=[
+                    TransactionCreate(
+                        amount=amount,
+                        occurred_at=datetime.fromisoformat(moment),
+                        category_id=category_id,
+                    )
+                    for amount, moment, category_id in [
+                        # Понедельник 2024-01-01 по UTC, хотя по Москве
+                        (-100, "2024-01-01T02:00:00+03:00", "food"),
+                        (-200, "2024-01-07T23:59:00+00:00", None),
+                        (5000, "2024-01-08T00:00:00+00:00", None),
+                        (-300, "2024-02-29T12:00:00+00:00", "food"),
+                    ]
+                ],
+            )
+
+            days = await timeseries(
+                db,
+                user_id=user_id,
+                granularity="day",
+                start=date(2023, 12, 31),
+                end=date(2024, 1, 2),
+            )
+            assert days.buckets == [
+                date(2023, 12, 31),
+                date(2024, 1, 1),
+                date(2024, 1, 2),
+            ]
+            assert days.expense == [100, 0, 0]
+
+            weeks = await timeseries(
+                db,
+                user_id=user_id,
+                granularity="week",
+                start=date(2024, 1, 3),
+                end=date(2024, 1, 20),
+            )
+            assert weeks.buckets == [
+                date(2024, 1, 1),
+                date(2024, 1, 8),
+                date(2024, 1, 15),
+            ]
+            # Период обрезает первую неделю по from
+            assert (weeks.income, weeks.expense, weeks.count) == (
+                [0, 5000, 0],
+                [200, 0, 0],
+                [1, 1, 0],
+            )
+
+            months = await timeseries(
+                db,
+                user_id=user_id,
+                granularity="month",
+                start=date(2023, 12, 1),
+                end=date(2024, 3, 31),
+                category_id="food",
+            )
+            assert months.expense == [100, 0, 300, 0]
+            assert months.buckets[-1] == date(2024, 3, 1)
+
+    async def test_rollup_statement_count(self):
+        """Пачка операций - один UPSERT итогов, а не запрос на строку."""
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.engine.sync_engine, "before_cursor_execute", count)
+        try:
+            async with self.AsyncSessionLocal() as db:
+                await transaction.create_many(
+                    db,
+                    objs_in=[
+                        TransactionCreate(amount=-i, occurred_at=at(2024, i % 12 + 1))
+                        for i in range(1, 50)
+                    ],
+                )
+        finally:
+            event.remove(self.engine.sync_engine, "before_cursor_execute", count)
+
+        upserts = [s for s in statements if "monthly_rollups" in s]
+        # executemany UPSERT + удаление опустевших итогов
+        assert len(upserts) == 2
+
+
+class TestAnalyticsKernels:
+    """Тесты ядер NumPy."""
+
+    def test_kernels(self):
+        np = pytest.importorskip("numpy")
+
+        codes = np.array([2, 0, 2, 1, 2], dtype=np.int32)
+        values = np.array([5, 1, 7, 3, 2**40], dtype=np.int64)
+        assert analytics.group_sums(codes, values, 4).tolist() == [1, 3, 12 + 2**40, 0]
+        average = analytics.moving_average(np.array([3, 6, 9, 0]), 3)
+        assert np.isnan(average[:2]).all() and average[2:].tolist() == [6.0, 5.0]
+        yoy = analytics.year_over_year(np.arange(14) * 10)
+        assert np.isnan(yoy[:12]).all() and yoy[12:].tolist() == [120, 120]
+
+
+@pytest.mark.asyncio
+class TestAnalytics:
+    """Ядра NumPy должны совпадать с подсчетом в Python."""
+
+    @pytest.fixture(autouse=True)
+    async def setup_db(self):
+        pytest.importorskip("numpy")
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        yield
+        await self.engine.dispose()
+
+    async def test_report_matches_python(self):
+        user_id = str(uuid4())
+        crud = transaction.for_owner(user_id)
+        cache = analytics.AnalyticsCache(max_users=10, ttl=60)
+        crud.add_write_listener(cache.on_write)
+        rows = [
+            (-1000, at(2023, 1, 5), "food"),
+            (-300, at(2023, 1, 20), None),
+            (70000, at(2023, 12, 31), None),
+            (-2500, at(2024, 1, 1), "food"),
+            (-400, at(2024, 3, 15), "fun"),
+        ]
+        try:
+            async with self.AsyncSessionLocal() as db:
+                await crud.create_many(
+                    db,
+                    objs_in=[
+                        TransactionCreate(amount=a, occurred_at=t, category_id=c)
+                        for a, t, c in rows
+                    ],
+                )
+                frame = await cache.get(db, user_id)
+                assert await cache.get(db, user_id) is frame
+                assert len(await cache.get(db, None)) == 0
+
+                report = analytics.period_report(
+                    frame, start=date(2024, 1, 1), window=2, percentiles=[50]
+                )
+                assert report["months"] == [
+                    date(2024, 1, 1),
+                    date(2024, 2, 1),
+                    date(2024, 3, 1),
+                ]
+                assert report["expense"] == [2500, 0, 400]
+                # Среднее и год к году учитывают месяцы до начала периода
+                assert report["expense_moving_avg"] == [1250.0, 1250.0, 200.0]
+                assert report["expense_yoy"] == [1200, 0, 400]
+                assert sorted(
+                    (r["category_id"] or "", r["expense"], r["count"])
+                    for r in report["by_category"]
+                ) == [("food", 2500, 1), ("fun", 400, 1)]
+                assert report["expense_percentiles"] == {"50": 1450.0}
+
+                # Запись сбрасывает колонки владельца
+                await crud.create(
+                    db,
+                    obj_in=TransactionCreate(amount=-1, occurred_at=at(2024, 2)),
+                )
+                frame = await cache.get(db, user_id)
+                assert len(frame) == len(rows) + 1
+                assert cache.loads == 3
+        finally:
+            transaction.write_listeners.remove(cache.on_write)
+
+
+@pytest.mark.asyncio
+class TestTransactionsAPI:
+    """Тесты /transactions и /reports/monthly."""
+
+    async def test_transactions_and_monthly_report(self, client: AsyncClient):
+        user = {"X-User-Id": str(uuid4())}
+        response = await client.post(
+            "/api/v1/categories/", json={"name": f"Отчеты {uuid4().hex[:8]}"}
+        )
+        category_id = response.json()["id"]
+
+        created = []
+        for amount, day in [
+            (-1500, "2024-01-10"),
+            (-500, "2024-01-20"),
+            (9000, "2024-02-01"),
+        ]:
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={
+                    "amount": amount,
+                    "occurred_at": f"{day}T10:00:00Z",
+                    "category_id": category_id,
+                },
+                headers=user,
+            )
+            assert response.status_code == 201
+            created.append(response.json())
+
+        try:
+            response = await client.get(
+                "/api/v1/reports/monthly", params={"from": "2024-01-15"}, headers=user
+            )
+            assert response.status_code == 200
+            assert [
+                (row["month"], row["income"], row["expense"], row["net"], row["count"])
+                for row in response.json()
+            ] == [
+                ("2024-01-01", 0, 2000, -2000, 2),
+                ("2024-02-01", 9000, 0, 9000, 1),
+            ]
+
+            response = await client.put(
+                f"/api/v1/transactions/{created[0]['id']}",
+                json={"amount": -2500},
+                headers=user,
+            )
+            assert response.json()["amount"] == -2500
+            response = await client.get(
+                "/api/v1/reports/monthly",
+                params={"to": "2024-01-31", "category": category_id},
+                headers=user,
+            )
+            assert response.json()[0]["expense"] == 3000
+
+            # Другой пользователь не видит ни операций, ни итогов
+            response = await client.get("/api/v1/reports/monthly")
+            assert all(row["count"] for row in response.json())
+            assert category_id not in {row["category_id"] for row in response.json()}
+            response = await client.get(f"/api/v1/transactions/{created[0]['id']}")
+            assert response.status_code == 404
+
+            response = await client.get(
+                "/api/v1/transactions/", params={"limit": 2}, headers=user
+            )
+            assert len(response.json()) == 2
+            assert "X-Next-Cursor" in response.headers
+
+            # Проверки ввода
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={"amount": 0, "occurred_at": "2024-01-01T00:00:00Z"},
+                headers=user,
+            )
+            assert response.status_code == 422
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={
+                    "amount": -1,
+                    "occurred_at": "2024-01-01T00:00:00Z",
+                    "category_id": str(uuid4()),
+                },
+                headers=user,
+            )
+            assert response.status_code == 400
+            response = await client.get(
+                "/api/v1/reports/monthly",
+                params={"from": "2024-02-01", "to": "2024-01-01"},
+            )
+            assert response.status_code == 400
+
+            response = await client.get(
+                "/api/v1/reports/timeseries",
+                params={
+                    "granularity": "month",
+                    "from": "2023-12-15",
+                    "to": "2024-02-01",
+                },
+                headers=user,
+            )
+            assert response.json() == {
+                "granularity": "month",
+                "currency": "RUB",
+                "buckets": ["2023-12-01", "2024-01-01", "2024-02-01"],
+                "income": [0, 0, 9000],
+                "expense": [0, 3000, 0],
+                "count": [0, 2, 1],
+            }
+            response = await client.get(
+                "/api/v1/reports/timeseries",
+                params={"from": "2000-01-01", "to": "2024-01-01"},
+            )
+            assert response.status_code == 400
+            response = await client.get(
+                "/api/v1/reports/timeseries",
+                params={
+                    "granularity": "year",
+                    "from": "2024-01-01",
+                    "to": "2024-01-01",
+                },
+            )
+            assert response.status_code == 422
+        finally:
+            for item in created:
+                await client.delete(f"/api/v1/transactions/{item['id']}", headers=user)
+            await client.delete(f"/api/v1/categories/{category_id}")
+
+        response = await client.get("/api/v1/reports/monthly", headers=user)
+        assert response.json() == []
+
+    async def test_analytics_report(self, client: AsyncClient):
+        pytest.importorskip("numpy")
+        user = {"X-User-Id": str(uuid4())}
+        created = []
+        for amount, day in [(-100, "2024-01-10"), (-300, "2024-03-01")]:
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={"amount": amount, "occurred_at": f"{day}T10:00:00Z"},
+                headers=user,
+            )
+            created.append(response.json())
+
+        try:
+            response = await client.get(
+                "/api/v1/reports/analytics",
+                params={"window": 2, "percentile": [0, 100]},
+                headers=user,
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["months"] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+            assert data["expense"] == [100, 0, 300]
+            assert data["expense_moving_avg"] == [50.0, 50.0, 150.0]
+            assert data["expense_percentiles"] == {"0": 100.0, "100": 300.0}
+
+            # Новая операция видна сразу (колонки сброшены записью)
+            response = await client.post(
+                "/api/v1/transactions/",
+                json={"amount": -50, "occurred_at": "2024-02-01T00:00:00Z"},
+                headers=user,
+            )
+            created.append(response.json())
+            response = await client.get(
+                "/api/v1/reports/analytics",
+                params={"from": "2024-02-01", "to": "2024-02-29"},
+                headers=user,
+            )
+            assert response.json()["expense"] == [50]
+
+            response = await client.get(
+                "/api/v1/reports/analytics",
+                params={"percentile": 101},
+                headers=user,
+            )
+            assert response.status_code == 400
+        finally:
+            for item in created:
+                await client.delete(f"/api/v1/transactions/{item['id']}", headers=user)